@@ -0,0 +1,85 @@
+"""
+Microbenchmark of the serialization of Exchange Rates into newline delimited JSON
+for BigQuery loads: the dictionary comprehension plus json.dumps done previously
+(load_table_from_json serializes each dictionary with json.dumps) against
+NdjsonRowEncoder. Run it from repo root:
+
+    python -m benchmarks.bq_row_encoding
+"""
+
+import datetime as dt
+import json
+import time
+from typing import List
+
+from src import model
+from src.destination_repository import NdjsonRowEncoder
+
+CURRENCIES = ["USD", "JPY", "GBP", "CHF", "AUD", "CAD", "CNY", "SEK", "NOK", "PLN"]
+
+
+def build_exchange_rates(rows: int) -> List[model.ExchangeRate]:
+    """
+    Builds a backfill-like batch: every currency for consecutive dates, sharing the
+    creation date as the exchange rates parsed from a response do.
+
+    Args:
+        rows (int): number of Exchange Rates.
+    Returns:
+        List[model.ExchangeRate]: the Exchange Rates.
+    """
+    creation_date = dt.datetime(2024, 1, 1, 12, 0, 0)
+    return [
+        model.ExchangeRate(
+            date=dt.date(1999, 1, 4) + dt.timedelta(index // len(CURRENCIES)),
+            exchange_rate=1.0 + index % 997 / 1000,
+            currency_pair=model.CurrencyPair(
+                "EUR", CURRENCIES[index % len(CURRENCIES)]
+            ),
+            source="ECB API",
+            creation_date=creation_date,
+        )
+        for index in range(rows)
+    ]
+
+
+def comprehension(exchange_rates: List[model.ExchangeRate]) -> bytes:
+    """Previous serialization: dictionaries, then json.dumps per row."""
+    dictify = [
+        {
+            "date": exchange_rate.date.strftime("%Y-%m-%d"),
+            "exchange_rate": exchange_rate.exchange_rate,
+            "base_currency": exchange_rate.currency_pair.base,
+            "quote_currency": exchange_rate.currency_pair.quote,
+            "source": exchange_rate.source,
+            "creation_date": exchange_rate.creation_date.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        for exchange_rate in exchange_rates
+    ]
+    return "\n".join(json.dumps(row, ensure_ascii=False) for row in dictify).encode()
+
+
+def encoder(exchange_rates: List[model.ExchangeRate]) -> bytearray:
+    """NdjsonRowEncoder serialization."""
+    row_encoder = NdjsonRowEncoder()
+    row_encoder.encode(exchange_rates)
+    return row_encoder.buffer
+
+
+def main():
+    for rows in (10_000, 100_000, 1_000_000):
+        exchange_rates = build_exchange_rates(rows)
+        timings = {}
+        for name, function in (("comprehension", comprehension), ("encoder", encoder)):
+            start = time.perf_counter()
+            function(exchange_rates)
+            timings[name] = time.perf_counter() - start
+        print(
+            f"{rows:>9} rows: comprehension {timings['comprehension']:.3f}s, "
+            f"encoder {timings['encoder']:.3f}s, "
+            f"speed-up {timings['comprehension'] / timings['encoder']:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
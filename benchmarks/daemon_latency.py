@@ -0,0 +1,106 @@
+"""
+Benchmark of the per-job latency of the daemon mode against cold invocations.
+
+Both modes run the same job, EUR/GBP and EUR/USD through EcbApiCallerFake into a
+SQLite file, so the benchmark runs offline and measures the startup overhead only:
+
+- cold: a new interpreter importing the CLI, as `python -m src.entrypoints.cli`
+  does, and running the job.
+- warm, thin client: a new interpreter running the stdlib-only submit client
+  against a daemon that is already running.
+- warm, in process: a job submitted to the running daemon from this process.
+
+Run it from repo root:
+
+    python -m benchmarks.daemon_latency
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from src import destination_repository, jobs, services, source_repository
+from src.entrypoints.cli.daemon import JobServer
+from src.entrypoints.cli.daemon_client import submit_job
+
+API_RESPONSES = {
+    "GBP": "tests/data/xml_ecb_test.xml",
+    "USD": "tests/data/xml_ecb_test.xml",
+}
+COLD_JOB = """
+import src.entrypoints.cli.__main__
+from src import destination_repository, jobs, services, source_repository
+services.source_exchange_rates_for_jobs(
+    [jobs.JobSpec()],
+    lambda days, data_format: source_repository.EcbApiCallerFake({responses!r}, days),
+    lambda table: destination_repository.SqliteDestinationRepository({sqlite_path!r}),
+)
+"""
+RUNS = 10
+
+
+def timed(function) -> list:
+    """Runs function RUNS times and returns the elapsed seconds of each run."""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "daemon.sock")
+        sqlite_path = os.path.join(directory, "rates.sqlite")
+
+        def run_job(job_spec: jobs.JobSpec):
+            services.source_exchange_rates_for_jobs(
+                [job_spec],
+                lambda days, data_format: source_repository.EcbApiCallerFake(
+                    API_RESPONSES, days
+                ),
+                lambda table: destination_repository.SqliteDestinationRepository(
+                    sqlite_path
+                ),
+            )
+
+        server = JobServer(socket_path, run_job)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        cold_job = COLD_JOB.format(responses=API_RESPONSES, sqlite_path=sqlite_path)
+        results = {
+            "cold": timed(
+                lambda: subprocess.run([sys.executable, "-c", cold_job], check=True)
+            ),
+            "warm, thin client": timed(
+                lambda: subprocess.run(
+                    [
+                        sys.executable,
+                        "-m",
+                        "src.entrypoints.cli.daemon_client",
+                        "--socket",
+                        socket_path,
+                    ],
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                )
+            ),
+            "warm, in process": timed(lambda: submit_job(socket_path, {})),
+        }
+        server.shutdown()
+        server.server_close()
+
+    for name, timings in results.items():
+        print(
+            f"{name:>18}: median {statistics.median(timings) * 1000:8.1f} ms, "
+            f"max {max(timings) * 1000:8.1f} ms over {RUNS} jobs"
+        )
+
+
+if __name__ == "__main__":
+    main()
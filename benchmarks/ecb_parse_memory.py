@@ -0,0 +1,100 @@
+"""
+Benchmark of the memory allocated while reading and parsing large ECB API responses,
+comparing the former path (decode the body to a str with response.text, then
+Et.fromstring), streaming bytes chunks with response.iter_content, and the buffer views
+of source_repository.iter_body_views used by EcbApiCaller.
+
+Responses are served by requests_mock from synthesised bodies, see
+benchmarks.ecb_transfer_savings, without charset in their Content-Type header as the
+ECB API does. Memory is measured with tracemalloc. Run it from repo root:
+
+    python -m benchmarks.ecb_parse_memory
+"""
+
+import gzip
+import time
+import tracemalloc
+from typing import Callable
+
+import requests as req
+import requests_mock
+
+from benchmarks.ecb_transfer_savings import generic_body
+from src import model, source_repository
+
+URL = "https://data-api.ecb.europa.eu"
+CURRENCY_PAIR = model.CurrencyPair("EUR", "GBP")
+
+
+def parse_text(response: req.models.Response):
+    """Former path: decodes the whole body to a str before parsing it."""
+    return source_repository.EcbApiCaller._xml_chunks_to_ecb_rates(
+        [response.text], CURRENCY_PAIR
+    )
+
+
+def parse_iter_content(response: req.models.Response):
+    """Streams the body as bytes chunks allocated by requests."""
+    return source_repository.EcbApiCaller._xml_chunks_to_ecb_rates(
+        response.iter_content(source_repository.RESPONSE_CHUNK_SIZE), CURRENCY_PAIR
+    )
+
+
+def parse_buffer_views(response: req.models.Response):
+    """Streams the body through views of a single reusable buffer."""
+    return source_repository.EcbApiCaller._xml_to_ecb_rates(response, CURRENCY_PAIR)
+
+
+def measure(
+    body: bytes, compressed: bool, parse: Callable[[req.models.Response], object]
+) -> tuple[float, float]:
+    """
+    Parses a streamed response and measures the memory it needs on top of the parsed
+    exchange rates, i.e. the peak traced memory minus the memory still held once parsed,
+    and its duration.
+
+    Returns:
+        tuple[float, float]: transient memory in MiB and duration in ms.
+    """
+    headers = {"Content-Type": source_repository.GENERIC_DATA}
+    if compressed:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    with requests_mock.Mocker() as mocker:
+        mocker.get(URL, content=body, headers=headers)
+        response = req.get(URL, stream=True)
+        start = time.perf_counter()
+        parse(response)
+        elapsed = (time.perf_counter() - start) * 1000
+        response = req.get(URL, stream=True)
+        tracemalloc.start()
+        exchange_rates = parse(response)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del exchange_rates
+
+    return (peak - retained) / 2**20, elapsed
+
+
+def main():
+    print(
+        f"{'window':>8} {'body MiB':>9} {'gzip':>5} {'path':>14} "
+        f"{'transient MiB':>14} {'parse ms':>9}"
+    )
+    for days in (3650, 9125, 36500):
+        body = generic_body(days)
+        for compressed in (False, True):
+            for name, parse in (
+                ("text", parse_text),
+                ("iter_content", parse_iter_content),
+                ("buffer views", parse_buffer_views),
+            ):
+                peak, elapsed = measure(body, compressed, parse)
+                print(
+                    f"{days:>8} {len(body) / 2**20:>9.2f} {'yes' if compressed else 'no':>5} "
+                    f"{name:>14} {peak:>14.2f} {elapsed:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
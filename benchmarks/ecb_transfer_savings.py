@@ -0,0 +1,146 @@
+"""
+Benchmark of the bytes transferred by ECB API calls for the different response
+formats and encodings supported by EcbApiCaller.
+
+Response bodies are synthesised from the shape of real ECB responses, one series
+per currency pair with one observation per business day, so the benchmark runs
+offline. Run it from repo root:
+
+    python -m benchmarks.ecb_transfer_savings
+"""
+
+import datetime as dt
+import gzip
+import random
+import time
+from typing import Iterator, List
+
+from src import model, source_repository
+
+GENERIC_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?><message:GenericData '
+    'xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message" '
+    'xmlns:generic="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/generic">'
+    "<message:DataSet>"
+)
+GENERIC_SERIES = (
+    "<generic:Series><generic:SeriesKey>"
+    '<generic:Value id="FREQ" value="D"/><generic:Value id="CURRENCY" value="{quote}"/>'
+    '<generic:Value id="CURRENCY_DENOM" value="EUR"/><generic:Value id="EXR_TYPE" value="SP00"/>'
+    '<generic:Value id="EXR_SUFFIX" value="A"/></generic:SeriesKey><generic:Attributes>'
+    '<generic:Value id="TITLE" value="{quote}/Euro"/><generic:Value id="COLLECTION" value="A"/>'
+    '<generic:Value id="TITLE_COMPL" value="ECB reference exchange rate, {quote}/Euro, 2:15 pm (C.E.T.)"/>'
+    '<generic:Value id="DECIMALS" value="5"/><generic:Value id="UNIT_MULT" value="0"/>'
+    '<generic:Value id="TIME_FORMAT" value="P1D"/><generic:Value id="UNIT" value="{quote}"/>'
+    '<generic:Value id="SOURCE_AGENCY" value="4F0"/></generic:Attributes>\n'
+)
+GENERIC_OBS = (
+    '<generic:Obs><generic:ObsDimension value="{date}"/><generic:ObsValue value="{value}"/>'
+    '<generic:Attributes><generic:Value id="OBS_STATUS" value="A"/>'
+    '<generic:Value id="OBS_CONF" value="F"/></generic:Attributes></generic:Obs>\n'
+)
+GENERIC_FOOTER = "</generic:Series></message:DataSet></message:GenericData>"
+STRUCTURE_SPECIFIC_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?><message:StructureSpecificData '
+    'xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message">'
+    "<message:DataSet>"
+    '<Series FREQ="D" CURRENCY="{quote}" CURRENCY_DENOM="EUR" EXR_TYPE="SP00" EXR_SUFFIX="A">\n'
+)
+STRUCTURE_SPECIFIC_OBS = '<Obs TIME_PERIOD="{date}" OBS_VALUE="{value}"/>\n'
+STRUCTURE_SPECIFIC_FOOTER = (
+    "</Series></message:DataSet></message:StructureSpecificData>"
+)
+
+
+def business_days(days: int) -> List[dt.date]:
+    """
+    Returns the weekdays within the last given number of days.
+
+    Args:
+        days (int): Number of calendar days of the window.
+    Returns:
+        List[dt.date]: weekdays of the window.
+    """
+    today = dt.date(2024, 12, 31)
+    dates = [today - dt.timedelta(days=offset) for offset in range(days)]
+    return sorted(date for date in dates if date.weekday() < 5)
+
+
+def rates(days: int) -> List[tuple]:
+    """
+    Returns a seeded random walk of rates for the business days of the window.
+
+    Args:
+        days (int): Number of calendar days of the window.
+    Returns:
+        List[tuple]: (date, rate) tuples.
+    """
+    generator = random.Random(days)
+    rate = 0.85
+    observations = []
+    for date in business_days(days):
+        rate = round(rate * (1 + generator.gauss(0, 0.004)), 5)
+        observations.append((date, rate))
+    return observations
+
+
+def generic_body(days: int) -> bytes:
+    """Synthesises a generic format body with all attributes for the window."""
+    observations = "".join(
+        GENERIC_OBS.format(date=date, value=value) for date, value in rates(days)
+    )
+    return (
+        GENERIC_HEADER
+        + GENERIC_SERIES.format(quote="GBP")
+        + observations
+        + GENERIC_FOOTER
+    ).encode()
+
+
+def structure_specific_body(days: int) -> bytes:
+    """Synthesises a structure specific, data only, format body for the window."""
+    observations = "".join(
+        STRUCTURE_SPECIFIC_OBS.format(date=date, value=value)
+        for date, value in rates(days)
+    )
+    return (
+        STRUCTURE_SPECIFIC_HEADER.format(quote="GBP")
+        + observations
+        + STRUCTURE_SPECIFIC_FOOTER
+    ).encode()
+
+
+def chunked(
+    body: bytes, size: int = source_repository.RESPONSE_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Splits a body in chunks as it would be streamed."""
+    for offset in range(0, len(body), size):
+        yield body[offset : offset + size]
+
+
+def main():
+    currency_pair = model.CurrencyPair("EUR", "GBP")
+    print(
+        f"{'window':>8} {'format':>20} {'raw bytes':>12} {'gzip bytes':>12} "
+        f"{'vs baseline':>12} {'parse ms':>9}"
+    )
+    for days in (10, 365, 3650, 9125):
+        baseline = len(generic_body(days))
+        for name, body in (
+            ("generic", generic_body(days)),
+            ("structure specific", structure_specific_body(days)),
+        ):
+            compressed = len(gzip.compress(body))
+            start = time.perf_counter()
+            source_repository.EcbApiCaller._xml_chunks_to_ecb_rates(
+                chunked(body), currency_pair
+            )
+            elapsed = (time.perf_counter() - start) * 1000
+            print(
+                f"{days:>8} {name:>20} {len(body):>12} {compressed:>12} "
+                f"{baseline / compressed:>11.1f}x {elapsed:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
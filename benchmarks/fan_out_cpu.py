@@ -0,0 +1,105 @@
+"""
+Benchmark of the CPU spent landing the same run in three destinations, BigQuery, the
+BigQuery project of a partner and a local archive: three independent pipelines, each
+parsing, validating and encoding the rates, against a single pipeline loading into a
+FanOutDestinationRepository, that encodes each batch once for the three destinations.
+
+Responses are synthesised, see benchmarks.ecb_transfer_savings, and load jobs only read
+the bytes they are given, so the benchmark runs offline and measures the CPU of the
+pipeline itself. Run it from repo root:
+
+    python -m benchmarks.fan_out_cpu
+"""
+
+import tempfile
+import time
+from typing import Callable, List
+
+from benchmarks.ecb_transfer_savings import (
+    business_days,
+    chunked,
+    structure_specific_body,
+)
+from src import destination_repository, model, source_repository, validation
+
+CURRENCIES = ["USD", "JPY", "GBP", "CHF", "AUD", "CAD", "CNY", "SEK", "NOK", "PLN"]
+DAYS = 3650
+
+
+class NullLoadJob:
+    def result(self):
+        return self
+
+
+class NullBigQueryClient:
+    """Client whose load jobs read their file and discard it."""
+
+    def load_table_from_file(self, file_obj, destination, size=None, job_config=None):
+        file_obj.read()
+        return NullLoadJob()
+
+
+def run_pipeline(
+    body: bytes, destination: destination_repository.AbstractDestinationRepository
+):
+    """Parses the response of every currency, validates the rates and loads them."""
+    exchange_rates = []
+    for currency in CURRENCIES:
+        exchange_rates += source_repository.EcbApiCaller._xml_chunks_to_ecb_rates(
+            chunked(body), model.CurrencyPair("EUR", currency)
+        )
+    exchange_rates = validation.ExchangeRateValidator().validate(exchange_rates).valid
+    destination.load_exchange_rates(exchange_rates)
+    destination.flush()
+
+
+def build_destinations(
+    directory: str,
+) -> List[destination_repository.AbstractDestinationRepository]:
+    return [
+        destination_repository.BiqQueryDestinationRepository(NullBigQueryClient()),
+        destination_repository.BiqQueryDestinationRepository(NullBigQueryClient()),
+        destination_repository.NdjsonArchiveDestinationRepository(directory),
+    ]
+
+
+def measure(function: Callable[[], None]) -> tuple:
+    """Returns the CPU and wall clock seconds of a call, threads included."""
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    function()
+    return time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def main():
+    body = structure_specific_body(DAYS)
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        def independent_pipelines():
+            for destination in build_destinations(directory):
+                run_pipeline(body, destination)
+
+        def fan_out_pipeline():
+            fan_out = destination_repository.FanOutDestinationRepository(
+                build_destinations(directory)
+            )
+            run_pipeline(body, fan_out)
+            fan_out.close()
+
+        independent_cpu, independent_wall = measure(independent_pipelines)
+        fan_out_cpu, fan_out_wall = measure(fan_out_pipeline)
+
+    print(f"rows per destination: {len(CURRENCIES) * len(business_days(DAYS)):>10}")
+    print(
+        f"independent:          {independent_cpu:>10.2f} s CPU "
+        f"{independent_wall:>7.2f} s wall"
+    )
+    print(
+        f"fan-out:              {fan_out_cpu:>10.2f} s CPU "
+        f"{fan_out_wall:>7.2f} s wall"
+    )
+    print(f"CPU saved:            {1 - fan_out_cpu / independent_cpu:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark of the startup time and lookup latency of the full rate history, comparing
+reading every row of a SQLite destination into memory with opening a memory-mapped
+snapshot written by src.snapshot.
+
+The history is synthesised: 43 currencies against the EURO over 25 years of business
+days, about 280k rates. Run it from repo root:
+
+    python -m benchmarks.snapshot_startup
+"""
+
+import datetime as dt
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from src import destination_repository, model, snapshot
+
+CURRENCIES = 43
+YEARS = 25
+LOOKUPS = 100_000
+
+
+def history() -> list[model.ExchangeRate]:
+    """Synthesises the rates of every currency over the business days of the period."""
+    generator = random.Random(0)
+    last_date = dt.date(2024, 12, 31)
+    dates = [
+        date
+        for date in (
+            last_date - dt.timedelta(days=offset) for offset in range(YEARS * 365)
+        )
+        if date.weekday() < 5
+    ]
+    creation_date = dt.datetime(2025, 1, 1)
+    return [
+        model.ExchangeRate(
+            date=date,
+            exchange_rate=generator.uniform(0.5, 150.0),
+            currency_pair=model.CurrencyPair("EUR", f"C{currency:02d}"),
+            source="ECB API",
+            creation_date=creation_date,
+        )
+        for currency in range(CURRENCIES)
+        for date in dates
+    ]
+
+
+def measure(label: str, startup, lookup, queries: list):
+    """Prints startup time, memory retained after startup and lookup latency."""
+    start = time.perf_counter()
+    state = startup()
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    tracemalloc.start()
+    traced_state = startup()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced_state
+
+    start = time.perf_counter()
+    for currency_pair, date in queries:
+        lookup(state, currency_pair, date)
+    lookup_us = (time.perf_counter() - start) / len(queries) * 1e6
+    print(
+        f"{label:>22} {startup_ms:>12.1f} {retained / 2**20:>12.1f} {lookup_us:>12.2f}"
+    )
+    return state
+
+
+def main():
+    exchange_rates = history()
+    generator = random.Random(1)
+    queries = [
+        (
+            model.CurrencyPair("EUR", f"C{generator.randrange(CURRENCIES):02d}"),
+            dt.date(2000, 1, 1) + dt.timedelta(days=generator.randrange(YEARS * 365)),
+        )
+        for _ in range(LOOKUPS)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite_path = os.path.join(directory, "rates.sqlite")
+        snapshot_path = os.path.join(directory, "rates.snapshot")
+        destination_repository.SqliteDestinationRepository(
+            sqlite_path
+        ).load_exchange_rates(exchange_rates)
+        snapshot.write_snapshot(snapshot_path, exchange_rates)
+        print(
+            f"{len(exchange_rates)} rates, snapshot of "
+            f"{os.path.getsize(snapshot_path) / 2**20:.1f} MiB, "
+            f"SQLite file of {os.path.getsize(sqlite_path) / 2**20:.1f} MiB"
+        )
+        print(f"{'':>22} {'startup ms':>12} {'retained MiB':>12} {'lookup us':>12}")
+
+        def load_sqlite():
+            history_by_pair: dict = {}
+            repository = destination_repository.SqliteDestinationRepository(sqlite_path)
+            for exchange_rate in repository.read_all_exchange_rates():
+                history_by_pair.setdefault(exchange_rate.currency_pair, {})[
+                    exchange_rate.date
+                ] = exchange_rate.exchange_rate
+            return history_by_pair
+
+        measure(
+            "in-memory from SQLite",
+            load_sqlite,
+            lambda state, currency_pair, date: state[currency_pair].get(date),
+            queries,
+        )
+        rates_snapshot = measure(
+            "memory-mapped snapshot",
+            lambda: snapshot.ExchangeRateSnapshot(snapshot_path),
+            lambda state, currency_pair, date: state.rate(currency_pair, date),
+            queries,
+        )
+        rates_snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark of the overhead of the validation stage on a backfill of about one million
+Exchange Rates: the time spent by ExchangeRateValidator against the time spent by the
+rest of the path from source to destination, i.e. parsing the streamed ECB responses
+and encoding the rows for BigQuery. A few rates are corrupted so the stage also has
+outliers to catch.
+
+Responses are synthesised, see benchmarks.ecb_transfer_savings, so the benchmark runs
+offline. Run it from repo root:
+
+    python -m benchmarks.validation_overhead
+"""
+
+import dataclasses
+import time
+
+from benchmarks.ecb_transfer_savings import chunked, structure_specific_body
+from src import model, source_repository, validation
+from src.destination_repository import NdjsonRowEncoder
+
+CURRENCIES = [
+    "USD", "JPY", "BGN", "CZK", "DKK", "GBP", "HUF", "PLN", "RON", "SEK", "CHF", "ISK",
+    "NOK", "TRY", "AUD", "BRL", "CAD", "CNY", "HKD", "IDR", "ILS", "INR", "KRW", "MXN",
+    "MYR", "NZD", "PHP", "SGD", "THB", "ZAR", "CYP", "EEK", "LTL", "LVL", "MTL", "SIT",
+    "SKK", "HRK", "RUB", "ARS", "DZD", "MAD", "TWD",
+]  # fmt: skip
+DAYS = 32_000
+# One rate out of CORRUPTION_STRIDE is mis-parsed, e.g. a misplaced decimal separator.
+CORRUPTION_STRIDE = 10_000
+
+
+def main():
+    body = structure_specific_body(DAYS)
+
+    start = time.perf_counter()
+    exchange_rates = []
+    for currency in CURRENCIES:
+        exchange_rates += source_repository.EcbApiCaller._xml_chunks_to_ecb_rates(
+            chunked(body), model.CurrencyPair("EUR", currency)
+        )
+    parse_seconds = time.perf_counter() - start
+
+    for index in range(0, len(exchange_rates), CORRUPTION_STRIDE):
+        exchange_rates[index] = dataclasses.replace(
+            exchange_rates[index],
+            exchange_rate=exchange_rates[index].exchange_rate * 100,
+        )
+
+    start = time.perf_counter()
+    encoder = NdjsonRowEncoder()
+    encoder.encode(exchange_rates)
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = validation.ExchangeRateValidator().validate(exchange_rates)
+    validate_seconds = time.perf_counter() - start
+
+    pipeline_seconds = parse_seconds + encode_seconds
+    print(f"rows:          {len(exchange_rates):>10}")
+    print(f"parse:         {parse_seconds:>10.2f} s")
+    print(f"encode:        {encode_seconds:>10.2f} s")
+    print(f"validate:      {validate_seconds:>10.2f} s")
+    print(f"quarantined:   {len(result.quarantined):>10}")
+    print(f"overhead:      {validate_seconds / pipeline_seconds:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+from dataclasses import dataclass, field, replace
+import hashlib
+from typing import List
+
+from src import model
+from src.utils.observation_hashes import ObservationHashStore
+
+
+# Appended to the source of revised observations, e.g. "ECB API (revised)".
+REVISION_SUFFIX = " (revised)"
+
+
+def observation_hash(exchange_rate: model.ExchangeRate) -> int:
+    """
+    Hashes the value of an observation, as a signed 64-bit integer that SQLite can store.
+
+    Args:
+        exchange_rate (model.ExchangeRate): The observation.
+    Returns:
+        int: The hash of its value.
+    """
+    digest = hashlib.blake2b(
+        repr(exchange_rate.exchange_rate).encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@dataclass(frozen=True)
+class ChangeCounts:
+    """
+    Number of new, revised and unchanged observations of a run.
+
+    Attributes:
+        new (int): Observations of a currency pair and date never loaded before.
+        revised (int): Observations whose value differs from the one loaded before.
+        unchanged (int): Observations whose value is the one loaded before.
+    """
+
+    new: int
+    revised: int
+    unchanged: int
+
+
+@dataclass
+class ChangeSet:
+    """
+    Observations of a run split by ObservationChangeDetector.classify().
+
+    Attributes:
+        new (List[model.ExchangeRate]): Observations never loaded before.
+        revised (List[model.ExchangeRate]): Observations with a new value, their source
+            marked with REVISION_SUFFIX.
+        unchanged (int): Number of observations skipped because their value did not change.
+        hashes (list[tuple]): Currency pair, date, frequency and hash of the new and
+            revised observations.
+    """
+
+    new: List[model.ExchangeRate] = field(default_factory=list)
+    revised: List[model.ExchangeRate] = field(default_factory=list)
+    unchanged: int = 0
+    hashes: list = field(default_factory=list)
+
+    @property
+    def changed(self) -> List[model.ExchangeRate]:
+        """
+        Observations to load: the new ones followed by the revised ones.
+        """
+        return self.new + self.revised
+
+    @property
+    def counts(self) -> ChangeCounts:
+        return ChangeCounts(len(self.new), len(self.revised), self.unchanged)
+
+
+class ObservationChangeDetector:
+    """
+    Tells new, revised and unchanged observations apart by comparing the hash of their
+    value with the one stored for their currency pair, date and frequency when they were
+    last loaded.
+    Only new and revised observations need to be loaded, so unchanged ones are dropped
+    before they are serialized, and revisions are marked in their source so they can be
+    told from the observation they revise.
+
+    Args:
+        store (ObservationHashStore): Hashes of the observations already loaded.
+    Attributes:
+        store (ObservationHashStore): Hashes of the observations already loaded.
+        reports (list[ChangeCounts]): Counts of each classified run.
+    Methods:
+        classify(exchange_rates: List[model.ExchangeRate]) -> ChangeSet:
+            Splits the observations of a run in new, revised and unchanged ones.
+        commit(change_set: ChangeSet):
+            Stores the hashes of a change set once it has been loaded.
+    """
+
+    def __init__(self, store: ObservationHashStore):
+        self.store = store
+        self.reports: list[ChangeCounts] = []
+
+    def classify(self, exchange_rates: List[model.ExchangeRate]) -> ChangeSet:
+        """
+        Splits the observations of a run in new, revised and unchanged ones. Stored hashes
+        are read once per currency pair and frequency, over the dates of the run.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]): The observations of the run.
+        Returns:
+            ChangeSet: The new and revised observations and the count of unchanged ones.
+        """
+        dates_by_series: dict[tuple, list] = {}
+        for exchange_rate in exchange_rates:
+            dates_by_series.setdefault(
+                (exchange_rate.currency_pair, exchange_rate.frequency), []
+            ).append(exchange_rate.date)
+        stored_hashes = {
+            (currency_pair, frequency): self.store.get_hashes(
+                currency_pair, min(dates), max(dates), frequency
+            )
+            for (currency_pair, frequency), dates in dates_by_series.items()
+        }
+
+        change_set = ChangeSet()
+        for exchange_rate in exchange_rates:
+            value_hash = observation_hash(exchange_rate)
+            stored_hash = stored_hashes[
+                exchange_rate.currency_pair, exchange_rate.frequency
+            ].get(exchange_rate.date)
+            if stored_hash == value_hash:
+                change_set.unchanged += 1
+                continue
+            if stored_hash is None:
+                change_set.new.append(exchange_rate)
+            else:
+                change_set.revised.append(
+                    replace(
+                        exchange_rate, source=exchange_rate.source + REVISION_SUFFIX
+                    )
+                )
+            change_set.hashes.append(
+                (
+                    exchange_rate.currency_pair,
+                    exchange_rate.date,
+                    exchange_rate.frequency,
+                    value_hash,
+                )
+            )
+
+        self.reports.append(change_set.counts)
+        return change_set
+
+    def commit(self, change_set: ChangeSet):
+        """
+        Stores the hashes of the new and revised observations of a change set. Call it once
+        they have been loaded, so observations that failed to load are loaded again next run.
+
+        Args:
+            change_set (ChangeSet): The loaded change set.
+        """
+        self.store.put_hashes(change_set.hashes)
@@ -0,0 +1,126 @@
+import datetime as dt
+import math
+from typing import Iterable, List, Sequence
+
+from src import model
+
+
+DERIVED_SOURCE = "ECB API (derived)"
+EURO = "EUR"
+
+
+def euro_legs(
+    exchange_rates: Iterable[model.ExchangeRate],
+) -> tuple[List[dt.date], dict[str, List[float]]]:
+    """
+    Arranges the EUR based Exchange Rates in columns aligned on their dates: one column per
+    quote currency, with NaN on the dates the currency has no rate. Rates that are not
+    positive, e.g. a zero rate loaded without validation, are left out as NaN too, so no
+    derived rate divides by zero. The EUR column is all ones.
+
+    Args:
+        exchange_rates (Iterable[model.ExchangeRate]): Exchange Rates against the EURO.
+            Rates of other base currencies are ignored.
+    Returns:
+        tuple[List[dt.date], dict[str, List[float]]]: the sorted dates and the column of
+            each currency.
+    """
+    rates_by_currency: dict[str, dict[dt.date, float]] = {}
+    for exchange_rate in exchange_rates:
+        if exchange_rate.currency_pair.base == EURO:
+            rates_by_currency.setdefault(exchange_rate.currency_pair.quote, {})[
+                exchange_rate.date
+            ] = (
+                exchange_rate.exchange_rate
+                if exchange_rate.exchange_rate > 0
+                else math.nan
+            )
+
+    dates = sorted({date for rates in rates_by_currency.values() for date in rates})
+    columns = {
+        currency: [rates.get(date, math.nan) for date in dates]
+        for currency, rates in rates_by_currency.items()
+    }
+    columns[EURO] = [1.0] * len(dates)
+
+    return dates, columns
+
+
+def derive_exchange_rates(
+    exchange_rates: Iterable[model.ExchangeRate],
+    cross_currency_pairs: Sequence[model.CurrencyPair] = (),
+    inverses: bool = True,
+) -> List[model.ExchangeRate]:
+    """
+    Derives inverse rates (e.g. USD/EUR) and cross rates (e.g. GBP/USD) from Exchange Rates
+    against the EURO. Rates are computed column by column over the dates of the EUR legs:
+    the rate of X/Y is EUR/Y divided by EUR/X, so inverses are cross rates with Y = EUR.
+    Dates on which a leg is missing get no derived rate. Rates of each frequency are
+    derived from the legs of that frequency only.
+
+    Args:
+        exchange_rates (Iterable[model.ExchangeRate]): Exchange Rates against the EURO.
+        cross_currency_pairs (Sequence[model.CurrencyPair]): Cross rates to derive. Pairs
+            with a currency without EUR leg are skipped.
+        inverses (bool): Whether to derive the inverse of every EUR leg. Default is True.
+    Returns:
+        List[model.ExchangeRate]: The derived Exchange Rates, ordered by currency pair and date.
+    """
+    rates_by_frequency: dict[str, List[model.ExchangeRate]] = {}
+    for exchange_rate in exchange_rates:
+        rates_by_frequency.setdefault(exchange_rate.frequency, []).append(exchange_rate)
+
+    creation_date = dt.datetime.now()
+    derived_rates = []
+    for frequency, frequency_rates in rates_by_frequency.items():
+        derived_rates += _derive_frequency(
+            frequency_rates, cross_currency_pairs, inverses, frequency, creation_date
+        )
+
+    return derived_rates
+
+
+def _derive_frequency(
+    exchange_rates: List[model.ExchangeRate],
+    cross_currency_pairs: Sequence[model.CurrencyPair],
+    inverses: bool,
+    frequency: str,
+    creation_date: dt.datetime,
+) -> List[model.ExchangeRate]:
+    """
+    Derives inverse and cross rates from Exchange Rates against the EURO of a single frequency.
+    See derive_exchange_rates().
+    """
+    dates, columns = euro_legs(exchange_rates)
+    currency_pairs = list(cross_currency_pairs)
+    if inverses:
+        currency_pairs += [
+            model.CurrencyPair(currency, EURO)
+            for currency in columns
+            if currency != EURO
+        ]
+
+    derived_rates = []
+    for currency_pair in dict.fromkeys(currency_pairs):
+        if currency_pair.base not in columns or currency_pair.quote not in columns:
+            continue
+        values = [
+            quote / base
+            for base, quote in zip(
+                columns[currency_pair.base], columns[currency_pair.quote]
+            )
+        ]
+        derived_rates += [
+            model.ExchangeRate(
+                date=date,
+                exchange_rate=value,
+                currency_pair=currency_pair,
+                source=DERIVED_SOURCE,
+                creation_date=creation_date,
+                frequency=frequency,
+            )
+            for date, value in zip(dates, values)
+            if not math.isnan(value)
+        ]
+
+    return derived_rates
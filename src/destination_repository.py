@@ -1,7 +1,27 @@
 from abc import ABC, abstractmethod
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from google.api_core.exceptions import GoogleAPIError, NotFound
+from google.api_core.retry import if_transient_error
 from google.cloud import bigquery
-from typing import List
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+import datetime as dt
+import gzip
+import io
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import requests
 from src import model
+from src.utils.logs import default_module_logger
+
+
+logger = default_module_logger(__file__)
 
 
 class AbstractDestinationRepository(ABC):
@@ -12,6 +32,12 @@ class AbstractDestinationRepository(ABC):
     Methods:
         load_exchange_rates(List[model.ExchangeRate]):
             interface to load Exchange Rates into the destination repository.
+        flush():
+            interface to write any Exchange Rates buffered by the destination repository.
+        replace_exchange_rates(List[model.ExchangeRate]):
+            interface to replace the Exchange Rates of some currency pairs and dates.
+        load_encoded_rows(List[model.ExchangeRate], EncodedRows):
+            interface to load Exchange Rates already encoded as newline delimited JSON.
     """
 
     @abstractmethod
@@ -26,55 +52,1261 @@ class AbstractDestinationRepository(ABC):
         """
         raise NotImplementedError
 
+    def flush(self):
+        """
+        Writes any Exchange Rates buffered by the destination repository. Repositories
+        that do not buffer have nothing to do.
+        """
+
+    def replace_exchange_rates(self, exchange_rates: List[model.ExchangeRate]):
+        """
+        Replaces the Exchange Rates stored for the currency pairs and dates of the given
+        ones, leaving any other row untouched, and writes them straight away. The default
+        implementation suits repositories whose loads overwrite existing rows.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances replacing the stored ones.
+        """
+        self.load_exchange_rates(exchange_rates)
+        self.flush()
+
+    def load_encoded_rows(
+        self, exchange_rates: List[model.ExchangeRate], encoded_rows: "EncodedRows"
+    ):
+        """
+        Loads Exchange Rates that have already been encoded as newline delimited JSON
+        rows, e.g. once for several destinations. The default implementation suits
+        repositories that do not store that encoding, and loads the Exchange Rates.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances to be loaded into the repository.
+            encoded_rows (EncodedRows): The same Exchange Rates, encoded by a NdjsonRowEncoder.
+        """
+        self.load_exchange_rates(exchange_rates)
+
+
+class AbstractAsyncDestinationRepository(ABC):
+    """
+    An abstract base class for destination repository interfaces to be used from asyncio
+    code, loading Exchange Rates batch by batch.
+
+    Methods:
+        load_exchange_rates(List[model.ExchangeRate]):
+            interface to load a batch of Exchange Rates into the destination repository.
+        flush():
+            interface to write any Exchange Rates buffered by the destination repository.
+    """
+
+    @abstractmethod
+    async def load_exchange_rates(self, exchange_rates: List[model.ExchangeRate]):
+        """
+        Abstract method to define the interface to load a batch of Exchange Rates into the
+        destination repository.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances to be loaded into the repository.
+        """
+        raise NotImplementedError
+
+    async def flush(self):
+        """
+        Writes any Exchange Rates buffered by the destination repository. Repositories
+        that do not buffer have nothing to do.
+        """
+
+
+@dataclass(frozen=True)
+class LoadBatchingPolicy:
+    """
+    Policy to split the Exchange Rates loaded into BigQuery in chunks, one load job per chunk.
+
+    Attributes:
+        max_rows (int): Maximum number of rows of a chunk. Default is 100,000.
+        max_bytes (int): Maximum size of a chunk, as newline delimited JSON. Default is 10 MiB.
+        merge_window_seconds (float): Rows of consecutive loads are buffered and merged in
+            the same chunks until flush() is called, or for up to this number of seconds
+            since the first buffered row, when a timer loads them. Default is 0, what means
+            every load is sent straight away.
+        max_attempts (int): Maximum number of attempts to load a chunk. Default is 3.
+        backoff_seconds (float): Wait before the second attempt to load a chunk, doubled
+            for each following one. Default is 1.
+    """
+
+    max_rows: int = 100_000
+    max_bytes: int = 10 * 1024 * 1024
+    merge_window_seconds: float = 0.0
+    max_attempts: int = 3
+    backoff_seconds: float = 1.0
+
+
+@dataclass(frozen=True)
+class ChunkReport:
+    """
+    Outcome of the load of a chunk of Exchange Rates into BigQuery.
+
+    Attributes:
+        rows (int): Number of rows of the chunk.
+        bytes (int): Size of the chunk, as newline delimited JSON.
+        attempts (int): Number of attempts made to load the chunk.
+        seconds (float): Time spent loading the chunk, including all attempts.
+        succeeded (bool): Whether the chunk was loaded.
+    """
+
+    rows: int
+    bytes: int
+    attempts: int
+    seconds: float
+    succeeded: bool
+
+
+@dataclass(frozen=True)
+class EncodedRows:
+    """
+    Exchange Rates encoded as newline delimited JSON rows of the BigQuery exchange rates
+    table, in an immutable buffer that several destinations can read at the same time.
+
+    Attributes:
+        buffer (bytes): Newline delimited JSON of the rows.
+        row_ends (Tuple[int, ...]): Offset in the buffer of the end of each row.
+    """
+
+    buffer: bytes
+    row_ends: Tuple[int, ...]
+
 
 class BiqQueryDestinationRepository(AbstractDestinationRepository):
     """
     A concrete implementation of the AbstractDestinationRepository to interact with Google BigQuery.
-    This class is designed to load Exchange Rates data into Google BigQuery.
+    This class is designed to load Exchange Rates data into Google BigQuery. Rows are encoded
+    as newline delimited JSON by a NdjsonRowEncoder and split in chunks by size and number
+    of rows, as set by the batching policy. Each chunk is loaded in its own load job, and
+    retried with exponential backoff if it fails with a transient error. Loads, flushes
+    and the timer of the merge window can run from different threads.
 
     Args:
         client (google.cloud.bigquery.Client): The BigQuery client instance.
+        batching_policy (LoadBatchingPolicy, optional): Policy to split rows in load jobs.
+            Default is LoadBatchingPolicy().
     Attributes:
         client (google.cloud.bigquery.Client): The BigQuery client instance.
         exchange_rates_destination (str): The destination table for exchange rates in BigQuery.
+        batching_policy (LoadBatchingPolicy): Policy to split rows in load jobs.
+        chunk_reports (list[ChunkReport]): Outcome of the load of each chunk.
     Methods:
         load_exchange_rates(List[model.ExchangeRate]):
             interface to load Exchange Rates into bq table indicated
             by attribute exchange_rates_destination.
+        flush():
+            loads the rows buffered within the merge window.
+        load_encoded_rows(List[model.ExchangeRate], EncodedRows):
+            loads rows already encoded as newline delimited JSON.
+        replace_exchange_rates(List[model.ExchangeRate]):
+            deletes the rows of the currency pairs and dates of the Exchange Rates, then loads them.
+        read_all_exchange_rates() -> Iterator[model.ExchangeRate]:
+            returns every Exchange Rate of the table indicated by attribute exchange_rates_destination.
     """
 
-    def __init__(self, client: bigquery.Client):
+    def __init__(
+        self,
+        client: bigquery.Client,
+        batching_policy: Optional[LoadBatchingPolicy] = None,
+    ):
         self.client = client
         self.exchange_rates_destination = "raw.exchange_rates"
+        self.batching_policy = batching_policy or LoadBatchingPolicy()
+        self.chunk_reports: list[ChunkReport] = []
+        self._encoder = NdjsonRowEncoder()
+        self._lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._timer_exception: Optional[Exception] = None
+        self._partial_load: Optional[Tuple[EncodedRows, set[int]]] = None
 
     def load_exchange_rates(self, exchange_rates: List[model.ExchangeRate]):
         """
         interface to load Exchange Rates into bq table indicatedby attribute
-        exchange_rates_destination.
+        exchange_rates_destination. Rows are buffered instead if the batching policy
+        has a merge window, and loaded on flush(), once the window has elapsed or once
+        the buffer holds a full chunk, whichever comes first.
 
         Args:
             exchange_rates (List[model.ExchangeRate]):
                 List of ExchangeRate instances to be loaded into BigQuery.
         """
+        with self._lock:
+            self._encoder.encode(exchange_rates)
+            if (
+                self.batching_policy.merge_window_seconds <= 0
+                or len(self._encoder.row_ends) >= self.batching_policy.max_rows
+                or len(self._encoder.buffer) >= self.batching_policy.max_bytes
+            ):
+                self.flush()
+            elif self._flush_timer is None and self._encoder.row_ends:
+                self._flush_timer = threading.Timer(
+                    self.batching_policy.merge_window_seconds, self._flush_on_timer
+                )
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        """
+        Loads the buffered rows, one load job per chunk. A chunk that fails is retried
+        up to the maximum number of attempts of the batching policy, without reloading
+        the chunks that succeeded.
+
+        Raises:
+            RuntimeError: if any chunk could not be loaded, including by the timer of the
+                merge window since the last flush.
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            timer_exception, self._timer_exception = self._timer_exception, None
+            if self._encoder.row_ends:
+                try:
+                    self._load_chunks(self._encoder.buffer, self._encoder.row_ends)
+                finally:
+                    self._encoder.clear()
+            if timer_exception is not None:
+                raise timer_exception
+
+    def _flush_on_timer(self):
+        """
+        Loads the rows buffered once the merge window has elapsed. A failure is logged
+        and raised by the next flush().
+        """
+        with self._lock:
+            if self._flush_timer is None:
+                return
+            self._flush_timer = None
+            if not self._encoder.row_ends:
+                return
+            try:
+                self._load_chunks(self._encoder.buffer, self._encoder.row_ends)
+            except RuntimeError as exception:
+                logger.exception(
+                    f"Merge window load into {self.exchange_rates_destination} failed."
+                )
+                self._timer_exception = exception
+            finally:
+                self._encoder.clear()
+
+    def load_encoded_rows(
+        self, exchange_rates: List[model.ExchangeRate], encoded_rows: EncodedRows
+    ):
+        """
+        Loads rows already encoded as newline delimited JSON straight away, one load job
+        per chunk as set by the batching policy, after the rows buffered within the merge
+        window. If the same encoded rows are loaded again after a failure, the chunks that
+        were loaded are not loaded twice.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances to be loaded into BigQuery.
+            encoded_rows (EncodedRows): The same Exchange Rates, encoded by a NdjsonRowEncoder.
+        Raises:
+            RuntimeError: if any chunk could not be loaded.
+        """
+        with self._lock:
+            self.flush()
+            if self._partial_load is None or self._partial_load[0] is not encoded_rows:
+                self._partial_load = (encoded_rows, set())
+            self._load_chunks(
+                encoded_rows.buffer, encoded_rows.row_ends, self._partial_load[1]
+            )
+            self._partial_load = None
+
+    def _load_chunks(
+        self,
+        buffer: Union[bytes, bytearray],
+        row_ends: Sequence[int],
+        loaded_chunks: Optional[set[int]] = None,
+    ):
+        """
+        Loads encoded rows, one load job per chunk. A chunk that fails with a transient
+        error, e.g. a 5xx, a rate limit or a dropped connection, is retried with exponential
+        backoff up to the maximum number of attempts of the batching policy, without
+        reloading the chunks that succeeded. A chunk rejected by BigQuery is not retried.
+
+        Args:
+            buffer (Union[bytes, bytearray]): Newline delimited JSON of the rows.
+            row_ends (Sequence[int]): Offset in the buffer of the end of each row.
+            loaded_chunks (set[int], optional): Start offsets of the chunks already
+                loaded, skipped, and completed with the chunks loaded.
+        Raises:
+            RuntimeError: if any chunk could not be loaded.
+        """
+        job_config = bigquery.LoadJobConfig(
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            autodetect=True,
+        )
+        failed_chunks, last_exception = 0, None
+        with memoryview(buffer) as view:
+            for chunk_start, chunk_end, chunk_rows in self._split_in_chunks(row_ends):
+                if loaded_chunks is not None and chunk_start in loaded_chunks:
+                    continue
+                start, attempts, succeeded = time.perf_counter(), 0, False
+                while not succeeded and attempts < self.batching_policy.max_attempts:
+                    if attempts:
+                        time.sleep(
+                            self.batching_policy.backoff_seconds * 2 ** (attempts - 1)
+                        )
+                    attempts += 1
+                    try:
+                        with view[chunk_start:chunk_end] as chunk:
+                            load_job = self.client.load_table_from_file(
+                                io.BytesIO(chunk),
+                                self.exchange_rates_destination,
+                                size=len(chunk),
+                                job_config=job_config,
+                            )
+                        load_job.result()
+                        succeeded = True
+                    except (GoogleAPIError, requests.RequestException) as exception:
+                        last_exception = exception
+                        if not if_transient_error(exception):
+                            break
+
+                failed_chunks += not succeeded
+                if succeeded and loaded_chunks is not None:
+                    loaded_chunks.add(chunk_start)
+                self.chunk_reports.append(
+                    ChunkReport(
+                        rows=chunk_rows,
+                        bytes=chunk_end - chunk_start,
+                        attempts=attempts,
+                        seconds=time.perf_counter() - start,
+                        succeeded=succeeded,
+                    )
+                )
+
+        if failed_chunks:
+            raise RuntimeError(
+                f"{failed_chunks} chunks failed to load into {self.exchange_rates_destination}."
+            ) from last_exception
+
+    def replace_exchange_rates(self, exchange_rates: List[model.ExchangeRate]):
+        """
+        Replaces the rows of the currency pairs and dates of the Exchange Rates: a DML
+        statement deletes the rows of those currency pairs on those dates, then the
+        Exchange Rates are loaded. Rows of other dates are not scanned for rewrite, so the
+        cost of the replacement follows the number of dates affected. Rates of other
+        frequencies than daily only delete the rows of their frequencies; rows of daily
+        rates carry no frequency column, so tables of daily rates keep their schema.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances replacing the stored ones.
+        """
+        if not exchange_rates:
+            return
+
+        frequencies = sorted(
+            {exchange_rate.frequency for exchange_rate in exchange_rates}
+        )
+        frequency_condition = (
+            ""
+            if frequencies == [model.DAILY]
+            else f" AND IFNULL(frequency, '{model.DAILY}') IN UNNEST(@frequencies)"
+        )
+        with self._lock:
+            self.flush()
+            job_config = bigquery.QueryJobConfig(
+                query_parameters=[
+                    bigquery.ArrayQueryParameter(
+                        "dates",
+                        "DATE",
+                        sorted(
+                            {exchange_rate.date for exchange_rate in exchange_rates}
+                        ),
+                    ),
+                    bigquery.ArrayQueryParameter(
+                        "currency_pairs",
+                        "STRING",
+                        sorted(
+                            {
+                                str(exchange_rate.currency_pair)
+                                for exchange_rate in exchange_rates
+                            }
+                        ),
+                    ),
+                ]
+                + (
+                    [bigquery.ArrayQueryParameter("frequencies", "STRING", frequencies)]
+                    if frequency_condition
+                    else []
+                )
+            )
+            try:
+                self.client.query(
+                    f"DELETE FROM `{self.exchange_rates_destination}` "
+                    "WHERE date IN UNNEST(@dates) "
+                    "AND CONCAT(base_currency, '/', quote_currency) IN UNNEST(@currency_pairs)"
+                    + frequency_condition,
+                    job_config=job_config,
+                ).result()
+            except NotFound:
+                pass
+            self.load_exchange_rates(exchange_rates)
+            self.flush()
 
-        dictify = [
-            {
-                "date": exchange_rate.date.strftime("%Y-%m-%d"),
-                "exchange_rate": exchange_rate.exchange_rate,
-                "base_currency": exchange_rate.currency_pair.base,
-                "quote_currency": exchange_rate.currency_pair.quote,
-                "source": exchange_rate.source,
-                "creation_date": exchange_rate.creation_date.strftime(
-                    "%Y-%m-%d %H:%M:%S"
+    def read_all_exchange_rates(self) -> Iterator[model.ExchangeRate]:
+        """
+        Returns every Exchange Rate of the table indicated by attribute
+        exchange_rates_destination. Rows are listed through the table data API, so
+        reading the full history does not cost a query.
+
+        Returns:
+            Iterator[model.ExchangeRate]: The Exchange Rates, in no particular order.
+        """
+        for row in self.client.list_rows(self.exchange_rates_destination):
+            yield model.ExchangeRate(
+                date=row["date"],
+                exchange_rate=row["exchange_rate"],
+                currency_pair=model.CurrencyPair(
+                    row["base_currency"], row["quote_currency"]
                 ),
-            }
+                source=row["source"],
+                creation_date=row["creation_date"].replace(tzinfo=None),
+                frequency=row.get("frequency") or model.DAILY,
+            )
+
+    def _split_in_chunks(
+        self, row_ends: Sequence[int]
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Splits encoded rows in chunks within the maximum number of rows and bytes of the
+        batching policy.
+
+        Args:
+            row_ends (Sequence[int]): Offset in the buffer of the end of each row.
+        Yields:
+            Tuple[int, int, int]: start and end offsets of the chunk in the buffer and
+                its number of rows.
+        """
+        chunk_start, chunk_end, chunk_rows = 0, 0, 0
+        for row_end in row_ends:
+            if chunk_rows and (
+                chunk_rows >= self.batching_policy.max_rows
+                or row_end - chunk_start > self.batching_policy.max_bytes
+            ):
+                yield chunk_start, chunk_end, chunk_rows
+                chunk_start, chunk_rows = chunk_end, 0
+            chunk_end = row_end
+            chunk_rows += 1
+
+        if chunk_rows:
+            yield chunk_start, chunk_end, chunk_rows
+
+
+class NdjsonRowEncoder:
+    """
+    Encodes Exchange Rates as newline delimited JSON rows of the BigQuery exchange rates
+    table, appending them to a buffer that is reused between batches. Rows are written
+    straight as bytes from fragments cached per date, per currency pair and source and per
+    creation date, that repeat across rows, so no intermediate dictionaries are built and
+    each distinct date is formatted once. Rows of Exchange Rates of other frequencies than
+    daily carry a frequency column, so tables of daily rates keep their schema. JSON has no
+    NaN nor infinity, so Exchange Rates with such values are rejected.
+
+    Attributes:
+        buffer (bytearray): Newline delimited JSON of the encoded rows.
+        row_ends (list[int]): Offset in the buffer of the end of each row.
+    Methods:
+        encode(exchange_rates: List[model.ExchangeRate]):
+            appends Exchange Rates to the buffer.
+        clear():
+            empties the buffer.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.row_ends: list[int] = []
+        self._date_fragments: dict[dt.date, bytes] = {}
+        self._pair_fragments: dict[Tuple[model.CurrencyPair, str, str], bytes] = {}
+        self._creation_date: Optional[dt.datetime] = None
+        self._creation_date_fragment = b""
+
+    def encode(self, exchange_rates: List[model.ExchangeRate]):
+        """
+        Appends Exchange Rates to the buffer, one JSON row per line.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]): Exchange Rates to encode.
+        Raises:
+            ValueError: if an exchange rate is NaN or infinite, in which case none of the
+                Exchange Rates is appended.
+        """
+        buffer, row_ends = self.buffer, self.row_ends
+        buffer_length, row_count = len(buffer), len(row_ends)
+        date_fragments, pair_fragments = self._date_fragments, self._pair_fragments
+        for exchange_rate in exchange_rates:
+            date_fragment = date_fragments.get(exchange_rate.date)
+            if date_fragment is None:
+                date_fragment = date_fragments[exchange_rate.date] = (
+                    f'{{"date":"{exchange_rate.date.isoformat()}","exchange_rate":'
+                ).encode()
+            pair_key = (
+                exchange_rate.currency_pair,
+                exchange_rate.source,
+                exchange_rate.frequency,
+            )
+            pair_fragment = pair_fragments.get(pair_key)
+            if pair_fragment is None:
+                frequency_fragment = (
+                    ""
+                    if exchange_rate.frequency == model.DAILY
+                    else f',"frequency":{json.dumps(exchange_rate.frequency)}'
+                )
+                pair_fragment = pair_fragments[pair_key] = (
+                    f',"base_currency":{json.dumps(exchange_rate.currency_pair.base)}'
+                    f',"quote_currency":{json.dumps(exchange_rate.currency_pair.quote)}'
+                    f',"source":{json.dumps(exchange_rate.source)}{frequency_fragment}'
+                    ',"creation_date":"'
+                ).encode()
+            if exchange_rate.creation_date != self._creation_date:
+                self._creation_date = exchange_rate.creation_date
+                self._creation_date_fragment = (
+                    f'{exchange_rate.creation_date.isoformat(" ", "seconds")}"}}\n'
+                ).encode()
+
+            if not math.isfinite(exchange_rate.exchange_rate):
+                del buffer[buffer_length:]
+                del row_ends[row_count:]
+                raise ValueError(
+                    f"Exchange rate of '{exchange_rate.currency_pair}' on "
+                    f"{exchange_rate.date} is {exchange_rate.exchange_rate}, "
+                    "it cannot be encoded as JSON."
+                )
+            buffer += date_fragment
+            buffer += repr(exchange_rate.exchange_rate).encode()
+            buffer += pair_fragment
+            buffer += self._creation_date_fragment
+            row_ends.append(len(buffer))
+
+    def clear(self):
+        """
+        Empties the buffer, keeping the cached fragments.
+        """
+        del self.buffer[:]
+        self.row_ends.clear()
+
+
+class SqliteDestinationRepository(AbstractDestinationRepository):
+    """
+    A concrete implementation of the AbstractDestinationRepository that stores Exchange Rates
+    in a local SQLite file. Rows are keyed by (base_currency, quote_currency, date), so loading
+    the same observation twice updates it in place instead of duplicating it. The table is
+    clustered on its primary key, what makes range queries and as-of lookups for a currency
+    pair cheap, so the same file can be used as an offline destination or as a read cache.
+    A table holds the rates of a single frequency, as rates of longer periods are dated on
+    the first day of the period; tables created before frequencies were supported get a
+    frequency column defaulting to daily. The repository can be used from other threads
+    than the one that created it, one call at a time.
+
+    Args:
+        database_path (str): Path to the SQLite file. Use ":memory:" for an in-memory database.
+        exchange_rates_destination (str): The table for exchange rates. Default is "exchange_rates".
+    Attributes:
+        connection (sqlite3.Connection): Connection to the SQLite database.
+        exchange_rates_destination (str): The destination table for exchange rates.
+    Methods:
+        table_name(str) -> str:
+            returns the SQLite table standing for a BigQuery table.
+        load_exchange_rates(List[model.ExchangeRate]):
+            upserts Exchange Rates into the table indicated by attribute exchange_rates_destination.
+        read_exchange_rates(model.CurrencyPair, Optional[dt.date], Optional[dt.date]) -> List[model.ExchangeRate]:
+            returns the Exchange Rates of a currency pair within a date range.
+        read_exchange_rate_as_of(model.CurrencyPair, dt.date) -> Optional[model.ExchangeRate]:
+            returns the latest Exchange Rate of a currency pair published on or before a date.
+        read_all_exchange_rates() -> Iterator[model.ExchangeRate]:
+            returns every Exchange Rate of the table, ordered by currency pair and date.
+    """
+
+    def __init__(
+        self, database_path: str, exchange_rates_destination: str = "exchange_rates"
+    ):
+        self.connection = sqlite3.connect(database_path, check_same_thread=False)
+        self.exchange_rates_destination = exchange_rates_destination
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.exchange_rates_destination} ("
+            "base_currency TEXT NOT NULL, "
+            "quote_currency TEXT NOT NULL, "
+            "date TEXT NOT NULL, "
+            "exchange_rate REAL NOT NULL, "
+            "source TEXT NOT NULL, "
+            "creation_date TEXT NOT NULL, "
+            f"frequency TEXT NOT NULL DEFAULT '{model.DAILY}', "
+            "PRIMARY KEY (base_currency, quote_currency, date)"
+            ") WITHOUT ROWID"
+        )
+        columns = {
+            row[1]
+            for row in self.connection.execute(
+                f"PRAGMA table_info({self.exchange_rates_destination})"
+            )
+        }
+        if "frequency" not in columns:
+            self.connection.execute(
+                f"ALTER TABLE {self.exchange_rates_destination} "
+                f"ADD COLUMN frequency TEXT NOT NULL DEFAULT '{model.DAILY}'"
+            )
+        self.connection.commit()
+
+    @staticmethod
+    def table_name(destination_table: str) -> str:
+        """
+        Returns the SQLite table standing for a BigQuery table, e.g. "exchange_rates" for
+        "raw.exchange_rates": the name of the table without project nor dataset, with the
+        characters other than letters, digits and underscores replaced by underscores.
+
+        Args:
+            destination_table (str): The BigQuery table.
+        Returns:
+            str: The SQLite table.
+        """
+        return re.sub(r"\W", "_", destination_table.rsplit(".", 1)[-1])
+
+    def load_exchange_rates(self, exchange_rates: List[model.ExchangeRate]):
+        """
+        Upserts Exchange Rates into the table indicated by attribute exchange_rates_destination.
+        An Exchange Rate that already exists for the same currency pair and date is overwritten.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances to be loaded into SQLite.
+        """
+        rows = [
+            (
+                exchange_rate.currency_pair.base,
+                exchange_rate.currency_pair.quote,
+                exchange_rate.date.strftime("%Y-%m-%d"),
+                exchange_rate.exchange_rate,
+                exchange_rate.source,
+                exchange_rate.creation_date.strftime("%Y-%m-%d %H:%M:%S"),
+                exchange_rate.frequency,
+            )
             for exchange_rate in exchange_rates
         ]
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO {self.exchange_rates_destination} "
+                "(base_currency, quote_currency, date, exchange_rate, source, creation_date, "
+                "frequency) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (base_currency, quote_currency, date) DO UPDATE SET "
+                "exchange_rate = excluded.exchange_rate, "
+                "source = excluded.source, "
+                "creation_date = excluded.creation_date, "
+                "frequency = excluded.frequency",
+                rows,
+            )
+
+    def read_exchange_rates(
+        self,
+        currency_pair: model.CurrencyPair,
+        date_from: Optional[dt.date] = None,
+        date_to: Optional[dt.date] = None,
+    ) -> List[model.ExchangeRate]:
+        """
+        Returns the Exchange Rates of a currency pair within a date range, ordered by date.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair to read exchange rates for.
+            date_from (dt.date, optional): First date of the range, inclusive. Unbounded if None.
+            date_to (dt.date, optional): Last date of the range, inclusive. Unbounded if None.
+        Returns:
+            List[model.ExchangeRate]: A list of ExchangeRate instances.
+        """
+        cursor = self.connection.execute(
+            "SELECT date, exchange_rate, source, creation_date, frequency "
+            f"FROM {self.exchange_rates_destination} "
+            "WHERE base_currency = ? AND quote_currency = ? AND date >= ? AND date <= ? "
+            "ORDER BY date",
+            (
+                currency_pair.base,
+                currency_pair.quote,
+                date_from.strftime("%Y-%m-%d") if date_from else "0000-00-00",
+                date_to.strftime("%Y-%m-%d") if date_to else "9999-99-99",
+            ),
+        )
+        return [self._row_to_exchange_rate(row, currency_pair) for row in cursor]
+
+    def read_exchange_rate_as_of(
+        self, currency_pair: model.CurrencyPair, as_of: dt.date
+    ) -> Optional[model.ExchangeRate]:
+        """
+        Returns the latest Exchange Rate of a currency pair with a date on or before as_of.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair to read the exchange rate for.
+            as_of (dt.date): Date of reference.
+        Returns:
+            Optional[model.ExchangeRate]: The ExchangeRate instance or None if there is none.
+        """
+        row = self.connection.execute(
+            "SELECT date, exchange_rate, source, creation_date, frequency "
+            f"FROM {self.exchange_rates_destination} "
+            "WHERE base_currency = ? AND quote_currency = ? AND date <= ? "
+            "ORDER BY date DESC LIMIT 1",
+            (currency_pair.base, currency_pair.quote, as_of.strftime("%Y-%m-%d")),
+        ).fetchone()
+        if row is None:
+            return None
+
+        return self._row_to_exchange_rate(row, currency_pair)
+
+    def read_all_exchange_rates(self) -> Iterator[model.ExchangeRate]:
+        """
+        Returns every Exchange Rate of the table indicated by attribute
+        exchange_rates_destination, ordered by currency pair and date.
+
+        Returns:
+            Iterator[model.ExchangeRate]: The Exchange Rates.
+        """
+        cursor = self.connection.execute(
+            "SELECT base_currency, quote_currency, date, exchange_rate, source, creation_date, "
+            "frequency "
+            f"FROM {self.exchange_rates_destination} "
+            "ORDER BY base_currency, quote_currency, date"
+        )
+        for base_currency, quote_currency, *row in cursor:
+            yield self._row_to_exchange_rate(
+                tuple(row), model.CurrencyPair(base_currency, quote_currency)
+            )
+
+    @staticmethod
+    def _row_to_exchange_rate(
+        row: tuple, currency_pair: model.CurrencyPair
+    ) -> model.ExchangeRate:
+        """
+        Converts a row of the exchange rates table to an ExchangeRate instance.
+
+        Args:
+            row (tuple): Row with date, exchange_rate, source, creation_date and frequency columns.
+            currency_pair (model.CurrencyPair): The currency pair of the row.
+        Returns:
+            model.ExchangeRate: The ExchangeRate instance.
+        """
+        date, exchange_rate, source, creation_date, frequency = row
+        return model.ExchangeRate(
+            date=dt.date.fromisoformat(date),
+            exchange_rate=exchange_rate,
+            currency_pair=currency_pair,
+            source=source,
+            creation_date=dt.datetime.strptime(creation_date, "%Y-%m-%d %H:%M:%S"),
+            frequency=frequency,
+        )
+
+
+@dataclass(frozen=True)
+class DestinationReport:
+    """
+    Outcome of an operation of a FanOutDestinationRepository on one of its destinations.
+
+    Attributes:
+        destination_index (int): Index of the destination in the fan-out.
+        destination (str): Class name of the destination.
+        operation (str): "load", "flush" or "replace".
+        attempts (int): Number of attempts made.
+        seconds (float): Time spent, including all attempts.
+        succeeded (bool): Whether the operation succeeded.
+    """
+
+    destination_index: int
+    destination: str
+    operation: str
+    attempts: int
+    seconds: float
+    succeeded: bool
+
+
+class FanOutDestinationRepository(AbstractDestinationRepository):
+    """
+    A concrete implementation of the AbstractDestinationRepository that loads Exchange
+    Rates into several destinations, e.g. BigQuery, a local archive and the BigQuery
+    project of a partner, from a single fetch. Each batch is encoded once as newline
+    delimited JSON into an immutable buffer, shared by the destinations that load that
+    encoding, and the destinations are written concurrently, one thread each. A
+    destination that fails is retried with exponential backoff without holding back the
+    others, and once every destination is done, the operation raises if any of them
+    failed. Destinations retried with the same batch must not load it twice, as
+    SQLite upserts, archive files written atomically and BiqQueryDestinationRepository
+    chunks do not.
+
+    Args:
+        destination_repositories (Sequence[AbstractDestinationRepository]): The destinations.
+        max_attempts (int): Maximum number of attempts per destination and operation.
+            Default is 3.
+        backoff_seconds (float): Wait before the second attempt, doubled for each
+            following one. Default is 1.
+    Attributes:
+        destination_repositories (list[AbstractDestinationRepository]): The destinations.
+        max_attempts (int): Maximum number of attempts per destination and operation.
+        backoff_seconds (float): Wait before the second attempt.
+        destination_reports (list[DestinationReport]): Outcome of each operation on each
+            destination.
+    Methods:
+        load_exchange_rates(List[model.ExchangeRate]):
+            encodes Exchange Rates once and loads them into every destination.
+        flush():
+            flushes every destination.
+        replace_exchange_rates(List[model.ExchangeRate]):
+            replaces Exchange Rates in every destination.
+        close():
+            stops the threads of the destinations.
+    """
+
+    def __init__(
+        self,
+        destination_repositories: Sequence[AbstractDestinationRepository],
+        max_attempts: int = 3,
+        backoff_seconds: float = 1.0,
+    ):
+        if not destination_repositories:
+            raise ValueError("A fan-out needs at least one destination.")
+        self.destination_repositories = list(destination_repositories)
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.destination_reports: list[DestinationReport] = []
+        self._encoder = NdjsonRowEncoder()
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.destination_repositories),
+            thread_name_prefix="fan-out",
+        )
+
+    def load_exchange_rates(self, exchange_rates: List[model.ExchangeRate]):
+        """
+        Encodes Exchange Rates once and loads them into every destination concurrently.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances to be loaded into the destinations.
+        Raises:
+            RuntimeError: if any destination failed to load them.
+        """
+        if not exchange_rates:
+            return
+
+        self._encoder.encode(exchange_rates)
+        encoded_rows = EncodedRows(
+            bytes(self._encoder.buffer), tuple(self._encoder.row_ends)
+        )
+        self._encoder.clear()
+        self._fan_out(
+            "load",
+            lambda destination: destination.load_encoded_rows(
+                exchange_rates, encoded_rows
+            ),
+        )
+
+    def flush(self):
+        """
+        Flushes every destination concurrently.
+
+        Raises:
+            RuntimeError: if any destination failed to flush.
+        """
+        self._fan_out("flush", lambda destination: destination.flush())
+
+    def replace_exchange_rates(self, exchange_rates: List[model.ExchangeRate]):
+        """
+        Replaces the Exchange Rates of the currency pairs and dates of the given ones in
+        every destination concurrently.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances replacing the stored ones.
+        Raises:
+            RuntimeError: if any destination failed to replace them.
+        """
+        self._fan_out(
+            "replace",
+            lambda destination: destination.replace_exchange_rates(exchange_rates),
+        )
+
+    def close(self):
+        """
+        Stops the threads of the destinations.
+        """
+        self._executor.shutdown()
+
+    def _fan_out(
+        self, operation: str, call: Callable[[AbstractDestinationRepository], None]
+    ):
+        """
+        Runs an operation on every destination concurrently and records its outcome.
+
+        Args:
+            operation (str): Name of the operation, for reports and errors.
+            call (Callable[[AbstractDestinationRepository], None]): The operation.
+        Raises:
+            RuntimeError: if the operation failed on any destination.
+        """
+        futures = [
+            self._executor.submit(self._call_with_retries, index, operation, call)
+            for index in range(len(self.destination_repositories))
+        ]
+        outcomes = [future.result() for future in futures]
+        self.destination_reports.extend(report for report, _ in outcomes)
+
+        failures = [(report, exception) for report, exception in outcomes if exception]
+        if failures:
+            destinations = ", ".join(
+                f"{report.destination_index} ({report.destination})"
+                for report, _ in failures
+            )
+            raise RuntimeError(
+                f"{len(failures)} of {len(outcomes)} destinations failed to "
+                f"{operation}: {destinations}."
+            ) from failures[-1][1]
+
+    def _call_with_retries(
+        self,
+        index: int,
+        operation: str,
+        call: Callable[[AbstractDestinationRepository], None],
+    ) -> Tuple[DestinationReport, Optional[Exception]]:
+        """
+        Runs an operation on a destination, retrying it with exponential backoff.
+
+        Args:
+            index (int): Index of the destination.
+            operation (str): Name of the operation.
+            call (Callable[[AbstractDestinationRepository], None]): The operation.
+        Returns:
+            Tuple[DestinationReport, Optional[Exception]]: The outcome, and the exception
+                of the last attempt if it failed.
+        """
+        destination = self.destination_repositories[index]
+        start, attempts, last_exception = time.perf_counter(), 0, None
+        while attempts < self.max_attempts:
+            if attempts:
+                time.sleep(self.backoff_seconds * 2 ** (attempts - 1))
+            attempts += 1
+            try:
+                call(destination)
+                last_exception = None
+                break
+            except Exception as exception:
+                last_exception = exception
+                logger.warning(
+                    f"Destination {index} ({type(destination).__name__}) failed to "
+                    f"{operation}, attempt {attempts}: {exception}"
+                )
+
+        report = DestinationReport(
+            destination_index=index,
+            destination=type(destination).__name__,
+            operation=operation,
+            attempts=attempts,
+            seconds=time.perf_counter() - start,
+            succeeded=last_exception is None,
+        )
+        return report, last_exception
+
+
+class NdjsonArchiveDestinationRepository(AbstractDestinationRepository):
+    """
+    A concrete implementation of the AbstractDestinationRepository that archives Exchange
+    Rates in a local directory, one newline delimited JSON file per batch, with the rows
+    of the BigQuery exchange rates table, so an archive can be loaded into BigQuery as is.
+    Files are written to a temporary file and renamed, so a file that appears is complete.
+
+    Args:
+        directory (str): The directory of the archive. It is created if needed.
+        compressed (bool): If True, files are compressed with gzip. Default is True.
+    Attributes:
+        directory (str): The directory of the archive.
+        compressed (bool): If True, files are compressed with gzip.
+        file_paths (list[str]): Path of each file written.
+    Methods:
+        load_exchange_rates(List[model.ExchangeRate]):
+            encodes Exchange Rates and writes them into a new file.
+        load_encoded_rows(List[model.ExchangeRate], EncodedRows):
+            writes rows already encoded into a new file.
+    """
+
+    def __init__(self, directory: str, compressed: bool = True):
+        self.directory = directory
+        self.compressed = compressed
+        self.file_paths: list[str] = []
+        self._encoder = NdjsonRowEncoder()
+        os.makedirs(directory, exist_ok=True)
+
+    def load_exchange_rates(self, exchange_rates: List[model.ExchangeRate]):
+        """
+        Encodes Exchange Rates as newline delimited JSON and writes them into a new file.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances to be archived.
+        """
+        self._encoder.encode(exchange_rates)
+        try:
+            self._write(self._encoder.buffer)
+        finally:
+            self._encoder.clear()
+
+    def load_encoded_rows(
+        self, exchange_rates: List[model.ExchangeRate], encoded_rows: EncodedRows
+    ):
+        """
+        Writes rows already encoded as newline delimited JSON into a new file.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances to be archived.
+            encoded_rows (EncodedRows): The same Exchange Rates, encoded by a NdjsonRowEncoder.
+        """
+        self._write(encoded_rows.buffer)
+
+    def _write(self, rows: Union[bytes, bytearray]):
+        """
+        Writes encoded rows into a new file of the archive, named after the current time.
+
+        Args:
+            rows (Union[bytes, bytearray]): Newline delimited JSON of the rows.
+        """
+        if not rows:
+            return
+
+        file_name = (
+            f"exchange_rates.{dt.datetime.now():%Y%m%dT%H%M%S%f}"
+            f".{len(self.file_paths):06d}.ndjson"
+        )
+        file_path = os.path.join(
+            self.directory, file_name + (".gz" if self.compressed else "")
+        )
+        temporary_path = os.path.join(self.directory, f".{file_name}.tmp")
+        with open(temporary_path, "wb") as f:
+            f.write(gzip.compress(rows, mtime=0) if self.compressed else rows)
+        os.replace(temporary_path, file_path)
+        self.file_paths.append(file_path)
+
+
+class SyncToAsyncDestinationRepository(AbstractAsyncDestinationRepository):
+    """
+    Adapts an AbstractDestinationRepository to AbstractAsyncDestinationRepository, running
+    its loads and flushes in an executor so the event loop is not blocked while they wait,
+    e.g. on BigQuery load jobs. The default executor has a single thread, so calls run one
+    at a time in the order they were awaited. The wrapped repository must be usable from
+    that thread.
+
+    Args:
+        destination_repository (AbstractDestinationRepository): The synchronous repository.
+        executor (Executor, optional): Executor of the calls. A single thread if None.
+    Attributes:
+        destination_repository (AbstractDestinationRepository): The synchronous repository.
+        executor (Executor): Executor of the calls.
+    Methods:
+        load_exchange_rates(List[model.ExchangeRate]):
+            Loads a batch of Exchange Rates in the executor.
+        flush():
+            Flushes the repository in the executor.
+    """
+
+    def __init__(
+        self,
+        destination_repository: AbstractDestinationRepository,
+        executor: Optional[Executor] = None,
+    ):
+        self.destination_repository = destination_repository
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+
+    async def load_exchange_rates(self, exchange_rates: List[model.ExchangeRate]):
+        """
+        Loads a batch of Exchange Rates into the wrapped repository, in the executor.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]):
+                List of ExchangeRate instances to be loaded into the repository.
+        """
+        await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            self.destination_repository.load_exchange_rates,
+            exchange_rates,
+        )
+
+    async def flush(self):
+        """
+        Flushes the wrapped repository, in the executor.
+        """
+        await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.destination_repository.flush
+        )
+
+
+class AbstractQuarantineRepository(ABC):
+    """
+    An abstract base class for the side tables that keep the Exchange Rates set aside by
+    the validation stage, with the reason why.
+
+    Methods:
+        load_quarantined_exchange_rates(List[model.QuarantinedExchangeRate]):
+            interface to load quarantined Exchange Rates into the quarantine table.
+    """
+
+    @abstractmethod
+    def load_quarantined_exchange_rates(
+        self, quarantined_exchange_rates: List[model.QuarantinedExchangeRate]
+    ):
+        """
+        Abstract method to define the interface to load quarantined Exchange Rates into
+        the quarantine table.
+
+        Args:
+            quarantined_exchange_rates (List[model.QuarantinedExchangeRate]):
+                List of QuarantinedExchangeRate instances to be loaded into the repository.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _to_row(quarantined_exchange_rate: model.QuarantinedExchangeRate) -> dict:
+        """
+        Converts a quarantined Exchange Rate to a row of the quarantine table. Every value
+        is kept as text, since values failing the schema check may not fit their type.
+
+        Args:
+            quarantined_exchange_rate (model.QuarantinedExchangeRate): The quarantined Exchange Rate.
+        Returns:
+            dict: The row.
+        """
+        exchange_rate = quarantined_exchange_rate.exchange_rate
+        currency_pair = exchange_rate.currency_pair
+        return {
+            "date": str(exchange_rate.date),
+            "exchange_rate": str(exchange_rate.exchange_rate),
+            "base_currency": str(getattr(currency_pair, "base", currency_pair)),
+            "quote_currency": str(getattr(currency_pair, "quote", "")),
+            "source": str(exchange_rate.source),
+            "creation_date": exchange_rate.creation_date.isoformat(" ", "seconds"),
+            "reason": quarantined_exchange_rate.reason,
+        }
+
+
+class BigQueryQuarantineRepository(AbstractQuarantineRepository):
+    """
+    Quarantine table in Google BigQuery.
+
+    Args:
+        client (google.cloud.bigquery.Client): The BigQuery client instance.
+    Attributes:
+        client (google.cloud.bigquery.Client): The BigQuery client instance.
+        quarantine_destination (str): The quarantine table in BigQuery.
+    Methods:
+        load_quarantined_exchange_rates(List[model.QuarantinedExchangeRate]):
+            appends quarantined Exchange Rates to the table indicated by attribute
+            quarantine_destination.
+    """
+
+    def __init__(self, client: bigquery.Client):
+        self.client = client
+        self.quarantine_destination = "raw.exchange_rates_quarantine"
+
+    def load_quarantined_exchange_rates(
+        self, quarantined_exchange_rates: List[model.QuarantinedExchangeRate]
+    ):
+        """
+        Appends quarantined Exchange Rates to the table indicated by attribute
+        quarantine_destination.
+
+        Args:
+            quarantined_exchange_rates (List[model.QuarantinedExchangeRate]):
+                List of QuarantinedExchangeRate instances to be loaded into BigQuery.
+        """
+        if not quarantined_exchange_rates:
+            return
+
+        rows = [self._to_row(rate) for rate in quarantined_exchange_rates]
         job_config = bigquery.LoadJobConfig(
             write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
-            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            schema=[bigquery.SchemaField(name, "STRING") for name in rows[0]],
         )
-        load_job = self.client.load_table_from_json(
-            dictify, self.exchange_rates_destination, job_config=job_config
+        self.client.load_table_from_json(
+            rows, self.quarantine_destination, job_config=job_config
+        ).result()
+
+
+class SqliteQuarantineRepository(AbstractQuarantineRepository):
+    """
+    Quarantine table in a local SQLite file. The repository can be shared by several
+    threads, e.g. the jobs of the daemon, as calls are serialized by a lock.
+
+    Args:
+        database_path (str): Path to the SQLite file. Use ":memory:" for an in-memory database.
+        quarantine_destination (str): The quarantine table. Default is "exchange_rates_quarantine".
+    Attributes:
+        connection (sqlite3.Connection): Connection to the SQLite database.
+        quarantine_destination (str): The quarantine table.
+    Methods:
+        load_quarantined_exchange_rates(List[model.QuarantinedExchangeRate]):
+            appends quarantined Exchange Rates to the table indicated by attribute
+            quarantine_destination.
+        read_quarantined_rows() -> List[dict]:
+            returns the rows of the quarantine table.
+    """
+
+    COLUMNS = (
+        "date",
+        "exchange_rate",
+        "base_currency",
+        "quote_currency",
+        "source",
+        "creation_date",
+        "reason",
+    )
+
+    def __init__(
+        self,
+        database_path: str,
+        quarantine_destination: str = "exchange_rates_quarantine",
+    ):
+        self.connection = sqlite3.connect(database_path, check_same_thread=False)
+        self.quarantine_destination = quarantine_destination
+        self._lock = threading.Lock()
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.quarantine_destination} ("
+            + ", ".join(f"{column} TEXT" for column in self.COLUMNS)
+            + ")"
         )
-        load_job.result()
+        self.connection.commit()
+
+    def load_quarantined_exchange_rates(
+        self, quarantined_exchange_rates: List[model.QuarantinedExchangeRate]
+    ):
+        """
+        Appends quarantined Exchange Rates to the table indicated by attribute
+        quarantine_destination.
+
+        Args:
+            quarantined_exchange_rates (List[model.QuarantinedExchangeRate]):
+                List of QuarantinedExchangeRate instances to be loaded into SQLite.
+        """
+        with self._lock, self.connection:
+            self.connection.executemany(
+                f"INSERT INTO {self.quarantine_destination} "
+                f"({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self.COLUMNS)})",
+                [
+                    tuple(self._to_row(rate).values())
+                    for rate in quarantined_exchange_rates
+                ],
+            )
+
+    def read_quarantined_rows(self) -> List[dict]:
+        """
+        Returns the rows of the quarantine table, in insertion order.
+
+        Returns:
+            List[dict]: The rows, by column name.
+        """
+        with self._lock:
+            cursor = self.connection.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM {self.quarantine_destination}"
+            )
+            return [dict(zip(self.COLUMNS, row)) for row in cursor]
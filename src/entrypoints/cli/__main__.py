@@ -1,18 +1,48 @@
 import click
 from src.entrypoints.cli.get_ecb_rates import get_ecb_rates
+from src.entrypoints.cli.daemon import serve
+from src.entrypoints.cli.daemon_client import submit
+from src.entrypoints.cli.export_snapshot import export_snapshot
+from src.entrypoints.cli.distributed import coordinate, work
 import warnings
+from src import services
 from src.utils.env_var_loader import env_var_loader
+from src.utils.profiling import Profiler
 
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
 
 @click.group()
-def cli():
-    pass
+@click.option(
+    "--profile",
+    "profile_directory",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Profile the command and write a flamegraph, function and stage reports into this directory.",
+)
+@click.option(
+    "--profile-memory",
+    is_flag=True,
+    default=False,
+    help="With --profile, also trace memory allocations and report the top ones.",
+)
+@click.pass_context
+def cli(ctx, profile_directory, profile_memory):
+    if profile_directory is not None:
+        profiler = Profiler(
+            profile_directory, memory=profile_memory, stages=services.RUN_STAGES
+        )
+        profiler.start()
+        ctx.call_on_close(profiler.stop)
 
 
 cli.add_command(get_ecb_rates)
+cli.add_command(serve)
+cli.add_command(submit)
+cli.add_command(export_snapshot)
+cli.add_command(coordinate)
+cli.add_command(work)
 
 if __name__ == "__main__":
     env_var_loader(".env")
@@ -0,0 +1,175 @@
+import json
+import os
+import socketserver
+import time
+import click
+from typing import Callable, Optional
+from src import source_repository, destination_repository, services, jobs, validation
+from src.utils.gcp_clients import create_bigquery_client
+from src.utils.logs import default_module_logger
+from src.utils.resilience import CircuitBreaker, RetryPolicy
+from src.utils.single_flight import SingleFlight
+
+
+logger = default_module_logger(__file__)
+
+
+class JobRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles a connection to the daemon: reads one job specification as a JSON line,
+    runs it and writes its outcome back as a JSON line.
+    """
+
+    def handle(self):
+        start = time.perf_counter()
+        try:
+            job_spec = jobs.JobSpec.from_dict(json.loads(self.rfile.readline()))
+            self.server.run_job(job_spec)
+            outcome = {"status": "ok"}
+        except Exception as exception:
+            logger.exception("Job failed.")
+            outcome = {"status": "error", "error": str(exception)}
+        outcome["seconds"] = time.perf_counter() - start
+
+        self.wfile.write(json.dumps(outcome).encode() + b"\n")
+
+
+class JobServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Unix socket server that runs ingestion jobs, each connection in its own thread.
+
+    Args:
+        socket_path (str): Path to the Unix socket to listen on.
+        run_job (Callable[[jobs.JobSpec], None]): Runs a job.
+    Attributes:
+        run_job (Callable[[jobs.JobSpec], None]): Runs a job.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, run_job: Callable[[jobs.JobSpec], None]):
+        self.run_job = run_job
+        super().__init__(socket_path, JobRequestHandler)
+
+
+def create_job_runner(
+    sqlite_path: Optional[str], validate: bool = False
+) -> Callable[[jobs.JobSpec], None]:
+    """
+    Creates the function that runs jobs in the daemon. The HTTP session, the coalescing of
+    concurrent fetches, the circuit breaker of the ECB API and the BigQuery client are created
+    once and shared by every job. The retry policy is read from the RETRY_* environment variables.
+    If validation is enabled, Exchange Rates failing it are loaded into the quarantine table.
+
+    Args:
+        sqlite_path (Optional[str]): Path to a local SQLite file used as destination
+            instead of BigQuery. Each table of the jobs is stored in the SQLite table
+            given by SqliteDestinationRepository.table_name().
+        validate (bool): Whether to validate the rates before loading them. Default is
+            False.
+    Returns:
+        Callable[[jobs.JobSpec], None]: function that runs a job.
+    """
+    session = source_repository.create_ecb_session()
+    single_flight = SingleFlight()
+    retry_policy = RetryPolicy.from_environment(os.environ)
+    circuit_breaker = CircuitBreaker.from_policy(retry_policy)
+    client = None if sqlite_path else create_bigquery_client(os.environ["PROJECT"])
+
+    def source_repository_factory(days: int, data_format: str):
+        return source_repository.EcbApiCaller(
+            days,
+            data_format=data_format,
+            session=session,
+            single_flight=single_flight,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+        )
+
+    def destination_repository_factory(destination_table: str):
+        if sqlite_path:
+            return destination_repository.SqliteDestinationRepository(
+                sqlite_path,
+                destination_repository.SqliteDestinationRepository.table_name(
+                    destination_table
+                ),
+            )
+        bq_repository = destination_repository.BiqQueryDestinationRepository(client)
+        bq_repository.exchange_rates_destination = destination_table
+        return bq_repository
+
+    if not validate:
+        quarantine_repository = None
+    elif sqlite_path:
+        quarantine_repository = destination_repository.SqliteQuarantineRepository(
+            sqlite_path
+        )
+    else:
+        quarantine_repository = destination_repository.BigQueryQuarantineRepository(
+            client
+        )
+    validator = validation.ExchangeRateValidator() if validate else None
+
+    def run_job(job_spec: jobs.JobSpec):
+        logger.info(
+            f"Job for '{job_spec.destination_table}': "
+            f"currency pairs {', '.join(str(pair) for pair in job_spec.currency_pairs)}; "
+            f"number of days to register: {job_spec.days}."
+        )
+        services.source_exchange_rates_for_jobs(
+            [job_spec],
+            source_repository_factory,
+            destination_repository_factory,
+            validator=validator,
+            quarantine_repository=quarantine_repository,
+        )
+
+    return run_job
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    required=True,
+    type=click.Path(dir_okay=False),
+    help="Path to the Unix socket to listen on.",
+)
+@click.option(
+    "--sqlite-path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Path to a local SQLite file to store the rates in instead of BigQuery.",
+)
+@click.option(
+    "--validation/--no-validation",
+    "validate",
+    default=False,
+    show_default=True,
+    help="Whether to validate the rates before loading them. Rates failing validation "
+    "are loaded into the exchange rates quarantine table instead.",
+)
+def serve(socket_path: str, sqlite_path: Optional[str], validate: bool) -> None:
+    """
+    Starts a long-lived daemon that runs the jobs submitted with the `submit` command,
+    keeping the interpreter, HTTP session and BigQuery client warm between jobs.
+
+    Args:
+        socket_path (str):
+            Path to the Unix socket to listen on.
+        sqlite_path (Optional[str]):
+            Path to a local SQLite file used as destination instead of BigQuery.
+        validate (bool):
+            Whether to validate the rates and quarantine the ones failing validation.
+    """
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    with JobServer(socket_path, create_job_runner(sqlite_path, validate)) as server:
+        logger.info(f"Listening for jobs on '{socket_path}'.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Daemon stopped.")
+        finally:
+            os.remove(socket_path)
@@ -0,0 +1,89 @@
+import json
+import socket
+import click
+from typing import Optional, Tuple
+
+
+def submit_job(socket_path: str, job: dict, timeout: Optional[float] = None) -> dict:
+    """
+    Submits a job to the daemon listening on a Unix socket and waits for its outcome.
+    This module only depends on the standard library and click, so submitting a job
+    does not pay for the imports of the ingestion code.
+
+    Args:
+        socket_path (str): Path to the Unix socket of the daemon.
+        job (dict): Job specification, as accepted by jobs.JobSpec.from_dict().
+        timeout (float, optional): Seconds to wait for the outcome. Waits forever if None.
+    Returns:
+        dict: outcome of the job, with key "status" set to "ok" or "error".
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(job).encode() + b"\n")
+        with connection.makefile("rb") as reader:
+            return json.loads(reader.readline())
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    required=True,
+    type=click.Path(dir_okay=False),
+    help="Path to the Unix socket of the daemon.",
+)
+@click.option(
+    "--currency",
+    multiple=True,
+    type=str,
+    help="You can specify this option multiple times.",
+)
+@click.option(
+    "--days",
+    default=10,
+    type=int,
+    show_default=True,
+    help="The number of days to register. Defaults to 10.",
+)
+@click.option(
+    "--destination-table",
+    default=None,
+    type=str,
+    help="Destination table of the exchange rates. Defaults to raw.exchange_rates.",
+)
+def submit(
+    socket_path: str,
+    currency: Tuple[str],
+    days: int,
+    destination_table: Optional[str],
+) -> None:
+    """
+    Submits a job to fetch exchange rates against the EURO to a daemon started with
+    the `serve` command, and waits for it to finish.
+
+    Args:
+        socket_path (str):
+            Path to the Unix socket of the daemon.
+        currency (Tuple[str]):
+            A tuple of currency codes (e.g., ["USD", "GBP"]) for which exchange
+            rates are to be fetched from ECB API.
+        days (int):
+            The number of days to register. Defaults to 10.
+        destination_table (Optional[str]):
+            Destination table of the exchange rates.
+    """
+    job: dict = {"days": days}
+    if currency:
+        job["currencies"] = list(currency)
+    if destination_table:
+        job["destination_table"] = destination_table
+
+    outcome = submit_job(socket_path, job)
+    if outcome["status"] != "ok":
+        raise click.ClickException(outcome["error"])
+    click.echo(f"Job done in {outcome['seconds']:.3f}s.")
+
+
+if __name__ == "__main__":
+    submit()
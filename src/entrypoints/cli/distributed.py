@@ -0,0 +1,315 @@
+import datetime as dt
+import os
+import socket
+import time
+import click
+from typing import Optional, Tuple
+from src import (
+    source_repository,
+    destination_repository,
+    services,
+    model,
+    jobs,
+    validation,
+    work_queue,
+)
+from src.utils.gcp_clients import create_bigquery_client
+from src.utils.logs import default_module_logger
+from src.utils.resilience import CircuitBreaker, RetryPolicy
+
+
+logger = default_module_logger(__file__)
+
+QUEUE_BACKENDS = ("sqlite", "directory")
+
+queue_options = [
+    click.option(
+        "--queue",
+        "queue_path",
+        required=True,
+        type=click.Path(),
+        help="Path to the work queue shared by the coordinator and the workers: a SQLite "
+        "file, or a directory with --queue-backend directory.",
+    ),
+    click.option(
+        "--queue-backend",
+        default="sqlite",
+        type=click.Choice(QUEUE_BACKENDS),
+        show_default=True,
+        help="Storage of the work queue.",
+    ),
+]
+
+
+def with_queue_options(command):
+    for option in reversed(queue_options):
+        command = option(command)
+    return command
+
+
+def open_work_queue(
+    queue_path: str, queue_backend: str, max_attempts: int = 3
+) -> work_queue.AbstractWorkQueue:
+    """
+    Opens the work queue at a path.
+
+    Args:
+        queue_path (str): Path to the SQLite file or the directory of the queue.
+        queue_backend (str): "sqlite" or "directory".
+        max_attempts (int): Maximum number of attempts of the units queued. Default is 3.
+    Returns:
+        work_queue.AbstractWorkQueue: The work queue.
+    """
+    if queue_backend == "directory":
+        return work_queue.DirectoryWorkQueue(queue_path, max_attempts)
+    return work_queue.SqliteWorkQueue(queue_path, max_attempts)
+
+
+@click.command()
+@with_queue_options
+@click.option(
+    "--currency",
+    multiple=True,
+    type=str,
+    help="You can specify this option multiple times.",
+)
+@click.option(
+    "--date-from",
+    required=True,
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="First date of the backfill.",
+)
+@click.option(
+    "--date-to",
+    default=None,
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Last date of the backfill. Defaults to today.",
+)
+@click.option(
+    "--days-per-unit",
+    default=30,
+    type=int,
+    show_default=True,
+    help="Maximum number of days of a work unit.",
+)
+@click.option(
+    "--pairs-per-unit",
+    default=1,
+    type=int,
+    show_default=True,
+    help="Maximum number of currencies of a work unit.",
+)
+@click.option(
+    "--table",
+    default="raw.exchange_rates",
+    type=str,
+    show_default=True,
+    help="Destination table of the rates.",
+)
+@click.option(
+    "--format",
+    "data_format",
+    default="structurespecific",
+    type=click.Choice(list(jobs.DATA_FORMATS)),
+    show_default=True,
+    help="SDMX format requested to the ECB API.",
+)
+@click.option(
+    "--max-attempts",
+    default=3,
+    type=int,
+    show_default=True,
+    help="Maximum number of attempts of a work unit, across workers.",
+)
+@click.option(
+    "--wait",
+    is_flag=True,
+    default=False,
+    help="Wait for the workers to run every unit, logging progress and throughput.",
+)
+def coordinate(
+    queue_path: str,
+    queue_backend: str,
+    currency: Tuple[str],
+    date_from: dt.datetime,
+    date_to: Optional[dt.datetime],
+    days_per_unit: int,
+    pairs_per_unit: int,
+    table: str,
+    data_format: str,
+    max_attempts: int,
+    wait: bool,
+) -> None:
+    """
+    Splits a backfill of exchange rates against the EURO into work units of a few
+    currencies and days, and queues them for the workers started with the `work`
+    command, on this node or on others sharing the queue. Units already queued are
+    not queued again.
+
+    Args:
+        queue_path (str):
+            Path to the SQLite file or the directory of the queue.
+        queue_backend (str):
+            Storage of the queue, "sqlite" or "directory".
+        currency (Tuple[str]):
+            A tuple of currency codes (e.g., ["USD", "GBP"]) to backfill.
+        date_from (dt.datetime):
+            First date of the backfill.
+        date_to (Optional[dt.datetime]):
+            Last date of the backfill, today if None.
+        days_per_unit (int):
+            Maximum number of days of a unit.
+        pairs_per_unit (int):
+            Maximum number of currencies of a unit.
+        table (str):
+            Destination table of the rates.
+        data_format (str):
+            SDMX format requested to the ECB API.
+        max_attempts (int):
+            Maximum number of attempts of a unit.
+        wait (bool):
+            Whether to wait for every unit to be run.
+    """
+    queue = open_work_queue(queue_path, queue_backend, max_attempts)
+    units = work_queue.plan_work_units(
+        [model.CurrencyPair("EUR", curr) for curr in currency],
+        date_from.date(),
+        date_to.date() if date_to else dt.date.today(),
+        table,
+        jobs.DATA_FORMATS[data_format],
+        pairs_per_unit=pairs_per_unit,
+        days_per_unit=days_per_unit,
+    )
+    queued = queue.put(units)
+    logger.info(f"Work units planned: {len(units)}, queued: {queued}.")
+
+    summary = queue.summary()
+    while wait and summary.remaining:
+        time.sleep(5)
+        summary = queue.summary()
+        logger.info(f"Work units remaining: {summary.remaining}.")
+    for line in summary.format():
+        logger.info(line)
+
+
+@click.command()
+@with_queue_options
+@click.option(
+    "--worker-id",
+    default=None,
+    type=str,
+    help="Identifier of the worker, unique across nodes. Defaults to host name and "
+    "process id.",
+)
+@click.option(
+    "--lease-seconds",
+    default=60.0,
+    type=float,
+    show_default=True,
+    help="Duration of the lease on a unit, renewed while the unit runs. Units of "
+    "workers that stop renewing it are run again by other workers.",
+)
+@click.option(
+    "--max-units",
+    default=None,
+    type=int,
+    help="Maximum number of units to run. Unbounded by default.",
+)
+@click.option(
+    "--sqlite-path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Path to a local SQLite file to store the rates in instead of BigQuery.",
+)
+@click.option(
+    "--validation/--no-validation",
+    "validate",
+    default=False,
+    show_default=True,
+    help="Whether to validate the rates before loading them. Rates failing validation "
+    "are loaded into the exchange rates quarantine table instead.",
+)
+def work(
+    queue_path: str,
+    queue_backend: str,
+    worker_id: Optional[str],
+    lease_seconds: float,
+    max_units: Optional[int],
+    sqlite_path: Optional[str],
+    validate: bool,
+) -> None:
+    """
+    Runs the work units queued by the `coordinate` command until none is left, fetching
+    them from the ECB API and loading them into BigQuery, or into a local SQLite file if
+    a path is given. Start any number of workers, on any number of nodes sharing the
+    queue. Calls to the ECB API follow the retry policy set by the RETRY_* environment
+    variables.
+
+    Args:
+        queue_path (str):
+            Path to the SQLite file or the directory of the queue.
+        queue_backend (str):
+            Storage of the queue, "sqlite" or "directory".
+        worker_id (Optional[str]):
+            Identifier of the worker, host name and process id if None.
+        lease_seconds (float):
+            Duration of the lease on a unit.
+        max_units (Optional[int]):
+            Maximum number of units to run.
+        sqlite_path (Optional[str]):
+            Path to a local SQLite file used as destination instead of BigQuery.
+        validate (bool):
+            Whether to validate the rates and quarantine the ones failing validation.
+    """
+    queue = open_work_queue(queue_path, queue_backend)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    session = source_repository.create_ecb_session()
+    retry_policy = RetryPolicy.from_environment(os.environ)
+    circuit_breaker = CircuitBreaker.from_policy(retry_policy)
+    client = None if sqlite_path else create_bigquery_client(os.environ["PROJECT"])
+
+    def source_repository_factory(unit: work_queue.WorkUnit):
+        return source_repository.EcbApiCaller(
+            (unit.date_to - unit.date_from).days,
+            data_format=unit.data_format,
+            session=session,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            end_date=unit.date_to,
+        )
+
+    def destination_repository_factory(destination_table: str):
+        if sqlite_path:
+            return destination_repository.SqliteDestinationRepository(sqlite_path)
+        bq_repository = destination_repository.BiqQueryDestinationRepository(client)
+        bq_repository.exchange_rates_destination = destination_table
+        return bq_repository
+
+    if sqlite_path:
+        quarantine_repository = destination_repository.SqliteQuarantineRepository(
+            sqlite_path
+        )
+    else:
+        quarantine_repository = destination_repository.BigQueryQuarantineRepository(
+            client
+        )
+
+    start = time.perf_counter()
+    reports = services.run_worker(
+        queue,
+        worker_id,
+        source_repository_factory,
+        destination_repository_factory,
+        lease_seconds=lease_seconds,
+        validator=validation.ExchangeRateValidator() if validate else None,
+        quarantine_repository=quarantine_repository,
+        max_units=max_units,
+    )
+    elapsed = time.perf_counter() - start
+    rows = sum(report.rows for report in reports)
+    logger.info(
+        f"Worker '{worker_id}' ran {len(reports)} units: {rows} rows in "
+        f"{elapsed:.1f}s ({rows / elapsed if elapsed else 0:.1f} rows/s)."
+    )
+    for line in queue.summary().format():
+        logger.info(line)
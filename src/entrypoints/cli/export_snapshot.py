@@ -0,0 +1,61 @@
+import os
+import click
+from typing import Optional
+from src import destination_repository, snapshot
+from src.utils.gcp_clients import create_bigquery_client
+from src.utils.logs import default_module_logger
+
+
+logger = default_module_logger(__file__)
+
+
+@click.command()
+@click.option(
+    "--output",
+    required=True,
+    type=click.Path(dir_okay=False),
+    help="Path to the snapshot file to write.",
+)
+@click.option(
+    "--sqlite-path",
+    default=None,
+    type=click.Path(dir_okay=False, exists=True),
+    help="Path to a local SQLite file to read the rates from instead of BigQuery.",
+)
+@click.option(
+    "--table",
+    default=None,
+    type=str,
+    help="Table to read the rates from. Defaults to raw.exchange_rates in BigQuery "
+    "and exchange_rates in SQLite.",
+)
+def export_snapshot(
+    output: str, sqlite_path: Optional[str], table: Optional[str]
+) -> None:
+    """
+    Exports the full history of a destination table to a binary snapshot file, that
+    services can memory-map with snapshot.ExchangeRateSnapshot instead of querying the table.
+
+    Args:
+        output (str):
+            Path to the snapshot file to write.
+        sqlite_path (Optional[str]):
+            Path to a local SQLite file used as source instead of BigQuery.
+        table (Optional[str]):
+            Table to read the rates from.
+    """
+    if sqlite_path:
+        repository = destination_repository.SqliteDestinationRepository(
+            sqlite_path, table or "exchange_rates"
+        )
+    else:
+        repository = destination_repository.BiqQueryDestinationRepository(
+            create_bigquery_client(os.environ["PROJECT"])
+        )
+        if table:
+            repository.exchange_rates_destination = table
+
+    logger.info(
+        f"Exporting '{repository.exchange_rates_destination}' to snapshot '{output}'."
+    )
+    snapshot.export_snapshot(output, repository)
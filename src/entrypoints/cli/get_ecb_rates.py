@@ -1,13 +1,48 @@
 import os
 import click
-from typing import Tuple
-from src import source_repository, destination_repository, services, model
+from typing import Tuple, Optional
+from src import (
+    source_repository,
+    destination_repository,
+    services,
+    model,
+    validation,
+    planner,
+    change_detection,
+    notifications,
+)
 from src.utils.gcp_clients import create_bigquery_client
+from src.utils.high_water_marks import HighWaterMarkStore
+from src.utils.notification_state import NotificationStateStore
+from src.utils.observation_hashes import ObservationHashStore
+from src.utils.resilience import RetryPolicy
 from src.utils.logs import default_module_logger
 
 
 logger = default_module_logger(__file__)
 
+# Suffix of the destination tables of the series of other frequencies than daily.
+FREQUENCY_TABLE_SUFFIXES = {
+    model.MONTHLY: "_monthly",
+    model.QUARTERLY: "_quarterly",
+    model.ANNUAL: "_annual",
+}
+
+
+def parse_cross_currency_pairs(
+    context: click.Context, parameter: click.Parameter, value: Tuple[str]
+) -> Tuple[model.CurrencyPair, ...]:
+    """
+    Parses the cross rates given to --cross, e.g. ("GBP/USD",), into currency pairs.
+
+    Raises:
+        click.BadParameter: if a cross rate is not a currency pair such as GBP/USD.
+    """
+    try:
+        return tuple(model.CurrencyPair.from_string(cross) for cross in value)
+    except ValueError as error:
+        raise click.BadParameter(str(error)) from error
+
 
 @click.command()
 @click.option(
@@ -23,10 +58,163 @@ logger = default_module_logger(__file__)
     show_default=True,
     help="The number of days to register. Defaults to 10.",
 )
-def get_ecb_rates(currency: Tuple[str], days: int) -> None:
+@click.option(
+    "--frequency",
+    default=model.DAILY,
+    type=click.Choice(model.FREQUENCIES),
+    show_default=True,
+    help="Frequency of the rates: daily (D), or monthly (M), quarterly (Q) or annual (A) "
+    "averages, stored in the exchange rates table, and the derived table if any, suffixed "
+    "with _monthly, _quarterly or _annual.",
+)
+@click.option(
+    "--sqlite-path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Path to a local SQLite file to store the rates in instead of BigQuery.",
+)
+@click.option(
+    "--state-path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Path to a local JSON file keeping the latest date loaded per currency. "
+    "Currencies without a new ECB publication date since then are not fetched.",
+)
+@click.option(
+    "--probe/--no-probe",
+    default=False,
+    show_default=True,
+    help="With --state-path, probe the latest ECB observation of every currency in a "
+    "single call before fetching, and fetch only the ones with a new observation, e.g. "
+    "for runs scheduled before the afternoon publication.",
+)
+@click.option(
+    "--max-attempts",
+    default=RetryPolicy.max_attempts,
+    type=int,
+    show_default=True,
+    help="Maximum number of attempts per call to the ECB API.",
+)
+@click.option(
+    "--retry-budget",
+    default=RetryPolicy.retry_budget,
+    type=int,
+    show_default=True,
+    help="Maximum number of retries of the whole run, across currencies.",
+)
+@click.option(
+    "--deadline",
+    default=None,
+    type=float,
+    help="Maximum duration of the calls to the ECB API, in seconds. Unbounded by default.",
+)
+@click.option(
+    "--failure-rate-threshold",
+    default=RetryPolicy.failure_rate_threshold,
+    type=float,
+    show_default=True,
+    help="Failure rate of the last calls that stops calling the ECB API.",
+)
+@click.option(
+    "--derived-table",
+    default=None,
+    type=str,
+    help="Table to materialize inverse and cross rates into, in the SQLite file if "
+    "--sqlite-path is given, in BigQuery otherwise. No rate is derived by default.",
+)
+@click.option(
+    "--cross",
+    multiple=True,
+    type=str,
+    callback=parse_cross_currency_pairs,
+    help="Cross rate to materialize into the derived table, e.g. GBP/USD. "
+    "You can specify this option multiple times.",
+)
+@click.option(
+    "--validation/--no-validation",
+    "validate",
+    default=False,
+    show_default=True,
+    help="Whether to validate the rates before loading them. Rates failing validation "
+    "are loaded into the exchange rates quarantine table instead.",
+)
+@click.option(
+    "--change-state-path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Path to a local SQLite file keeping a hash of each rate loaded. Rates loaded "
+    "before with the same value are skipped, and revised ones are loaded with their "
+    "source marked as revised. It also keeps the rates notified, see --notify-webhook.",
+)
+@click.option(
+    "--mirror-project",
+    multiple=True,
+    type=str,
+    help="Another BigQuery project to load the rates into, e.g. a partner's, in the same "
+    "table. You can specify this option multiple times.",
+)
+@click.option(
+    "--archive-dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Local directory to archive the rates into, one gzip compressed newline "
+    "delimited JSON file per load.",
+)
+@click.option(
+    "--notify-webhook",
+    default=None,
+    type=str,
+    help="URL to POST a JSON message to with the rates newly loaded by the run. "
+    "Needs --change-state-path.",
+)
+@click.option(
+    "--notify-pubsub-topic",
+    default=None,
+    type=str,
+    help="Pub/Sub topic, projects/<project>/topics/<topic>, to publish a JSON message "
+    "to with the rates newly loaded by the run. Needs --change-state-path.",
+)
+@click.option(
+    "--notify-file",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Local file to append a JSON message to with the rates newly loaded by the run. "
+    "Needs --change-state-path.",
+)
+@click.option(
+    "--plan",
+    is_flag=True,
+    default=False,
+    help="Print the estimated requests, bytes, rows and load jobs of the run and exit "
+    "without touching the network.",
+)
+def get_ecb_rates(
+    currency: Tuple[str],
+    days: int,
+    frequency: str,
+    sqlite_path: Optional[str],
+    state_path: Optional[str],
+    probe: bool,
+    max_attempts: int,
+    retry_budget: int,
+    deadline: Optional[float],
+    failure_rate_threshold: float,
+    derived_table: Optional[str],
+    cross: Tuple[model.CurrencyPair, ...],
+    validate: bool,
+    change_state_path: Optional[str],
+    mirror_project: Tuple[str],
+    archive_dir: Optional[str],
+    notify_webhook: Optional[str],
+    notify_pubsub_topic: Optional[str],
+    notify_file: Optional[str],
+    plan: bool,
+) -> None:
     """
     Fetches exchange rates against the EURO from the ECB (European Central Bank)
-    API for the specified currencies and stores them in a BigQuery repository.
+    API for the specified currencies and stores them in a BigQuery repository,
+    or in a local SQLite file if a path is given. The run is planned beforehand,
+    and the plan is compared with what actually happened once the run is over.
 
     Args:
         currency (Tuple[str]):
@@ -34,16 +222,191 @@ def get_ecb_rates(currency: Tuple[str], days: int) -> None:
             rates are to be fetched from ECB API.
         days (int):
             The number of days to register. Defaults to 10.
+        frequency (str):
+            Frequency of the rates, model.DAILY, MONTHLY, QUARTERLY or ANNUAL.
+        sqlite_path (Optional[str]):
+            Path to a local SQLite file used as destination instead of BigQuery.
+        state_path (Optional[str]):
+            Path to a local JSON file with the high-water mark of each currency pair.
+        probe (bool):
+            Whether to probe the latest observation of the currency pairs before fetching them.
+        max_attempts (int):
+            Maximum number of attempts per call to the ECB API.
+        retry_budget (int):
+            Maximum number of retries of the whole run.
+        deadline (Optional[float]):
+            Maximum duration of the calls to the ECB API, in seconds.
+        failure_rate_threshold (float):
+            Failure rate that opens the circuit breaker of the ECB API.
+        derived_table (Optional[str]):
+            Table to materialize inverse and cross rates into, suffixed like the
+            exchange rates table for other frequencies than daily.
+        cross (Tuple[model.CurrencyPair, ...]):
+            Cross rates to materialize, e.g. [CurrencyPair("GBP", "USD")].
+        validate (bool):
+            Whether to validate the rates and quarantine the ones failing validation.
+        change_state_path (Optional[str]):
+            Path to a local SQLite file with the hash of each rate loaded and the state
+            of the notifier.
+        mirror_project (Tuple[str]):
+            Other BigQuery projects to load the rates into.
+        archive_dir (Optional[str]):
+            Local directory to archive the rates into.
+        notify_webhook (Optional[str]):
+            URL to post the notification of the rates loaded to.
+        notify_pubsub_topic (Optional[str]):
+            Pub/Sub topic to publish the notification of the rates loaded to.
+        notify_file (Optional[str]):
+            Local file to append the notification of the rates loaded to.
+        plan (bool):
+            Whether to only print the execution plan of the run.
     """
+    notify_options = sum(map(bool, (notify_webhook, notify_pubsub_topic, notify_file)))
+    if notify_options > 1:
+        raise click.UsageError(
+            "Use a single one of --notify-webhook, --notify-pubsub-topic and --notify-file."
+        )
+    if notify_options and not change_state_path:
+        # The process ends with the run, so the notifier keeps its state in that file.
+        raise click.UsageError(
+            "--notify-webhook, --notify-pubsub-topic and --notify-file need "
+            "--change-state-path."
+        )
     currency_pairs = [model.CurrencyPair("EUR", curr) for curr in currency]
+    currencies = {"EUR"} | {currency_pair.quote for currency_pair in currency_pairs}
+    for cross_currency_pair in cross:
+        if not {cross_currency_pair.base, cross_currency_pair.quote} <= currencies:
+            raise click.BadParameter(
+                f"Cross rate {cross_currency_pair} needs currencies not fetched by the run.",
+                param_hint="'--cross'",
+            )
 
     logger.info(f"Currency pairs to load:")
     for currency_pair in currency_pairs:
         logger.info(f"'{currency_pair}'.")
     logger.info(f"Number of days to register: {days}.")
 
-    bq_repository = destination_repository.BiqQueryDestinationRepository(
-        create_bigquery_client(os.environ["PROJECT"])
+    cross_currency_pairs = list(cross)
+    high_water_marks = HighWaterMarkStore(state_path) if state_path else None
+    ecb_api_caller = source_repository.EcbApiCaller(
+        days_to_register=days,
+        frequency=frequency,
+        high_water_marks=high_water_marks,
+        probe=probe,
+        retry_policy=RetryPolicy(
+            max_attempts=max_attempts,
+            retry_budget=retry_budget,
+            deadline_seconds=deadline,
+            failure_rate_threshold=failure_rate_threshold,
+        ),
+    )
+    execution_plan = planner.plan_run(
+        ecb_api_caller,
+        currency_pairs,
+        batching_policy=(
+            None if sqlite_path else destination_repository.LoadBatchingPolicy()
+        ),
+        derived=bool(derived_table),
+        cross_currency_pairs=cross_currency_pairs,
+    )
+    if plan:
+        click.echo(planner.format_plan(execution_plan))
+        return
+
+    table_suffix = FREQUENCY_TABLE_SUFFIXES.get(frequency, "")
+    derived_repository = None
+    if sqlite_path:
+        logger.info(f"Destination: SQLite file '{sqlite_path}'.")
+        repository = destination_repository.SqliteDestinationRepository(
+            sqlite_path, f"exchange_rates{table_suffix}"
+        )
+        if derived_table:
+            derived_repository = destination_repository.SqliteDestinationRepository(
+                sqlite_path,
+                destination_repository.SqliteDestinationRepository.table_name(
+                    derived_table
+                )
+                + table_suffix,
+            )
+        quarantine_repository = destination_repository.SqliteQuarantineRepository(
+            sqlite_path
+        )
+    else:
+        repository = destination_repository.BiqQueryDestinationRepository(
+            create_bigquery_client(os.environ["PROJECT"])
+        )
+        repository.exchange_rates_destination += table_suffix
+        if derived_table:
+            derived_repository = destination_repository.BiqQueryDestinationRepository(
+                repository.client
+            )
+            derived_repository.exchange_rates_destination = derived_table + table_suffix
+        quarantine_repository = destination_repository.BigQueryQuarantineRepository(
+            repository.client
+        )
+    destination = repository
+    if mirror_project or archive_dir:
+        mirror_repositories = []
+        for project in mirror_project:
+            mirror_repository = destination_repository.BiqQueryDestinationRepository(
+                create_bigquery_client(project)
+            )
+            mirror_repository.exchange_rates_destination += table_suffix
+            mirror_repositories.append(mirror_repository)
+        if archive_dir:
+            mirror_repositories.append(
+                destination_repository.NdjsonArchiveDestinationRepository(archive_dir)
+            )
+        destination = destination_repository.FanOutDestinationRepository(
+            [repository, *mirror_repositories]
+        )
+    change_detector = (
+        change_detection.ObservationChangeDetector(
+            ObservationHashStore(change_state_path)
+        )
+        if change_state_path
+        else None
+    )
+    notifier = None
+    if notify_options:
+        if notify_webhook:
+            publisher = notifications.WebhookPublisher(notify_webhook)
+        elif notify_pubsub_topic:
+            publisher = notifications.PubSubPublisher(notify_pubsub_topic)
+        else:
+            publisher = notifications.FilePublisher(notify_file)
+        notifier = notifications.ChangeNotifier(
+            publisher, state_store=NotificationStateStore(change_state_path)
+        )
+    try:
+        exchange_rates = services.source_exchange_rates(
+            destination,
+            currency_pairs,
+            ecb_api_caller,
+            derived_destination_repository=derived_repository,
+            cross_currency_pairs=cross_currency_pairs,
+            validator=validation.ExchangeRateValidator() if validate else None,
+            quarantine_repository=quarantine_repository,
+            change_detector=change_detector,
+            notifier=notifier,
+            high_water_marks=high_water_marks,
+        )
+    finally:
+        if destination is not repository:
+            destination.close()
+    if change_detector is not None:
+        counts = change_detector.reports[-1]
+        logger.info(
+            f"Rates new: {counts.new}, revised: {counts.revised}, "
+            f"unchanged: {counts.unchanged}."
+        )
+
+    chunk_reports = [] if sqlite_path else list(repository.chunk_reports)
+    if derived_repository is not None and not sqlite_path:
+        chunk_reports += derived_repository.chunk_reports
+    run_report = planner.RunReport.from_run(
+        exchange_rates, ecb_api_caller.transfer_stats, chunk_reports
     )
-    ecb_api_caller = source_repository.EcbApiCaller(days_to_register=days)
-    services.source_exchange_rates(bq_repository, currency_pairs, ecb_api_caller)
+    logger.info("Planned versus actual:")
+    for line in planner.compare_plan(execution_plan, run_report):
+        logger.info(line)
@@ -1,6 +1,19 @@
-from src import source_repository, destination_repository, services, model
+import functools
+import os
+from typing import Optional
+from src import (
+    source_repository,
+    destination_repository,
+    services,
+    jobs,
+    validation,
+    notifications,
+)
 from src.utils.gcp_clients import create_bigquery_client
+from src.utils.notification_state import NotificationStateStore
+from src.utils.resilience import CircuitBreaker, RetryPolicy
 from src.utils.logs import default_module_logger
+from src.utils.profiling import profiler_from_environment
 
 
 logger = default_module_logger(__file__)
@@ -9,8 +22,22 @@ logger = default_module_logger(__file__)
 def function_entry_point(event, context):
     """
     Entry point function for ingesting ECB exchange rates into raw layer of the DW in BigQuery.
-    This function initializes a BigQueryRepository and an EcbApiCaller, then calls a service to fetch and load ECB
-    exchange rates into BigQuery.
+    This function decodes the jobs to run from the Pub/Sub message, see jobs.job_specs_from_event(),
+    and calls a service to fetch and load ECB exchange rates into BigQuery for all of them. Jobs share
+    a single HTTP session and BigQuery client, currency pairs requested by several jobs are fetched
+    once, and the rows of jobs loading the same table are merged in the same load jobs. A message
+    that is not a job specification runs the default job: EUR/GBP and EUR/USD for the last 10 days
+    into raw.exchange_rates. Calls to the ECB API follow the retry policy set by the RETRY_*
+    environment variables, see RetryPolicy.from_environment(), with a circuit breaker shared by
+    all jobs. If the VALIDATE_RATES environment variable is set to a non empty value, Exchange
+    Rates failing validation are loaded into the quarantine table set by the QUARANTINE_TABLE
+    environment variable, raw.exchange_rates_quarantine by default, instead of their destination. If the NOTIFY_PUBSUB_TOPIC or NOTIFY_WEBHOOK_URL
+    environment variable is set, the rates loaded are then published to that topic or URL, see
+    notifications.ChangeNotifier. The notifier is kept by the instance, so the rates notified and
+    the ones of failed messages are remembered across warm invocations, and across instances if
+    NOTIFY_STATE_PATH points to a SQLite file on a mounted volume. If the PROFILE_DIR environment
+    variable is set, the run is profiled and its reports are written into that directory, see
+    profiler_from_environment().
 
     Args:
          event: The dictionary with data specific to this type of event. The `@type` field maps to
@@ -23,18 +50,91 @@ def function_entry_point(event, context):
                   API endpoint pubsub.googleapis.com, the triggering topic's name, and the triggering event type
                   `type.googleapis.com/google.pubsub.v1.PubsubMessage`.
     """
+    with profiler_from_environment(os.environ, services.RUN_STAGES):
+        _ingest_exchange_rates(event)
+
+
+def _ingest_exchange_rates(event):
+    """
+    Runs the jobs of a Pub/Sub message, see function_entry_point().
+    """
+    job_specs = jobs.job_specs_from_event(event)
+    for job_spec in job_specs:
+        logger.info(
+            f"Job for '{job_spec.destination_table}': "
+            f"currency pairs {', '.join(str(pair) for pair in job_spec.currency_pairs)}; "
+            f"number of days to register: {job_spec.days}."
+        )
 
     client = create_bigquery_client()
-    bq_repository = destination_repository.BiqQueryDestinationRepository(client)
-    days = 10
-    ecb_api_caller = source_repository.EcbApiCaller(days)
-    currency_pairs = [
-        model.CurrencyPair("EUR", "GBP"),
-        model.CurrencyPair("EUR", "USD"),
-    ]
-    logger.info(f"Currency pairs to load:")
-    for currency_pair in currency_pairs:
-        logger.info(f"'{currency_pair}'.")
-    logger.info(f"Number of days to register: {days}.")
-
-    services.source_exchange_rates(bq_repository, currency_pairs, ecb_api_caller)
+    session = source_repository.create_ecb_session()
+    retry_policy = RetryPolicy.from_environment(os.environ)
+    circuit_breaker = CircuitBreaker.from_policy(retry_policy)
+
+    def source_repository_factory(days: int, data_format: str):
+        return source_repository.EcbApiCaller(
+            days,
+            data_format=data_format,
+            session=session,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+        )
+
+    # Rows are buffered until every job has loaded, see source_exchange_rates_for_jobs().
+    batching_policy = destination_repository.LoadBatchingPolicy(merge_window_seconds=60)
+
+    def destination_repository_factory(destination_table: str):
+        bq_repository = destination_repository.BiqQueryDestinationRepository(
+            client, batching_policy
+        )
+        bq_repository.exchange_rates_destination = destination_table
+        return bq_repository
+
+    validator, quarantine_repository = None, None
+    if os.environ.get("VALIDATE_RATES"):
+        validator = validation.ExchangeRateValidator()
+        quarantine_repository = destination_repository.BigQueryQuarantineRepository(
+            client
+        )
+        quarantine_repository.quarantine_destination = os.environ.get(
+            "QUARANTINE_TABLE", quarantine_repository.quarantine_destination
+        )
+
+    services.source_exchange_rates_for_jobs(
+        job_specs,
+        source_repository_factory,
+        destination_repository_factory,
+        validator=validator,
+        quarantine_repository=quarantine_repository,
+        notifier=_change_notifier(
+            os.environ.get("NOTIFY_PUBSUB_TOPIC"),
+            os.environ.get("NOTIFY_WEBHOOK_URL"),
+            os.environ.get("NOTIFY_STATE_PATH"),
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _change_notifier(
+    pubsub_topic: Optional[str],
+    webhook_url: Optional[str],
+    state_path: Optional[str],
+) -> Optional[notifications.ChangeNotifier]:
+    """
+    Returns the notifier of the Pub/Sub topic or the webhook, created once per instance so
+    warm invocations share its state, or None if neither is set.
+    """
+    if pubsub_topic and webhook_url:
+        raise ValueError(
+            "Set a single one of NOTIFY_PUBSUB_TOPIC and NOTIFY_WEBHOOK_URL."
+        )
+    if pubsub_topic:
+        publisher = notifications.PubSubPublisher(pubsub_topic)
+    elif webhook_url:
+        publisher = notifications.WebhookPublisher(webhook_url)
+    else:
+        return None
+    return notifications.ChangeNotifier(
+        publisher,
+        state_store=NotificationStateStore(state_path) if state_path else None,
+    )
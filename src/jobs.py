@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+import datetime as dt
+import base64
+import binascii
+import json
+from typing import List, Optional, Tuple
+
+from src import model, source_repository
+
+
+DATA_FORMATS = {
+    "generic": source_repository.GENERIC_DATA,
+    "structurespecific": source_repository.STRUCTURE_SPECIFIC_DATA,
+}
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """
+    Specification of an ingestion job: which exchange rates to fetch and where to load them.
+
+    Attributes:
+        currency_pairs (Tuple[model.CurrencyPair, ...]): Currency pairs to fetch.
+        days (int): Number of days to register. Default is 10.
+        destination_table (str): Destination table of the exchange rates.
+            Default is "raw.exchange_rates".
+        data_format (str): SDMX format requested to the ECB API.
+            Default is the structure specific one.
+        derived_table (Optional[str]): Destination table of the inverse and cross rates
+            derived from the exchange rates. No rate is derived if None, the default.
+        cross_currency_pairs (Tuple[model.CurrencyPair, ...]): Cross rates to derive,
+            between the currencies of the job and the EURO. Default is none.
+    """
+
+    currency_pairs: Tuple[model.CurrencyPair, ...] = field(
+        default_factory=lambda: (
+            model.CurrencyPair("EUR", "GBP"),
+            model.CurrencyPair("EUR", "USD"),
+        )
+    )
+    days: int = 10
+    destination_table: str = "raw.exchange_rates"
+    data_format: str = source_repository.STRUCTURE_SPECIFIC_DATA
+    derived_table: Optional[str] = None
+    cross_currency_pairs: Tuple[model.CurrencyPair, ...] = ()
+
+    def date_from(self, reference_date: dt.date) -> dt.date:
+        """
+        Returns the first date of the window of the job.
+
+        Args:
+            reference_date (dt.date): Last date of the window.
+        Returns:
+            dt.date: first date of the window.
+        """
+        return reference_date - dt.timedelta(self.days)
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "JobSpec":
+        """
+        Builds a JobSpec from its dictionary representation, e.g.:
+            {"currencies": ["GBP", "USD"], "days": 10,
+             "destination_table": "raw.exchange_rates", "format": "structurespecific",
+             "derived_table": "raw.derived_exchange_rates", "crosses": ["GBP/USD"]}
+        Missing keys take default values.
+
+        Args:
+            spec (dict): dictionary representation of the job.
+        Returns:
+            JobSpec: The job specification.
+        Raises:
+            ValueError: if the currencies, the format or a cross rate is not valid.
+        """
+        default = cls()
+        if spec.get("format", "structurespecific") not in DATA_FORMATS:
+            raise ValueError(f"Format '{spec['format']}' is not supported.")
+        if "currencies" in spec and not (
+            isinstance(spec["currencies"], list)
+            and all(isinstance(currency, str) for currency in spec["currencies"])
+        ):
+            raise ValueError("Currencies must be a list of currency codes.")
+        currency_pairs = (
+            tuple(
+                model.CurrencyPair("EUR", currency) for currency in spec["currencies"]
+            )
+            if "currencies" in spec
+            else default.currency_pairs
+        )
+        cross_currency_pairs = tuple(
+            model.CurrencyPair.from_string(cross) for cross in spec.get("crosses", [])
+        )
+        currencies = {"EUR"} | {currency_pair.quote for currency_pair in currency_pairs}
+        for cross_currency_pair in cross_currency_pairs:
+            if not {cross_currency_pair.base, cross_currency_pair.quote} <= currencies:
+                raise ValueError(
+                    f"Cross rate {cross_currency_pair} needs currencies not fetched by the job."
+                )
+
+        return cls(
+            currency_pairs=currency_pairs,
+            days=int(spec.get("days", default.days)),
+            destination_table=spec.get("destination_table", default.destination_table),
+            data_format=DATA_FORMATS[spec.get("format", "structurespecific")],
+            derived_table=spec.get("derived_table"),
+            cross_currency_pairs=cross_currency_pairs,
+        )
+
+
+def job_specs_from_event(event: dict) -> List[JobSpec]:
+    """
+    Decodes the job specifications carried by a Pub/Sub event. The message data is a
+    base64 encoded JSON with either a single job, a list of jobs or a dictionary with
+    the list of jobs under key "jobs". Any other payload, such as the plain text sent
+    by the Cloud Scheduler, results in the default job.
+
+    Args:
+        event (dict): Pub/Sub event with the base64 encoded message under key "data".
+    Returns:
+        List[JobSpec]: The job specifications.
+    """
+    try:
+        payload = json.loads(base64.b64decode(event.get("data") or b""))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return [JobSpec()]
+
+    if isinstance(payload, dict):
+        payload = payload.get("jobs", [payload])
+    if not isinstance(payload, list) or not payload:
+        return [JobSpec()]
+
+    return [JobSpec.from_dict(spec) for spec in payload]
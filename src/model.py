@@ -2,6 +2,97 @@ from dataclasses import dataclass, field
 import datetime as dt
 
 
+# SDMX frequencies of the ECB exchange rate series. Rates of a period other than a day are
+# averages over the period, and are dated on the first day of the period.
+DAILY = "D"
+MONTHLY = "M"
+QUARTERLY = "Q"
+ANNUAL = "A"
+FREQUENCIES = (DAILY, MONTHLY, QUARTERLY, ANNUAL)
+
+
+def period_start(date: dt.date, frequency: str) -> dt.date:
+    """
+    Returns the first day of the period of a frequency that contains a date.
+
+    Args:
+        date (dt.date): The date.
+        frequency (str): DAILY, MONTHLY, QUARTERLY or ANNUAL.
+    Returns:
+        dt.date: First day of the period.
+    """
+    if frequency == DAILY:
+        return date
+    if frequency == MONTHLY:
+        return date.replace(day=1)
+    if frequency == QUARTERLY:
+        return dt.date(date.year, 3 * ((date.month - 1) // 3) + 1, 1)
+    if frequency == ANNUAL:
+        return dt.date(date.year, 1, 1)
+    raise ValueError(f"Frequency '{frequency}' is not supported.")
+
+
+def period_end(date: dt.date, frequency: str) -> dt.date:
+    """
+    Returns the last day of the period of a frequency that contains a date.
+
+    Args:
+        date (dt.date): The date.
+        frequency (str): DAILY, MONTHLY, QUARTERLY or ANNUAL.
+    Returns:
+        dt.date: Last day of the period.
+    """
+    if frequency == DAILY:
+        return date
+    months = {MONTHLY: 1, QUARTERLY: 3, ANNUAL: 12}[frequency]
+    start = period_start(date, frequency)
+    year, month = divmod(start.month - 1 + months, 12)
+    return dt.date(start.year + year, month + 1, 1) - dt.timedelta(days=1)
+
+
+def period_label(date: dt.date, frequency: str) -> str:
+    """
+    Formats the period of a frequency that contains a date as the ECB API does,
+    e.g. "2023-11-10", "2023-11", "2023-Q4" or "2023".
+
+    Args:
+        date (dt.date): The date.
+        frequency (str): DAILY, MONTHLY, QUARTERLY or ANNUAL.
+    Returns:
+        str: The period.
+    """
+    if frequency == DAILY:
+        return date.isoformat()
+    if frequency == MONTHLY:
+        return f"{date.year}-{date.month:02d}"
+    if frequency == QUARTERLY:
+        return f"{date.year}-Q{(date.month - 1) // 3 + 1}"
+    if frequency == ANNUAL:
+        return str(date.year)
+    raise ValueError(f"Frequency '{frequency}' is not supported.")
+
+
+def parse_period(label: str, frequency: str) -> dt.date:
+    """
+    Parses a period formatted by the ECB API, returning its first day.
+
+    Args:
+        label (str): The period, e.g. "2023-11-10", "2023-11", "2023-Q4" or "2023".
+        frequency (str): DAILY, MONTHLY, QUARTERLY or ANNUAL.
+    Returns:
+        dt.date: First day of the period.
+    """
+    if frequency == DAILY:
+        return dt.date.fromisoformat(label)
+    if frequency == MONTHLY:
+        return dt.date(int(label[:4]), int(label[5:7]), 1)
+    if frequency == QUARTERLY:
+        return dt.date(int(label[:4]), 3 * (int(label[6]) - 1) + 1, 1)
+    if frequency == ANNUAL:
+        return dt.date(int(label[:4]), 1, 1)
+    raise ValueError(f"Frequency '{frequency}' is not supported.")
+
+
 @dataclass(frozen=True)
 class CurrencyPair:
     """
@@ -24,6 +115,26 @@ class CurrencyPair:
     def __str__(self):
         return f"{self.base}/{self.quote}"
 
+    @classmethod
+    def from_string(cls, currency_pair: str) -> "CurrencyPair":
+        """
+        Parses a currency pair written as base and quote currencies separated by a slash,
+        e.g. "GBP/USD".
+
+        Args:
+            currency_pair (str): The currency pair, e.g. "GBP/USD".
+        Returns:
+            CurrencyPair: The currency pair.
+        Raises:
+            ValueError: if it is not two currencies separated by a slash.
+        """
+        currencies = currency_pair.split("/")
+        if len(currencies) != 2 or not all(currencies):
+            raise ValueError(
+                f"'{currency_pair}' is not a currency pair such as GBP/USD."
+            )
+        return cls(*currencies)
+
 
 @dataclass(frozen=True)
 class ExchangeRate:
@@ -37,6 +148,8 @@ class ExchangeRate:
         to_currency (str): Currency. to_currency_amount = from_currency_amount / exchange_rate.
         source (str): Source of the exchange rate.
         creation_date (datetime): Creation date of the instance (default is the current date and time).
+        frequency (str): Period the exchange rate stands for, DAILY (default), MONTHLY, QUARTERLY
+            or ANNUAL. Rates of longer periods are averages dated on the first day of the period.
     """
 
     date: dt.date
@@ -44,6 +157,7 @@ class ExchangeRate:
     currency_pair: CurrencyPair
     source: str
     creation_date: dt.datetime = field(default_factory=dt.datetime.now)
+    frequency: str = DAILY
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, ExchangeRate):
@@ -53,4 +167,19 @@ class ExchangeRate:
             and self.exchange_rate == other.exchange_rate
             and self.currency_pair == other.currency_pair
             and self.source == other.source
+            and self.frequency == other.frequency
         )
+
+
+@dataclass(frozen=True)
+class QuarantinedExchangeRate:
+    """
+    Data class representing an Exchange Rate set aside by the validation stage.
+
+    Attributes:
+        exchange_rate (ExchangeRate): The Exchange Rate set aside.
+        reason (str): Check the Exchange Rate failed, e.g. "range" or "jump".
+    """
+
+    exchange_rate: ExchangeRate
+    reason: str
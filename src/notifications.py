@@ -0,0 +1,404 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Tuple
+import hashlib
+import json
+import threading
+
+import requests
+
+from src import model
+from src.change_detection import REVISION_SUFFIX
+from src.utils.logs import default_module_logger
+from src.utils.notification_state import NotificationStateStore
+
+
+logger = default_module_logger(__file__)
+
+
+@dataclass(frozen=True)
+class NotifiedRate:
+    """
+    Compact form of an exchange rate in a change notification.
+
+    Attributes:
+        pair (str): Currency pair, e.g. "EUR/GBP".
+        date (str): Date of the exchange rate, in ISO format.
+        value (float): Exchange rate value.
+        frequency (str): Period the exchange rate stands for, e.g. model.DAILY.
+        revised (bool): Whether the exchange rate revises one notified before.
+    """
+
+    pair: str
+    date: str
+    value: float
+    frequency: str
+    revised: bool
+
+    @classmethod
+    def from_exchange_rate(cls, exchange_rate: model.ExchangeRate) -> "NotifiedRate":
+        return cls(
+            pair=str(exchange_rate.currency_pair),
+            date=exchange_rate.date.isoformat(),
+            value=exchange_rate.exchange_rate,
+            frequency=exchange_rate.frequency,
+            revised=exchange_rate.source.endswith(REVISION_SUFFIX),
+        )
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        """Currency pair, date and frequency, identifying the observation."""
+        return self.pair, self.date, self.frequency
+
+    def to_row(self) -> Tuple[str, str, str, float, bool]:
+        """Currency pair, date, frequency, value and revision flag, as stored."""
+        return self.pair, self.date, self.frequency, self.value, self.revised
+
+    def to_dict(self) -> dict:
+        return {
+            "pair": self.pair,
+            "date": self.date,
+            "value": self.value,
+            "frequency": self.frequency,
+            "revised": self.revised,
+        }
+
+
+@dataclass(frozen=True)
+class RateNotification:
+    """
+    Message announcing exchange rates newly loaded into the destination.
+
+    Attributes:
+        message_id (str): Hash of the content of the message, so a message published twice,
+            e.g. by a retried run, has the same id and consumers can drop the duplicate.
+        rates (Tuple[NotifiedRate, ...]): The exchange rates, sorted by currency pair,
+            frequency and date.
+    """
+
+    message_id: str
+    rates: Tuple[NotifiedRate, ...]
+
+    @classmethod
+    def from_rates(cls, rates: List[NotifiedRate]) -> "RateNotification":
+        rates = tuple(
+            sorted(rates, key=lambda rate: (rate.pair, rate.frequency, rate.date))
+        )
+        digest = hashlib.blake2b(
+            json.dumps(
+                [rate.to_dict() for rate in rates], separators=(",", ":")
+            ).encode(),
+            digest_size=16,
+        )
+        return cls(message_id=digest.hexdigest(), rates=rates)
+
+    def to_json(self) -> bytes:
+        """
+        Encodes the message as compact JSON, e.g.
+        {"id":"...","rates":[{"pair":"EUR/GBP","date":"2023-11-10","value":0.87,...}]}.
+
+        Returns:
+            bytes: The UTF-8 encoded JSON message.
+        """
+        return json.dumps(
+            {
+                "id": self.message_id,
+                "rates": [rate.to_dict() for rate in self.rates],
+            },
+            separators=(",", ":"),
+        ).encode()
+
+
+class AbstractNotificationPublisher(ABC):
+    """
+    An abstract base class for the channels change notifications are published through.
+
+    Methods:
+        publish(RateNotification):
+            interface to publish a notification, raising if it could not be delivered.
+    """
+
+    @abstractmethod
+    def publish(self, notification: RateNotification):
+        """
+        Publishes a notification, raising if it could not be delivered.
+
+        Args:
+            notification (RateNotification): The notification to publish.
+        """
+        raise NotImplementedError
+
+
+class PubSubPublisher(AbstractNotificationPublisher):
+    """
+    A concrete implementation of the AbstractNotificationPublisher that publishes
+    notifications to a Google Cloud Pub/Sub topic, with the id of the message as attribute.
+
+    Args:
+        topic (str): Path of the topic, projects/<project>/topics/<topic>.
+        publisher_client (google.cloud.pubsub_v1.PublisherClient, optional):
+            Client to publish with. A new client is created if None.
+    Attributes:
+        topic (str): Path of the topic.
+        client (google.cloud.pubsub_v1.PublisherClient): Client to publish with.
+    Methods:
+        publish(RateNotification):
+            publishes a notification and waits for Pub/Sub to acknowledge it.
+    """
+
+    def __init__(self, topic: str, publisher_client=None):
+        if publisher_client is None:
+            # Imported here so the other publishers work without the Pub/Sub client library.
+            from google.cloud import pubsub_v1
+
+            publisher_client = pubsub_v1.PublisherClient()
+        self.topic = topic
+        self.client = publisher_client
+
+    def publish(self, notification: RateNotification):
+        """
+        Publishes a notification and waits for Pub/Sub to acknowledge it.
+
+        Args:
+            notification (RateNotification): The notification to publish.
+        """
+        future = self.client.publish(
+            self.topic, notification.to_json(), message_id=notification.message_id
+        )
+        future.result()
+
+
+class WebhookPublisher(AbstractNotificationPublisher):
+    """
+    A concrete implementation of the AbstractNotificationPublisher that POSTs
+    notifications to an HTTP endpoint, with the id of the message as idempotency key.
+
+    Args:
+        url (str): URL of the endpoint.
+        session (requests.Session, optional): Session to post with. A new one is created if None.
+        timeout (float): Timeout of each request, in seconds. Default is 10.
+        headers (Mapping[str, str], optional): Additional headers, e.g. Authorization.
+    Attributes:
+        url (str): URL of the endpoint.
+        session (requests.Session): Session to post with.
+        timeout (float): Timeout of each request, in seconds.
+        headers (dict[str, str]): Headers of each request.
+    Methods:
+        publish(RateNotification):
+            posts a notification, raising if the endpoint does not answer with a success.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        session: Optional[requests.Session] = None,
+        timeout: float = 10.0,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        self.url = url
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def publish(self, notification: RateNotification):
+        """
+        Posts a notification, raising if the endpoint does not answer with a success.
+
+        Args:
+            notification (RateNotification): The notification to publish.
+        """
+        response = self.session.post(
+            self.url,
+            data=notification.to_json(),
+            headers={**self.headers, "Idempotency-Key": notification.message_id},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+
+class FilePublisher(AbstractNotificationPublisher):
+    """
+    A concrete implementation of the AbstractNotificationPublisher that appends
+    notifications to a local file, one JSON message per line, e.g. for tests or for a
+    consumer tailing the file on the same host.
+
+    Args:
+        path (str): Path of the file.
+    Attributes:
+        path (str): Path of the file.
+    Methods:
+        publish(RateNotification):
+            appends a notification to the file.
+        read_notifications() -> list[dict]:
+            returns the messages published so far.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def publish(self, notification: RateNotification):
+        """
+        Appends a notification to the file.
+
+        Args:
+            notification (RateNotification): The notification to publish.
+        """
+        with self._lock, open(self.path, "ab") as file:
+            file.write(notification.to_json() + b"\n")
+
+    def read_notifications(self) -> list[dict]:
+        """
+        Returns the messages published so far.
+
+        Returns:
+            list[dict]: The decoded messages, oldest first.
+        """
+        try:
+            with open(self.path, "rb") as file:
+                return [json.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+
+class ChangeNotifier:
+    """
+    Post-load stage publishing the exchange rates newly loaded, so consumers react to them
+    without polling the destination. The exchange rates of a run are deduplicated, against
+    each other and against the values notified before by the notifier, and published in
+    messages of at most max_rates exchange rates. Publishing is best-effort: the rates are
+    loaded already, so a message that could not be published is logged and kept to be
+    published with the next run instead of failing this one. Without a state store, the
+    values notified and the pending rates are only kept by the instance, e.g. across the
+    invocations of a warm Cloud Function; with one, they are kept across processes.
+
+    Args:
+        publisher (AbstractNotificationPublisher): The channel to publish through.
+        max_rates (int): Maximum number of exchange rates per message. Default is 1000.
+        dedup_capacity (int): Number of observations whose notified value is remembered
+            in memory, the least recently notified ones being forgotten first. Default is
+            100000. Not used with a state store.
+        state_store (NotificationStateStore, optional): Keeps the values notified and the
+            pending rates. They are kept in memory if None.
+    Attributes:
+        publisher (AbstractNotificationPublisher): The channel to publish through.
+        max_rates (int): Maximum number of exchange rates per message.
+        dedup_capacity (int): Number of observations whose notified value is remembered.
+        state_store (Optional[NotificationStateStore]): Keeps the values notified and the
+            pending rates.
+        notifications (list[RateNotification]): The messages published.
+    Methods:
+        notify(List[model.ExchangeRate]) -> list[RateNotification]:
+            publishes the exchange rates not notified before with the same value.
+        pending_rates() -> int:
+            returns the number of exchange rates waiting for a failed message to be published.
+    """
+
+    def __init__(
+        self,
+        publisher: AbstractNotificationPublisher,
+        max_rates: int = 1000,
+        dedup_capacity: int = 100_000,
+        state_store: Optional[NotificationStateStore] = None,
+    ):
+        if max_rates < 1:
+            raise ValueError("A notification needs room for at least one rate.")
+        self.publisher = publisher
+        self.max_rates = max_rates
+        self.dedup_capacity = dedup_capacity
+        self.state_store = state_store
+        self.notifications: list[RateNotification] = []
+        self._notified: OrderedDict[Tuple[str, str, str], float] = OrderedDict()
+        self._pending: dict[Tuple[str, str, str], NotifiedRate] = {}
+        if state_store is not None:
+            for pair, date, frequency, value, revised in state_store.get_pending():
+                rate = NotifiedRate(pair, date, value, frequency, revised)
+                self._pending[rate.key] = rate
+
+    def notify(
+        self, exchange_rates: List[model.ExchangeRate]
+    ) -> list[RateNotification]:
+        """
+        Publishes the exchange rates not notified before with the same value, along with
+        the ones of the messages that failed to be published before.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]): The exchange rates loaded.
+        Returns:
+            list[RateNotification]: The messages published.
+        """
+        rates = [
+            NotifiedRate.from_exchange_rate(exchange_rate)
+            for exchange_rate in exchange_rates
+        ]
+        notified_values = self._notified_values([rate.key for rate in rates])
+        for rate in rates:
+            if notified_values.get(rate.key) == rate.value:
+                self._pending.pop(rate.key, None)
+                continue
+            self._pending[rate.key] = rate
+
+        rates = list(self._pending.values())
+        published = []
+        for start in range(0, len(rates), self.max_rates):
+            notification = RateNotification.from_rates(
+                rates[start : start + self.max_rates]
+            )
+            try:
+                self.publisher.publish(notification)
+            except Exception as exception:
+                logger.warning(
+                    f"Notification {notification.message_id} of "
+                    f"{len(notification.rates)} rates not published, kept for the "
+                    f"next run: {exception!r}"
+                )
+                continue
+            self._remember(notification.rates)
+            for rate in notification.rates:
+                del self._pending[rate.key]
+            published.append(notification)
+
+        if self.state_store is not None:
+            self.state_store.replace_pending(
+                rate.to_row() for rate in self._pending.values()
+            )
+        self.notifications += published
+        if published:
+            logger.info(
+                f"{sum(len(notification.rates) for notification in published)} rates "
+                f"notified in {len(published)} messages."
+            )
+        return published
+
+    def pending_rates(self) -> int:
+        """
+        Returns the number of exchange rates waiting for a failed message to be published.
+
+        Returns:
+            int: The number of pending exchange rates.
+        """
+        return len(self._pending)
+
+    def _notified_values(
+        self, keys: List[Tuple[str, str, str]]
+    ) -> dict[Tuple[str, str, str], float]:
+        """
+        Returns the values notified before for observations, from the state store if any.
+        """
+        if self.state_store is not None:
+            return self.state_store.get_notified_values(keys)
+        return {key: self._notified[key] for key in keys if key in self._notified}
+
+    def _remember(self, rates: Tuple[NotifiedRate, ...]):
+        """
+        Records the values of rates just published, in the state store if any.
+        """
+        if self.state_store is not None:
+            self.state_store.put_notified(rate.to_row()[:4] for rate in rates)
+            return
+        for rate in rates:
+            self._notified[rate.key] = rate.value
+            self._notified.move_to_end(rate.key)
+        while len(self._notified) > self.dedup_capacity:
+            self._notified.popitem(last=False)
@@ -0,0 +1,333 @@
+import datetime as dt
+import math
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence
+
+from src import model, source_repository, target_calendar
+from src.derived_rates import EURO
+from src.destination_repository import ChunkReport, LoadBatchingPolicy
+
+
+@dataclass(frozen=True)
+class ResponseSize:
+    """
+    Size model of an ECB API response body: a fixed envelope plus a size per observation.
+
+    Attributes:
+        envelope_bytes (int): Bytes of the body without observations.
+        observation_bytes (int): Bytes per observation.
+        compressed_envelope_bytes (int): Bytes of the gzip compressed body without observations.
+        compressed_observation_bytes (int): Gzip compressed bytes per observation.
+    """
+
+    envelope_bytes: int
+    observation_bytes: int
+    compressed_envelope_bytes: int
+    compressed_observation_bytes: int
+
+    def body_bytes(self, observations: int, compressed: bool) -> int:
+        """
+        Estimates the bytes of a body, as read from the wire.
+
+        Args:
+            observations (int): Number of observations of the body.
+            compressed (bool): Whether the body is gzip compressed.
+        Returns:
+            int: Bytes of the body.
+        """
+        if compressed:
+            return (
+                self.compressed_envelope_bytes
+                + self.compressed_observation_bytes * observations
+            )
+        return self.envelope_bytes + self.observation_bytes * observations
+
+
+# Measured on the bodies of benchmarks/ecb_transfer_savings.py, that follow real responses.
+RESPONSE_SIZES = {
+    source_repository.STRUCTURE_SPECIFIC_DATA: ResponseSize(303, 52, 269, 6),
+    source_repository.GENERIC_DATA: ResponseSize(987, 228, 478, 7),
+}
+# Bytes of a row of the exchange rates table as newline delimited JSON, see NdjsonRowEncoder.
+NDJSON_ROW_BYTES = 148
+
+
+@dataclass(frozen=True)
+class FetchPlan:
+    """
+    Planned call to the ECB API for a currency pair.
+
+    Attributes:
+        fetch_key (source_repository.FetchKey): Currency pair, window and format of the call.
+        rows (int): Expected number of exchange rates, see count_periods().
+        response_bytes (int): Expected bytes of the decoded response body.
+        transferred_bytes (int): Expected bytes of the response body read from the wire.
+    """
+
+    fetch_key: source_repository.FetchKey
+    rows: int
+    response_bytes: int
+    transferred_bytes: int
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """
+    Estimated cost of a run, computed without touching the network.
+
+    Attributes:
+        fetches (List[FetchPlan]): Planned calls to the ECB API.
+        skipped_currency_pairs (List[model.CurrencyPair]): Currency pairs without a publication
+            date since their high-water mark, that are not fetched.
+        load_jobs (int): Expected number of BigQuery load jobs, 0 for other destinations.
+        derived_rows (int): Expected number of inverse and cross rates materialized.
+        dml_queries (int): Expected number of BigQuery DML statements.
+    """
+
+    fetches: List[FetchPlan]
+    skipped_currency_pairs: List[model.CurrencyPair] = field(default_factory=list)
+    load_jobs: int = 0
+    derived_rows: int = 0
+    dml_queries: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.fetches)
+
+    @property
+    def rows(self) -> int:
+        return sum(fetch.rows for fetch in self.fetches)
+
+    @property
+    def response_bytes(self) -> int:
+        return sum(fetch.response_bytes for fetch in self.fetches)
+
+    @property
+    def transferred_bytes(self) -> int:
+        return sum(fetch.transferred_bytes for fetch in self.fetches)
+
+
+@dataclass(frozen=True)
+class RunReport:
+    """
+    Actual cost of a run, to compare with its ExecutionPlan.
+
+    Attributes:
+        requests (int): Number of successful calls to the ECB API.
+        rows (int): Number of exchange rates loaded.
+        response_bytes (int): Bytes of the decoded response bodies.
+        transferred_bytes (int): Bytes of the response bodies read from the wire.
+        load_jobs (int): Number of BigQuery load jobs.
+    """
+
+    requests: int
+    rows: int
+    response_bytes: int
+    transferred_bytes: int
+    load_jobs: int
+
+    @classmethod
+    def from_run(
+        cls,
+        exchange_rates: Sequence[model.ExchangeRate],
+        transfer_stats: Iterable[source_repository.TransferStats],
+        chunk_reports: Iterable[ChunkReport] = (),
+    ) -> "RunReport":
+        """
+        Builds the report of a run from what its repositories recorded.
+
+        Args:
+            exchange_rates (Sequence[model.ExchangeRate]): The exchange rates loaded.
+            transfer_stats (Iterable[source_repository.TransferStats]): Bytes transferred
+                by each call to the ECB API.
+            chunk_reports (Iterable[ChunkReport]): Outcome of each BigQuery load job.
+        Returns:
+            RunReport: The report of the run.
+        """
+        transfer_stats = list(transfer_stats)
+        return cls(
+            requests=len(transfer_stats),
+            rows=len(exchange_rates),
+            response_bytes=sum(stats.uncompressed_bytes for stats in transfer_stats),
+            transferred_bytes=sum(stats.compressed_bytes for stats in transfer_stats),
+            load_jobs=len(list(chunk_reports)),
+        )
+
+
+def estimate_load_jobs(rows: int, batching_policy: LoadBatchingPolicy) -> int:
+    """
+    Estimates the number of load jobs needed to load rows into BigQuery, given the maximum
+    number of rows and bytes of a chunk.
+
+    Args:
+        rows (int): Number of rows to load.
+        batching_policy (LoadBatchingPolicy): Policy to split rows in load jobs.
+    Returns:
+        int: Number of load jobs.
+    """
+    if rows <= 0:
+        return 0
+    rows_per_chunk = min(
+        batching_policy.max_rows,
+        max(batching_policy.max_bytes // NDJSON_ROW_BYTES, 1),
+    )
+    return math.ceil(rows / rows_per_chunk)
+
+
+def count_periods(date_from: dt.date, date_to: dt.date, frequency: str) -> int:
+    """
+    Counts the observations the ECB publishes within a window: one per TARGET2 publication
+    date for daily series, one per period over before the last date of the window otherwise.
+
+    Args:
+        date_from (dt.date): First date of the window.
+        date_to (dt.date): Last date of the window.
+        frequency (str): Frequency of the series.
+    Returns:
+        int: Number of observations.
+    """
+    if frequency == model.DAILY:
+        return len(target_calendar.publication_dates(date_from, date_to))
+
+    periods, start = 0, model.period_start(date_from, frequency)
+    while model.period_end(start, frequency) < date_to:
+        periods += 1
+        start = model.period_end(start, frequency) + dt.timedelta(days=1)
+    return periods
+
+
+def plan_run(
+    ecb_api_caller: source_repository.EcbApiCaller,
+    currency_pairs: List[model.CurrencyPair],
+    batching_policy: Optional[LoadBatchingPolicy] = None,
+    derived: bool = False,
+    cross_currency_pairs: Sequence[model.CurrencyPair] = (),
+) -> ExecutionPlan:
+    """
+    Plans a run of source_exchange_rates() with an ECB API caller. The calls are the ones
+    the caller would make given its window and high-water marks, each returning the
+    observations counted by count_periods(). Bytes follow RESPONSE_SIZES, and load jobs
+    follow the batching policy.
+
+    Args:
+        ecb_api_caller (source_repository.EcbApiCaller): The caller of the run.
+        currency_pairs (List[model.CurrencyPair]): Currency pairs of the run.
+        batching_policy (LoadBatchingPolicy, optional): Batching policy of the BigQuery
+            destination. No load job is planned if None, e.g. for a SQLite destination.
+        derived (bool): Whether inverse and cross rates are materialized. Default is False.
+        cross_currency_pairs (Sequence[model.CurrencyPair]): Cross rates to derive.
+    Returns:
+        ExecutionPlan: The plan of the run.
+    """
+    response_size = RESPONSE_SIZES[ecb_api_caller.data_format]
+    fetches = []
+    for fetch_key in ecb_api_caller.planned_fetches(currency_pairs):
+        rows = count_periods(
+            fetch_key.date_from, fetch_key.date_to, fetch_key.frequency
+        )
+        fetches.append(
+            FetchPlan(
+                fetch_key=fetch_key,
+                rows=rows,
+                response_bytes=response_size.body_bytes(rows, compressed=False),
+                transferred_bytes=response_size.body_bytes(
+                    rows, compressed=ecb_api_caller.compressed
+                ),
+            )
+        )
+    fetched_currency_pairs = {fetch.fetch_key.currency_pair for fetch in fetches}
+    skipped_currency_pairs = [
+        currency_pair
+        for currency_pair in dict.fromkeys(currency_pairs)
+        if currency_pair not in fetched_currency_pairs
+    ]
+
+    derived_rows = 0
+    if derived and fetches:
+        dates = max(fetch.rows for fetch in fetches)
+        currencies = {currency_pair.quote for currency_pair in fetched_currency_pairs}
+        crosses = [
+            cross_currency_pair
+            for cross_currency_pair in dict.fromkeys(cross_currency_pairs)
+            if {cross_currency_pair.base, cross_currency_pair.quote}
+            <= currencies | {EURO}
+        ]
+        derived_rows = dates * (len(currencies) + len(crosses))
+
+    load_jobs, dml_queries = 0, 0
+    if batching_policy is not None:
+        load_jobs = estimate_load_jobs(
+            sum(fetch.rows for fetch in fetches), batching_policy
+        ) + estimate_load_jobs(derived_rows, batching_policy)
+        dml_queries = int(derived_rows > 0)
+
+    return ExecutionPlan(
+        fetches=fetches,
+        skipped_currency_pairs=skipped_currency_pairs,
+        load_jobs=load_jobs,
+        derived_rows=derived_rows,
+        dml_queries=dml_queries,
+    )
+
+
+def format_plan(plan: ExecutionPlan) -> str:
+    """
+    Formats an execution plan as a human readable report.
+
+    Args:
+        plan (ExecutionPlan): The plan.
+    Returns:
+        str: The report, one line per call and one per total.
+    """
+    lines = []
+    for fetch in plan.fetches:
+        lines.append(
+            f"fetch {fetch.fetch_key.currency_pair} "
+            f"{fetch.fetch_key.date_from}..{fetch.fetch_key.date_to}: "
+            f"~{fetch.rows} rows, ~{fetch.transferred_bytes} bytes transferred"
+        )
+    for currency_pair in plan.skipped_currency_pairs:
+        lines.append(f"skip {currency_pair}: no publication since high-water mark")
+    lines += [
+        f"requests: {plan.requests}",
+        f"rows: {plan.rows}",
+        f"response bytes: {plan.response_bytes}",
+        f"transferred bytes: {plan.transferred_bytes}",
+        f"derived rows: {plan.derived_rows}",
+        f"BigQuery load jobs: {plan.load_jobs}",
+        f"BigQuery DML queries: {plan.dml_queries}",
+    ]
+
+    return "\n".join(lines)
+
+
+def compare_plan(plan: ExecutionPlan, report: RunReport) -> List[str]:
+    """
+    Compares the plan of a run with what actually happened.
+
+    Args:
+        plan (ExecutionPlan): The plan of the run.
+        report (RunReport): The report of the run.
+    Returns:
+        List[str]: One line per metric with the planned and actual values and their difference.
+    """
+    lines = []
+    for metric in ("requests", "rows", "response_bytes", "transferred_bytes"):
+        lines.append(
+            _comparison_line(metric, getattr(plan, metric), getattr(report, metric))
+        )
+    lines.append(_comparison_line("load_jobs", plan.load_jobs, report.load_jobs))
+
+    return lines
+
+
+def _comparison_line(metric: str, planned: int, actual: int) -> str:
+    """
+    Formats the planned and actual values of a metric and their relative difference.
+    """
+    difference = actual - planned
+    relative = f" ({difference / planned:+.0%})" if planned else ""
+    return (
+        f"{metric.replace('_', ' ')}: planned {planned}, actual {actual}, "
+        f"difference {difference:+d}{relative}"
+    )
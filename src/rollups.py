@@ -0,0 +1,67 @@
+import datetime as dt
+from itertools import groupby
+from operator import itemgetter
+from statistics import fmean
+from typing import Iterable, List
+
+from src import model
+
+
+ROLLUP_SOURCE = "ECB API (rollup)"
+
+
+def rollup_exchange_rates(
+    exchange_rates: Iterable[model.ExchangeRate],
+    frequency: str,
+    complete_before: dt.date,
+) -> List[model.ExchangeRate]:
+    """
+    Averages daily Exchange Rates over the periods of a frequency, as the ECB does for its
+    monthly, quarterly and annual series, for the series it does not publish. Rates are
+    arranged in one column of dates and one of values per currency pair, dates are mapped
+    to their period once per distinct date, and each run of a period is averaged at once.
+    Only periods over before complete_before are kept, so an average is never published for
+    a period that has not ended.
+
+    Args:
+        exchange_rates (Iterable[model.ExchangeRate]): Daily Exchange Rates.
+        frequency (str): model.MONTHLY, model.QUARTERLY or model.ANNUAL.
+        complete_before (dt.date): Periods ending on or after this date are dropped.
+    Returns:
+        List[model.ExchangeRate]: One Exchange Rate per currency pair and period, dated on
+            the first day of the period, ordered by currency pair and date.
+    """
+    columns: dict[model.CurrencyPair, dict[dt.date, float]] = {}
+    for exchange_rate in exchange_rates:
+        columns.setdefault(exchange_rate.currency_pair, {})[
+            exchange_rate.date
+        ] = exchange_rate.exchange_rate
+    period_starts = {
+        date: model.period_start(date, frequency)
+        for rates in columns.values()
+        for date in rates
+    }
+
+    creation_date = dt.datetime.now()
+    rollups = []
+    for currency_pair, rates in columns.items():
+        dates = sorted(rates)
+        runs = groupby(
+            zip(map(period_starts.__getitem__, dates), map(rates.__getitem__, dates)),
+            key=itemgetter(0),
+        )
+        for start, run in runs:
+            if model.period_end(start, frequency) >= complete_before:
+                continue
+            rollups.append(
+                model.ExchangeRate(
+                    date=start,
+                    exchange_rate=fmean(map(itemgetter(1), run)),
+                    currency_pair=currency_pair,
+                    source=ROLLUP_SOURCE,
+                    creation_date=creation_date,
+                    frequency=frequency,
+                )
+            )
+
+    return rollups
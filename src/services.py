@@ -1,13 +1,53 @@
-from src import source_repository, destination_repository, model
+from typing import Callable, Optional, Sequence
+import asyncio
+import datetime as dt
+import time
+
+from src import (
+    source_repository,
+    destination_repository,
+    model,
+    jobs,
+    derived_rates,
+    validation,
+    change_detection,
+    notifications,
+    work_queue,
+)
+from src.utils.high_water_marks import HighWaterMarkStore
+from src.utils.logs import default_module_logger
+
+
+logger = default_module_logger(__file__)
 
 
 def source_exchange_rates(
     destination_repository: destination_repository.AbstractDestinationRepository,
     currency_pairs: list[model.CurrencyPair],
     source_repository: source_repository.AbstractSourceRepository,
-):
+    derived_destination_repository: Optional[
+        destination_repository.AbstractDestinationRepository
+    ] = None,
+    cross_currency_pairs: Sequence[model.CurrencyPair] = (),
+    validator: Optional[validation.ExchangeRateValidator] = None,
+    quarantine_repository: Optional[
+        destination_repository.AbstractQuarantineRepository
+    ] = None,
+    change_detector: Optional[change_detection.ObservationChangeDetector] = None,
+    notifier: Optional[notifications.ChangeNotifier] = None,
+    high_water_marks: Optional[HighWaterMarkStore] = None,
+) -> list[model.ExchangeRate]:
     """
     Fetches exchange rates from source repository and loads them into destination repository.
+    If a validator is given, the exchange rates failing its checks are routed before the
+    load, see validate_exchange_rates(). If a change detector is given, only the new and
+    revised exchange rates are loaded. If a derived destination repository is given,
+    inverse and cross rates are then materialized into it from the valid exchange rates
+    of the dates with a new or revised exchange rate, so a cross rate is derived again
+    when only one of its legs is revised.
+    If a notifier is given, the loaded exchange rates it has not notified yet are then
+    published, see notifications.ChangeNotifier. If high-water marks are given, they are
+    moved forward once the destination repository is flushed, see advance_high_water_marks().
 
     Args:
         destination_repository (destination_repository.AbstractDestinationRepository):
@@ -16,6 +56,458 @@ def source_exchange_rates(
             List of currency pairs for which to fetch exchange rates.
         source_repository (source_repository.AbstractSourceRepository):
             The data repository to get exchange rates from.
+        derived_destination_repository (destination_repository.AbstractDestinationRepository, optional):
+            The data repository to load inverse and cross rates into. No rate is derived if None.
+        cross_currency_pairs (Sequence[model.CurrencyPair]):
+            Cross rates to derive, e.g. GBP/USD.
+        validator (validation.ExchangeRateValidator, optional):
+            Validation stage run before the load. No validation if None.
+        quarantine_repository (destination_repository.AbstractQuarantineRepository, optional):
+            The side table to load the quarantined exchange rates into.
+        change_detector (change_detection.ObservationChangeDetector, optional):
+            Skips the exchange rates loaded before with the same value. All the exchange
+            rates are loaded if None.
+        notifier (notifications.ChangeNotifier, optional):
+            Publishes the exchange rates once loaded. Nothing is published if None.
+        high_water_marks (HighWaterMarkStore, optional):
+            Date of the latest exchange rate loaded per currency pair, usually the one the
+            source repository reads. No mark is moved if None.
+    Returns:
+        list[model.ExchangeRate]: The exchange rates loaded.
     """
-    exchange_rates = source_repository.get_exchange_rates(currency_pairs)
+    fetched_exchange_rates = source_repository.get_exchange_rates(currency_pairs)
+    exchange_rates = fetched_exchange_rates
+    if validator is not None:
+        exchange_rates = validate_exchange_rates(
+            exchange_rates, validator, quarantine_repository
+        )
+    valid_exchange_rates = exchange_rates
+    change_set = None
+    if change_detector is not None:
+        change_set = change_detector.classify(exchange_rates)
+        exchange_rates = change_set.changed
     destination_repository.load_exchange_rates(exchange_rates)
+    destination_repository.flush()
+    if change_set is not None:
+        change_detector.commit(change_set)
+    if high_water_marks is not None:
+        advance_high_water_marks(
+            high_water_marks, fetched_exchange_rates, valid_exchange_rates
+        )
+    if notifier is not None:
+        notifier.notify(exchange_rates)
+    if derived_destination_repository is not None:
+        changed_periods = {
+            (exchange_rate.date, exchange_rate.frequency)
+            for exchange_rate in exchange_rates
+        }
+        materialize_derived_rates(
+            [
+                exchange_rate
+                for exchange_rate in valid_exchange_rates
+                if (exchange_rate.date, exchange_rate.frequency) in changed_periods
+            ],
+            derived_destination_repository,
+            cross_currency_pairs,
+        )
+
+    return exchange_rates
+
+
+async def source_exchange_rates_async(
+    destination_repository: destination_repository.AbstractAsyncDestinationRepository,
+    currency_pairs: list[model.CurrencyPair],
+    source_repository: source_repository.AbstractAsyncSourceRepository,
+    validator: Optional[validation.ExchangeRateValidator] = None,
+    quarantine_repository: Optional[
+        destination_repository.AbstractQuarantineRepository
+    ] = None,
+    change_detector: Optional[change_detection.ObservationChangeDetector] = None,
+    high_water_marks: Optional[HighWaterMarkStore] = None,
+) -> list[model.ExchangeRate]:
+    """
+    Asyncio counterpart of source_exchange_rates(), for services running an event loop.
+    Each batch of exchange rates is validated and loaded as soon as the source repository
+    yields it, while the other currency pairs are still being fetched, and the destination
+    repository is flushed once all batches are loaded. Quarantined exchange rates are
+    loaded in a worker thread. Use source_repository.SyncToAsyncSourceRepository and
+    destination_repository.SyncToAsyncDestinationRepository to run synchronous repositories.
+
+    Args:
+        destination_repository (destination_repository.AbstractAsyncDestinationRepository):
+            The data repository to load exchange rates into.
+        currency_pairs (list[model.CurrencyPair]):
+            List of currency pairs for which to fetch exchange rates.
+        source_repository (source_repository.AbstractAsyncSourceRepository):
+            The data repository to get exchange rates from.
+        validator (validation.ExchangeRateValidator, optional):
+            Validation stage run on each batch before its load. No validation if None.
+        quarantine_repository (destination_repository.AbstractQuarantineRepository, optional):
+            The side table to load the quarantined exchange rates into.
+        change_detector (change_detection.ObservationChangeDetector, optional):
+            Skips the exchange rates loaded before with the same value. Hashes are
+            stored once the destination repository is flushed.
+        high_water_marks (HighWaterMarkStore, optional):
+            Date of the latest exchange rate loaded per currency pair, moved forward once
+            the destination repository is flushed, see advance_high_water_marks().
+    Returns:
+        list[model.ExchangeRate]: The exchange rates loaded.
+    """
+    fetched_exchange_rates = []
+    valid_exchange_rates = []
+    loaded_exchange_rates = []
+    change_sets = []
+    async for exchange_rates in source_repository.iter_exchange_rates(currency_pairs):
+        fetched_exchange_rates.extend(exchange_rates)
+        if validator is not None:
+            validation_result = validator.validate(exchange_rates)
+            if quarantine_repository is not None and validation_result.quarantined:
+                await asyncio.to_thread(
+                    quarantine_repository.load_quarantined_exchange_rates,
+                    validation_result.quarantined,
+                )
+            exchange_rates = validation_result.valid
+        valid_exchange_rates.extend(exchange_rates)
+        if change_detector is not None:
+            change_set = change_detector.classify(exchange_rates)
+            change_sets.append(change_set)
+            exchange_rates = change_set.changed
+        if exchange_rates:
+            await destination_repository.load_exchange_rates(exchange_rates)
+            loaded_exchange_rates.extend(exchange_rates)
+    await destination_repository.flush()
+    for change_set in change_sets:
+        change_detector.commit(change_set)
+    if high_water_marks is not None:
+        advance_high_water_marks(
+            high_water_marks, fetched_exchange_rates, valid_exchange_rates
+        )
+
+    return loaded_exchange_rates
+
+
+def validate_exchange_rates(
+    exchange_rates: list[model.ExchangeRate],
+    validator: validation.ExchangeRateValidator,
+    quarantine_repository: Optional[
+        destination_repository.AbstractQuarantineRepository
+    ] = None,
+) -> list[model.ExchangeRate]:
+    """
+    Validates a batch of exchange rates and loads the quarantined ones into the quarantine
+    repository, if any.
+
+    Args:
+        exchange_rates (list[model.ExchangeRate]): The batch of exchange rates.
+        validator (validation.ExchangeRateValidator): The validation stage.
+        quarantine_repository (destination_repository.AbstractQuarantineRepository, optional):
+            The side table to load the quarantined exchange rates into. They are
+            discarded if None.
+    Returns:
+        list[model.ExchangeRate]: The exchange rates to load.
+    """
+    validation_result = validator.validate(exchange_rates)
+    if quarantine_repository is not None and validation_result.quarantined:
+        quarantine_repository.load_quarantined_exchange_rates(
+            validation_result.quarantined
+        )
+
+    return validation_result.valid
+
+
+def advance_high_water_marks(
+    high_water_marks: HighWaterMarkStore,
+    fetched_exchange_rates: list[model.ExchangeRate],
+    loaded_exchange_rates: list[model.ExchangeRate],
+):
+    """
+    Moves forward the high-water mark of each currency pair to the latest date loaded, but
+    not past a date that was fetched and left out of the load, e.g. quarantined, so that
+    date is fetched again by the next runs. Call it once the load has been flushed.
+    Exchange rates skipped as unchanged by a change detector count as loaded. Marks are
+    kept for daily exchange rates only.
+
+    Args:
+        high_water_marks (HighWaterMarkStore): The high-water marks.
+        fetched_exchange_rates (list[model.ExchangeRate]): The exchange rates fetched.
+        loaded_exchange_rates (list[model.ExchangeRate]): The ones loaded, or already
+            loaded with the same value.
+    """
+    loaded_dates: dict[model.CurrencyPair, set[dt.date]] = {}
+    for exchange_rate in loaded_exchange_rates:
+        if exchange_rate.frequency == model.DAILY:
+            loaded_dates.setdefault(exchange_rate.currency_pair, set()).add(
+                exchange_rate.date
+            )
+    left_out_dates: dict[model.CurrencyPair, set[dt.date]] = {}
+    for exchange_rate in fetched_exchange_rates:
+        if exchange_rate.frequency == model.DAILY and exchange_rate.date not in (
+            loaded_dates.get(exchange_rate.currency_pair, set())
+        ):
+            left_out_dates.setdefault(exchange_rate.currency_pair, set()).add(
+                exchange_rate.date
+            )
+
+    for currency_pair, dates in loaded_dates.items():
+        if currency_pair in left_out_dates:
+            first_left_out = min(left_out_dates[currency_pair])
+            dates = {date for date in dates if date < first_left_out}
+        if dates:
+            high_water_marks.update(currency_pair, max(dates))
+
+
+def materialize_derived_rates(
+    exchange_rates: list[model.ExchangeRate],
+    derived_destination_repository: destination_repository.AbstractDestinationRepository,
+    cross_currency_pairs: Sequence[model.CurrencyPair] = (),
+):
+    """
+    Derives the inverse of every exchange rate and the cross rates asked for, and replaces
+    them in the derived destination repository. Only the dates of the given exchange rates
+    are rewritten.
+
+    Args:
+        exchange_rates (list[model.ExchangeRate]):
+            Freshly fetched exchange rates against the EURO, with every leg of the
+            dates to derive.
+        derived_destination_repository (destination_repository.AbstractDestinationRepository):
+            The data repository to load inverse and cross rates into.
+        cross_currency_pairs (Sequence[model.CurrencyPair]):
+            Cross rates to derive, e.g. GBP/USD.
+    """
+    derived_destination_repository.replace_exchange_rates(
+        derived_rates.derive_exchange_rates(exchange_rates, cross_currency_pairs)
+    )
+
+
+def source_exchange_rates_for_jobs(
+    job_specs: list[jobs.JobSpec],
+    source_repository_factory: Callable[
+        [int, str], source_repository.AbstractSourceRepository
+    ],
+    destination_repository_factory: Callable[
+        [str], destination_repository.AbstractDestinationRepository
+    ],
+    reference_date: Optional[dt.date] = None,
+    validator: Optional[validation.ExchangeRateValidator] = None,
+    quarantine_repository: Optional[
+        destination_repository.AbstractQuarantineRepository
+    ] = None,
+    notifier: Optional[notifications.ChangeNotifier] = None,
+):
+    """
+    Runs several ingestion jobs at once. Jobs requesting the same data format share a
+    single fetch covering the union of their currency pairs over the widest of their
+    windows, so a currency pair is fetched once no matter how many jobs ask for it.
+    Each job then loads its own currency pairs and window into its destination. Jobs
+    loading the same destination table share its repository, so a batching policy with a
+    merge window merges their rows in the same load jobs, and destinations are flushed
+    once every job has loaded. The inverse and cross rates of each job with a derived
+    table are then materialized into it, and the exchange rates loaded by the jobs are
+    published by the notifier if one is given.
+
+    Args:
+        job_specs (list[jobs.JobSpec]): The jobs to run.
+        source_repository_factory (Callable[[int, str], source_repository.AbstractSourceRepository]):
+            Creates the source repository for a number of days and a data format.
+        destination_repository_factory (Callable[[str], destination_repository.AbstractDestinationRepository]):
+            Creates the destination repository for a destination table.
+        reference_date (dt.date, optional): Last date of the windows of the jobs. Default is today.
+        validator (validation.ExchangeRateValidator, optional):
+            Validation stage run on each fetch before the jobs load it. No validation if None.
+        quarantine_repository (destination_repository.AbstractQuarantineRepository, optional):
+            The side table to load the quarantined exchange rates into.
+        notifier (notifications.ChangeNotifier, optional):
+            Publishes the exchange rates once loaded. Nothing is published if None.
+    """
+    reference_date = reference_date or dt.date.today()
+    destination_repositories: dict[
+        str, destination_repository.AbstractDestinationRepository
+    ] = {}
+    loaded_jobs: list[tuple[jobs.JobSpec, list[model.ExchangeRate]]] = []
+    job_specs_by_format: dict[str, list[jobs.JobSpec]] = {}
+    for job_spec in job_specs:
+        job_specs_by_format.setdefault(job_spec.data_format, []).append(job_spec)
+
+    for data_format, format_job_specs in job_specs_by_format.items():
+        currency_pairs = list(
+            dict.fromkeys(
+                currency_pair
+                for job_spec in format_job_specs
+                for currency_pair in job_spec.currency_pairs
+            )
+        )
+        days = max(job_spec.days for job_spec in format_job_specs)
+        exchange_rates = source_repository_factory(
+            days, data_format
+        ).get_exchange_rates(currency_pairs)
+        if validator is not None:
+            exchange_rates = validate_exchange_rates(
+                exchange_rates, validator, quarantine_repository
+            )
+
+        for job_spec in format_job_specs:
+            date_from = job_spec.date_from(reference_date)
+            if job_spec.destination_table not in destination_repositories:
+                destination_repositories[job_spec.destination_table] = (
+                    destination_repository_factory(job_spec.destination_table)
+                )
+            job_exchange_rates = [
+                exchange_rate
+                for exchange_rate in exchange_rates
+                if exchange_rate.currency_pair in job_spec.currency_pairs
+                and exchange_rate.date >= date_from
+            ]
+            destination_repositories[job_spec.destination_table].load_exchange_rates(
+                job_exchange_rates
+            )
+            loaded_jobs.append((job_spec, job_exchange_rates))
+
+    for job_destination_repository in destination_repositories.values():
+        job_destination_repository.flush()
+    for job_spec, job_exchange_rates in loaded_jobs:
+        if job_spec.derived_table:
+            materialize_derived_rates(
+                job_exchange_rates,
+                destination_repository_factory(job_spec.derived_table),
+                job_spec.cross_currency_pairs,
+            )
+    if notifier is not None:
+        notifier.notify(
+            [
+                exchange_rate
+                for _, job_exchange_rates in loaded_jobs
+                for exchange_rate in job_exchange_rates
+            ]
+        )
+
+
+def run_worker(
+    queue: work_queue.AbstractWorkQueue,
+    worker_id: str,
+    source_repository_factory: Callable[
+        [work_queue.WorkUnit], source_repository.AbstractSourceRepository
+    ],
+    destination_repository_factory: Callable[
+        [str], destination_repository.AbstractDestinationRepository
+    ],
+    lease_seconds: float = 60.0,
+    validator: Optional[validation.ExchangeRateValidator] = None,
+    quarantine_repository: Optional[
+        destination_repository.AbstractQuarantineRepository
+    ] = None,
+    max_units: Optional[int] = None,
+    poll_seconds: float = 1.0,
+) -> list[work_queue.UnitReport]:
+    """
+    Claims units from a work queue and runs them until none is left: the exchange rates of
+    the currency pairs and window of each unit are fetched, validated if a validator is
+    given, and replace the ones of the same currency pairs and dates in the destination
+    table of the unit. The lease of a unit is renewed while it runs, and once more right
+    before the load, which is skipped if the lease was lost, so the unit is left to the
+    worker that claimed it again. The replace is not atomic on BigQuery, so a load
+    running longer than the lease can still overlap the load of another attempt. A failed unit is given back to the
+    queue, that retries it while it has attempts left. While other workers hold leases,
+    the worker polls the queue in case one of them expires.
+
+    Args:
+        queue (work_queue.AbstractWorkQueue): The queue of units.
+        worker_id (str): Identifier of the worker, unique across nodes.
+        source_repository_factory (Callable[[work_queue.WorkUnit], source_repository.AbstractSourceRepository]):
+            Creates the source repository of a unit, fetching its window.
+        destination_repository_factory (Callable[[str], destination_repository.AbstractDestinationRepository]):
+            Creates the destination repository of a destination table.
+        lease_seconds (float): Duration of the leases. Default is 60.
+        validator (validation.ExchangeRateValidator, optional):
+            Validation stage run before each load. No validation if None.
+        quarantine_repository (destination_repository.AbstractQuarantineRepository, optional):
+            The side table to load the quarantined exchange rates into.
+        max_units (int, optional): Maximum number of units to complete. Unbounded if None.
+        poll_seconds (float): Seconds between claims while other workers hold leases.
+            Default is 1.
+    Returns:
+        list[work_queue.UnitReport]: Reports of the units completed by the worker.
+    """
+    reports = []
+    while max_units is None or len(reports) < max_units:
+        lease = queue.claim(worker_id, lease_seconds)
+        if lease is None:
+            if not queue.summary().counts.get(work_queue.LEASED):
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        unit = lease.unit
+        logger.info(
+            f"Worker '{worker_id}' runs unit '{unit.unit_id}', attempt {lease.attempt}."
+        )
+        start = time.perf_counter()
+        try:
+            with work_queue.LeaseKeeper(queue, lease, lease_seconds) as lease_keeper:
+                unit_source_repository = source_repository_factory(unit)
+                exchange_rates = unit_source_repository.get_exchange_rates(
+                    list(unit.currency_pairs)
+                )
+                if validator is not None:
+                    exchange_rates = validate_exchange_rates(
+                        exchange_rates, validator, quarantine_repository
+                    )
+                lease_keeper.renew()
+                destination_repository_factory(
+                    unit.destination_table
+                ).replace_exchange_rates(exchange_rates)
+        except work_queue.LeaseLostError:
+            logger.warning(
+                f"Lease on unit '{unit.unit_id}' was lost before its load, it is left "
+                "to the worker that claimed it again."
+            )
+            continue
+        except Exception as exception:
+            logger.exception(f"Unit '{unit.unit_id}' failed.")
+            try:
+                queue.fail(lease, str(exception))
+            except work_queue.LeaseLostError:
+                pass
+            continue
+
+        report = work_queue.UnitReport(
+            unit_id=unit.unit_id,
+            worker_id=worker_id,
+            rows=len(exchange_rates),
+            transferred_bytes=sum(
+                stats.compressed_bytes
+                for stats in getattr(unit_source_repository, "transfer_stats", [])
+            ),
+            seconds=time.perf_counter() - start,
+        )
+        try:
+            queue.complete(lease_keeper.lease, report)
+        except work_queue.LeaseLostError:
+            logger.warning(
+                f"Lease on unit '{unit.unit_id}' was lost, it is left to the worker "
+                "that claimed it again."
+            )
+            continue
+        reports.append(report)
+
+    return reports
+
+
+# Functions whose cumulative time makes each stage of a run, for utils.profiling.Profiler.
+# Stages nest: fetch includes parse, and load includes the encoding of the rows.
+RUN_STAGES = {
+    "fetch": [source_repository.EcbApiCaller.get_exchange_rates],
+    "parse": [source_repository.EcbApiCaller._xml_chunks_to_ecb_rates],
+    "validate": [validation.ExchangeRateValidator.validate],
+    "detect changes": [change_detection.ObservationChangeDetector.classify],
+    "encode": [destination_repository.NdjsonRowEncoder.encode],
+    "load": [
+        destination_repository.BiqQueryDestinationRepository._load_chunks,
+        destination_repository.SqliteDestinationRepository.load_exchange_rates,
+    ],
+    "quarantine": [
+        destination_repository.BigQueryQuarantineRepository.load_quarantined_exchange_rates,
+        destination_repository.SqliteQuarantineRepository.load_quarantined_exchange_rates,
+    ],
+    "derive": [derived_rates.derive_exchange_rates],
+}
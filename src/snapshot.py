@@ -0,0 +1,228 @@
+from array import array
+from bisect import bisect_left, bisect_right
+import datetime as dt
+import mmap
+import os
+import struct
+from typing import Iterable, List, Optional, Tuple, Union
+
+from src import model
+from src.destination_repository import (
+    BiqQueryDestinationRepository,
+    SqliteDestinationRepository,
+)
+
+
+# Snapshot layout, little-endian:
+#   header: magic, format version, number of series
+#   index: one entry per series with its base and quote currencies, the offsets of its
+#       dates and rates arrays and its number of observations
+#   data: per series, the dates as int32 ordinals sorted ascending, padded to 8 bytes,
+#       then the rates as float64
+SNAPSHOT_MAGIC = b"ECBRATES"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct("<8sII")
+INDEX_ENTRY = struct.Struct("<8s8sQQQ")
+
+
+def write_snapshot(file_path: str, exchange_rates: Iterable[model.ExchangeRate]):
+    """
+    Writes Exchange Rates to a binary snapshot file that ExchangeRateSnapshot can map
+    into memory. Each currency pair is stored as a series of dates and rates sorted by
+    date; if a currency pair has several Exchange Rates for a date, the one with the
+    latest creation date is kept, the last one written if they were created at the same
+    time. The file is replaced atomically, so processes mapping the previous one are not
+    affected.
+
+    Args:
+        file_path (str): Path to the snapshot file.
+        exchange_rates (Iterable[model.ExchangeRate]): The Exchange Rates to write.
+    """
+    series: dict[model.CurrencyPair, dict[int, model.ExchangeRate]] = {}
+    for exchange_rate in exchange_rates:
+        observations = series.setdefault(exchange_rate.currency_pair, {})
+        date = exchange_rate.date.toordinal()
+        kept = observations.get(date)
+        if kept is None or exchange_rate.creation_date >= kept.creation_date:
+            observations[date] = exchange_rate
+
+    currency_pairs = sorted(series, key=str)
+    offset = HEADER.size + INDEX_ENTRY.size * len(currency_pairs)
+    index, data = [], []
+    for currency_pair in currency_pairs:
+        observations = sorted(series[currency_pair].items())
+        dates = array("i", [date for date, _ in observations])
+        rates = array("d", [rate.exchange_rate for _, rate in observations])
+        dates_bytes = _little_endian(dates)
+        dates_bytes += bytes(-len(dates_bytes) % 8)
+        rates_bytes = _little_endian(rates)
+        index.append(
+            INDEX_ENTRY.pack(
+                currency_pair.base.encode(),
+                currency_pair.quote.encode(),
+                offset,
+                offset + len(dates_bytes),
+                len(observations),
+            )
+        )
+        data += [dates_bytes, rates_bytes]
+        offset += len(dates_bytes) + len(rates_bytes)
+
+    temporary_path = f"{file_path}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(currency_pairs)))
+        f.writelines(index)
+        f.writelines(data)
+    os.replace(temporary_path, file_path)
+
+
+def export_snapshot(
+    file_path: str,
+    destination_repository: Union[
+        BiqQueryDestinationRepository, SqliteDestinationRepository
+    ],
+):
+    """
+    Writes every Exchange Rate of a destination repository to a binary snapshot file.
+
+    Args:
+        file_path (str): Path to the snapshot file.
+        destination_repository (Union[BiqQueryDestinationRepository, SqliteDestinationRepository]):
+            The repository to read the Exchange Rates from.
+    """
+    write_snapshot(file_path, destination_repository.read_all_exchange_rates())
+
+
+def _little_endian(values: array) -> bytes:
+    """
+    Returns the bytes of an array in little-endian order, whatever the order of the host.
+    """
+    if struct.pack("=H", 1) != struct.pack("<H", 1):
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class ExchangeRateSnapshot:
+    """
+    Read-only view of a snapshot file written by write_snapshot(). The file is memory-mapped,
+    so opening it only reads its index, and processes opening the same file share its pages.
+    Lookups are binary searches over the dates of a currency pair. Requires a little-endian
+    host, as the arrays are read in place.
+
+    Args:
+        file_path (str): Path to the snapshot file.
+    Attributes:
+        currency_pairs (List[model.CurrencyPair]): Currency pairs of the snapshot.
+    Methods:
+        rate(currency_pair: model.CurrencyPair, date: dt.date) -> Optional[float]:
+            Returns the rate of a currency pair on a date.
+        rate_as_of(currency_pair: model.CurrencyPair, as_of: dt.date) -> Optional[Tuple[dt.date, float]]:
+            Returns the latest rate of a currency pair on or before a date.
+        rates(currency_pair: model.CurrencyPair, date_from, date_to) -> List[Tuple[dt.date, float]]:
+            Returns the rates of a currency pair within a date range.
+        close():
+            Unmaps the file.
+    Raises:
+        ValueError: if the file is not a snapshot of a supported version.
+    """
+
+    def __init__(self, file_path: str):
+        with open(file_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, series_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f"'{file_path}' is not a version {SNAPSHOT_VERSION} snapshot."
+            )
+
+        self._views: List[memoryview] = [memoryview(self._mmap)]
+        self._series: dict[model.CurrencyPair, Tuple[memoryview, memoryview]] = {}
+        for position in range(series_count):
+            base, quote, dates_offset, rates_offset, size = INDEX_ENTRY.unpack_from(
+                self._mmap, HEADER.size + INDEX_ENTRY.size * position
+            )
+            dates = self._views[0][dates_offset : dates_offset + 4 * size].cast("i")
+            rates = self._views[0][rates_offset : rates_offset + 8 * size].cast("d")
+            self._views += [dates, rates]
+            currency_pair = model.CurrencyPair(
+                base.rstrip(b"\0").decode(), quote.rstrip(b"\0").decode()
+            )
+            self._series[currency_pair] = (dates, rates)
+        self.currency_pairs = list(self._series)
+
+    def rate(self, currency_pair: model.CurrencyPair, date: dt.date) -> Optional[float]:
+        """
+        Returns the rate of a currency pair on a date.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair.
+            date (dt.date): The date.
+        Returns:
+            Optional[float]: The rate, None if there is none on that date.
+        """
+        dates, rates = self._series.get(currency_pair, ((), ()))
+        ordinal = date.toordinal()
+        position = bisect_left(dates, ordinal)
+        if position < len(dates) and dates[position] == ordinal:
+            return rates[position]
+        return None
+
+    def rate_as_of(
+        self, currency_pair: model.CurrencyPair, as_of: dt.date
+    ) -> Optional[Tuple[dt.date, float]]:
+        """
+        Returns the latest rate of a currency pair with a date on or before as_of.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair.
+            as_of (dt.date): Date of reference.
+        Returns:
+            Optional[Tuple[dt.date, float]]: The date and the rate, None if there is none.
+        """
+        dates, rates = self._series.get(currency_pair, ((), ()))
+        position = bisect_right(dates, as_of.toordinal()) - 1
+        if position < 0:
+            return None
+        return dt.date.fromordinal(dates[position]), rates[position]
+
+    def rates(
+        self,
+        currency_pair: model.CurrencyPair,
+        date_from: Optional[dt.date] = None,
+        date_to: Optional[dt.date] = None,
+    ) -> List[Tuple[dt.date, float]]:
+        """
+        Returns the rates of a currency pair within a date range, ordered by date.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair.
+            date_from (dt.date, optional): First date of the range, inclusive. Unbounded if None.
+            date_to (dt.date, optional): Last date of the range, inclusive. Unbounded if None.
+        Returns:
+            List[Tuple[dt.date, float]]: The dates and rates.
+        """
+        dates, rates = self._series.get(currency_pair, ((), ()))
+        start = bisect_left(dates, date_from.toordinal()) if date_from else 0
+        end = bisect_right(dates, date_to.toordinal()) if date_to else len(dates)
+        return [
+            (dt.date.fromordinal(date), rate)
+            for date, rate in zip(dates[start:end], rates[start:end])
+        ]
+
+    def close(self):
+        """
+        Unmaps the file. The snapshot cannot be read afterwards.
+        """
+        self._series.clear()
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+    def __enter__(self) -> "ExchangeRateSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
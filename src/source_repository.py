@@ -1,13 +1,43 @@
 from abc import ABC, abstractmethod
+from collections import deque
 from xml.etree import ElementTree as Et
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.request import ACCEPT_ENCODING
+from dataclasses import dataclass
+from functools import partial
 import requests as req
 import requests_mock
+import httpx
+import asyncio
 import datetime as dt
-from typing import List
+import time
+from typing import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from src import model
+from src import model, rollups, target_calendar
+from src.utils.high_water_marks import HighWaterMarkStore
+from src.utils.logs import default_module_logger
+from src.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceededError,
+    RetryBudget,
+    RetryPolicy,
+)
+from src.utils.single_flight import SingleFlight
+
+
+logger = default_module_logger(__file__)
 
 
 class AbstractSourceRepository(ABC):
@@ -36,6 +66,355 @@ class AbstractSourceRepository(ABC):
         raise NotImplementedError
 
 
+class AbstractAsyncSourceRepository(ABC):
+    """
+    An abstract base class for source repository interfaces to be used from asyncio code,
+    yielding Exchange Rates in batches as they are extracted.
+
+    Methods:
+        iter_exchange_rates(currency_pairs: List[model.CurrencyPair]) -> AsyncIterator[list[model.ExchangeRate]]:
+            Retrieves exchange rates for a list of currency pairs, batch by batch.
+    """
+
+    @abstractmethod
+    def iter_exchange_rates(
+        self, currency_pairs: List[model.CurrencyPair]
+    ) -> AsyncIterator[list[model.ExchangeRate]]:
+        """
+        Retrieves exchange rates for a list of currency pairs, batch by batch.
+
+        Args:
+            currency_pairs (List[model.CurrencyPair]):
+                currency pair consisting of a base currency and a quote currency.
+        Returns:
+            AsyncIterator[list[model.ExchangeRate]]: Batches of ExchangeRate instances.
+        """
+        raise NotImplementedError
+
+
+GENERIC_DATA = "application/vnd.sdmx.genericdata+xml;version=2.1"
+STRUCTURE_SPECIFIC_DATA = "application/vnd.sdmx.structurespecificdata+xml;version=2.1"
+SDMX_GENERIC_NAMESPACE = (
+    "{http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/generic}"
+)
+RESPONSE_CHUNK_SIZE = 64 * 1024
+# Chunk of a response body, either a bytes object or a view of a reusable buffer.
+ByteChunk = Union[bytes, memoryview]
+ECB_API_URL = "https://data-api.ecb.europa.eu/service/data/EXR/"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Encodings httpx decodes without optional dependencies, to send as Accept-Encoding.
+ASYNC_ACCEPT_ENCODING = "gzip, deflate"
+# Number of calls and probes whose stats are kept, so long-lived callers, e.g. the ones
+# shared by the jobs of the daemon, do not grow without bound.
+MAX_RECORDED_STATS = 10_000
+
+
+@dataclass(frozen=True)
+class TransferStats:
+    """
+    Bytes transferred by a single call to the ECB API.
+
+    Attributes:
+        currency_pair (model.CurrencyPair): The currency pair requested.
+        content_encoding (str): Content encoding of the response body, "identity" if none.
+        compressed_bytes (int): Bytes of the response body read from the wire.
+        uncompressed_bytes (int): Bytes of the response body after decoding.
+    """
+
+    currency_pair: model.CurrencyPair
+    content_encoding: str
+    compressed_bytes: int
+    uncompressed_bytes: int
+
+
+@dataclass(frozen=True)
+class ProbeStats:
+    """
+    Outcome of a freshness probe of the ECB API, made before fetching the full windows.
+
+    Attributes:
+        probed_pairs (int): Number of currency pairs probed in the call.
+        avoided_fetches (int): Number of currency pairs without a new observation, whose
+            full fetch was avoided.
+        compressed_bytes (int): Bytes of the probe response body read from the wire.
+    """
+
+    probed_pairs: int
+    avoided_fetches: int
+    compressed_bytes: int
+
+
+@dataclass(frozen=True)
+class FetchKey:
+    """
+    Normalized identifier of a call to the ECB API, used to coalesce concurrent identical calls.
+
+    Attributes:
+        currency_pair (model.CurrencyPair): The currency pair requested.
+        date_from (dt.date): First date of the window requested.
+        date_to (dt.date): Last date of the window requested.
+        data_format (str): SDMX format requested.
+        frequency (str): Frequency of the series requested. Default is model.DAILY.
+    """
+
+    currency_pair: model.CurrencyPair
+    date_from: dt.date
+    date_to: dt.date
+    data_format: str
+    frequency: str = model.DAILY
+
+    def covers(self, other: "FetchKey") -> bool:
+        """
+        Checks whether the data fetched for this key contains the data requested by other.
+
+        Args:
+            other (FetchKey): The requested key.
+        Returns:
+            bool: True if other can be served by slicing the result of this key.
+        """
+        return (
+            self.currency_pair == other.currency_pair
+            and self.data_format == other.data_format
+            and self.frequency == other.frequency
+            and self.date_from <= other.date_from
+            and other.date_to <= self.date_to
+        )
+
+
+class _ByteCounter:
+    """
+    Iterator wrapper that counts the bytes of the chunks that go through it.
+
+    Args:
+        chunks (Iterable[ByteChunk]): The chunks to count.
+    Attributes:
+        total (int): Bytes counted so far.
+    """
+
+    def __init__(self, chunks: Iterable[ByteChunk]):
+        self._chunks = iter(chunks)
+        self.total = 0
+
+    def __iter__(self) -> Iterator[ByteChunk]:
+        return self
+
+    def __next__(self) -> ByteChunk:
+        chunk = next(self._chunks)
+        self.total += len(chunk)
+        return chunk
+
+
+class _ObservationParser:
+    """
+    Incremental parser of the observations of an SDMX body from the ECB API, fed with the
+    chunks of the body as they arrive, in the generic or the structure specific format.
+    All the Exchange Rates of a body share the same creation date.
+
+    Args:
+        currency_pair (model.CurrencyPair): The currency pair of the body.
+        frequency (str): Frequency of the series. Periods of other frequencies than daily
+            are dated on their first day.
+    Methods:
+        feed(chunk: ByteChunk):
+            Parses a chunk of the body.
+        close() -> list[model.ExchangeRate]:
+            Ends the body and returns its Exchange Rates.
+    """
+
+    def __init__(self, currency_pair: model.CurrencyPair, frequency: str):
+        self.currency_pair = currency_pair
+        self.frequency = frequency
+        self.exchange_rates: list[model.ExchangeRate] = []
+        self._creation_date = dt.datetime.now()
+        self._parser = Et.XMLPullParser(events=("end",))
+
+    def feed(self, chunk: ByteChunk):
+        """
+        Parses a chunk of the body, fed as bytes so the parser decodes it with the
+        encoding declared in the XML header.
+
+        Args:
+            chunk (ByteChunk): Decoded chunk of the XML body, as bytes or a view.
+        """
+        self._parser.feed(chunk)
+        for _, element in self._parser.read_events():
+            if element.tag == "Obs":
+                date = element.get("TIME_PERIOD")
+                exchange_rate = element.get("OBS_VALUE")
+            elif element.tag == SDMX_GENERIC_NAMESPACE + "Obs":
+                date, exchange_rate = None, None
+                for child in element:
+                    if child.tag == SDMX_GENERIC_NAMESPACE + "ObsDimension":
+                        date = child.get("value")
+                    elif child.tag == SDMX_GENERIC_NAMESPACE + "ObsValue":
+                        exchange_rate = child.get("value")
+            else:
+                if element.tag.endswith("Series"):
+                    element.clear()
+                continue
+            element.clear()
+
+            exchange_rate = float(exchange_rate) if exchange_rate else None
+            if date and exchange_rate:
+                self.exchange_rates.append(
+                    model.ExchangeRate(
+                        date=(
+                            dt.datetime.strptime(date, "%Y-%m-%d").date()
+                            if self.frequency == model.DAILY
+                            else model.parse_period(date, self.frequency)
+                        ),
+                        exchange_rate=exchange_rate,
+                        currency_pair=self.currency_pair,
+                        source="ECB API",
+                        creation_date=self._creation_date,
+                        frequency=self.frequency,
+                    )
+                )
+
+    def close(self) -> list[model.ExchangeRate]:
+        """
+        Ends the body and returns its Exchange Rates.
+
+        Returns:
+            list[model.ExchangeRate]: The Exchange Rates of the body.
+        """
+        self._parser.close()
+        return self.exchange_rates
+
+
+def _latest_observation_dates(chunks: Iterable[ByteChunk]) -> dict[str, dt.date]:
+    """
+    Parses an SDMX body of daily series of several currencies, in the generic or the
+    structure specific format, and returns the date of the latest observation of each.
+
+    Args:
+        chunks (Iterable[ByteChunk]): Decoded chunks of the XML body, as bytes or views.
+    Returns:
+        dict[str, dt.date]: Date of the latest observation per quote currency.
+    """
+    parser = Et.XMLPullParser(events=("start", "end"))
+    latest_dates: dict[str, dt.date] = {}
+    currency = None
+
+    def read_events():
+        nonlocal currency
+        for event, element in parser.read_events():
+            if event == "start":
+                if element.tag == "Series":
+                    currency = element.get("CURRENCY")
+                continue
+            if element.tag == "Obs":
+                date = element.get("TIME_PERIOD")
+            elif element.tag == SDMX_GENERIC_NAMESPACE + "ObsDimension":
+                date = element.get("value")
+            else:
+                if (
+                    element.tag == SDMX_GENERIC_NAMESPACE + "Value"
+                    and element.get("id") == "CURRENCY"
+                ):
+                    currency = element.get("value")
+                continue
+            if currency and date:
+                date = dt.datetime.strptime(date, "%Y-%m-%d").date()
+                latest_dates[currency] = max(
+                    date, latest_dates.get(currency, dt.date.min)
+                )
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        read_events()
+    parser.close()
+    read_events()
+
+    return latest_dates
+
+
+def iter_body_views(
+    response: req.models.Response,
+    chunk_size: int = RESPONSE_CHUNK_SIZE,
+    deadline: Optional[Deadline] = None,
+) -> Iterator[memoryview]:
+    """
+    Reads the decoded body of a response into a single reusable buffer and yields views of
+    the bytes read, so chunks go from the urllib3 stream to the consumer without creating a
+    bytes object per chunk. A view is only valid until the next one is requested, which
+    suits consumers like XMLPullParser.feed() that do not keep their input. Bodies already
+    loaded by requests, i.e. responses not streamed, are yielded as a single view. With a
+    deadline, each read of the connection times out at the deadline, so a body trickling
+    in cannot outlast it.
+
+    Args:
+        response (req.models.Response): The HTTP response.
+        chunk_size (int): Size of the buffer, in bytes. Default is RESPONSE_CHUNK_SIZE.
+        deadline (Deadline, optional): Deadline of the run. Reads are not bounded if None.
+    Returns:
+        Iterator[memoryview]: views of the decoded body.
+    Raises:
+        DeadlineExceededError: if the deadline passes before the end of the body.
+    """
+    if response._content_consumed:
+        yield memoryview(response.content)
+        return
+
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    response.raw.decode_content = True
+    while True:
+        remaining = None if deadline is None else deadline.remaining()
+        if remaining == 0.0:
+            raise DeadlineExceededError(
+                "Run deadline exceeded while reading a response."
+            )
+        try:
+            if remaining is None:
+                size = response.raw.readinto(buffer)
+            else:
+                # readinto() fills the buffer over as many reads of the connection as it
+                # takes, each within the timeout, while read1() makes a single one.
+                _set_read_timeout(response, remaining)
+                data = response.raw.read1(chunk_size)
+                size = len(data)
+                buffer[:size] = data
+        except ReadTimeoutError as error:
+            if deadline is not None and deadline.remaining() == 0.0:
+                raise DeadlineExceededError(
+                    "Run deadline exceeded while reading a response."
+                ) from error
+            raise
+        if not size:
+            break
+        yield view[:size]
+    response._content_consumed = True
+
+
+def _set_read_timeout(response: req.models.Response, seconds: float):
+    """
+    Sets the timeout of the next reads of the connection of a streamed response, if it
+    still has one.
+    """
+    connection = getattr(response.raw, "connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        sock.settimeout(seconds)
+
+
+def create_ecb_session() -> req.Session:
+    """
+    Creates an HTTP session to call the ECB API. The session does not retry by itself:
+    retries are driven by the RetryPolicy of EcbApiCaller, so they can be budgeted per run
+    and stopped by its circuit breaker.
+
+    Returns:
+        req.Session: The HTTP session.
+    """
+    session = req.Session()
+    adapter = HTTPAdapter(max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
 class EcbApiCaller(AbstractSourceRepository):
     """
     Concrete implementation of AbstractSourceRepository to interact with the ECB API.
@@ -44,53 +423,206 @@ class EcbApiCaller(AbstractSourceRepository):
 
     Args:
         days_to_register (int): Number of days to consider when making the API call. Default is 10.
+        data_format (str): SDMX format requested to the API, GENERIC_DATA or STRUCTURE_SPECIFIC_DATA.
+            Default is STRUCTURE_SPECIFIC_DATA, that is the lighter one.
+        data_only (bool): If True, series and observation attributes are not requested. Default is True.
+        compressed (bool): If True, a compressed response is requested. Default is True.
+        session (req.Session, optional): HTTP session used for the calls, so it can be shared
+            between instances. A new one is created with create_ecb_session() if None.
+        single_flight (SingleFlight, optional): Coalesces concurrent identical calls to the API.
+            Share it between instances to coalesce their calls too. A new one is created if None.
+        high_water_marks (HighWaterMarkStore, optional): Date of the latest exchange rate loaded
+            per currency pair. If given, currency pairs without a TARGET2 publication date since
+            their mark are not fetched. Marks are only read: the service loading the exchange
+            rates moves them forward once they are loaded, see services.source_exchange_rates().
+        retry_policy (RetryPolicy, optional): Retries, retry budget and deadline of each run,
+            and thresholds of the circuit breaker. Default is RetryPolicy().
+        circuit_breaker (CircuitBreaker, optional): Circuit breaker of the ECB API, shared by all
+            currency pairs. Share it between instances to share the failure rate too. A new one
+            is created from retry_policy if None.
+        base_url (str): URL of the EXR dataflow of the API. Default is ECB_API_URL.
+        frequency (str): Frequency of the series requested, model.DAILY (default), model.MONTHLY,
+            model.QUARTERLY or model.ANNUAL. Series of other frequencies than daily are averages
+            computed by the ECB, or rolled up from daily rates if the ECB does not publish them.
+        end_date (dt.date, optional): Last date of the window, e.g. for backfills. Default is
+            the current date.
+        probe (bool): If True, the currency pairs left to fetch after the TARGET2 calendar
+            check of their high-water mark are first probed in a single call for their
+            latest observation, and only the ones with a newer observation than their mark
+            are fetched. Default is False.
     Attributes:
         days_to_register (int): Number of days to consider when making the API call. Default is 10.
+        data_format (str): SDMX format requested to the API.
+        data_only (bool): If True, series and observation attributes are not requested.
+        compressed (bool): If True, a compressed response is requested.
+        session (req.Session): HTTP session used for the calls.
+        single_flight (SingleFlight): Coalesces concurrent identical calls to the API.
+        high_water_marks (Optional[HighWaterMarkStore]): Date of the latest exchange rate loaded
+            per currency pair.
+        retry_policy (RetryPolicy): Retries, retry budget and deadline of each run.
+        circuit_breaker (CircuitBreaker): Circuit breaker of the ECB API.
+        base_url (str): URL of the EXR dataflow of the API.
+        frequency (str): Frequency of the series requested.
+        end_date (Optional[dt.date]): Last date of the window, the current date if None.
+        probe (bool): If True, currency pairs are probed for new observations before they are fetched.
+        transfer_stats (deque[TransferStats]): Bytes transferred by the latest calls to the
+            API, at most MAX_RECORDED_STATS.
+        probe_stats (deque[ProbeStats]): Outcome of the latest freshness probes, at most
+            MAX_RECORDED_STATS.
     Methods:
+        _date_window() -> Tuple[dt.date, dt.date]:
+            Returns the window of dates requested to the API.
+        _request_arguments(currency_pair, frequency) -> Tuple[str, dict, dict]:
+            Returns the URL, query parameters and headers of a call to the API.
         _call_to_ecb_api_exchange_rate(currency: str) -> Response:
             Calls the ECB API to get exchange rates for a specific currency pair.
         _xml_to_ecb_rates(response: req.models.Response, currency: str) -> list[model.ExchangeRate]:
             Converts an XML response from ECB API to a list of ExchangeRate instances.
+        _call_with_retry_policy(currency_pair: model.CurrencyPair) -> Response:
+            Calls the ECB API for a currency pair, retrying as set by the retry policy.
+        _send_with_retry_policy(call: Callable[[], Response], description: str) -> Response:
+            Makes a call to the ECB API, retrying as set by the retry policy.
+        _can_retry(attempt: int) -> bool:
+            Checks whether a failed attempt can be retried.
+        _fetch_exchange_rates(currency_pair: model.CurrencyPair) -> list[model.ExchangeRate]:
+            Calls the ECB API for a currency pair and parses the response.
+        _parse_response(response, currency_pair, frequency) -> list[model.ExchangeRate]:
+            Parses the response of a call and records the bytes transferred.
+        _has_new_publication(currency_pair, date_from, date_to) -> bool:
+            Checks whether there is a publication date after the high-water mark of a currency pair.
+        _call_to_ecb_api_latest_observations(currency_pairs, date_from, date_to) -> Response:
+            Calls the ECB API for the latest observation of several currency pairs at once.
+        _probe_unchanged_pairs(currency_pairs, date_from, date_to) -> set[model.CurrencyPair]:
+            Returns the currency pairs without a newer observation than their high-water mark.
+        _log_gaps(exchange_rates, currency_pair, date_from, date_to):
+            Logs a warning if a publication date of the window has no exchange rate.
         get_exchange_rates(currency_pairs: List[model.CurrencyPair]) -> list[model.ExchangeRate]:
             Retrieves exchange rates for a list of currency pairs.
+        planned_fetches(currency_pairs: List[model.CurrencyPair]) -> list[FetchKey]:
+            Returns the calls to the API a run would make, without making them.
     """
 
-    def __init__(self, days_to_register: int = 10):
+    def __init__(
+        self,
+        days_to_register: int = 10,
+        data_format: str = STRUCTURE_SPECIFIC_DATA,
+        data_only: bool = True,
+        compressed: bool = True,
+        session: Optional[req.Session] = None,
+        single_flight: Optional[SingleFlight] = None,
+        high_water_marks: Optional[HighWaterMarkStore] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        base_url: str = ECB_API_URL,
+        frequency: str = model.DAILY,
+        end_date: Optional[dt.date] = None,
+        probe: bool = False,
+    ):
+        if data_format not in (GENERIC_DATA, STRUCTURE_SPECIFIC_DATA):
+            raise ValueError(f"Data format '{data_format}' is not supported.")
+        if frequency not in model.FREQUENCIES:
+            raise ValueError(f"Frequency '{frequency}' is not supported.")
         self.days_to_register = days_to_register
+        self.data_format = data_format
+        self.data_only = data_only
+        self.compressed = compressed
+        self.session = session if session is not None else create_ecb_session()
+        self.single_flight = (
+            single_flight if single_flight is not None else SingleFlight()
+        )
+        self.high_water_marks = high_water_marks
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker.from_policy(
+            self.retry_policy
+        )
+        self.base_url = base_url
+        self.frequency = frequency
+        self.end_date = end_date
+        self.probe = probe
+        self.transfer_stats: deque[TransferStats] = deque(maxlen=MAX_RECORDED_STATS)
+        self.probe_stats: deque[ProbeStats] = deque(maxlen=MAX_RECORDED_STATS)
+        self._start_run()
+
+    def _start_run(self):
+        """
+        Resets the retry budget and the deadline of the retry policy for a new run.
+        """
+        self._retry_budget = RetryBudget(self.retry_policy.retry_budget)
+        self._deadline = Deadline(self.retry_policy.deadline_seconds)
+
+    def _date_window(self) -> Tuple[dt.date, dt.date]:
+        """
+        Returns the window of dates requested to the API, given attribute days_to_register,
+        ending on attribute end_date or on the current date. For frequencies other than
+        daily, the window starts on the first day of its first period, so that period is
+        complete.
+
+        Returns:
+            Tuple[dt.date, dt.date]: first and last date of the window.
+        """
+        date_to = self.end_date or dt.datetime.date(dt.datetime.now())
+        date_from = model.period_start(
+            date_to - dt.timedelta(self.days_to_register), self.frequency
+        )
+        return date_from, date_to
+
+    def _request_arguments(
+        self, currency_pair: model.CurrencyPair, frequency: str
+    ) -> Tuple[str, dict[str, str], dict[str, str]]:
+        """
+        Returns the URL, query parameters and headers of a call to the ECB API.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair to get exchange rates for.
+            frequency (str): Frequency of the series.
+        Returns:
+            Tuple[str, dict[str, str], dict[str, str]]: URL, parameters and headers.
+        """
+        ecb_url = f"{self.base_url}{frequency}.{currency_pair.quote}.{currency_pair.base}.SP00.A"
+        date_from, date_to = self._date_window()
+        params = {
+            "startPeriod": model.period_label(date_from, frequency),
+            "endPeriod": model.period_label(date_to, frequency),
+        }
+        if self.data_only:
+            params["detail"] = "dataonly"
+        headers = {
+            "Accept": self.data_format,
+            "Accept-Encoding": ACCEPT_ENCODING if self.compressed else "identity",
+        }
+
+        return ecb_url, params, headers
 
     def _call_to_ecb_api_exchange_rate(
-        self, currency_pair: model.CurrencyPair
+        self, currency_pair: model.CurrencyPair, frequency: Optional[str] = None
     ) -> req.models.Response:
         """
         Calls the ECB API to get exchange rates for a specific currency pair.
+        The response body is streamed, so it is not read until it is parsed.
+        The call times out at the deadline of the run.
 
         Args:
             currency_pair (model.CurrencyPair): The currency pair consisting to get exchange rates for.
+            frequency (str, optional): Frequency of the series. Default is attribute frequency.
         Returns:
             Response: The HTTP response object.
         """
-        session = req.Session()
-        retry = Retry(
-            total=3, status_forcelist=[429, 500, 502, 504], backoff_factor=0.1
+        ecb_url, params, headers = self._request_arguments(
+            currency_pair, frequency or self.frequency
         )
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount("https://", adapter)
-
-        ecb_url = (
-            f"https://data-api.ecb.europa.eu/service/data/EXR/"
-            f"D.{currency_pair.quote}.{currency_pair.base}.SP00.A"
-            f"?startPeriod=%s&endPeriod=%s"
-        )
-        date_from = str(
-            dt.datetime.date(dt.datetime.now()) - dt.timedelta(self.days_to_register)
+        return self.session.get(
+            ecb_url,
+            params=params,
+            headers=headers,
+            stream=True,
+            timeout=self._deadline.remaining(),
         )
-        date_to = str(dt.datetime.date(dt.datetime.now()))
-
-        return session.get(ecb_url % (date_from, date_to))
 
     @staticmethod
     def _xml_to_ecb_rates(
-        response: req.models.Response, currency_pair: model.CurrencyPair
+        response: req.models.Response,
+        currency_pair: model.CurrencyPair,
+        frequency: str = model.DAILY,
     ) -> list[model.ExchangeRate]:
         """
         Converts an HTTP response from ECB API to a list of ExchangeRate instances.
@@ -99,48 +631,55 @@ class EcbApiCaller(AbstractSourceRepository):
             response (req.models.Response): HTTP response from the ECB API.
             currency_pair (model.CurrencyPair): The currency pair from which exchange rates
                 have been extracted.
+            frequency (str): Frequency of the series. Default is model.DAILY.
         Returns:
             list[ExchangeRate]: A list of ExchangeRate instances.
         """
-        exchange_rates = []
-        root = Et.fromstring(response.text)
-        for series in root.iter(
-            "{http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/generic}Series"
-        ):
-            for obs, value in zip(
-                series.iter(
-                    "{http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/generic}Obs"
-                ),
-                series.iter(
-                    "{http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/generic}Value"
-                ),
-            ):
-                date, exchange_rate = None, None
-                for child in obs.iter():
-                    if "ObsDimension" in child.tag:
-                        date = dt.datetime.strptime(
-                            child.attrib["value"], "%Y-%m-%d"
-                        ).date()
-                    elif "ObsValue" in child.tag:
-                        exchange_rate = float(child.attrib["value"])
-
-                if date and exchange_rate:
-                    exchange_rates.append(
-                        model.ExchangeRate(
-                            date=date,
-                            exchange_rate=exchange_rate,
-                            currency_pair=currency_pair,
-                            source="ECB API",
-                        )
-                    )
+        return EcbApiCaller._xml_chunks_to_ecb_rates(
+            iter_body_views(response), currency_pair, frequency
+        )
 
-        return exchange_rates
+    @staticmethod
+    def _xml_chunks_to_ecb_rates(
+        chunks: Iterable[ByteChunk],
+        currency_pair: model.CurrencyPair,
+        frequency: str = model.DAILY,
+    ) -> list[model.ExchangeRate]:
+        """
+        Converts the chunks of an XML body from ECB API to a list of ExchangeRate instances.
+        Chunks are parsed as they arrive, so the body does not need to be held in memory,
+        and are fed as bytes so the parser decodes them with the encoding declared in the
+        XML header.
+        Both SDMX generic and structure specific formats are supported. All the Exchange
+        Rates of a body share the same creation date. Periods of other frequencies than
+        daily are dated on their first day.
+
+        Args:
+            chunks (Iterable[ByteChunk]): Decoded chunks of the XML body, as bytes or views.
+            currency_pair (model.CurrencyPair): The currency pair from which exchange rates
+                have been extracted.
+            frequency (str): Frequency of the series. Default is model.DAILY.
+        Returns:
+            list[ExchangeRate]: A list of ExchangeRate instances.
+        """
+        parser = _ObservationParser(currency_pair, frequency)
+        for chunk in chunks:
+            parser.feed(chunk)
+
+        return parser.close()
 
     def get_exchange_rates(
         self, currency_pairs: List[model.CurrencyPair]
     ) -> list[model.ExchangeRate]:
         """
-        Retrieves exchange rates for a list of currency pairs.
+        Retrieves exchange rates for a list of currency pairs. Concurrent requests for the
+        same currency pair share a single call to the API through attribute single_flight,
+        including requests whose window is contained in the window of a call in flight.
+        Currency pairs without a TARGET2 publication date since their high-water mark are
+        skipped, and so are the ones without a newer observation than their mark if
+        attribute probe is set, and missing publication dates are logged as warnings, for
+        daily series only. Each call counts as a run for the retry budget and the deadline
+        of the retry policy.
 
         Args:
             currency_pairs (List[model.CurrencyPair]):
@@ -148,6 +687,57 @@ class EcbApiCaller(AbstractSourceRepository):
         Returns:
             list[model.ExchangeRate]: A list of ExchangeRate instances.
         """
+        self._check_base_currency(currency_pairs)
+        self._start_run()
+        exchange_rates = []
+        date_from, date_to = self._date_window()
+        unchanged_pairs = (
+            self._probe_unchanged_pairs(currency_pairs, date_from, date_to)
+            if self.probe
+            else set()
+        )
+        for currency_pair in currency_pairs:
+            if not self._has_new_publication(currency_pair, date_from, date_to):
+                logger.info(
+                    f"No ECB publication for '{currency_pair}' since last run, fetch skipped."
+                )
+                continue
+            if currency_pair in unchanged_pairs:
+                logger.info(
+                    f"No new ECB observation for '{currency_pair}' since last run, "
+                    "fetch skipped."
+                )
+                continue
+
+            fetch_key = FetchKey(
+                currency_pair, date_from, date_to, self.data_format, self.frequency
+            )
+            served_key, pair_exchange_rates = self.single_flight.do(
+                fetch_key, partial(self._fetch_exchange_rates, currency_pair)
+            )
+            if served_key != fetch_key:
+                pair_exchange_rates = [
+                    exchange_rate
+                    for exchange_rate in pair_exchange_rates
+                    if date_from <= exchange_rate.date <= date_to
+                ]
+            exchange_rates.extend(pair_exchange_rates)
+            if self.frequency == model.DAILY:
+                self._log_gaps(pair_exchange_rates, currency_pair, date_from, date_to)
+
+        return exchange_rates
+
+    @staticmethod
+    def _check_base_currency(currency_pairs: Iterable[model.CurrencyPair]):
+        """
+        Checks that the base currency of every currency pair is the EURO, the only one the
+        ECB publishes exchange rates against.
+
+        Args:
+            currency_pairs (Iterable[model.CurrencyPair]): The currency pairs requested.
+        Raises:
+            ValueError: if a base currency is not EUR.
+        """
         for currency_pair in currency_pairs:
             if currency_pair.base != "EUR":
                 raise ValueError(
@@ -155,17 +745,371 @@ class EcbApiCaller(AbstractSourceRepository):
                     "Please use the correct currency pair."
                 )
 
-        exchange_rates = []
-        for currency_pair in currency_pairs:
-            response = self._call_to_ecb_api_exchange_rate(currency_pair)
+    def planned_fetches(
+        self, currency_pairs: List[model.CurrencyPair]
+    ) -> list[FetchKey]:
+        """
+        Returns the calls to the API that get_exchange_rates() would make for a list of
+        currency pairs, i.e. one per currency pair with a TARGET2 publication date since its
+        high-water mark, without making them.
 
-            if response.status_code != 200:
-                raise ValueError(
-                    f"ECB API returned status code {response.status_code} for currency pair {currency_pair}"
+        Args:
+            currency_pairs (List[model.CurrencyPair]):
+                List of currency pairs consisting of a base currency and a quote currency.
+        Returns:
+            list[FetchKey]: The calls to make, in the order of the currency pairs.
+        """
+        date_from, date_to = self._date_window()
+        return [
+            FetchKey(
+                currency_pair, date_from, date_to, self.data_format, self.frequency
+            )
+            for currency_pair in dict.fromkeys(currency_pairs)
+            if self._has_new_publication(currency_pair, date_from, date_to)
+        ]
+
+    def _has_new_publication(
+        self, currency_pair: model.CurrencyPair, date_from: dt.date, date_to: dt.date
+    ) -> bool:
+        """
+        Checks whether the ECB may have published exchange rates for a currency pair that
+        have not been seen yet, i.e. whether there is a publication date within the window
+        after the high-water mark of the currency pair. High-water marks are kept for daily
+        series only, so series of other frequencies are always fetched.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair.
+            date_from (dt.date): First date of the window.
+            date_to (dt.date): Last date of the window.
+        Returns:
+            bool: True if the currency pair has to be fetched.
+        """
+        mark = (
+            self.high_water_marks.get(currency_pair)
+            if self.high_water_marks is not None and self.frequency == model.DAILY
+            else None
+        )
+        if mark is None:
+            return True
+
+        return bool(
+            target_calendar.publication_dates(
+                max(date_from, mark + dt.timedelta(days=1)), date_to
+            )
+        )
+
+    def _call_to_ecb_api_latest_observations(
+        self,
+        currency_pairs: List[model.CurrencyPair],
+        date_from: dt.date,
+        date_to: dt.date,
+    ) -> req.models.Response:
+        """
+        Calls the ECB API for the latest daily observation of several currency pairs at
+        once, within a window, without series attributes. Series without observation in
+        the window are left out of the response, and the API answers 404 if none has one.
+
+        Args:
+            currency_pairs (List[model.CurrencyPair]): The currency pairs to probe.
+            date_from (dt.date): First date of the window.
+            date_to (dt.date): Last date of the window.
+        Returns:
+            Response: The HTTP response object.
+        """
+        quotes = "+".join(currency_pair.quote for currency_pair in currency_pairs)
+        bases = "+".join(
+            dict.fromkeys(currency_pair.base for currency_pair in currency_pairs)
+        )
+        return self.session.get(
+            f"{self.base_url}{model.DAILY}.{quotes}.{bases}.SP00.A",
+            params={
+                "startPeriod": date_from.isoformat(),
+                "endPeriod": date_to.isoformat(),
+                "lastNObservations": "1",
+                "detail": "dataonly",
+            },
+            headers={
+                "Accept": self.data_format,
+                "Accept-Encoding": ACCEPT_ENCODING if self.compressed else "identity",
+            },
+            stream=True,
+            timeout=self._deadline.remaining(),
+        )
+
+    def _probe_unchanged_pairs(
+        self,
+        currency_pairs: List[model.CurrencyPair],
+        date_from: dt.date,
+        date_to: dt.date,
+    ) -> set[model.CurrencyPair]:
+        """
+        Probes the ECB API, in a single call, for the latest observation of the currency
+        pairs that have a high-water mark and a TARGET2 publication date since, e.g. runs
+        scheduled before the afternoon publication of the ECB, and returns the ones whose
+        latest observation is not newer than their mark. If the probe fails or its body
+        cannot be parsed, no currency pair is left out, so they are all fetched. The
+        outcome is recorded in attribute probe_stats.
+
+        Args:
+            currency_pairs (List[model.CurrencyPair]): The currency pairs requested.
+            date_from (dt.date): First date of the window.
+            date_to (dt.date): Last date of the window.
+        Returns:
+            set[model.CurrencyPair]: The currency pairs whose full fetch can be skipped.
+        """
+        if self.high_water_marks is None or self.frequency != model.DAILY:
+            return set()
+        marks = {
+            currency_pair: self.high_water_marks.get(currency_pair)
+            for currency_pair in dict.fromkeys(currency_pairs)
+        }
+        marks = {
+            currency_pair: mark
+            for currency_pair, mark in marks.items()
+            if mark is not None
+            and self._has_new_publication(currency_pair, date_from, date_to)
+        }
+        if not marks:
+            return set()
+
+        probe_from = max(date_from, min(marks.values()) + dt.timedelta(days=1))
+        try:
+            response = self._send_with_retry_policy(
+                partial(
+                    self._call_to_ecb_api_latest_observations,
+                    list(marks),
+                    probe_from,
+                    date_to,
+                ),
+                "the freshness probe",
+            )
+        except req.exceptions.RequestException:
+            logger.warning("Freshness probe of the ECB API failed, every pair fetched.")
+            return set()
+        if response.status_code == 404:
+            latest_dates = {}
+        elif response.status_code == 200:
+            try:
+                latest_dates = _latest_observation_dates(iter_body_views(response))
+            except Et.ParseError as error:
+                response.close()
+                logger.warning(
+                    f"Freshness probe of the ECB API returned a malformed body "
+                    f"({error}), every pair fetched."
                 )
+                return set()
+        else:
+            response.close()
+            logger.warning(
+                f"Freshness probe of the ECB API returned status code "
+                f"{response.status_code}, every pair fetched."
+            )
+            return set()
+        compressed_bytes = response.raw.tell()
+        response.close()
+
+        unchanged_pairs = {
+            currency_pair
+            for currency_pair, mark in marks.items()
+            if latest_dates.get(currency_pair.quote, mark) <= mark
+        }
+        self.probe_stats.append(
+            ProbeStats(
+                probed_pairs=len(marks),
+                avoided_fetches=len(unchanged_pairs),
+                compressed_bytes=compressed_bytes,
+            )
+        )
+        logger.info(
+            f"Freshness probe of {len(marks)} currency pairs: "
+            f"{len(unchanged_pairs)} full fetches avoided."
+        )
+
+        return unchanged_pairs
 
-            for exchange_rate in self._xml_to_ecb_rates(response, currency_pair):
-                exchange_rates.append(exchange_rate)
+    @staticmethod
+    def _log_gaps(
+        exchange_rates: List[model.ExchangeRate],
+        currency_pair: model.CurrencyPair,
+        date_from: dt.date,
+        date_to: dt.date,
+    ):
+        """
+        Logs a warning if a publication date of the window has no exchange rate. The last
+        date of the window is not checked, as the ECB publishes in the afternoon.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]): Exchange rates fetched for the currency pair.
+            currency_pair (model.CurrencyPair): The currency pair.
+            date_from (dt.date): First date of the window.
+            date_to (dt.date): Last date of the window.
+        """
+        gaps = target_calendar.find_gaps(
+            exchange_rates, [currency_pair], date_from, date_to - dt.timedelta(days=1)
+        )
+        if gaps:
+            missing_dates = ", ".join(str(date) for date in gaps[currency_pair])
+            logger.warning(
+                f"Missing ECB exchange rates for '{currency_pair}' on: {missing_dates}."
+            )
+
+    def _call_with_retry_policy(
+        self, currency_pair: model.CurrencyPair, frequency: Optional[str] = None
+    ) -> req.models.Response:
+        """
+        Calls the ECB API for a currency pair, retrying on connection errors and transient
+        status codes with exponential backoff while there are attempts, retry budget and
+        time before the deadline left. Every attempt is recorded by the circuit breaker,
+        and no attempt is made while it is open.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair to get exchange rates for.
+            frequency (str, optional): Frequency of the series. Default is attribute frequency.
+        Returns:
+            Response: The HTTP response of the last attempt.
+        Raises:
+            CircuitOpenError: if the circuit breaker is open.
+            DeadlineExceededError: if the deadline of the run has passed.
+        """
+        return self._send_with_retry_policy(
+            partial(self._call_to_ecb_api_exchange_rate, currency_pair, frequency),
+            str(currency_pair),
+        )
+
+    def _send_with_retry_policy(
+        self, call: Callable[[], req.models.Response], description: str
+    ) -> req.models.Response:
+        """
+        Makes a call to the ECB API, retrying on connection errors and transient status
+        codes as described in _call_with_retry_policy().
+
+        Args:
+            call (Callable[[], Response]): Makes an attempt of the call.
+            description (str): What the call fetches, for error messages.
+        Returns:
+            Response: The HTTP response of the last attempt.
+        Raises:
+            CircuitOpenError: if the circuit breaker is open.
+            DeadlineExceededError: if the deadline of the run has passed.
+        """
+        attempt = 0
+        while True:
+            self._deadline.check()
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(
+                    f"Circuit breaker of the ECB API is open, {description} not fetched."
+                )
+
+            attempt += 1
+            outcome_recorded = False
+            try:
+                response = call()
+            except req.exceptions.RequestException as exception:
+                self.circuit_breaker.record_failure()
+                outcome_recorded = True
+                self._deadline.check()
+                if not self._can_retry(attempt):
+                    raise exception
+            else:
+                outcome_recorded = True
+                if response.status_code not in RETRY_STATUSES:
+                    self.circuit_breaker.record_success()
+                    return response
+                self.circuit_breaker.record_failure()
+                if not self._can_retry(attempt):
+                    return response
+                response.close()
+            finally:
+                if not outcome_recorded:
+                    self.circuit_breaker.release_trial()
+
+            backoff = self.retry_policy.backoff_factor * 2 ** (attempt - 1)
+            remaining = self._deadline.remaining()
+            time.sleep(backoff if remaining is None else min(backoff, remaining))
+
+    def _can_retry(self, attempt: int) -> bool:
+        """
+        Checks whether a failed attempt can be retried, spending the retry budget if so.
+
+        Args:
+            attempt (int): Number of attempts made so far.
+        Returns:
+            bool: True if the call can be retried.
+        """
+        if attempt >= self.retry_policy.max_attempts:
+            return False
+        if not self._retry_budget.try_consume():
+            logger.warning("Retry budget of the run exhausted.")
+            return False
+        return True
+
+    def _fetch_exchange_rates(
+        self, currency_pair: model.CurrencyPair
+    ) -> list[model.ExchangeRate]:
+        """
+        Calls the ECB API for a currency pair and parses the response. If the ECB does not
+        publish the series of attribute frequency for the currency pair, the daily series is
+        fetched instead and rolled up into complete periods. The bytes transferred by each
+        call are recorded in attribute transfer_stats.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair to get exchange rates for.
+        Returns:
+            list[model.ExchangeRate]: A list of ExchangeRate instances.
+        """
+        response = self._call_with_retry_policy(currency_pair)
+        if response.status_code == 404 and self.frequency != model.DAILY:
+            response.close()
+            logger.info(
+                f"No '{self.frequency}' series published for '{currency_pair}', "
+                "rolled up from daily rates."
+            )
+            daily_exchange_rates = self._parse_response(
+                self._call_with_retry_policy(currency_pair, model.DAILY),
+                currency_pair,
+                model.DAILY,
+            )
+            return rollups.rollup_exchange_rates(
+                daily_exchange_rates, self.frequency, self._date_window()[1]
+            )
+
+        return self._parse_response(response, currency_pair, self.frequency)
+
+    def _parse_response(
+        self,
+        response: req.models.Response,
+        currency_pair: model.CurrencyPair,
+        frequency: str,
+    ) -> list[model.ExchangeRate]:
+        """
+        Parses the response of a call to the ECB API, recording the bytes transferred in
+        attribute transfer_stats. The body is read within the deadline of the run.
+
+        Args:
+            response (req.models.Response): HTTP response from the ECB API.
+            currency_pair (model.CurrencyPair): The currency pair requested.
+            frequency (str): Frequency of the series requested.
+        Returns:
+            list[model.ExchangeRate]: A list of ExchangeRate instances.
+        Raises:
+            DeadlineExceededError: if the deadline of the run passes while reading the body.
+        """
+        if response.status_code != 200:
+            raise ValueError(
+                f"ECB API returned status code {response.status_code} for currency pair {currency_pair}"
+            )
+
+        chunks = _ByteCounter(iter_body_views(response, deadline=self._deadline))
+        exchange_rates = self._xml_chunks_to_ecb_rates(chunks, currency_pair, frequency)
+
+        self.transfer_stats.append(
+            TransferStats(
+                currency_pair=currency_pair,
+                content_encoding=response.headers.get("Content-Encoding", "identity"),
+                compressed_bytes=response.raw.tell(),
+                uncompressed_bytes=chunks.total,
+            )
+        )
 
         return exchange_rates
 
@@ -178,6 +1122,8 @@ class EcbApiCallerFake(EcbApiCaller):
     Args:
         api_responses (dict): A dictionary mapping currency codes to file paths containing fake API response texts.
         days_to_register (int): Number of days to consider when making the fake API call. Default is 10.
+        frequency (str): Frequency of the series requested. Default is model.DAILY.
+        end_date (dt.date, optional): Last date of the window. Default is the current date.
     Attributes:
         api_responses (dict): A dictionary mapping currency codes to file paths containing fake API responses text.
         days_to_register (int): Number of days to consider when making the fake API call. Default is 10.
@@ -190,32 +1136,439 @@ class EcbApiCallerFake(EcbApiCaller):
             Retrieves exchange rates for a list of currency pairs.
     """
 
-    def __init__(self, api_responses: dict[str, str], days_to_register: int = 10):
-        super().__init__(days_to_register=days_to_register)
+    def __init__(
+        self,
+        api_responses: dict[str, str],
+        days_to_register: int = 10,
+        frequency: str = model.DAILY,
+        end_date: Optional[dt.date] = None,
+    ):
+        super().__init__(
+            days_to_register=days_to_register,
+            data_format=GENERIC_DATA,
+            frequency=frequency,
+            end_date=end_date,
+        )
         self.api_responses = api_responses
 
     def _call_to_ecb_api_exchange_rate(
-        self, currency_pair: model.CurrencyPair
+        self, currency_pair: model.CurrencyPair, frequency: Optional[str] = None
     ) -> req.models.Response:
         """
         Overrides the parent method to return a fake response based on the provided API responses.
+        Responses of daily series are looked up by quote currency, e.g. "GBP", and the ones
+        of other frequencies by frequency and quote currency, e.g. "M.GBP".
 
         Args:
             currency_pairs (model.CurrencyPair):
                 currency pair consisting of a base currency and a quote currency.
+            frequency (str, optional): Frequency of the series. Default is attribute frequency.
         Returns:
             Response: The fake HTTP response object.
         """
         url = "https://data-api.ecb.europa.eu"
-        if currency_pair.quote not in self.api_responses.keys():
+        frequency = frequency or self.frequency
+        response_key = (
+            currency_pair.quote
+            if frequency == model.DAILY
+            else f"{frequency}.{currency_pair.quote}"
+        )
+        if response_key not in self.api_responses.keys():
             with requests_mock.Mocker() as mocker:
                 mocker.get(url, text="not valid", status_code=404)
                 response = req.get(url)
         else:
-            with open(self.api_responses[currency_pair.quote], "r") as f:
+            with open(self.api_responses[response_key], "r") as f:
                 response_text = f.read()
             with requests_mock.Mocker() as mocker:
                 mocker.get(url, text=response_text, status_code=200)
-                response = req.get(url)
+                response = req.get(url, stream=True)
 
         return response
+
+
+class AsyncEcbApiCaller(EcbApiCaller, AbstractAsyncSourceRepository):
+    """
+    Implementation of AbstractAsyncSourceRepository for the ECB API, calling it with an
+    httpx.AsyncClient so no thread waits on the network. Currency pairs are fetched
+    concurrently, at most max_concurrency at a time, and the Exchange Rates of each one
+    are yielded as soon as its response has been parsed. Responses are parsed as their
+    chunks arrive. Windows, formats, frequencies, high-water marks, the retry policy and
+    the circuit breaker work as for EcbApiCaller, whose synchronous get_exchange_rates()
+    is still available. Calls of concurrent iterations are not coalesced.
+
+    Args:
+        days_to_register (int): Number of days to consider when making the API call. Default is 10.
+        data_format (str): SDMX format requested to the API. Default is STRUCTURE_SPECIFIC_DATA.
+        data_only (bool): If True, series and observation attributes are not requested. Default is True.
+        compressed (bool): If True, a gzip compressed response is requested. Default is True.
+        client (httpx.AsyncClient, optional): HTTP client used for the calls, so its
+            connections can be shared between instances. A new one is created if None.
+        high_water_marks (HighWaterMarkStore, optional): Date of the latest exchange rate loaded
+            per currency pair, only read, see EcbApiCaller.
+        retry_policy (RetryPolicy, optional): Retries, retry budget and deadline of each run.
+            Default is RetryPolicy().
+        circuit_breaker (CircuitBreaker, optional): Circuit breaker of the ECB API. A new one
+            is created from retry_policy if None.
+        base_url (str): URL of the EXR dataflow of the API. Default is ECB_API_URL.
+        frequency (str): Frequency of the series requested. Default is model.DAILY.
+        end_date (dt.date, optional): Last date of the window. Default is the current date.
+        max_concurrency (int): Maximum number of calls in flight. Default is 4.
+    Attributes:
+        client (httpx.AsyncClient): HTTP client used for the calls.
+        max_concurrency (int): Maximum number of calls in flight.
+    Methods:
+        iter_exchange_rates(currency_pairs: List[model.CurrencyPair]) -> AsyncIterator[list[model.ExchangeRate]]:
+            Retrieves exchange rates for a list of currency pairs, one batch per currency pair.
+        aclose():
+            Closes the connections of the HTTP client.
+    """
+
+    def __init__(
+        self,
+        days_to_register: int = 10,
+        data_format: str = STRUCTURE_SPECIFIC_DATA,
+        data_only: bool = True,
+        compressed: bool = True,
+        client: Optional[httpx.AsyncClient] = None,
+        high_water_marks: Optional[HighWaterMarkStore] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        base_url: str = ECB_API_URL,
+        frequency: str = model.DAILY,
+        end_date: Optional[dt.date] = None,
+        max_concurrency: int = 4,
+    ):
+        super().__init__(
+            days_to_register=days_to_register,
+            data_format=data_format,
+            data_only=data_only,
+            compressed=compressed,
+            high_water_marks=high_water_marks,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            base_url=base_url,
+            frequency=frequency,
+            end_date=end_date,
+        )
+        self.client = client if client is not None else httpx.AsyncClient()
+        self.max_concurrency = max_concurrency
+
+    async def iter_exchange_rates(
+        self, currency_pairs: List[model.CurrencyPair]
+    ) -> AsyncIterator[list[model.ExchangeRate]]:
+        """
+        Retrieves exchange rates for a list of currency pairs, yielding the Exchange Rates
+        of each currency pair as soon as they are fetched, in the order the calls end.
+        Currency pairs without a TARGET2 publication date since their high-water mark are
+        skipped, and the iteration counts as a run for the retry budget and the deadline.
+        Calls still in flight are cancelled if the iteration is not run to the end.
+
+        Args:
+            currency_pairs (List[model.CurrencyPair]):
+                List of currency pairs consisting of a base currency and a quote currency.
+        Returns:
+            AsyncIterator[list[model.ExchangeRate]]: One batch of ExchangeRate instances
+                per currency pair fetched.
+        """
+        self._check_base_currency(currency_pairs)
+        self._start_run()
+        date_from, date_to = self._date_window()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = []
+        for currency_pair in dict.fromkeys(currency_pairs):
+            if not self._has_new_publication(currency_pair, date_from, date_to):
+                logger.info(
+                    f"No ECB publication for '{currency_pair}' since last run, fetch skipped."
+                )
+                continue
+            tasks.append(
+                asyncio.ensure_future(
+                    self._afetch_exchange_rates(currency_pair, semaphore)
+                )
+            )
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                currency_pair, pair_exchange_rates = await task
+                if self.frequency == model.DAILY:
+                    self._log_gaps(
+                        pair_exchange_rates, currency_pair, date_from, date_to
+                    )
+                yield pair_exchange_rates
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _acall_to_ecb_api_exchange_rate(
+        self, currency_pair: model.CurrencyPair, frequency: Optional[str] = None
+    ) -> httpx.Response:
+        """
+        Calls the ECB API to get exchange rates for a specific currency pair. The response
+        is returned once its headers are read, and its body is streamed as it is parsed.
+        The call times out at the deadline of the run.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair to get exchange rates for.
+            frequency (str, optional): Frequency of the series. Default is attribute frequency.
+        Returns:
+            httpx.Response: The HTTP response.
+        """
+        ecb_url, params, headers = self._request_arguments(
+            currency_pair, frequency or self.frequency
+        )
+        headers["Accept-Encoding"] = (
+            ASYNC_ACCEPT_ENCODING if self.compressed else "identity"
+        )
+        request = self.client.build_request(
+            "GET",
+            ecb_url,
+            params=params,
+            headers=headers,
+            timeout=self._deadline.remaining(),
+        )
+        return await self.client.send(request, stream=True)
+
+    async def _acall_with_retry_policy(
+        self, currency_pair: model.CurrencyPair, frequency: Optional[str] = None
+    ) -> httpx.Response:
+        """
+        Calls the ECB API for a currency pair, retrying as _call_with_retry_policy() does,
+        without blocking the event loop between attempts.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair to get exchange rates for.
+            frequency (str, optional): Frequency of the series. Default is attribute frequency.
+        Returns:
+            httpx.Response: The HTTP response of the last attempt.
+        Raises:
+            CircuitOpenError: if the circuit breaker is open.
+            DeadlineExceededError: if the deadline of the run has passed.
+        """
+        attempt = 0
+        while True:
+            self._deadline.check()
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(
+                    f"Circuit breaker of the ECB API is open, {currency_pair} not fetched."
+                )
+
+            attempt += 1
+            outcome_recorded = False
+            try:
+                response = await self._acall_to_ecb_api_exchange_rate(
+                    currency_pair, frequency
+                )
+            except httpx.TransportError as exception:
+                self.circuit_breaker.record_failure()
+                outcome_recorded = True
+                self._deadline.check()
+                if not self._can_retry(attempt):
+                    raise exception
+            else:
+                outcome_recorded = True
+                if response.status_code not in RETRY_STATUSES:
+                    self.circuit_breaker.record_success()
+                    return response
+                self.circuit_breaker.record_failure()
+                if not self._can_retry(attempt):
+                    return response
+                await response.aclose()
+            finally:
+                if not outcome_recorded:
+                    self.circuit_breaker.release_trial()
+
+            backoff = self.retry_policy.backoff_factor * 2 ** (attempt - 1)
+            remaining = self._deadline.remaining()
+            await asyncio.sleep(
+                backoff if remaining is None else min(backoff, remaining)
+            )
+
+    async def _afetch_exchange_rates(
+        self, currency_pair: model.CurrencyPair, semaphore: asyncio.Semaphore
+    ) -> Tuple[model.CurrencyPair, list[model.ExchangeRate]]:
+        """
+        Calls the ECB API for a currency pair and parses the response once the semaphore is
+        acquired, rolling daily rates up as _fetch_exchange_rates() does if the series of
+        attribute frequency is not published.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair to get exchange rates for.
+            semaphore (asyncio.Semaphore): Bounds the number of calls in flight.
+        Returns:
+            Tuple[model.CurrencyPair, list[model.ExchangeRate]]: The currency pair and
+                its Exchange Rates.
+        """
+        async with semaphore:
+            response = await self._acall_with_retry_policy(currency_pair)
+            if response.status_code == 404 and self.frequency != model.DAILY:
+                await response.aclose()
+                logger.info(
+                    f"No '{self.frequency}' series published for '{currency_pair}', "
+                    "rolled up from daily rates."
+                )
+                daily_exchange_rates = await self._aparse_response(
+                    await self._acall_with_retry_policy(currency_pair, model.DAILY),
+                    currency_pair,
+                    model.DAILY,
+                )
+                return currency_pair, rollups.rollup_exchange_rates(
+                    daily_exchange_rates, self.frequency, self._date_window()[1]
+                )
+
+            return currency_pair, await self._aparse_response(
+                response, currency_pair, self.frequency
+            )
+
+    async def _aparse_response(
+        self,
+        response: httpx.Response,
+        currency_pair: model.CurrencyPair,
+        frequency: str,
+    ) -> list[model.ExchangeRate]:
+        """
+        Parses the response of a call to the ECB API as its chunks arrive, within the
+        deadline of the run, recording the bytes transferred in attribute transfer_stats,
+        then closes the response.
+
+        Args:
+            response (httpx.Response): HTTP response from the ECB API.
+            currency_pair (model.CurrencyPair): The currency pair requested.
+            frequency (str): Frequency of the series requested.
+        Returns:
+            list[model.ExchangeRate]: A list of ExchangeRate instances.
+        """
+        if response.status_code != 200:
+            await response.aclose()
+            raise ValueError(
+                f"ECB API returned status code {response.status_code} for currency pair {currency_pair}"
+            )
+
+        parser = _ObservationParser(currency_pair, frequency)
+        uncompressed_bytes = 0
+
+        async def read_body():
+            nonlocal uncompressed_bytes
+            async for chunk in response.aiter_bytes(RESPONSE_CHUNK_SIZE):
+                uncompressed_bytes += len(chunk)
+                parser.feed(chunk)
+
+        try:
+            await asyncio.wait_for(read_body(), self._deadline.remaining())
+        except asyncio.TimeoutError as error:
+            raise DeadlineExceededError(
+                "Run deadline exceeded while reading a response."
+            ) from error
+        finally:
+            await response.aclose()
+        exchange_rates = parser.close()
+
+        self.transfer_stats.append(
+            TransferStats(
+                currency_pair=currency_pair,
+                content_encoding=response.headers.get("content-encoding", "identity"),
+                compressed_bytes=response.num_bytes_downloaded,
+                uncompressed_bytes=uncompressed_bytes,
+            )
+        )
+
+        return exchange_rates
+
+    async def aclose(self):
+        """
+        Closes the connections of the HTTP client.
+        """
+        await self.client.aclose()
+
+
+class AsyncEcbApiCallerFake(AsyncEcbApiCaller):
+    """
+    Fake implementation of AsyncEcbApiCaller for testing purposes, answering calls with the
+    content of files instead of calling the API.
+
+    Args:
+        api_responses (dict): A dictionary mapping quote currencies, e.g. "GBP", or frequencies
+            and quote currencies, e.g. "M.GBP", to files containing fake API responses.
+        days_to_register (int): Number of days to consider when making the fake API call. Default is 10.
+        frequency (str): Frequency of the series requested. Default is model.DAILY.
+    Attributes:
+        api_responses (dict): A dictionary mapping currencies to files of fake API responses.
+    Methods:
+        _acall_to_ecb_api_exchange_rate(currency_pair, frequency) -> httpx.Response:
+            Overrides the parent method to return a fake response based on the provided API responses.
+    """
+
+    def __init__(
+        self,
+        api_responses: dict[str, str],
+        days_to_register: int = 10,
+        frequency: str = model.DAILY,
+    ):
+        super().__init__(
+            days_to_register=days_to_register,
+            data_format=GENERIC_DATA,
+            frequency=frequency,
+        )
+        self.api_responses = api_responses
+
+    async def _acall_to_ecb_api_exchange_rate(
+        self, currency_pair: model.CurrencyPair, frequency: Optional[str] = None
+    ) -> httpx.Response:
+        """
+        Overrides the parent method to return a fake response based on the provided API
+        responses, looked up as in EcbApiCallerFake, or a 404 response if there is none.
+
+        Args:
+            currency_pair (model.CurrencyPair):
+                currency pair consisting of a base currency and a quote currency.
+            frequency (str, optional): Frequency of the series. Default is attribute frequency.
+        Returns:
+            httpx.Response: The fake HTTP response.
+        """
+        frequency = frequency or self.frequency
+        response_key = (
+            currency_pair.quote
+            if frequency == model.DAILY
+            else f"{frequency}.{currency_pair.quote}"
+        )
+        if response_key not in self.api_responses:
+            return httpx.Response(404, content=b"not valid")
+
+        with open(self.api_responses[response_key], "rb") as f:
+            return httpx.Response(200, content=f.read())
+
+
+class SyncToAsyncSourceRepository(AbstractAsyncSourceRepository):
+    """
+    Adapts an AbstractSourceRepository to AbstractAsyncSourceRepository, calling its
+    get_exchange_rates() in a worker thread so the event loop is not blocked. The Exchange
+    Rates are yielded as a single batch.
+
+    Args:
+        source_repository (AbstractSourceRepository): The synchronous source repository.
+    Attributes:
+        source_repository (AbstractSourceRepository): The synchronous source repository.
+    Methods:
+        iter_exchange_rates(currency_pairs: List[model.CurrencyPair]) -> AsyncIterator[list[model.ExchangeRate]]:
+            Retrieves exchange rates for a list of currency pairs, in a single batch.
+    """
+
+    def __init__(self, source_repository: AbstractSourceRepository):
+        self.source_repository = source_repository
+
+    async def iter_exchange_rates(
+        self, currency_pairs: List[model.CurrencyPair]
+    ) -> AsyncIterator[list[model.ExchangeRate]]:
+        """
+        Retrieves exchange rates for a list of currency pairs in a worker thread.
+
+        Args:
+            currency_pairs (List[model.CurrencyPair]):
+                List of currency pairs consisting of a base currency and a quote currency.
+        Returns:
+            AsyncIterator[list[model.ExchangeRate]]: A single batch of ExchangeRate instances.
+        """
+        yield await asyncio.to_thread(
+            self.source_repository.get_exchange_rates, currency_pairs
+        )
@@ -0,0 +1,121 @@
+import datetime as dt
+from typing import Iterable, List
+
+from src import model
+
+
+def easter_sunday(year: int) -> dt.date:
+    """
+    Computes the date of Easter Sunday in the Gregorian calendar (anonymous Gregorian algorithm).
+
+    Args:
+        year (int): The year.
+    Returns:
+        dt.date: Easter Sunday of the year.
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    n = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * n) // 451
+    month, day = divmod(h + n - 7 * m + 114, 31)
+
+    return dt.date(year, month, day + 1)
+
+
+def target_holidays(year: int) -> set[dt.date]:
+    """
+    Returns the TARGET2 closing days of a year: New Year's Day, Good Friday, Easter Monday,
+    Labour Day, Christmas Day and Boxing Day. The ECB does not publish reference exchange
+    rates on these days.
+
+    Args:
+        year (int): The year.
+    Returns:
+        set[dt.date]: TARGET2 closing days of the year.
+    """
+    easter = easter_sunday(year)
+
+    return {
+        dt.date(year, 1, 1),
+        easter - dt.timedelta(days=2),
+        easter + dt.timedelta(days=1),
+        dt.date(year, 5, 1),
+        dt.date(year, 12, 25),
+        dt.date(year, 12, 26),
+    }
+
+
+def is_publication_day(date: dt.date) -> bool:
+    """
+    Checks whether the ECB publishes reference exchange rates on a date, i.e. it is a
+    weekday and not a TARGET2 closing day.
+
+    Args:
+        date (dt.date): The date.
+    Returns:
+        bool: True if the ECB publishes on the date.
+    """
+    return date.weekday() < 5 and date not in target_holidays(date.year)
+
+
+def publication_dates(date_from: dt.date, date_to: dt.date) -> List[dt.date]:
+    """
+    Returns the dates on which the ECB publishes reference exchange rates within a window.
+
+    Args:
+        date_from (dt.date): First date of the window, inclusive.
+        date_to (dt.date): Last date of the window, inclusive.
+    Returns:
+        List[dt.date]: publication dates of the window, in order.
+    """
+    holidays: set[dt.date] = set()
+    for year in range(date_from.year, date_to.year + 1):
+        holidays |= target_holidays(year)
+
+    return [
+        date
+        for date in (
+            date_from + dt.timedelta(days=offset)
+            for offset in range((date_to - date_from).days + 1)
+        )
+        if date.weekday() < 5 and date not in holidays
+    ]
+
+
+def find_gaps(
+    exchange_rates: Iterable[model.ExchangeRate],
+    currency_pairs: Iterable[model.CurrencyPair],
+    date_from: dt.date,
+    date_to: dt.date,
+) -> dict[model.CurrencyPair, List[dt.date]]:
+    """
+    Finds the publication dates of a window for which a currency pair has no exchange rate.
+
+    Args:
+        exchange_rates (Iterable[model.ExchangeRate]): The exchange rates observed.
+        currency_pairs (Iterable[model.CurrencyPair]): The currency pairs expected.
+        date_from (dt.date): First date of the window, inclusive.
+        date_to (dt.date): Last date of the window, inclusive.
+    Returns:
+        dict[model.CurrencyPair, List[dt.date]]: missing publication dates of each currency
+            pair with gaps.
+    """
+    observed: dict[model.CurrencyPair, set[dt.date]] = {
+        currency_pair: set() for currency_pair in currency_pairs
+    }
+    for exchange_rate in exchange_rates:
+        if exchange_rate.currency_pair in observed:
+            observed[exchange_rate.currency_pair].add(exchange_rate.date)
+
+    expected = publication_dates(date_from, date_to)
+    gaps = {
+        currency_pair: [date for date in expected if date not in dates]
+        for currency_pair, dates in observed.items()
+    }
+
+    return {currency_pair: dates for currency_pair, dates in gaps.items() if dates}
@@ -1,5 +1,9 @@
+from google.api_core.exceptions import BadRequest, ServiceUnavailable
 from google.cloud import bigquery
-from typing import Optional
+from typing import IO, Iterable, Iterator, Optional
+import datetime as dt
+import json
+from src import model
 
 
 def create_bigquery_client(project_id: Optional[str] = None) -> bigquery.Client:
@@ -11,3 +15,143 @@ def create_bigquery_client(project_id: Optional[str] = None) -> bigquery.Client:
         google.cloud.bigquery.Client: A client for interacting with Google BigQuery.
     """
     return bigquery.Client(project=project_id)
+
+
+class LoadJobFake:
+    """
+    Fake of google.cloud.bigquery.LoadJob and QueryJob returned by BigQueryClientFake.
+
+    Args:
+        exception (Optional[Exception]): Exception to raise when waiting for the job result.
+    """
+
+    def __init__(self, exception: Optional[Exception] = None):
+        self.exception = exception
+
+    def result(self):
+        if self.exception is not None:
+            raise self.exception
+        return self
+
+
+class BigQueryClientFake:
+    """
+    Fake of google.cloud.bigquery.Client for testing purposes. Load jobs do not reach
+    BigQuery: rows are kept in memory per destination table.
+
+    Args:
+        failing_loads (Iterable[int]): 0-based indexes of the load jobs that must fail,
+            with a transient ServiceUnavailable error.
+        rejected_loads (Iterable[int]): 0-based indexes of the load jobs that must fail,
+            with a BadRequest error, as for rows BigQuery cannot parse.
+    Attributes:
+        tables (dict[str, list[dict]]): Rows loaded per destination table.
+        loads (list[tuple[str, int]]): Destination table and number of rows of each load job,
+            including the failed ones.
+        queries (list[tuple[str, dict]]): Statement and parameters of each query job.
+        failing_loads (set[int]): 0-based indexes of the load jobs that must fail.
+        rejected_loads (set[int]): 0-based indexes of the load jobs that must be rejected.
+    """
+
+    def __init__(
+        self, failing_loads: Iterable[int] = (), rejected_loads: Iterable[int] = ()
+    ):
+        self.tables: dict[str, list[dict]] = {}
+        self.loads: list[tuple[str, int]] = []
+        self.queries: list[tuple[str, dict]] = []
+        self.failing_loads = set(failing_loads)
+        self.rejected_loads = set(rejected_loads)
+
+    def load_table_from_json(
+        self, json_rows: list[dict], destination: str, job_config=None
+    ) -> LoadJobFake:
+        """
+        Fakes the load of rows into a destination table.
+
+        Args:
+            json_rows (list[dict]): rows to load.
+            destination (str): destination table.
+            job_config (bigquery.LoadJobConfig, optional): configuration of the job, ignored.
+        Returns:
+            LoadJobFake: the fake load job.
+        """
+        load_index = len(self.loads)
+        self.loads.append((destination, len(json_rows)))
+        if load_index in self.failing_loads:
+            return LoadJobFake(ServiceUnavailable(f"Load job {load_index} failed."))
+        if load_index in self.rejected_loads:
+            return LoadJobFake(BadRequest(f"Load job {load_index} rejected."))
+
+        self.tables.setdefault(destination, []).extend(json_rows)
+        return LoadJobFake()
+
+    def load_table_from_file(
+        self, file_obj: IO[bytes], destination: str, size=None, job_config=None
+    ) -> LoadJobFake:
+        """
+        Fakes the load of a newline delimited JSON file into a destination table.
+
+        Args:
+            file_obj (IO[bytes]): newline delimited JSON rows to load.
+            destination (str): destination table.
+            size (int, optional): number of bytes to read, ignored.
+            job_config (bigquery.LoadJobConfig, optional): configuration of the job, ignored.
+        Returns:
+            LoadJobFake: the fake load job.
+        """
+        json_rows = [json.loads(line) for line in file_obj.read().splitlines()]
+        return self.load_table_from_json(json_rows, destination, job_config)
+
+    def query(self, query: str, job_config=None) -> LoadJobFake:
+        """
+        Fakes a query job. Only the DELETE statements of BiqQueryDestinationRepository are
+        run: rows of the table whose date and currency pair are within the @dates and
+        @currency_pairs parameters, and frequency within the @frequencies one if given,
+        are removed.
+
+        Args:
+            query (str): statement of the query.
+            job_config (bigquery.QueryJobConfig, optional): configuration with the parameters.
+        Returns:
+            LoadJobFake: the fake query job.
+        """
+        parameters = {
+            parameter.name: parameter.values
+            for parameter in (job_config.query_parameters if job_config else [])
+        }
+        self.queries.append((query, parameters))
+        if query.startswith("DELETE FROM"):
+            table = query.split("`")[1]
+            dates = {date.isoformat() for date in parameters["dates"]}
+            currency_pairs = set(parameters["currency_pairs"])
+            frequencies = parameters.get("frequencies")
+            self.tables[table] = [
+                row
+                for row in self.tables.get(table, [])
+                if row["date"] not in dates
+                or f"{row['base_currency']}/{row['quote_currency']}"
+                not in currency_pairs
+                or (
+                    frequencies is not None
+                    and row.get("frequency", model.DAILY) not in frequencies
+                )
+            ]
+        return LoadJobFake()
+
+    def list_rows(self, table: str) -> Iterator[dict]:
+        """
+        Fakes the listing of the rows of a table. Columns date and creation_date are
+        returned as dates and datetimes, as BigQuery does for DATE and TIMESTAMP columns.
+
+        Args:
+            table (str): the table.
+        Returns:
+            Iterator[dict]: the rows of the table.
+        """
+        for row in self.tables.get(table, []):
+            row = dict(row)
+            if isinstance(row.get("date"), str):
+                row["date"] = dt.date.fromisoformat(row["date"])
+            if isinstance(row.get("creation_date"), str):
+                row["creation_date"] = dt.datetime.fromisoformat(row["creation_date"])
+            yield row
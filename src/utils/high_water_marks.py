@@ -0,0 +1,62 @@
+import datetime as dt
+import json
+import os
+from typing import Optional
+
+from src import model
+
+
+class HighWaterMarkStore:
+    """
+    Keeps, in a local JSON file, the date of the latest exchange rate loaded for each currency
+    pair, so later runs can tell whether there is anything new to fetch.
+
+    Args:
+        file_path (str): Path to the JSON file. It is created on the first update.
+    Attributes:
+        file_path (str): Path to the JSON file.
+    Methods:
+        get(currency_pair: model.CurrencyPair) -> Optional[dt.date]:
+            Returns the high-water mark of a currency pair.
+        update(currency_pair: model.CurrencyPair, date: dt.date):
+            Moves forward the high-water mark of a currency pair.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._marks: dict[str, str] = {}
+        if os.path.isfile(file_path):
+            with open(file_path, "r") as f:
+                self._marks = json.load(f)
+
+    def get(self, currency_pair: model.CurrencyPair) -> Optional[dt.date]:
+        """
+        Returns the date of the latest exchange rate loaded for a currency pair.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair.
+        Returns:
+            Optional[dt.date]: the high-water mark, None if the currency pair has never been loaded.
+        """
+        mark = self._marks.get(str(currency_pair))
+
+        return dt.date.fromisoformat(mark) if mark else None
+
+    def update(self, currency_pair: model.CurrencyPair, date: dt.date):
+        """
+        Moves forward the high-water mark of a currency pair and persists it. Dates older
+        than the current mark are ignored.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair.
+            date (dt.date): Date of the latest exchange rate loaded.
+        """
+        mark = self.get(currency_pair)
+        if mark is not None and mark >= date:
+            return
+
+        self._marks[str(currency_pair)] = date.isoformat()
+        temporary_path = f"{self.file_path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self._marks, f, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.file_path)
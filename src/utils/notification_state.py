@@ -0,0 +1,131 @@
+import sqlite3
+from typing import Iterable, Tuple
+
+
+# Currency pair, date in ISO format and frequency, identifying a notified observation.
+NotificationKey = Tuple[str, str, str]
+
+
+class NotificationStateStore:
+    """
+    Keeps, in a local SQLite file, the value of each observation notified and the rates
+    of the messages that failed to be published, so a notifier run by a new process, e.g.
+    the next run of the CLI, neither notifies the same rates again nor loses the failed ones.
+
+    Args:
+        database_path (str): Path to the SQLite file. Use ":memory:" for an in-memory database.
+    Attributes:
+        connection (sqlite3.Connection): Connection to the SQLite database.
+    Methods:
+        get_notified_values(keys: Iterable[NotificationKey]) -> dict[NotificationKey, float]:
+            Returns the values notified for observations.
+        put_notified(rates: Iterable[Tuple[str, str, str, float]]):
+            Stores the values notified, and removes the observations from the pending rates.
+        get_pending() -> list[Tuple[str, str, str, float, bool]]:
+            Returns the rates waiting for a failed message to be published.
+        replace_pending(rates: Iterable[Tuple[str, str, str, float, bool]]):
+            Replaces the rates waiting for a failed message to be published.
+    """
+
+    def __init__(self, database_path: str):
+        self.connection = sqlite3.connect(database_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS notified_rates ("
+            "pair TEXT NOT NULL, "
+            "date TEXT NOT NULL, "
+            "frequency TEXT NOT NULL, "
+            "value REAL NOT NULL, "
+            "PRIMARY KEY (pair, date, frequency)"
+            ") WITHOUT ROWID"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS pending_notified_rates ("
+            "pair TEXT NOT NULL, "
+            "date TEXT NOT NULL, "
+            "frequency TEXT NOT NULL, "
+            "value REAL NOT NULL, "
+            "revised INTEGER NOT NULL, "
+            "PRIMARY KEY (pair, date, frequency)"
+            ") WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def get_notified_values(
+        self, keys: Iterable[NotificationKey]
+    ) -> dict[NotificationKey, float]:
+        """
+        Returns the values notified for observations.
+
+        Args:
+            keys (Iterable[NotificationKey]): currency pair, date and frequency of each
+                observation.
+        Returns:
+            dict[NotificationKey, float]: value of each observation notified before.
+        """
+        values = {}
+        for key in set(keys):
+            row = self.connection.execute(
+                "SELECT value FROM notified_rates "
+                "WHERE pair = ? AND date = ? AND frequency = ?",
+                key,
+            ).fetchone()
+            if row is not None:
+                values[key] = row[0]
+        return values
+
+    def put_notified(self, rates: Iterable[Tuple[str, str, str, float]]):
+        """
+        Stores the values notified in a single transaction, replacing the ones stored for
+        the same observations, and removes the observations from the pending rates.
+
+        Args:
+            rates (Iterable[Tuple[str, str, str, float]]): currency pair, date, frequency
+                and value of each observation notified.
+        """
+        rates = list(rates)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO notified_rates (pair, date, frequency, value) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (pair, date, frequency) DO UPDATE SET value = excluded.value",
+                rates,
+            )
+            self.connection.executemany(
+                "DELETE FROM pending_notified_rates "
+                "WHERE pair = ? AND date = ? AND frequency = ?",
+                (rate[:3] for rate in rates),
+            )
+
+    def get_pending(self) -> list[Tuple[str, str, str, float, bool]]:
+        """
+        Returns the rates waiting for a failed message to be published.
+
+        Returns:
+            list[Tuple[str, str, str, float, bool]]: currency pair, date, frequency, value
+                and whether it is a revision, of each pending rate.
+        """
+        cursor = self.connection.execute(
+            "SELECT pair, date, frequency, value, revised FROM pending_notified_rates "
+            "ORDER BY pair, frequency, date"
+        )
+        return [
+            (pair, date, frequency, value, bool(revised))
+            for pair, date, frequency, value, revised in cursor
+        ]
+
+    def replace_pending(self, rates: Iterable[Tuple[str, str, str, float, bool]]):
+        """
+        Replaces the rates waiting for a failed message to be published, in a single
+        transaction.
+
+        Args:
+            rates (Iterable[Tuple[str, str, str, float, bool]]): currency pair, date,
+                frequency, value and whether it is a revision, of each pending rate.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM pending_notified_rates")
+            self.connection.executemany(
+                "INSERT INTO pending_notified_rates "
+                "(pair, date, frequency, value, revised) VALUES (?, ?, ?, ?, ?)",
+                rates,
+            )
@@ -0,0 +1,119 @@
+import datetime as dt
+import sqlite3
+from typing import Iterable, Tuple
+
+from src import model
+
+
+class ObservationHashStore:
+    """
+    Keeps, in a local SQLite file, a hash of the value of each observation loaded per currency
+    pair, date and frequency, so later runs can tell new, revised and unchanged observations
+    apart without reading the destination. Rates of longer periods are dated on the first day
+    of the period, so the frequency keeps them apart from the daily rate of that date. Files
+    created before frequencies were supported are migrated, their hashes taken as daily.
+
+    Args:
+        database_path (str): Path to the SQLite file. Use ":memory:" for an in-memory database.
+    Attributes:
+        connection (sqlite3.Connection): Connection to the SQLite database.
+    Methods:
+        get_hashes(currency_pair: model.CurrencyPair, date_from: dt.date, date_to: dt.date, frequency: str) -> dict[dt.date, int]:
+            Returns the hashes of a currency pair and frequency within a date range.
+        put_hashes(hashes: Iterable[Tuple[model.CurrencyPair, dt.date, str, int]]):
+            Stores the hashes of observations, replacing the previous ones.
+    """
+
+    def __init__(self, database_path: str):
+        self.connection = sqlite3.connect(database_path)
+        columns = {
+            row[1]
+            for row in self.connection.execute("PRAGMA table_info(observation_hashes)")
+        }
+        migrated = bool(columns) and "frequency" not in columns
+        self.connection.execute("BEGIN")
+        if migrated:
+            self.connection.execute(
+                "ALTER TABLE observation_hashes RENAME TO observation_hashes_v1"
+            )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS observation_hashes ("
+            "base_currency TEXT NOT NULL, "
+            "quote_currency TEXT NOT NULL, "
+            "date TEXT NOT NULL, "
+            "frequency TEXT NOT NULL, "
+            "hash INTEGER NOT NULL, "
+            "PRIMARY KEY (base_currency, quote_currency, frequency, date)"
+            ") WITHOUT ROWID"
+        )
+        if migrated:
+            self.connection.execute(
+                "INSERT INTO observation_hashes "
+                "(base_currency, quote_currency, date, frequency, hash) "
+                f"SELECT base_currency, quote_currency, date, '{model.DAILY}', hash "
+                "FROM observation_hashes_v1"
+            )
+            self.connection.execute("DROP TABLE observation_hashes_v1")
+        self.connection.commit()
+
+    def get_hashes(
+        self,
+        currency_pair: model.CurrencyPair,
+        date_from: dt.date,
+        date_to: dt.date,
+        frequency: str = model.DAILY,
+    ) -> dict[dt.date, int]:
+        """
+        Returns the hashes stored for a currency pair and frequency within a date range.
+
+        Args:
+            currency_pair (model.CurrencyPair): The currency pair.
+            date_from (dt.date): First date of the range, inclusive.
+            date_to (dt.date): Last date of the range, inclusive.
+            frequency (str): Frequency of the observations. Default is model.DAILY.
+        Returns:
+            dict[dt.date, int]: hash of each date that has one.
+        """
+        cursor = self.connection.execute(
+            "SELECT date, hash FROM observation_hashes "
+            "WHERE base_currency = ? AND quote_currency = ? AND frequency = ? "
+            "AND date >= ? AND date <= ?",
+            (
+                currency_pair.base,
+                currency_pair.quote,
+                frequency,
+                date_from.isoformat(),
+                date_to.isoformat(),
+            ),
+        )
+        return {dt.date.fromisoformat(date): value for date, value in cursor}
+
+    def put_hashes(
+        self, hashes: Iterable[Tuple[model.CurrencyPair, dt.date, str, int]]
+    ):
+        """
+        Stores the hashes of observations in a single transaction, replacing the ones
+        stored for the same currency pairs, dates and frequencies.
+
+        Args:
+            hashes (Iterable[Tuple[model.CurrencyPair, dt.date, str, int]]): currency
+                pair, date, frequency and hash of each observation.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO observation_hashes "
+                "(base_currency, quote_currency, date, frequency, hash) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (base_currency, quote_currency, frequency, date) "
+                "DO UPDATE SET hash = excluded.hash",
+                (
+                    (
+                        currency_pair.base,
+                        currency_pair.quote,
+                        date.isoformat(),
+                        frequency,
+                        value,
+                    )
+                    for currency_pair, date, frequency, value in hashes
+                ),
+            )
@@ -0,0 +1,235 @@
+from collections import Counter
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, ContextManager, Mapping, Optional, Sequence
+
+from src.utils.logs import default_module_logger
+
+
+logger = default_module_logger(__file__)
+
+
+class StackSampler:
+    """
+    Sampling profiler of a thread: a background thread records the stack of the profiled
+    thread at a fixed interval, and stacks are counted in the collapsed format read by
+    flamegraph tools, one line per distinct stack with its frames from the root separated
+    by semicolons, followed by its number of samples.
+
+    Args:
+        interval (float): Seconds between samples. Default is 0.005.
+        thread_id (int, optional): Identifier of the thread to sample. Default is the
+            thread creating the sampler.
+    Attributes:
+        samples (Counter[str]): Number of samples of each collapsed stack.
+    Methods:
+        start():
+            Starts sampling.
+        stop():
+            Stops sampling.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def start(self):
+        """
+        Starts sampling.
+        """
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling, waiting for the sampling thread to finish.
+        """
+        self._stopped.set()
+        self._thread.join()
+
+    def _sample(self):
+        """
+        Records the stack of the profiled thread until stopped.
+        """
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if frames:
+                self.samples[";".join(reversed(frames))] += 1
+
+
+class Profiler:
+    """
+    Profiles a run with cProfile and a StackSampler, and optionally tracemalloc, and writes
+    its reports into a directory when stopped:
+
+    - profile.pstats: raw cProfile statistics, readable with pstats or snakeviz.
+    - flamegraph.collapsed: sampled stacks in collapsed format, e.g. for flamegraph.pl.
+    - functions.txt: top functions by cumulative time.
+    - allocations.txt: top lines by memory allocated and still held, if memory is True.
+    - stages.txt: cumulative time of each stage of the run, also logged.
+
+    Args:
+        output_directory (str): Directory of the reports. It is created if it does not exist.
+        memory (bool): Whether to trace memory allocations. Default is False.
+        top (int): Number of rows of the function and allocation tables. Default is 25.
+        stages (Mapping[str, Sequence[Callable]], optional): Functions whose cumulative
+            time makes each stage of the run, e.g.
+            {"fetch": [EcbApiCaller.get_exchange_rates]}. No stage if None.
+        sampling_interval (float): Seconds between stack samples. Default is 0.005.
+    Methods:
+        start():
+            Starts profiling the calling thread.
+        stop() -> dict[str, str]:
+            Stops profiling and writes the reports.
+    """
+
+    def __init__(
+        self,
+        output_directory: str,
+        memory: bool = False,
+        top: int = 25,
+        stages: Optional[Mapping[str, Sequence[Callable]]] = None,
+        sampling_interval: float = 0.005,
+    ):
+        self.output_directory = output_directory
+        self.memory = memory
+        self.top = top
+        self.stages = stages if stages is not None else {}
+        self._profile = cProfile.Profile()
+        self._sampler = StackSampler(sampling_interval)
+        self._started_at = 0.0
+
+    def start(self):
+        """
+        Starts profiling the calling thread.
+        """
+        if self.memory:
+            tracemalloc.start(25)
+        self._sampler.start()
+        self._started_at = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self) -> dict[str, str]:
+        """
+        Stops profiling and writes the reports into the output directory.
+
+        Returns:
+            dict[str, str]: path of each report written, by name.
+        """
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._started_at
+        self._sampler.stop()
+        allocations = None
+        if self.memory:
+            allocations = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+        os.makedirs(self.output_directory, exist_ok=True)
+        paths = {
+            name: os.path.join(self.output_directory, file_name)
+            for name, file_name in (
+                ("pstats", "profile.pstats"),
+                ("flamegraph", "flamegraph.collapsed"),
+                ("functions", "functions.txt"),
+                ("stages", "stages.txt"),
+            )
+        }
+        self._profile.dump_stats(paths["pstats"])
+        with open(paths["flamegraph"], "w") as f:
+            for stack, count in self._sampler.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        report = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        with open(paths["functions"], "w") as f:
+            f.write(report.getvalue())
+
+        stage_lines = self._stage_summary(stats, elapsed)
+        with open(paths["stages"], "w") as f:
+            f.write("\n".join(stage_lines) + "\n")
+        for line in stage_lines:
+            logger.info(line)
+
+        if allocations is not None:
+            paths["allocations"] = os.path.join(
+                self.output_directory, "allocations.txt"
+            )
+            with open(paths["allocations"], "w") as f:
+                for statistic in allocations.statistics("lineno")[: self.top]:
+                    f.write(f"{statistic}\n")
+
+        logger.info(f"Profile reports written to '{self.output_directory}'.")
+        return paths
+
+    def _stage_summary(self, stats: pstats.Stats, elapsed: float) -> list[str]:
+        """
+        Sums the cumulative time of the functions of each stage, matching them with the
+        statistics of cProfile by file, first line and name of their code.
+
+        Args:
+            stats (pstats.Stats): The statistics of the run.
+            elapsed (float): Duration of the run, in seconds.
+        Returns:
+            list[str]: One line per stage, then one for the whole run.
+        """
+        lines = []
+        for stage, functions in self.stages.items():
+            keys = {
+                (code.co_filename, code.co_firstlineno, code.co_name)
+                for code in (function.__code__ for function in functions)
+            }
+            seconds = sum(stats.stats[key][3] for key in keys if key in stats.stats)
+            share = seconds / elapsed if elapsed else 0.0
+            lines.append(f"stage {stage}: {seconds:.3f}s ({share:.0%})")
+        lines.append(f"run: {elapsed:.3f}s")
+
+        return lines
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def profiler_from_environment(
+    environment: Mapping[str, str],
+    stages: Optional[Mapping[str, Sequence[Callable]]] = None,
+) -> ContextManager:
+    """
+    Returns a Profiler writing into the directory of the PROFILE_DIR environment variable,
+    tracing memory if PROFILE_MEMORY is set to a non empty value, or a context that does
+    nothing if PROFILE_DIR is not set.
+
+    Args:
+        environment (Mapping[str, str]): The environment variables, e.g. os.environ.
+        stages (Mapping[str, Sequence[Callable]], optional): Functions of each stage of
+            the run. No stage if None.
+    Returns:
+        ContextManager: The profiler, or a context that does nothing.
+    """
+    output_directory = environment.get("PROFILE_DIR")
+    if not output_directory:
+        return contextlib.nullcontext()
+
+    return Profiler(
+        output_directory,
+        memory=bool(environment.get("PROFILE_MEMORY")),
+        stages=stages,
+    )
@@ -0,0 +1,275 @@
+from collections import deque
+from dataclasses import dataclass, fields
+import threading
+import time
+from typing import Callable, Mapping, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised when a call is rejected because the circuit breaker of its endpoint is open.
+    """
+
+
+class DeadlineExceededError(TimeoutError):
+    """
+    Raised when a run has no time left before its deadline.
+    """
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Policy to retry calls to an endpoint and to stop calling it when it degrades.
+
+    Attributes:
+        max_attempts (int): Maximum number of attempts per call. Default is 3.
+        backoff_factor (float): Seconds to wait before the first retry, doubled on each
+            following retry. Default is 0.1.
+        retry_budget (int): Maximum number of retries per run, across all calls. Default is 10.
+        deadline_seconds (Optional[float]): Maximum duration of a run. Unbounded if None.
+        failure_rate_threshold (float): Failure rate, over the last calls, that opens the
+            circuit breaker. Default is 0.5.
+        window_size (int): Number of last calls the failure rate is computed on. Default is 10.
+        minimum_calls (int): Minimum number of calls before the circuit breaker can open.
+            Default is 4.
+        open_seconds (float): Seconds the circuit breaker stays open before letting a trial
+            call through. Default is 30.
+    """
+
+    max_attempts: int = 3
+    backoff_factor: float = 0.1
+    retry_budget: int = 10
+    deadline_seconds: Optional[float] = None
+    failure_rate_threshold: float = 0.5
+    window_size: int = 10
+    minimum_calls: int = 4
+    open_seconds: float = 30.0
+
+    @classmethod
+    def from_environment(
+        cls, environment: Mapping[str, str], prefix: str = "RETRY_"
+    ) -> "RetryPolicy":
+        """
+        Builds a RetryPolicy from environment variables named after its attributes in upper
+        case with a prefix, e.g. RETRY_MAX_ATTEMPTS. Missing variables take default values.
+
+        Args:
+            environment (Mapping[str, str]): The environment variables, e.g. os.environ.
+            prefix (str): Prefix of the variables. Default is "RETRY_".
+        Returns:
+            RetryPolicy: The retry policy.
+        """
+        values = {}
+        for policy_field in fields(cls):
+            value = environment.get(prefix + policy_field.name.upper())
+            if value:
+                values[policy_field.name] = (
+                    int(value) if policy_field.type in (int, "int") else float(value)
+                )
+
+        return cls(**values)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker shared by the calls to an endpoint. It is closed while the failure rate
+    of the last calls is below a threshold. Once the threshold is reached it opens, and calls
+    are rejected without reaching the endpoint. After a while it becomes half open and lets
+    a single trial call through: it closes again if that call succeeds and reopens otherwise.
+
+    Args:
+        failure_rate_threshold (float): Failure rate that opens the circuit breaker.
+        window_size (int): Number of last calls the failure rate is computed on.
+        minimum_calls (int): Minimum number of calls before the circuit breaker can open.
+        open_seconds (float): Seconds the circuit breaker stays open.
+        clock (Callable[[], float]): Monotonic clock, in seconds. Default is time.monotonic.
+    Attributes:
+        state (str): CLOSED, OPEN or HALF_OPEN.
+    Methods:
+        allow_request() -> bool:
+            Checks whether a call can go through.
+        record_success():
+            Records a successful call.
+        record_failure():
+            Records a failed call.
+        release_trial():
+            Lets the next trial call through after a call that recorded no outcome.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 10,
+        minimum_calls: int = 4,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_policy(cls, retry_policy: RetryPolicy) -> "CircuitBreaker":
+        """
+        Builds a CircuitBreaker with the thresholds of a retry policy.
+
+        Args:
+            retry_policy (RetryPolicy): The retry policy.
+        Returns:
+            CircuitBreaker: The circuit breaker.
+        """
+        return cls(
+            failure_rate_threshold=retry_policy.failure_rate_threshold,
+            window_size=retry_policy.window_size,
+            minimum_calls=retry_policy.minimum_calls,
+            open_seconds=retry_policy.open_seconds,
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """
+        Returns the state, moving from open to half open once the open period has elapsed.
+        Must be called holding the lock.
+        """
+        if (
+            self._state == self.OPEN
+            and self._clock() - self._opened_at >= self.open_seconds
+        ):
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Checks whether a call can go through: always when closed, never when open, and
+        only a single trial call at a time when half open.
+
+        Returns:
+            bool: True if the call can go through.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """
+        Records a successful call, closing the circuit breaker if it was half open.
+        """
+        with self._lock:
+            if self._current_state() == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        """
+        Records a failed call, opening the circuit breaker if it was half open or if the
+        failure rate of the last calls reaches the threshold.
+        """
+        with self._lock:
+            state = self._current_state()
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if state == self.HALF_OPEN or (
+                len(self._outcomes) >= self.minimum_calls
+                and failures / len(self._outcomes) >= self.failure_rate_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def release_trial(self):
+        """
+        Ends a call let through without recording its outcome, e.g. one interrupted by an
+        unexpected error, so the circuit breaker does not stay half open with a trial call
+        that will never end.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class RetryBudget:
+    """
+    Number of retries a run can spend across all its calls.
+
+    Args:
+        retries (int): Number of retries of the run.
+    Methods:
+        try_consume() -> bool:
+            Spends a retry if there is any left.
+    """
+
+    def __init__(self, retries: int):
+        self._retries = retries
+        self._lock = threading.Lock()
+
+    def try_consume(self) -> bool:
+        """
+        Spends a retry if there is any left.
+
+        Returns:
+            bool: True if the retry can be made.
+        """
+        with self._lock:
+            if self._retries <= 0:
+                return False
+            self._retries -= 1
+            return True
+
+
+class Deadline:
+    """
+    Point in time by which a run has to be finished.
+
+    Args:
+        seconds (Optional[float]): Seconds from now to the deadline. Unbounded if None.
+        clock (Callable[[], float]): Monotonic clock, in seconds. Default is time.monotonic.
+    Methods:
+        remaining() -> Optional[float]:
+            Seconds left before the deadline.
+        check():
+            Raises DeadlineExceededError if the deadline has passed.
+    """
+
+    def __init__(
+        self, seconds: Optional[float], clock: Callable[[], float] = time.monotonic
+    ):
+        self._clock = clock
+        self._expires_at = None if seconds is None else clock() + seconds
+
+    def remaining(self) -> Optional[float]:
+        """
+        Returns the seconds left before the deadline, None if unbounded.
+
+        Returns:
+            Optional[float]: seconds left, never negative.
+        """
+        if self._expires_at is None:
+            return None
+        return max(self._expires_at - self._clock(), 0.0)
+
+    def check(self):
+        """
+        Raises DeadlineExceededError if the deadline has passed.
+        """
+        if self.remaining() == 0.0:
+            raise DeadlineExceededError("Run deadline exceeded.")
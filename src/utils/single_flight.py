@@ -0,0 +1,93 @@
+import threading
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class _Call:
+    """
+    A call in flight, whose result is shared with the callers waiting for it.
+
+    Attributes:
+        done (threading.Event): Set once the call has finished.
+        result: Value returned by the call.
+        exception (Optional[BaseException]): Exception raised by the call, if any.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.exception: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key, so only one of them is executed and
+    the rest wait for and share its result. Keys are hashable objects; if they define a
+    `covers(other) -> bool` method, a call in flight for a key that covers the requested
+    one is also shared, e.g. a fetch of a wider window serving a narrower one. Callers
+    get the key actually executed along with the result, so they can slice it. Results
+    are not kept once a call has finished, so it only helps callers running concurrently,
+    e.g. the jobs of the daemon handled in parallel threads.
+
+    Methods:
+        do(key, fn) -> Tuple[Hashable, Any]:
+            Executes fn for key, unless an equal or covering call is already in flight.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def _find_call(self, key: Hashable) -> Optional[Tuple[Hashable, _Call]]:
+        """
+        Finds a call in flight for the key or for a key covering it. Must be called holding the lock.
+
+        Args:
+            key (Hashable): The requested key.
+        Returns:
+            Optional[Tuple[Hashable, _Call]]: key and call in flight, None if there is none.
+        """
+        if key in self._calls:
+            return key, self._calls[key]
+        for in_flight_key, call in self._calls.items():
+            covers = getattr(in_flight_key, "covers", None)
+            if covers is not None and covers(key):
+                return in_flight_key, call
+
+        return None
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Hashable, Any]:
+        """
+        Executes fn for key, unless an equal or covering call is already in flight, in which
+        case it waits for that call and returns its result. Exceptions raised by the executed
+        call are raised to every caller sharing it.
+
+        Args:
+            key (Hashable): Normalized identifier of the call.
+            fn (Callable[[], Any]): The call to execute.
+        Returns:
+            Tuple[Hashable, Any]: the key of the call executed and its result.
+        """
+        with self._lock:
+            in_flight = self._find_call(key)
+            if in_flight is None:
+                call = _Call()
+                self._calls[key] = call
+
+        if in_flight is not None:
+            in_flight_key, call = in_flight
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return in_flight_key, call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exception:
+            call.exception = exception
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return key, call.result
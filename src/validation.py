@@ -0,0 +1,359 @@
+from dataclasses import dataclass, field
+import datetime as dt
+import math
+import re
+import statistics
+from itertools import chain
+from typing import FrozenSet, Iterable, List, Mapping, Optional, Sequence
+
+from src import model
+from src.utils.logs import default_module_logger
+
+
+logger = default_module_logger(__file__)
+
+QUARANTINE = "quarantine"
+DROP = "drop"
+LOAD = "load"
+CURRENCY_CODE = re.compile(r"[A-Z]{3}")
+# Consistency constant turning a median absolute deviation into a standard deviation.
+MAD_TO_SIGMA = 1.4826
+# Maximum number of changes of a series the median and deviation of its changes are
+# estimated on. Longer series are sampled evenly.
+MAX_SIGMA_SAMPLE = 1000
+
+
+@dataclass(frozen=True)
+class ValidationPolicy:
+    """
+    Checks and routing rules of the validation stage. Each Exchange Rate failing a check
+    is routed by the rule of its first failed check, in this order:
+        - "schema": currency codes of 3 upper case letters, a date and a finite float rate.
+        - "range": rate within min_rate, exclusive, and max_rate, inclusive.
+        - "duplicate": currency pair and date already seen earlier in the batch.
+        - "jump": day-over-day change of the rate, as log return, beyond max_sigma
+          robust standard deviations, estimated from the median absolute deviation, of
+          the changes of its series in the batch, and beyond min_jump, so the usual
+          moves of pegged and low-volatility series are not jumps.
+        - "unchanged": same rate as the previous max_unchanged_observations observations
+          of its series. Off by default: the ECB publishes a new observation of a pegged
+          currency every day with the same rate, so an unchanged rate is not stale data.
+          Currencies in unchanged_exempt_currencies are never checked.
+
+    Attributes:
+        min_rate (float): Exclusive lower bound of rates. Default is 0.
+        max_rate (float): Inclusive upper bound of rates. Default is 1,000,000.
+        max_sigma (float): Number of standard deviations beyond which a change is a jump.
+            Default is 8.
+        min_jump (float): Relative change, e.g. 0.01 for 1%, within which a change is
+            never a jump. Default is 0.01.
+        min_observations (int): Minimum number of changes of a series to look for jumps.
+            Default is 5.
+        max_unchanged_observations (Optional[int]): Number of repeated rates after which
+            the next ones fail the "unchanged" check. Default is None, not checked.
+        unchanged_exempt_currencies (FrozenSet[str]): Currencies pegged to the base
+            currency, whose series are not checked for unchanged rates. Default is BGN.
+        routes (Mapping[str, str]): Action of each check: QUARANTINE to load the Exchange
+            Rate into the quarantine table, DROP to discard it, LOAD to only log it and
+            load it anyway. Default quarantines all of them.
+    """
+
+    min_rate: float = 0.0
+    max_rate: float = 1_000_000.0
+    max_sigma: float = 8.0
+    min_jump: float = 0.01
+    min_observations: int = 5
+    max_unchanged_observations: Optional[int] = None
+    unchanged_exempt_currencies: FrozenSet[str] = frozenset({"BGN"})
+    routes: Mapping[str, str] = field(
+        default_factory=lambda: {
+            "schema": QUARANTINE,
+            "range": QUARANTINE,
+            "duplicate": QUARANTINE,
+            "jump": QUARANTINE,
+            "unchanged": QUARANTINE,
+        }
+    )
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    """
+    Outcome of the validation of a batch of Exchange Rates.
+
+    Attributes:
+        valid (List[model.ExchangeRate]): Exchange Rates to load.
+        quarantined (List[model.QuarantinedExchangeRate]): Exchange Rates to load into
+            the quarantine table.
+        dropped (List[model.QuarantinedExchangeRate]): Exchange Rates discarded.
+    """
+
+    valid: List[model.ExchangeRate]
+    quarantined: List[model.QuarantinedExchangeRate]
+    dropped: List[model.QuarantinedExchangeRate]
+
+
+class ExchangeRateValidator:
+    """
+    Validation stage between source and destination repositories. Checks are computed
+    over the whole batch, one column of flags per check, and each series is checked for
+    jumps and unchanged rates on its rates ordered by date.
+
+    Args:
+        policy (ValidationPolicy, optional): Checks and routing rules. Default is ValidationPolicy().
+    Attributes:
+        policy (ValidationPolicy): Checks and routing rules.
+    Methods:
+        validate(exchange_rates: Iterable[model.ExchangeRate]) -> ValidationResult:
+            Validates a batch of Exchange Rates and routes the failed ones.
+    """
+
+    def __init__(self, policy: Optional[ValidationPolicy] = None):
+        self.policy = policy or ValidationPolicy()
+
+    def validate(
+        self, exchange_rates: Iterable[model.ExchangeRate]
+    ) -> ValidationResult:
+        """
+        Validates a batch of Exchange Rates and routes the ones failing a check as set by
+        the routes of the policy.
+
+        Args:
+            exchange_rates (Iterable[model.ExchangeRate]): The batch of Exchange Rates.
+        Returns:
+            ValidationResult: The Exchange Rates to load, to quarantine and dropped.
+        """
+        exchange_rates = list(exchange_rates)
+        reasons: dict[int, str] = {}
+        for currency_pair, indexes in self._series(exchange_rates).items():
+            self._check_series(exchange_rates, currency_pair, indexes, reasons)
+
+        flagged = len(reasons)
+        if not flagged:
+            return ValidationResult(exchange_rates, [], [])
+
+        quarantined, dropped, excluded = [], [], set()
+        for index in sorted(reasons):
+            reason = reasons[index]
+            action = self.policy.routes.get(reason, QUARANTINE)
+            if action == LOAD:
+                continue
+            excluded.add(index)
+            (dropped if action == DROP else quarantined).append(
+                model.QuarantinedExchangeRate(exchange_rates[index], reason)
+            )
+        valid, start = [], 0
+        for index in sorted(excluded):
+            valid += exchange_rates[start:index]
+            start = index + 1
+        valid += exchange_rates[start:]
+        logger.warning(
+            f"{flagged} of {len(exchange_rates)} Exchange Rates failed validation: "
+            f"{len(quarantined)} quarantined, {len(dropped)} dropped, "
+            f"{flagged - len(quarantined) - len(dropped)} loaded anyway."
+        )
+
+        return ValidationResult(valid, quarantined, dropped)
+
+    @staticmethod
+    def _series(
+        exchange_rates: List[model.ExchangeRate],
+    ) -> dict[model.CurrencyPair, Sequence[int]]:
+        """
+        Groups the positions of the Exchange Rates of a batch by currency pair, keeping
+        their order. Batches come in runs of rates sharing the same currency pair instance,
+        one run per response, so only the first rate of each run is grouped by value.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]): The batch of Exchange Rates.
+        Returns:
+            dict[model.CurrencyPair, Sequence[int]]: positions of the rates of each currency
+                pair, as a range if they are contiguous.
+        """
+        runs: dict[model.CurrencyPair, List[range]] = {}
+        start = 0
+        for end in range(1, len(exchange_rates) + 1):
+            currency_pair = exchange_rates[start].currency_pair
+            if (
+                end == len(exchange_rates)
+                or exchange_rates[end].currency_pair is not currency_pair
+            ):
+                runs.setdefault(currency_pair, []).append(range(start, end))
+                start = end
+
+        return {
+            currency_pair: (
+                pair_runs[0] if len(pair_runs) == 1 else list(chain(*pair_runs))
+            )
+            for currency_pair, pair_runs in runs.items()
+        }
+
+    def _check_series(
+        self,
+        exchange_rates: List[model.ExchangeRate],
+        currency_pair: model.CurrencyPair,
+        indexes: Sequence[int],
+        reasons: dict[int, str],
+    ):
+        """
+        Runs all the checks on the rates of a currency pair and sets the reason of the
+        first check failed by each of them. Checks are computed over the columns of
+        dates and values of the series, and rates are only looked at one by one when
+        a column fails a check.
+
+        Args:
+            exchange_rates (List[model.ExchangeRate]): The batch of Exchange Rates.
+            currency_pair (model.CurrencyPair): The currency pair of the series.
+            indexes (Sequence[int]): Positions of the rates of the series in the batch.
+            reasons (dict[int, str]): Reason of the first failed check of the rates of the
+                batch that failed one, by position, updated in place.
+        """
+        if not (
+            isinstance(currency_pair, model.CurrencyPair)
+            and CURRENCY_CODE.fullmatch(currency_pair.base)
+            and CURRENCY_CODE.fullmatch(currency_pair.quote)
+        ):
+            for index in indexes:
+                reasons[index] = "schema"
+            return
+
+        if indexes[-1] - indexes[0] + 1 == len(indexes):
+            rows = exchange_rates[indexes[0] : indexes[-1] + 1]
+        else:
+            rows = [exchange_rates[index] for index in indexes]
+        values = [row.exchange_rate for row in rows]
+        dates = [row.date for row in rows]
+        if not (
+            set(map(type, values)) == {float}
+            and set(map(type, dates)) == {dt.date}
+            and math.isfinite(sum(values))
+            and self.policy.min_rate < min(values)
+            and max(values) <= self.policy.max_rate
+        ):
+            kept = []
+            for row_number, row in enumerate(rows):
+                reason = self._check_row(row)
+                if reason is None:
+                    kept.append(row_number)
+                else:
+                    reasons[indexes[row_number]] = reason
+            indexes, rows, values, dates = (
+                [column[row_number] for row_number in kept]
+                for column in (indexes, rows, values, dates)
+            )
+
+        increasing = all(
+            dates[position - 1] < dates[position] for position in range(1, len(dates))
+        )
+        if not increasing and len(set(dates)) != len(dates):
+            seen_dates, kept = set(), []
+            for row_number, date in enumerate(dates):
+                if date in seen_dates:
+                    reasons[indexes[row_number]] = "duplicate"
+                else:
+                    kept.append(row_number)
+                seen_dates.add(date)
+            indexes, values, dates = (
+                [column[row_number] for row_number in kept]
+                for column in (indexes, values, dates)
+            )
+
+        if not increasing and dates != sorted(dates):
+            order = sorted(range(len(dates)), key=dates.__getitem__)
+            indexes = [indexes[row_number] for row_number in order]
+            values = [values[row_number] for row_number in order]
+        for position in self._jumps(values):
+            reasons[indexes[position]] = "jump"
+        if not (
+            self.policy.max_unchanged_observations is None
+            or currency_pair.base in self.policy.unchanged_exempt_currencies
+            or currency_pair.quote in self.policy.unchanged_exempt_currencies
+        ):
+            for position in self._unchanged(values):
+                reasons.setdefault(indexes[position], "unchanged")
+
+    def _check_row(self, exchange_rate: model.ExchangeRate) -> Optional[str]:
+        """
+        Runs the schema and range checks on a single Exchange Rate.
+
+        Args:
+            exchange_rate (model.ExchangeRate): The Exchange Rate.
+        Returns:
+            Optional[str]: "schema" or "range" if the check failed, None otherwise.
+        """
+        if not (
+            type(exchange_rate.exchange_rate) is float
+            and math.isfinite(exchange_rate.exchange_rate)
+            and isinstance(exchange_rate.date, dt.date)
+        ):
+            return "schema"
+        if (
+            not self.policy.min_rate
+            < exchange_rate.exchange_rate
+            <= self.policy.max_rate
+        ):
+            return "range"
+        return None
+
+    def _jumps(self, values: List[float]) -> List[int]:
+        """
+        Finds the positions of the values of a series reached by a jump. Changes are
+        compared as ratios to bounds derived from the log returns, so logarithms are only
+        computed for the sample the bounds are estimated on, and the bounds are widened to
+        the minimum jump of the policy. The change that brings back a series after a
+        single outlier is not a jump.
+
+        Args:
+            values (List[float]): Rates of the series ordered by date.
+        Returns:
+            List[int]: Positions of the values reached by a jump.
+        """
+        if len(values) <= self.policy.min_observations:
+            return []
+        ratios = [
+            values[position] / values[position - 1]
+            for position in range(1, len(values))
+        ]
+        sample = list(map(math.log, ratios[:: len(ratios) // MAX_SIGMA_SAMPLE + 1]))
+        median = statistics.median(sample)
+        sigma = MAD_TO_SIGMA * statistics.median(
+            [abs(value - median) for value in sample]
+        )
+        width = max(self.policy.max_sigma * sigma, math.log1p(self.policy.min_jump))
+        if width == 0.0:
+            return []
+        lower = math.exp(median - width)
+        upper = math.exp(median + width)
+        if lower <= min(ratios) and max(ratios) <= upper:
+            return []
+        jumps = {
+            position
+            for position, ratio in enumerate(ratios)
+            if not lower <= ratio <= upper
+        }
+
+        return [
+            position + 1
+            for position in sorted(jumps)
+            if not (
+                position - 1 in jumps
+                and (ratios[position] > 1) != (ratios[position - 1] > 1)
+            )
+        ]
+
+    def _unchanged(self, values: List[float]) -> List[int]:
+        """
+        Finds the positions of the values of a series repeated more than the maximum
+        number of unchanged observations.
+
+        Args:
+            values (List[float]): Rates of the series ordered by date.
+        Returns:
+            List[int]: Positions of the unchanged values.
+        """
+        positions, repeated = [], 0
+        for position in range(1, len(values)):
+            repeated = repeated + 1 if values[position] == values[position - 1] else 0
+            if repeated >= self.policy.max_unchanged_observations:
+                positions.append(position)
+        return positions
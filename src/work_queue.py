@@ -0,0 +1,770 @@
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+import datetime as dt
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from src import model
+
+
+# Status of a work unit in a queue.
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+STATUSES = (PENDING, LEASED, DONE, FAILED)
+
+
+class LeaseLostError(RuntimeError):
+    """
+    Raised when a worker acts on a lease that has expired and has been claimed again,
+    or whose unit is no longer leased.
+    """
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """
+    Unit of work of a distributed run: exchange rates of a set of currency pairs over a
+    window of dates, to load into a destination table.
+
+    Attributes:
+        unit_id (str): Identifier of the unit, derived from its content so planning the
+            same work twice queues it once.
+        currency_pairs (Tuple[model.CurrencyPair, ...]): Currency pairs to fetch.
+        date_from (dt.date): First date of the window.
+        date_to (dt.date): Last date of the window.
+        destination_table (str): Destination table of the exchange rates.
+        data_format (str): SDMX format requested to the ECB API.
+    """
+
+    unit_id: str
+    currency_pairs: Tuple[model.CurrencyPair, ...]
+    date_from: dt.date
+    date_to: dt.date
+    destination_table: str
+    data_format: str
+
+    def to_dict(self) -> dict:
+        """
+        Returns the JSON serializable representation of the unit.
+        """
+        return {
+            "unit_id": self.unit_id,
+            "currency_pairs": [str(pair) for pair in self.currency_pairs],
+            "date_from": self.date_from.isoformat(),
+            "date_to": self.date_to.isoformat(),
+            "destination_table": self.destination_table,
+            "data_format": self.data_format,
+        }
+
+    @classmethod
+    def from_dict(cls, unit: dict) -> "WorkUnit":
+        """
+        Builds a unit from its representation returned by to_dict().
+        """
+        return cls(
+            unit_id=unit["unit_id"],
+            currency_pairs=tuple(
+                model.CurrencyPair(*pair.split("/")) for pair in unit["currency_pairs"]
+            ),
+            date_from=dt.date.fromisoformat(unit["date_from"]),
+            date_to=dt.date.fromisoformat(unit["date_to"]),
+            destination_table=unit["destination_table"],
+            data_format=unit["data_format"],
+        )
+
+
+@dataclass(frozen=True)
+class Lease:
+    """
+    Claim of a worker on a unit, valid until it expires unless renewed by a heartbeat.
+
+    Attributes:
+        unit (WorkUnit): The unit claimed.
+        worker_id (str): Identifier of the worker.
+        attempt (int): Number of the attempt at the unit, 1 for the first claim.
+        expires_at (float): Time the lease expires at, in seconds since the epoch.
+    """
+
+    unit: WorkUnit
+    worker_id: str
+    attempt: int
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class UnitReport:
+    """
+    Outcome of a unit completed by a worker.
+
+    Attributes:
+        unit_id (str): Identifier of the unit.
+        worker_id (str): Identifier of the worker.
+        rows (int): Number of exchange rates loaded.
+        transferred_bytes (int): Bytes of the ECB API responses read from the wire.
+        seconds (float): Time spent on the unit.
+    """
+
+    unit_id: str
+    worker_id: str
+    rows: int
+    transferred_bytes: int
+    seconds: float
+
+
+@dataclass(frozen=True)
+class QueueSummary:
+    """
+    Progress and aggregate throughput of the units of a queue.
+
+    Attributes:
+        counts (dict[str, int]): Number of units per status.
+        rows (int): Exchange rates loaded by the units done.
+        transferred_bytes (int): Bytes read from the ECB API by the units done.
+        busy_seconds (float): Time spent by workers on the units done.
+        elapsed_seconds (float): Time from the first claim to the last completion.
+        workers (int): Number of workers that completed a unit.
+    """
+
+    counts: dict = field(default_factory=dict)
+    rows: int = 0
+    transferred_bytes: int = 0
+    busy_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    workers: int = 0
+
+    @property
+    def remaining(self) -> int:
+        """
+        Number of units pending or leased.
+        """
+        return self.counts.get(PENDING, 0) + self.counts.get(LEASED, 0)
+
+    def format(self) -> List[str]:
+        """
+        Formats the summary as human readable lines.
+        """
+
+        def throughput(value: float) -> str:
+            if not self.elapsed_seconds:
+                return ""
+            return f" ({value / self.elapsed_seconds:.1f}/s)"
+
+        return [
+            "units: "
+            + ", ".join(
+                f"{status} {self.counts.get(status, 0)}" for status in STATUSES
+            ),
+            f"workers: {self.workers}",
+            f"rows: {self.rows}{throughput(self.rows)}",
+            f"transferred bytes: {self.transferred_bytes}"
+            f"{throughput(self.transferred_bytes)}",
+            f"busy seconds: {self.busy_seconds:.1f}, "
+            f"elapsed seconds: {self.elapsed_seconds:.1f}",
+        ]
+
+
+def plan_work_units(
+    currency_pairs: Sequence[model.CurrencyPair],
+    date_from: dt.date,
+    date_to: dt.date,
+    destination_table: str,
+    data_format: str,
+    pairs_per_unit: int = 1,
+    days_per_unit: int = 30,
+) -> List[WorkUnit]:
+    """
+    Splits a backfill in units of at most pairs_per_unit currency pairs and days_per_unit
+    consecutive days, so they can be fetched and loaded independently.
+
+    Args:
+        currency_pairs (Sequence[model.CurrencyPair]): Currency pairs of the backfill.
+        date_from (dt.date): First date of the backfill.
+        date_to (dt.date): Last date of the backfill.
+        destination_table (str): Destination table of the exchange rates.
+        data_format (str): SDMX format requested to the ECB API.
+        pairs_per_unit (int): Maximum number of currency pairs per unit. Default is 1.
+        days_per_unit (int): Maximum number of days per unit. Default is 30.
+    Returns:
+        List[WorkUnit]: The units, by window then by set of currency pairs.
+    """
+    if pairs_per_unit < 1 or days_per_unit < 1:
+        raise ValueError("Units must have at least one currency pair and one day.")
+    currency_pairs = list(dict.fromkeys(currency_pairs))
+    pair_sets = [
+        tuple(currency_pairs[i : i + pairs_per_unit])
+        for i in range(0, len(currency_pairs), pairs_per_unit)
+    ]
+
+    units = []
+    window_start = date_from
+    while window_start <= date_to:
+        window_end = min(window_start + dt.timedelta(days_per_unit - 1), date_to)
+        for pair_set in pair_sets:
+            units.append(
+                WorkUnit(
+                    unit_id=(
+                        f"{destination_table}.{'-'.join(pair.quote for pair in pair_set)}"
+                        f".{window_start:%Y%m%d}-{window_end:%Y%m%d}"
+                    ),
+                    currency_pairs=pair_set,
+                    date_from=window_start,
+                    date_to=window_end,
+                    destination_table=destination_table,
+                    data_format=data_format,
+                )
+            )
+        window_start = window_end + dt.timedelta(days=1)
+
+    return units
+
+
+class AbstractWorkQueue(ABC):
+    """
+    An abstract base class for queues of work units shared by a coordinator and any number
+    of workers. A worker claims a unit under a lease, renews it with heartbeats while it
+    works, and completes or fails it. Units whose lease expires, e.g. because their worker
+    died, are claimed again, up to a maximum number of attempts. Lease times are wall clock
+    times, so the clocks of the nodes sharing a queue must be synchronized.
+
+    Methods:
+        put(units: Iterable[WorkUnit]) -> int:
+            Queues units, ignoring the ones already queued.
+        claim(worker_id: str, lease_seconds: float) -> Optional[Lease]:
+            Claims a pending unit or a unit whose lease has expired.
+        heartbeat(lease: Lease, lease_seconds: float) -> Lease:
+            Renews a lease.
+        complete(lease: Lease, report: UnitReport):
+            Marks the unit of a lease as done.
+        fail(lease: Lease, error: str):
+            Gives up a lease, queuing its unit again if it has attempts left.
+        summary() -> QueueSummary:
+            Returns the progress and throughput of the units.
+    """
+
+    @abstractmethod
+    def put(self, units: Iterable[WorkUnit]) -> int:
+        """
+        Queues units, ignoring the ones already queued with the same identifier.
+
+        Args:
+            units (Iterable[WorkUnit]): The units.
+        Returns:
+            int: Number of units queued.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        """
+        Claims a pending unit, or a unit whose lease has expired. Units whose lease expired
+        on their last attempt are failed instead.
+
+        Args:
+            worker_id (str): Identifier of the worker.
+            lease_seconds (float): Duration of the lease.
+        Returns:
+            Optional[Lease]: The lease, None if no unit can be claimed.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> Lease:
+        """
+        Renews a lease for lease_seconds from now.
+
+        Args:
+            lease (Lease): The lease.
+            lease_seconds (float): Duration of the renewed lease.
+        Returns:
+            Lease: The renewed lease.
+        Raises:
+            LeaseLostError: if the lease is no longer held.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, lease: Lease, report: UnitReport):
+        """
+        Marks the unit of a lease as done, with its report.
+
+        Args:
+            lease (Lease): The lease.
+            report (UnitReport): Outcome of the unit.
+        Raises:
+            LeaseLostError: if the lease is no longer held.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, lease: Lease, error: str):
+        """
+        Gives up a lease after an error. Its unit is queued again if it has attempts left,
+        and failed otherwise.
+
+        Args:
+            lease (Lease): The lease.
+            error (str): Description of the error.
+        Raises:
+            LeaseLostError: if the lease is no longer held.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def summary(self) -> QueueSummary:
+        """
+        Returns the progress and aggregate throughput of the units of the queue.
+
+        Returns:
+            QueueSummary: The summary.
+        """
+        raise NotImplementedError
+
+
+class SqliteWorkQueue(AbstractWorkQueue):
+    """
+    Work queue in a SQLite file, for workers on the same node or sharing a file system
+    with reliable locks. In-memory databases are not supported. Each operation opens its
+    own connection and runs in a single transaction, so the queue can be used from several
+    threads and processes.
+
+    Args:
+        database_path (str): Path to the SQLite file.
+        max_attempts (int): Maximum number of attempts of the units queued. Default is 3.
+    Attributes:
+        database_path (str): Path to the SQLite file.
+        max_attempts (int): Maximum number of attempts of the units queued.
+    """
+
+    def __init__(self, database_path: str, max_attempts: int = 3):
+        self.database_path = database_path
+        self.max_attempts = max_attempts
+        with self._transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS work_units ("
+                "unit_id TEXT PRIMARY KEY, "
+                "unit TEXT NOT NULL, "
+                "status TEXT NOT NULL, "
+                "max_attempts INTEGER NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "worker_id TEXT, "
+                "lease_expires_at REAL, "
+                "first_claimed_at REAL, "
+                "finished_at REAL, "
+                "error TEXT, "
+                "rows INTEGER, "
+                "transferred_bytes INTEGER, "
+                "seconds REAL"
+                ")"
+            )
+
+    def _transaction(self) -> "_SqliteTransaction":
+        """
+        Returns a context opening a connection and an immediate transaction, committed on
+        exit unless an exception is raised.
+        """
+        return _SqliteTransaction(self.database_path)
+
+    def put(self, units: Iterable[WorkUnit]) -> int:
+        with self._transaction() as connection:
+            cursor = connection.executemany(
+                "INSERT OR IGNORE INTO work_units (unit_id, unit, status, max_attempts) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        unit.unit_id,
+                        json.dumps(unit.to_dict()),
+                        PENDING,
+                        self.max_attempts,
+                    )
+                    for unit in units
+                ),
+            )
+            return cursor.rowcount
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE work_units SET status = ?, error = 'lease expired', "
+                "finished_at = ? "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts",
+                (FAILED, now, LEASED, now),
+            )
+            row = connection.execute(
+                "SELECT unit_id, unit, attempts FROM work_units "
+                "WHERE status = ? OR (status = ? AND lease_expires_at < ?) "
+                "ORDER BY rowid LIMIT 1",
+                (PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                return None
+            unit_id, unit, attempts = row
+            connection.execute(
+                "UPDATE work_units SET status = ?, worker_id = ?, attempts = ?, "
+                "lease_expires_at = ?, first_claimed_at = COALESCE(first_claimed_at, ?) "
+                "WHERE unit_id = ?",
+                (LEASED, worker_id, attempts + 1, now + lease_seconds, now, unit_id),
+            )
+
+        return Lease(
+            unit=WorkUnit.from_dict(json.loads(unit)),
+            worker_id=worker_id,
+            attempt=attempts + 1,
+            expires_at=now + lease_seconds,
+        )
+
+    def _update_lease(self, connection: sqlite3.Connection, lease: Lease, **columns):
+        """
+        Updates the row of a lease if it is still held, i.e. leased to the same worker
+        for the same attempt.
+        """
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        cursor = connection.execute(
+            f"UPDATE work_units SET {assignments} "
+            "WHERE unit_id = ? AND status = ? AND worker_id = ? AND attempts = ?",
+            (
+                *columns.values(),
+                lease.unit.unit_id,
+                LEASED,
+                lease.worker_id,
+                lease.attempt,
+            ),
+        )
+        if cursor.rowcount == 0:
+            raise LeaseLostError(
+                f"Lease of '{lease.worker_id}' on unit '{lease.unit.unit_id}' was lost."
+            )
+
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> Lease:
+        expires_at = time.time() + lease_seconds
+        with self._transaction() as connection:
+            self._update_lease(connection, lease, lease_expires_at=expires_at)
+        return Lease(lease.unit, lease.worker_id, lease.attempt, expires_at)
+
+    def complete(self, lease: Lease, report: UnitReport):
+        with self._transaction() as connection:
+            self._update_lease(
+                connection,
+                lease,
+                status=DONE,
+                finished_at=time.time(),
+                rows=report.rows,
+                transferred_bytes=report.transferred_bytes,
+                seconds=report.seconds,
+            )
+
+    def fail(self, lease: Lease, error: str):
+        with self._transaction() as connection:
+            max_attempts = connection.execute(
+                "SELECT max_attempts FROM work_units WHERE unit_id = ?",
+                (lease.unit.unit_id,),
+            ).fetchone()[0]
+            self._update_lease(
+                connection,
+                lease,
+                status=FAILED if lease.attempt >= max_attempts else PENDING,
+                error=error,
+                finished_at=time.time(),
+            )
+
+    def summary(self) -> QueueSummary:
+        with self._transaction() as connection:
+            counts = dict(
+                connection.execute(
+                    "SELECT status, COUNT(*) FROM work_units GROUP BY status"
+                ).fetchall()
+            )
+            rows, transferred_bytes, busy_seconds, started, finished, workers = (
+                connection.execute(
+                    "SELECT SUM(rows), SUM(transferred_bytes), SUM(seconds), "
+                    "MIN(first_claimed_at), MAX(finished_at), COUNT(DISTINCT worker_id) "
+                    "FROM work_units WHERE status = ?",
+                    (DONE,),
+                ).fetchone()
+            )
+
+        return QueueSummary(
+            counts=counts,
+            rows=rows or 0,
+            transferred_bytes=transferred_bytes or 0,
+            busy_seconds=busy_seconds or 0.0,
+            elapsed_seconds=(finished - started) if started is not None else 0.0,
+            workers=workers,
+        )
+
+
+class _SqliteTransaction:
+    """
+    Context of a connection to a SQLite file within an immediate transaction, so that
+    concurrent writers wait for each other instead of failing on upgrade of their locks.
+    """
+
+    def __init__(self, database_path: str):
+        self.connection = sqlite3.connect(
+            database_path, timeout=30.0, isolation_level=None
+        )
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, *exc_info):
+        try:
+            self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.connection.close()
+
+
+class DirectoryWorkQueue(AbstractWorkQueue):
+    """
+    Work queue in a local directory, for tests and single node runs without a database.
+    Each unit is a JSON file in the subdirectory of its status, and moves between them
+    with atomic renames, so only one worker wins a claim. Renewing a lease that has just
+    expired can race with its reclaim, so leases should be long compared to heartbeats.
+
+    Args:
+        directory (str): Path to the directory. It is created if it does not exist.
+        max_attempts (int): Maximum number of attempts of the units queued. Default is 3.
+    Attributes:
+        directory (str): Path to the directory.
+        max_attempts (int): Maximum number of attempts of the units queued.
+    """
+
+    def __init__(self, directory: str, max_attempts: int = 3):
+        self.directory = directory
+        self.max_attempts = max_attempts
+        for status in STATUSES:
+            os.makedirs(os.path.join(directory, status), exist_ok=True)
+
+    def _path(self, status: str, unit_id: str) -> str:
+        return os.path.join(self.directory, status, f"{unit_id}.json")
+
+    def _unit_ids(self, status: str) -> List[str]:
+        return sorted(
+            name[: -len(".json")]
+            for name in os.listdir(os.path.join(self.directory, status))
+            if name.endswith(".json")
+        )
+
+    @staticmethod
+    def _read(path: str) -> dict:
+        with open(path, "r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write(path: str, state: dict):
+        """
+        Writes the state of a unit through a temporary file, so readers never see a
+        partial file.
+        """
+        temporary_path = os.path.join(
+            os.path.dirname(path),
+            f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp",
+        )
+        with open(temporary_path, "w") as f:
+            json.dump(state, f)
+        os.replace(temporary_path, path)
+
+    def put(self, units: Iterable[WorkUnit]) -> int:
+        queued = 0
+        for unit in units:
+            if any(
+                os.path.exists(self._path(status, unit.unit_id)) for status in STATUSES
+            ):
+                continue
+            self._write(
+                self._path(PENDING, unit.unit_id),
+                {
+                    "unit": unit.to_dict(),
+                    "max_attempts": self.max_attempts,
+                    "attempts": 0,
+                },
+            )
+            queued += 1
+        return queued
+
+    def _release_expired_leases(self, now: float):
+        """
+        Moves the units whose lease has expired back to pending, or to failed if it was
+        their last attempt.
+        """
+        for unit_id in self._unit_ids(LEASED):
+            path = self._path(LEASED, unit_id)
+            try:
+                state = self._read(path)
+            except FileNotFoundError:
+                continue
+            if state.get("lease_expires_at", now) >= now:
+                continue
+            status = FAILED if state["attempts"] >= state["max_attempts"] else PENDING
+            try:
+                os.rename(path, self._path(status, unit_id))
+            except FileNotFoundError:
+                continue
+            if status == FAILED:
+                state.update(error="lease expired", finished_at=now)
+                self._write(self._path(status, unit_id), state)
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        now = time.time()
+        self._release_expired_leases(now)
+        for unit_id in self._unit_ids(PENDING):
+            path = self._path(LEASED, unit_id)
+            try:
+                os.rename(self._path(PENDING, unit_id), path)
+            except FileNotFoundError:
+                continue
+            state = self._read(path)
+            state.update(
+                attempts=state["attempts"] + 1,
+                worker_id=worker_id,
+                lease_expires_at=now + lease_seconds,
+            )
+            state.setdefault("first_claimed_at", now)
+            self._write(path, state)
+            return Lease(
+                unit=WorkUnit.from_dict(state["unit"]),
+                worker_id=worker_id,
+                attempt=state["attempts"],
+                expires_at=now + lease_seconds,
+            )
+        return None
+
+    def _held_state(self, lease: Lease) -> dict:
+        """
+        Returns the state of the unit of a lease if the lease is still held.
+        """
+        try:
+            state = self._read(self._path(LEASED, lease.unit.unit_id))
+        except FileNotFoundError:
+            state = {}
+        if (
+            state.get("worker_id") != lease.worker_id
+            or state.get("attempts") != lease.attempt
+        ):
+            raise LeaseLostError(
+                f"Lease of '{lease.worker_id}' on unit '{lease.unit.unit_id}' was lost."
+            )
+        return state
+
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> Lease:
+        state = self._held_state(lease)
+        state["lease_expires_at"] = time.time() + lease_seconds
+        self._write(self._path(LEASED, lease.unit.unit_id), state)
+        return Lease(
+            lease.unit, lease.worker_id, lease.attempt, state["lease_expires_at"]
+        )
+
+    def _finish(self, lease: Lease, status: str, **fields):
+        """
+        Moves the unit of a held lease to a status, with fields added to its state.
+        """
+        state = self._held_state(lease)
+        state.update(fields, finished_at=time.time())
+        path = self._path(LEASED, lease.unit.unit_id)
+        self._write(path, state)
+        os.rename(path, self._path(status, lease.unit.unit_id))
+
+    def complete(self, lease: Lease, report: UnitReport):
+        self._finish(lease, DONE, report=asdict(report))
+
+    def fail(self, lease: Lease, error: str):
+        state = self._held_state(lease)
+        self._finish(
+            lease,
+            FAILED if lease.attempt >= state["max_attempts"] else PENDING,
+            error=error,
+        )
+
+    def summary(self) -> QueueSummary:
+        counts = {status: len(self._unit_ids(status)) for status in STATUSES}
+        reports, started, finished = [], [], []
+        for unit_id in self._unit_ids(DONE):
+            state = self._read(self._path(DONE, unit_id))
+            reports.append(UnitReport(**state["report"]))
+            started.append(state["first_claimed_at"])
+            finished.append(state["finished_at"])
+
+        return QueueSummary(
+            counts={status: count for status, count in counts.items() if count},
+            rows=sum(report.rows for report in reports),
+            transferred_bytes=sum(report.transferred_bytes for report in reports),
+            busy_seconds=sum(report.seconds for report in reports),
+            elapsed_seconds=max(finished) - min(started) if reports else 0.0,
+            workers=len({report.worker_id for report in reports}),
+        )
+
+
+class LeaseKeeper:
+    """
+    Renews a lease from a background thread while its unit is worked on, so long units
+    keep their lease without the worker calling heartbeat() itself.
+
+    Args:
+        queue (AbstractWorkQueue): The queue of the lease.
+        lease (Lease): The lease to renew.
+        lease_seconds (float): Duration of each renewal.
+        interval (float, optional): Seconds between heartbeats. Default is a third of
+            lease_seconds.
+    Attributes:
+        lease (Lease): The lease, as last renewed.
+        lost (bool): Whether the lease was lost, e.g. after missed heartbeats.
+    """
+
+    def __init__(
+        self,
+        queue: AbstractWorkQueue,
+        lease: Lease,
+        lease_seconds: float,
+        interval: Optional[float] = None,
+    ):
+        self.queue = queue
+        self.lease = lease
+        self.lease_seconds = lease_seconds
+        self.interval = interval if interval is not None else lease_seconds / 3
+        self.lost = False
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._renew, daemon=True)
+
+    def _renew(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.lease = self.queue.heartbeat(self.lease, self.lease_seconds)
+            except LeaseLostError:
+                self.lost = True
+                return
+
+    def renew(self) -> Lease:
+        """
+        Renews the lease now, e.g. right before a step that must not run without it.
+
+        Returns:
+            Lease: The renewed lease.
+        Raises:
+            LeaseLostError: if the lease is no longer held.
+        """
+        if self.lost:
+            raise LeaseLostError(
+                f"Lease of '{self.lease.worker_id}' on unit "
+                f"'{self.lease.unit.unit_id}' was lost."
+            )
+        try:
+            self.lease = self.queue.heartbeat(self.lease, self.lease_seconds)
+        except LeaseLostError:
+            self.lost = True
+            raise
+        return self.lease
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
@@ -1,6 +1,9 @@
 import pytest
 import os
 import datetime as dt
+import http.server
+import threading
+import time
 from typing import Generator, Tuple, List
 
 from tests.data.ecb_exchange_rates import EXCHANGE_RATES
@@ -26,6 +29,18 @@ def bq_repository() -> destination_repository.BiqQueryDestinationRepository:
     return bq_repository
 
 
+@pytest.fixture(scope="function")
+def sqlite_repository() -> destination_repository.SqliteDestinationRepository:
+    """
+    Fixture that returns instance of SqliteDestinationRepository backed by
+    an in-memory database.
+
+    Returns:
+        instance of SqliteDestinationRepository
+    """
+    return destination_repository.SqliteDestinationRepository(":memory:")
+
+
 @pytest.fixture(scope="function")
 def repository_with_exchange_rates(
     bq_repository: destination_repository.BiqQueryDestinationRepository,
@@ -146,3 +161,74 @@ def fake_ecb_api() -> Tuple[
     ]
 
     return fake_ecb_api_caller, expected_ecb_rates, currency_pairs
+
+
+class FaultInjectingEcbApi:
+    """
+    Local HTTP server standing in for the ECB API. Each request takes the next fault of
+    the queue, either a status code to answer with, a delay in seconds before answering,
+    or a delay in seconds before each of the 100 bytes pieces the body is sent in, as
+    ("slow_body", delay), and is answered with the structure specific test file once the
+    queue is empty.
+
+    Attributes:
+        base_url (str): Base URL of the server, to pass to EcbApiCaller.
+        faults (List): Queue of faults, status codes (int), delays (float) or slow bodies
+            (tuple).
+        request_count (int): Number of requests received.
+    """
+
+    def __init__(self):
+        self.faults: list = []
+        self.request_count = 0
+        with open("tests/data/xml_ecb_structure_specific_test.xml", "rb") as f:
+            body = f.read()
+        api = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                api.request_count += 1
+                fault = api.faults.pop(0) if api.faults else None
+                if isinstance(fault, float):
+                    time.sleep(fault)
+                if isinstance(fault, int):
+                    self.send_response(fault)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if isinstance(fault, tuple):
+                    for start in range(0, len(body), 100):
+                        time.sleep(fault[1])
+                        self.wfile.write(body[start : start + 100])
+                        self.wfile.flush()
+                    return
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}/"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture(scope="function")
+def fault_injecting_ecb_api() -> Generator[FaultInjectingEcbApi, None, None]:
+    """
+    Fixture that starts a local HTTP server answering like the ECB API, with faults
+    injected on demand.
+
+    Returns:
+        instance of FaultInjectingEcbApi
+    """
+    api = FaultInjectingEcbApi()
+    yield api
+    api.shutdown()
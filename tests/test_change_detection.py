@@ -0,0 +1,106 @@
+import dataclasses
+import datetime as dt
+import sqlite3
+
+from tests.data.ecb_exchange_rates import EXCHANGE_RATES
+from src import change_detection, model
+from src.utils.observation_hashes import ObservationHashStore
+
+
+def test_classify_new_revised_and_unchanged_observations(tmp_path):
+    """
+    GIVEN a change detector whose store has the hashes of loaded observations
+    WHEN the same observations are classified again, one of them with a revised value
+        and with an observation for a new date
+    THEN they should be split in new, revised and unchanged, with the revision marked
+        in its source, and the counts of the run reported
+    """
+    detector = change_detection.ObservationChangeDetector(
+        ObservationHashStore(str(tmp_path / "hashes.sqlite"))
+    )
+    detector.commit(detector.classify(EXCHANGE_RATES[:4]))
+    revised_rate = dataclasses.replace(EXCHANGE_RATES[1], exchange_rate=0.8685)
+
+    change_set = detector.classify(
+        [EXCHANGE_RATES[0], revised_rate] + EXCHANGE_RATES[2:]
+    )
+
+    assert change_set.new == [EXCHANGE_RATES[4]]
+    assert [
+        (exchange_rate.date, exchange_rate.exchange_rate, exchange_rate.source)
+        for exchange_rate in change_set.revised
+    ] == [(dt.date(2023, 10, 6), 0.8685, "ECB API (revised)")]
+    assert change_set.unchanged == 3
+    assert detector.reports == [
+        change_detection.ChangeCounts(new=4, revised=0, unchanged=0),
+        change_detection.ChangeCounts(new=1, revised=1, unchanged=3),
+    ]
+
+
+def test_uncommitted_change_set_is_classified_again(tmp_path):
+    """
+    GIVEN a change set that has not been committed, e.g. because its load failed
+    WHEN the same observations are classified again
+    THEN they should still be new
+    """
+    store = ObservationHashStore(str(tmp_path / "hashes.sqlite"))
+    detector = change_detection.ObservationChangeDetector(store)
+    detector.classify(EXCHANGE_RATES)
+
+    change_set = change_detection.ObservationChangeDetector(store).classify(
+        EXCHANGE_RATES
+    )
+
+    assert change_set.new == EXCHANGE_RATES
+    assert change_set.unchanged == 0
+
+
+def test_classify_keeps_frequencies_apart(tmp_path):
+    """
+    GIVEN a change detector whose store has the hash of a daily observation dated on the
+        first day of a month
+    WHEN the monthly observation of that month is classified, committed, and the daily
+        observation classified again
+    THEN the monthly observation should be new, and the daily one still unchanged
+    """
+    detector = change_detection.ObservationChangeDetector(
+        ObservationHashStore(str(tmp_path / "hashes.sqlite"))
+    )
+    daily_rate = dataclasses.replace(EXCHANGE_RATES[0], date=dt.date(2024, 3, 1))
+    monthly_rate = dataclasses.replace(
+        daily_rate, exchange_rate=0.8571, frequency=model.MONTHLY
+    )
+    detector.commit(detector.classify([daily_rate]))
+
+    monthly_change_set = detector.classify([monthly_rate])
+    detector.commit(monthly_change_set)
+    daily_change_set = detector.classify([daily_rate])
+
+    assert monthly_change_set.counts == change_detection.ChangeCounts(1, 0, 0)
+    assert daily_change_set.counts == change_detection.ChangeCounts(0, 0, 1)
+
+
+def test_hash_store_migrates_hashes_without_frequency(tmp_path):
+    """
+    GIVEN a hash store file created before frequencies were supported
+    WHEN it is opened with ObservationHashStore
+    THEN its hashes should be kept as the ones of daily observations
+    """
+    database_path = str(tmp_path / "hashes.sqlite")
+    with sqlite3.connect(database_path) as connection:
+        connection.execute(
+            "CREATE TABLE observation_hashes (base_currency TEXT NOT NULL, "
+            "quote_currency TEXT NOT NULL, date TEXT NOT NULL, hash INTEGER NOT NULL, "
+            "PRIMARY KEY (base_currency, quote_currency, date)) WITHOUT ROWID"
+        )
+        connection.execute(
+            "INSERT INTO observation_hashes VALUES ('EUR', 'GBP', '2024-03-01', 42)"
+        )
+    connection.close()
+
+    store = ObservationHashStore(database_path)
+
+    currency_pair = model.CurrencyPair("EUR", "GBP")
+    date = dt.date(2024, 3, 1)
+    assert store.get_hashes(currency_pair, date, date) == {date: 42}
+    assert store.get_hashes(currency_pair, date, date, model.MONTHLY) == {}
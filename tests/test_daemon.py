@@ -0,0 +1,199 @@
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Generator
+
+import pytest
+from click.testing import CliRunner
+
+from src import destination_repository, jobs, model, source_repository
+from src.entrypoints.cli.daemon import JobServer, create_job_runner
+from src.entrypoints.cli.daemon_client import submit, submit_job
+
+
+@pytest.fixture(scope="function")
+def socket_path() -> Generator[str, None, None]:
+    """
+    Fixture that returns the path of a Unix socket in a temporary directory, short enough
+    for the length limit of Unix socket paths.
+
+    Returns:
+        path of the Unix socket
+    """
+    directory = tempfile.mkdtemp(prefix="daemon")
+    yield os.path.join(directory, "daemon.sock")
+    shutil.rmtree(directory)
+
+
+@contextmanager
+def serve(
+    socket_path: str, run_job: Callable[[jobs.JobSpec], None]
+) -> Generator[JobServer, None, None]:
+    """
+    Starts a JobServer in a background thread.
+
+    Args:
+        socket_path (str): Path to the Unix socket to listen on.
+        run_job (Callable[[jobs.JobSpec], None]): Runs a job.
+    Yields:
+        the running JobServer, shut down on exit
+    """
+    server = JobServer(socket_path, run_job)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_job_server_runs_concurrent_submissions(socket_path: str):
+    """
+    GIVEN a JobServer whose jobs only finish once three of them are running
+    WHEN three jobs are submitted at once
+    THEN they should run concurrently, each with its own specification, and each
+        submission should get an "ok" outcome
+    """
+    barrier = threading.Barrier(3, timeout=5)
+    job_specs = []
+
+    def run_job(job_spec: jobs.JobSpec):
+        job_specs.append(job_spec)
+        barrier.wait()
+
+    with serve(socket_path, run_job):
+        with ThreadPoolExecutor(3) as executor:
+            outcomes = list(
+                executor.map(
+                    lambda currency: submit_job(
+                        socket_path,
+                        {"currencies": [currency], "days": 3},
+                        timeout=10,
+                    ),
+                    ["GBP", "USD", "JPY"],
+                )
+            )
+
+    assert [outcome["status"] for outcome in outcomes] == ["ok", "ok", "ok"]
+    assert all(outcome["seconds"] >= 0 for outcome in outcomes)
+    assert sorted(job_spec.currency_pairs[0].quote for job_spec in job_specs) == [
+        "GBP",
+        "JPY",
+        "USD",
+    ]
+    assert {job_spec.days for job_spec in job_specs} == {3}
+
+
+@pytest.mark.parametrize(
+    "job, error",
+    [
+        ({"currencies": ["GBP"]}, "ECB API unavailable"),
+        ({"format": "csv"}, "Format 'csv' is not supported."),
+        (
+            {"currencies": ["GBP"], "crosses": ["GBP/USD"]},
+            "Cross rate GBP/USD needs currencies not fetched by the job.",
+        ),
+    ],
+)
+def test_job_server_replies_errors(socket_path: str, job: dict, error: str):
+    """
+    GIVEN a JobServer whose jobs fail
+    WHEN a job is submitted, either valid or with an invalid specification
+    THEN the submission should get an "error" outcome with the message of the error,
+        and the server should keep serving
+    """
+
+    def run_job(job_spec: jobs.JobSpec):
+        raise RuntimeError("ECB API unavailable")
+
+    with serve(socket_path, run_job):
+        outcome = submit_job(socket_path, job, timeout=10)
+        next_outcome = submit_job(socket_path, {}, timeout=10)
+
+    assert outcome["status"] == "error"
+    assert outcome["error"] == error
+    assert next_outcome == {
+        "status": "error",
+        "error": "ECB API unavailable",
+        "seconds": next_outcome["seconds"],
+    }
+
+
+def test_submit_command(socket_path: str):
+    """
+    GIVEN a JobServer failing the jobs of JPY
+    WHEN the submit command is run for GBP, then for JPY
+    THEN the first run should report the job done, and the second one should exit with
+        the error of the job
+    """
+
+    def run_job(job_spec: jobs.JobSpec):
+        if job_spec.currency_pairs[0].quote == "JPY":
+            raise ValueError("No rates for JPY.")
+
+    runner = CliRunner()
+    with serve(socket_path, run_job):
+        done = runner.invoke(
+            submit, ["--socket", socket_path, "--currency", "GBP", "--days", "2"]
+        )
+        failed = runner.invoke(submit, ["--socket", socket_path, "--currency", "JPY"])
+
+    assert done.exit_code == 0
+    assert done.output.startswith("Job done in ")
+    assert failed.exit_code == 1
+    assert "No rates for JPY." in failed.output
+
+
+def test_job_server_loads_derived_rates_into_their_sqlite_table(
+    socket_path: str, tmp_path, monkeypatch
+):
+    """
+    GIVEN a JobServer storing rates in a SQLite file, and a fake ECB API
+    WHEN a job with a derived table and a cross rate is submitted
+    THEN the EUR rates should be loaded into the exchange_rates table, and the inverse
+        and cross rates only into the table of the derived table
+    """
+    monkeypatch.setattr(
+        source_repository,
+        "EcbApiCaller",
+        lambda days, **kwargs: source_repository.EcbApiCallerFake(
+            {
+                "GBP": "tests/data/xml_ecb_test.xml",
+                "USD": "tests/data/xml_ecb_test.xml",
+            },
+            days_to_register=days,
+        ),
+    )
+    sqlite_path = str(tmp_path / "rates.sqlite")
+
+    with serve(socket_path, create_job_runner(sqlite_path)):
+        outcome = submit_job(
+            socket_path,
+            {
+                "currencies": ["GBP", "USD"],
+                "days": 36500,
+                "derived_table": "raw.derived_exchange_rates",
+                "crosses": ["GBP/USD"],
+            },
+            timeout=10,
+        )
+
+    assert outcome["status"] == "ok"
+    pairs = {
+        table: {
+            str(exchange_rate.currency_pair)
+            for exchange_rate in destination_repository.SqliteDestinationRepository(
+                sqlite_path, table
+            ).read_all_exchange_rates()
+        }
+        for table in ("exchange_rates", "derived_exchange_rates")
+    }
+    assert pairs == {
+        "exchange_rates": {"EUR/GBP", "EUR/USD"},
+        "derived_exchange_rates": {"GBP/EUR", "USD/EUR", "GBP/USD"},
+    }
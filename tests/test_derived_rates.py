@@ -0,0 +1,88 @@
+import datetime as dt
+import pytest
+
+from src import derived_rates, model
+
+
+EUR_GBP = model.CurrencyPair("EUR", "GBP")
+EUR_USD = model.CurrencyPair("EUR", "USD")
+
+
+def build_exchange_rate(
+    date: dt.date, currency_pair: model.CurrencyPair, exchange_rate: float
+) -> model.ExchangeRate:
+    return model.ExchangeRate(
+        date=date,
+        exchange_rate=exchange_rate,
+        currency_pair=currency_pair,
+        source="ECB API",
+    )
+
+
+def test_derive_exchange_rates():
+    """
+    GIVEN EUR/GBP and EUR/USD Exchange Rates, with EUR/GBP missing on a date
+    WHEN derive_exchange_rates() is called with GBP/USD as cross rate
+    THEN the inverses and the cross rate should be derived for the dates with all their legs
+    """
+    exchange_rates = [
+        build_exchange_rate(dt.date(2023, 11, 6), EUR_GBP, 0.8),
+        build_exchange_rate(dt.date(2023, 11, 6), EUR_USD, 1.2),
+        build_exchange_rate(dt.date(2023, 11, 7), EUR_USD, 1.25),
+    ]
+
+    result = derived_rates.derive_exchange_rates(
+        exchange_rates, [model.CurrencyPair("GBP", "USD")]
+    )
+
+    assert [
+        (rate.date, str(rate.currency_pair), rate.exchange_rate) for rate in result
+    ] == [
+        (dt.date(2023, 11, 6), "GBP/USD", pytest.approx(1.5)),
+        (dt.date(2023, 11, 6), "GBP/EUR", pytest.approx(1.25)),
+        (dt.date(2023, 11, 6), "USD/EUR", pytest.approx(1 / 1.2)),
+        (dt.date(2023, 11, 7), "USD/EUR", pytest.approx(0.8)),
+    ]
+    assert {rate.source for rate in result} == {derived_rates.DERIVED_SOURCE}
+
+
+def test_derive_exchange_rates_skips_crosses_without_legs():
+    """
+    GIVEN EUR/USD Exchange Rates only
+    WHEN derive_exchange_rates() is called with GBP/USD as cross rate and without inverses
+    THEN no Exchange Rate should be derived
+    """
+    exchange_rates = [build_exchange_rate(dt.date(2023, 11, 6), EUR_USD, 1.2)]
+
+    assert (
+        derived_rates.derive_exchange_rates(
+            exchange_rates, [model.CurrencyPair("GBP", "USD")], inverses=False
+        )
+        == []
+    )
+
+
+def test_derive_exchange_rates_skips_zero_legs():
+    """
+    GIVEN EUR/GBP and EUR/USD Exchange Rates, with a zero EUR/GBP rate on a date
+    WHEN derive_exchange_rates() is called with GBP/USD as cross rate
+    THEN no rate should be derived from the zero leg, and the other dates should be
+        derived as usual
+    """
+    exchange_rates = [
+        build_exchange_rate(dt.date(2023, 11, 6), EUR_GBP, 0.0),
+        build_exchange_rate(dt.date(2023, 11, 6), EUR_USD, 1.2),
+        build_exchange_rate(dt.date(2023, 11, 7), EUR_GBP, 0.8),
+        build_exchange_rate(dt.date(2023, 11, 7), EUR_USD, 1.2),
+    ]
+
+    result = derived_rates.derive_exchange_rates(
+        exchange_rates, [model.CurrencyPair("GBP", "USD")]
+    )
+
+    assert [(rate.date, str(rate.currency_pair)) for rate in result] == [
+        (dt.date(2023, 11, 7), "GBP/USD"),
+        (dt.date(2023, 11, 7), "GBP/EUR"),
+        (dt.date(2023, 11, 6), "USD/EUR"),
+        (dt.date(2023, 11, 7), "USD/EUR"),
+    ]
@@ -1,6 +1,17 @@
-from typing import Tuple, List
+from typing import Tuple, List, Optional
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import datetime as dt
+import json
 import os
+import sqlite3
+import time
+import pytest
+
+from tests.data.ecb_exchange_rates import EXCHANGE_RATES
 from src import model, destination_repository
+from src.utils.gcp_clients import BigQueryClientFake
 
 
 def test_load_exchange_rates(
@@ -34,3 +45,588 @@ def test_load_exchange_rates(
     assert len(EXCHANGE_RATES) == len(results_exchange_rates)
     for exchange_rate in EXCHANGE_RATES:
         assert exchange_rate in results_exchange_rates
+
+
+def test_sqlite_load_exchange_rates(
+    sqlite_repository: destination_repository.SqliteDestinationRepository,
+):
+    """
+    GIVEN a sqlite repository and a collection of Exchange Rates
+    WHEN they are passed as arguments to SqliteDestinationRepository.load_exchange_rates()
+    THEN Exchange Rates should be readable back from the repository
+    """
+    sqlite_repository.load_exchange_rates(EXCHANGE_RATES)
+
+    results_exchange_rates = sqlite_repository.read_exchange_rates(
+        model.CurrencyPair("EUR", "GBP")
+    )
+
+    assert results_exchange_rates == EXCHANGE_RATES
+
+
+def test_sqlite_load_exchange_rates_is_idempotent(
+    sqlite_repository: destination_repository.SqliteDestinationRepository,
+):
+    """
+    GIVEN a sqlite repository with Exchange Rates already loaded
+    WHEN the same Exchange Rates are loaded again with a revised value
+    THEN there should be one row per currency pair and date holding the latest value
+    """
+    sqlite_repository.load_exchange_rates(EXCHANGE_RATES)
+    revised_exchange_rate = model.ExchangeRate(
+        date=EXCHANGE_RATES[0].date,
+        exchange_rate=0.9,
+        currency_pair=EXCHANGE_RATES[0].currency_pair,
+        source=EXCHANGE_RATES[0].source,
+    )
+    sqlite_repository.load_exchange_rates(EXCHANGE_RATES + [revised_exchange_rate])
+
+    results_exchange_rates = sqlite_repository.read_exchange_rates(
+        model.CurrencyPair("EUR", "GBP")
+    )
+
+    assert len(results_exchange_rates) == len(EXCHANGE_RATES)
+    assert results_exchange_rates[0] == revised_exchange_rate
+
+
+def test_sqlite_read_exchange_rates_in_range(
+    sqlite_repository: destination_repository.SqliteDestinationRepository,
+):
+    """
+    GIVEN a sqlite repository with Exchange Rates loaded
+    WHEN SqliteDestinationRepository.read_exchange_rates() is called with a date range
+    THEN only the Exchange Rates of the currency pair within the range should be returned
+    """
+    sqlite_repository.load_exchange_rates(EXCHANGE_RATES)
+
+    results_exchange_rates = sqlite_repository.read_exchange_rates(
+        model.CurrencyPair("EUR", "GBP"), dt.date(2023, 10, 6), dt.date(2023, 10, 8)
+    )
+
+    assert results_exchange_rates == EXCHANGE_RATES[1:4]
+    assert sqlite_repository.read_exchange_rates(model.CurrencyPair("EUR", "USD")) == []
+
+
+@pytest.mark.parametrize(
+    "as_of, expected_index",
+    [
+        (dt.date(2023, 10, 4), None),
+        (dt.date(2023, 10, 5), 0),
+        (dt.date(2023, 10, 8), 3),
+        (dt.date(2023, 12, 31), 4),
+    ],
+)
+def test_sqlite_read_exchange_rate_as_of(
+    sqlite_repository: destination_repository.SqliteDestinationRepository,
+    as_of: dt.date,
+    expected_index: Optional[int],
+):
+    """
+    GIVEN a sqlite repository with Exchange Rates loaded
+    WHEN SqliteDestinationRepository.read_exchange_rate_as_of() is called with a date
+    THEN the latest Exchange Rate on or before that date should be returned
+    """
+    sqlite_repository.load_exchange_rates(EXCHANGE_RATES)
+
+    result = sqlite_repository.read_exchange_rate_as_of(
+        model.CurrencyPair("EUR", "GBP"), as_of
+    )
+
+    if expected_index is None:
+        assert result is None
+    else:
+        assert result == EXCHANGE_RATES[expected_index]
+
+
+def build_exchange_rates(number: int) -> List[model.ExchangeRate]:
+    """
+    Builds a number of EUR/GBP Exchange Rates for consecutive dates.
+
+    Args:
+        number (int): number of Exchange Rates.
+    Returns:
+        List[model.ExchangeRate]: the Exchange Rates.
+    """
+    return [
+        model.ExchangeRate(
+            date=dt.date(2000, 1, 1) + dt.timedelta(days),
+            exchange_rate=0.8,
+            currency_pair=model.CurrencyPair("EUR", "GBP"),
+            source="ECB API",
+        )
+        for days in range(number)
+    ]
+
+
+@pytest.mark.parametrize(
+    "batching_policy, expected_chunk_rows",
+    [
+        (destination_repository.LoadBatchingPolicy(), [25]),
+        (destination_repository.LoadBatchingPolicy(max_rows=10), [10, 10, 5]),
+        (destination_repository.LoadBatchingPolicy(max_bytes=1000), [6, 6, 6, 6, 1]),
+        (destination_repository.LoadBatchingPolicy(max_bytes=1), [1] * 25),
+    ],
+)
+def test_bq_load_exchange_rates_splits_in_chunks(
+    batching_policy: destination_repository.LoadBatchingPolicy,
+    expected_chunk_rows: List[int],
+):
+    """
+    GIVEN a BigQuery repository with a batching policy and a fake client
+    WHEN Exchange Rates are passed to BiqQueryDestinationRepository.load_exchange_rates()
+    THEN they should be loaded in chunks within the rows and bytes limits of the policy
+    """
+    client = BigQueryClientFake()
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        client, batching_policy
+    )
+
+    bq_repository.load_exchange_rates(build_exchange_rates(25))
+
+    assert [rows for _, rows in client.loads] == expected_chunk_rows
+    assert len(client.tables["raw.exchange_rates"]) == 25
+    assert [report.rows for report in bq_repository.chunk_reports] == (
+        expected_chunk_rows
+    )
+    for report in bq_repository.chunk_reports:
+        assert report.succeeded and report.attempts == 1
+        assert report.bytes <= max(
+            batching_policy.max_bytes, report.bytes // report.rows
+        )
+
+
+def test_bq_load_exchange_rates_retries_failed_chunks_only():
+    """
+    GIVEN a BigQuery repository and a fake client failing the second load job
+    WHEN Exchange Rates are loaded in several chunks
+    THEN only the failed chunk should be loaded again
+    """
+    client = BigQueryClientFake(failing_loads=[1])
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        client,
+        destination_repository.LoadBatchingPolicy(max_rows=10, backoff_seconds=0),
+    )
+
+    bq_repository.load_exchange_rates(build_exchange_rates(25))
+
+    assert [rows for _, rows in client.loads] == [10, 10, 10, 5]
+    assert len(client.tables["raw.exchange_rates"]) == 25
+    assert [report.attempts for report in bq_repository.chunk_reports] == [1, 2, 1]
+
+
+def test_bq_load_exchange_rates_raises_when_attempts_are_exhausted():
+    """
+    GIVEN a BigQuery repository and a fake client failing every attempt of a chunk
+    WHEN Exchange Rates are loaded in several chunks
+    THEN the other chunks should be loaded and a RuntimeError should be raised
+    """
+    client = BigQueryClientFake(failing_loads=[1, 2, 3])
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        client,
+        destination_repository.LoadBatchingPolicy(max_rows=10, backoff_seconds=0),
+    )
+
+    with pytest.raises(RuntimeError) as excinfo:
+        bq_repository.load_exchange_rates(build_exchange_rates(25))
+
+    assert "1 chunks failed" in str(excinfo.value)
+    assert len(client.tables["raw.exchange_rates"]) == 15
+    assert [report.succeeded for report in bq_repository.chunk_reports] == [
+        True,
+        False,
+        True,
+    ]
+
+
+def test_bq_load_exchange_rates_backs_off_between_attempts(monkeypatch):
+    """
+    GIVEN a BigQuery repository and a fake client failing the first two attempts
+    WHEN Exchange Rates are loaded
+    THEN the attempts should be spaced by an exponential backoff
+    """
+    sleeps = []
+    monkeypatch.setattr(destination_repository.time, "sleep", sleeps.append)
+    client = BigQueryClientFake(failing_loads=[0, 1])
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        client, destination_repository.LoadBatchingPolicy(backoff_seconds=0.5)
+    )
+
+    bq_repository.load_exchange_rates(build_exchange_rates(5))
+
+    assert sleeps == [0.5, 1.0]
+    assert [report.attempts for report in bq_repository.chunk_reports] == [3]
+
+
+def test_bq_load_exchange_rates_does_not_retry_rejected_chunks():
+    """
+    GIVEN a BigQuery repository and a fake client rejecting the first load job
+    WHEN Exchange Rates are loaded
+    THEN the rejected chunk should not be retried and a RuntimeError should be raised
+    """
+    client = BigQueryClientFake(rejected_loads=[0])
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        client, destination_repository.LoadBatchingPolicy(backoff_seconds=0)
+    )
+
+    with pytest.raises(RuntimeError):
+        bq_repository.load_exchange_rates(build_exchange_rates(5))
+
+    assert len(client.loads) == 1
+    assert [report.attempts for report in bq_repository.chunk_reports] == [1]
+
+
+def test_bq_load_exchange_rates_merges_loads_within_window():
+    """
+    GIVEN a BigQuery repository with a merge window and a fake client
+    WHEN Exchange Rates are loaded several times within the window and then flushed
+    THEN they should be loaded in a single load job on flush
+    """
+    client = BigQueryClientFake()
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        client, destination_repository.LoadBatchingPolicy(merge_window_seconds=60)
+    )
+    exchange_rates = build_exchange_rates(9)
+
+    for index in range(0, 9, 3):
+        bq_repository.load_exchange_rates(exchange_rates[index : index + 3])
+    assert client.loads == []
+
+    bq_repository.flush()
+    assert client.loads == [("raw.exchange_rates", 9)]
+
+
+def test_bq_merge_window_is_loaded_by_timer():
+    """
+    GIVEN a BigQuery repository with a short merge window and a fake client
+    WHEN Exchange Rates are loaded twice within the window and never flushed
+    THEN they should be loaded in a single load job once the window has elapsed
+    """
+    client = BigQueryClientFake()
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        client, destination_repository.LoadBatchingPolicy(merge_window_seconds=0.1)
+    )
+    exchange_rates = build_exchange_rates(6)
+
+    bq_repository.load_exchange_rates(exchange_rates[:3])
+    bq_repository.load_exchange_rates(exchange_rates[3:])
+    assert client.loads == []
+    time.sleep(0.3)
+
+    assert client.loads == [("raw.exchange_rates", 6)]
+    bq_repository.flush()
+    assert len(client.loads) == 1
+
+
+def test_ndjson_row_encoder():
+    """
+    GIVEN a collection of Exchange Rates
+    WHEN they are encoded twice by NdjsonRowEncoder, clearing it in between
+    THEN the buffer should hold one JSON row per Exchange Rate with the columns of
+        the BigQuery exchange rates table
+    """
+    encoder = destination_repository.NdjsonRowEncoder()
+    encoder.encode(EXCHANGE_RATES)
+    encoder.clear()
+    encoder.encode(EXCHANGE_RATES)
+
+    rows = [json.loads(line) for line in encoder.buffer.splitlines()]
+
+    assert encoder.row_ends[-1] == len(encoder.buffer)
+    assert len(encoder.row_ends) == len(EXCHANGE_RATES)
+    assert rows == [
+        {
+            "date": exchange_rate.date.strftime("%Y-%m-%d"),
+            "exchange_rate": exchange_rate.exchange_rate,
+            "base_currency": exchange_rate.currency_pair.base,
+            "quote_currency": exchange_rate.currency_pair.quote,
+            "source": exchange_rate.source,
+            "creation_date": exchange_rate.creation_date.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        for exchange_rate in EXCHANGE_RATES
+    ]
+
+
+def test_bq_replace_exchange_rates_touches_affected_dates_only():
+    """
+    GIVEN a BigQuery table with Exchange Rates of several dates
+    WHEN Exchange Rates of one of these dates are passed to replace_exchange_rates()
+    THEN the rows of that date should be replaced and the others left untouched
+    """
+    client = BigQueryClientFake()
+    bq_repository = destination_repository.BiqQueryDestinationRepository(client)
+    bq_repository.load_exchange_rates(build_exchange_rates(3))
+    replacement = model.ExchangeRate(
+        date=dt.date(2000, 1, 2),
+        exchange_rate=0.9,
+        currency_pair=model.CurrencyPair("EUR", "GBP"),
+        source="ECB API",
+    )
+
+    bq_repository.replace_exchange_rates([replacement])
+
+    ((query, parameters),) = client.queries
+    assert query.startswith("DELETE FROM `raw.exchange_rates`")
+    assert parameters == {
+        "dates": [dt.date(2000, 1, 2)],
+        "currency_pairs": ["EUR/GBP"],
+    }
+    assert sorted(
+        (row["date"], row["exchange_rate"])
+        for row in client.tables["raw.exchange_rates"]
+    ) == [("2000-01-01", 0.8), ("2000-01-02", 0.9), ("2000-01-03", 0.8)]
+
+
+def test_bq_replace_exchange_rates_keeps_other_frequencies():
+    """
+    GIVEN a BigQuery table with a daily and a monthly Exchange Rate of the same date
+    WHEN a monthly Exchange Rate of that date is passed to replace_exchange_rates()
+    THEN only the monthly row should be replaced
+    """
+    client = BigQueryClientFake()
+    bq_repository = destination_repository.BiqQueryDestinationRepository(client)
+    daily_rate, monthly_rate, replacement = (
+        model.ExchangeRate(
+            date=dt.date(2023, 10, 1),
+            exchange_rate=exchange_rate,
+            currency_pair=model.CurrencyPair("EUR", "GBP"),
+            source="ECB API",
+            frequency=frequency,
+        )
+        for exchange_rate, frequency in [
+            (0.866, model.DAILY),
+            (0.8676, model.MONTHLY),
+            (0.8677, model.MONTHLY),
+        ]
+    )
+    bq_repository.load_exchange_rates([daily_rate, monthly_rate])
+
+    bq_repository.replace_exchange_rates([replacement])
+
+    ((query, parameters),) = client.queries
+    assert query.endswith("AND IFNULL(frequency, 'D') IN UNNEST(@frequencies)")
+    assert parameters["frequencies"] == [model.MONTHLY]
+    assert sorted(
+        (row.get("frequency", model.DAILY), row["exchange_rate"])
+        for row in client.tables["raw.exchange_rates"]
+    ) == [(model.DAILY, 0.866), (model.MONTHLY, 0.8677)]
+
+
+def test_sqlite_load_exchange_rates_of_other_frequencies(
+    sqlite_repository: destination_repository.SqliteDestinationRepository,
+):
+    """
+    GIVEN a SQLite repository
+    WHEN monthly Exchange Rates are loaded and read back
+    THEN they should keep their frequency
+    """
+    monthly_rate = model.ExchangeRate(
+        date=dt.date(2023, 10, 1),
+        exchange_rate=0.8676,
+        currency_pair=model.CurrencyPair("EUR", "GBP"),
+        source="ECB API",
+        frequency=model.MONTHLY,
+    )
+
+    sqlite_repository.load_exchange_rates([monthly_rate])
+
+    assert sqlite_repository.read_exchange_rates(monthly_rate.currency_pair) == [
+        monthly_rate
+    ]
+
+
+def test_ndjson_row_encoder_adds_frequency_of_other_frequencies():
+    """
+    GIVEN a daily and a monthly Exchange Rate
+    WHEN they are encoded by NdjsonRowEncoder
+    THEN only the row of the monthly one should have a frequency column
+    """
+    encoder = destination_repository.NdjsonRowEncoder()
+    daily_rate = EXCHANGE_RATES[0]
+    monthly_rate = dataclasses.replace(daily_rate, frequency=model.MONTHLY)
+
+    encoder.encode([daily_rate, monthly_rate])
+
+    daily_row, monthly_row = map(json.loads, bytes(encoder.buffer).splitlines())
+    assert "frequency" not in daily_row
+    assert monthly_row["frequency"] == model.MONTHLY
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_ndjson_row_encoder_rejects_non_finite_rates(value: float):
+    """
+    GIVEN Exchange Rates encoded by NdjsonRowEncoder, and a batch with a non-finite one
+    WHEN the batch is encoded
+    THEN a ValueError should be raised and none of the batch should be appended
+    """
+    encoder = destination_repository.NdjsonRowEncoder()
+    encoder.encode(EXCHANGE_RATES[:1])
+    buffer = bytes(encoder.buffer)
+
+    with pytest.raises(ValueError):
+        encoder.encode(
+            [
+                EXCHANGE_RATES[1],
+                dataclasses.replace(EXCHANGE_RATES[2], exchange_rate=value),
+            ]
+        )
+
+    assert bytes(encoder.buffer) == buffer
+    assert encoder.row_ends == [len(buffer)]
+
+
+def test_sqlite_adds_frequency_to_existing_table(tmp_path):
+    """
+    GIVEN a SQLite file with an exchange rates table created without frequency column
+    WHEN a SqliteDestinationRepository is created on it
+    THEN its rows should be read back as daily rates
+    """
+    database_path = str(tmp_path / "rates.sqlite")
+    connection = sqlite3.connect(database_path)
+    connection.execute(
+        "CREATE TABLE exchange_rates (base_currency TEXT NOT NULL, "
+        "quote_currency TEXT NOT NULL, date TEXT NOT NULL, exchange_rate REAL NOT NULL, "
+        "source TEXT NOT NULL, creation_date TEXT NOT NULL, "
+        "PRIMARY KEY (base_currency, quote_currency, date)) WITHOUT ROWID"
+    )
+    connection.execute(
+        "INSERT INTO exchange_rates VALUES "
+        "('EUR', 'GBP', '2023-10-05', 0.866, 'ECB API', '2023-10-05 16:00:00')"
+    )
+    connection.commit()
+    connection.close()
+
+    sqlite_repository = destination_repository.SqliteDestinationRepository(
+        database_path
+    )
+
+    assert sqlite_repository.read_exchange_rates(model.CurrencyPair("EUR", "GBP")) == [
+        EXCHANGE_RATES[0]
+    ]
+
+
+def test_fan_out_loads_rows_encoded_once_into_every_destination(tmp_path):
+    """
+    GIVEN a fan-out to two BigQuery repositories, a SQLite repository and an archive
+    WHEN Exchange Rates are loaded and flushed
+    THEN every destination should hold them, both BigQuery repositories and the archive
+        should get the same encoded rows, and a report be recorded per destination
+    """
+    partner_client, client = BigQueryClientFake(), BigQueryClientFake()
+    sqlite_repository = destination_repository.SqliteDestinationRepository(
+        str(tmp_path / "rates.db")
+    )
+    archive = destination_repository.NdjsonArchiveDestinationRepository(
+        str(tmp_path / "archive")
+    )
+    fan_out = destination_repository.FanOutDestinationRepository(
+        [
+            destination_repository.BiqQueryDestinationRepository(client),
+            destination_repository.BiqQueryDestinationRepository(partner_client),
+            sqlite_repository,
+            archive,
+        ]
+    )
+    exchange_rates = build_exchange_rates(25)
+
+    fan_out.load_exchange_rates(exchange_rates)
+    fan_out.flush()
+    fan_out.close()
+
+    assert client.tables == partner_client.tables
+    assert len(client.tables["raw.exchange_rates"]) == 25
+    assert len(list(sqlite_repository.read_all_exchange_rates())) == 25
+    with gzip.open(archive.file_paths[0], "rt") as f:
+        assert [json.loads(line) for line in f] == client.tables["raw.exchange_rates"]
+    assert [
+        (report.operation, report.destination_index, report.succeeded)
+        for report in fan_out.destination_reports
+    ] == [("load", index, True) for index in range(4)] + [
+        ("flush", index, True) for index in range(4)
+    ]
+
+
+def test_fan_out_isolates_and_retries_failed_destinations():
+    """
+    GIVEN a fan-out to a healthy BigQuery repository, one failing once and one failing
+        every attempt
+    WHEN Exchange Rates are loaded
+    THEN the healthy and the flaky destinations should load them once, and a
+        RuntimeError naming the failed destination should be raised
+    """
+    single_attempt = destination_repository.LoadBatchingPolicy(max_attempts=1)
+    clients = [
+        BigQueryClientFake(),
+        BigQueryClientFake(failing_loads=[0]),
+        BigQueryClientFake(failing_loads=[0, 1, 2]),
+    ]
+    fan_out = destination_repository.FanOutDestinationRepository(
+        [
+            destination_repository.BiqQueryDestinationRepository(client, single_attempt)
+            for client in clients
+        ],
+        max_attempts=3,
+        backoff_seconds=0,
+    )
+
+    with pytest.raises(RuntimeError) as excinfo:
+        fan_out.load_exchange_rates(build_exchange_rates(5))
+
+    assert "1 of 3 destinations failed to load: 2" in str(excinfo.value)
+    assert [len(client.tables.get("raw.exchange_rates", [])) for client in clients] == [
+        5,
+        5,
+        0,
+    ]
+    assert [report.attempts for report in fan_out.destination_reports] == [1, 2, 3]
+
+
+def test_bq_load_encoded_rows_skips_chunks_loaded_before_a_failure():
+    """
+    GIVEN a BigQuery repository and a fake client failing every attempt of a chunk
+    WHEN encoded rows fail to load and the same encoded rows are loaded again
+    THEN only the chunk that failed should be loaded the second time
+    """
+    client = BigQueryClientFake(failing_loads=[1, 2, 3])
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        client,
+        destination_repository.LoadBatchingPolicy(max_rows=10, backoff_seconds=0),
+    )
+    exchange_rates = build_exchange_rates(25)
+    encoder = destination_repository.NdjsonRowEncoder()
+    encoder.encode(exchange_rates)
+    encoded_rows = destination_repository.EncodedRows(
+        bytes(encoder.buffer), tuple(encoder.row_ends)
+    )
+
+    with pytest.raises(RuntimeError):
+        bq_repository.load_encoded_rows(exchange_rates, encoded_rows)
+    bq_repository.load_encoded_rows(exchange_rates, encoded_rows)
+
+    assert [rows for _, rows in client.loads][-1:] == [10]
+    assert len(client.tables["raw.exchange_rates"]) == 25
+
+
+def test_sqlite_quarantine_repository_is_shared_by_threads(tmp_path):
+    """
+    GIVEN a SQLite quarantine repository created by the main thread
+    WHEN several threads load quarantined Exchange Rates into it at the same time
+    THEN every row should be appended
+    """
+    quarantine_repository = destination_repository.SqliteQuarantineRepository(
+        str(tmp_path / "rates.sqlite")
+    )
+    quarantined = [
+        model.QuarantinedExchangeRate(exchange_rate, "range")
+        for exchange_rate in EXCHANGE_RATES
+    ]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for future in [
+            executor.submit(
+                quarantine_repository.load_quarantined_exchange_rates, quarantined
+            )
+            for _ in range(4)
+        ]:
+            future.result()
+
+    assert len(quarantine_repository.read_quarantined_rows()) == 4 * len(quarantined)
@@ -0,0 +1,26 @@
+import datetime as dt
+
+from src import model
+from src.utils.high_water_marks import HighWaterMarkStore
+
+
+def test_high_water_mark_store(tmp_path):
+    """
+    GIVEN a high-water mark store on a new file
+    WHEN marks are updated, including with older dates, and the file is reopened
+    THEN each currency pair should keep its latest date
+    """
+    file_path = str(tmp_path / "state.json")
+    eur_gbp, eur_usd = model.CurrencyPair("EUR", "GBP"), model.CurrencyPair(
+        "EUR", "USD"
+    )
+    store = HighWaterMarkStore(file_path)
+    assert store.get(eur_gbp) is None
+
+    store.update(eur_gbp, dt.date(2023, 11, 10))
+    store.update(eur_gbp, dt.date(2023, 11, 1))
+    store.update(eur_usd, dt.date(2023, 11, 9))
+
+    reopened_store = HighWaterMarkStore(file_path)
+    assert reopened_store.get(eur_gbp) == dt.date(2023, 11, 10)
+    assert reopened_store.get(eur_usd) == dt.date(2023, 11, 9)
@@ -0,0 +1,118 @@
+import base64
+import json
+import pytest
+
+from src import jobs, model, source_repository
+
+
+def encode_event(payload) -> dict:
+    """
+    Encodes a payload as the data of a Pub/Sub event.
+
+    Args:
+        payload: JSON serializable payload, or str to be sent as is.
+    Returns:
+        dict: the Pub/Sub event.
+    """
+    data = payload if isinstance(payload, str) else json.dumps(payload)
+    return {"data": base64.b64encode(data.encode()).decode()}
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        encode_event("Trigger Cloud Function"),
+        encode_event([]),
+        encode_event({}),
+        {"data": "not base64 !"},
+        {},
+    ],
+)
+def test_job_specs_from_event_without_jobs(event: dict):
+    """
+    GIVEN a Pub/Sub event that does not carry a job specification
+    WHEN job_specs_from_event() is called with it
+    THEN the default job should be returned
+    """
+    assert jobs.job_specs_from_event(event) == [jobs.JobSpec()]
+
+
+def test_job_specs_from_event():
+    """
+    GIVEN a Pub/Sub event carrying a list of job specifications
+    WHEN job_specs_from_event() is called with it
+    THEN the job specifications should be decoded with defaults for missing keys
+    """
+    event = encode_event(
+        {
+            "jobs": [
+                {
+                    "currencies": ["gbp", "JPY"],
+                    "days": 30,
+                    "destination_table": "finance.rates",
+                    "format": "generic",
+                },
+                {"currencies": ["USD"]},
+            ]
+        }
+    )
+
+    assert jobs.job_specs_from_event(event) == [
+        jobs.JobSpec(
+            currency_pairs=(
+                model.CurrencyPair("EUR", "GBP"),
+                model.CurrencyPair("EUR", "JPY"),
+            ),
+            days=30,
+            destination_table="finance.rates",
+            data_format=source_repository.GENERIC_DATA,
+        ),
+        jobs.JobSpec(currency_pairs=(model.CurrencyPair("EUR", "USD"),)),
+    ]
+
+
+def test_job_specs_from_event_with_invalid_format():
+    """
+    GIVEN a Pub/Sub event carrying a job specification with an unknown format
+    WHEN job_specs_from_event() is called with it
+    THEN a ValueError should be raised
+    """
+    with pytest.raises(ValueError):
+        jobs.job_specs_from_event(encode_event({"format": "csv"}))
+
+
+@pytest.mark.parametrize("currencies", ["USD", ["USD", 1], {"USD": 1}])
+def test_job_spec_from_dict_with_invalid_currencies(currencies):
+    """
+    GIVEN a job specification whose currencies are not a list of currency codes
+    WHEN JobSpec.from_dict() is called with it
+    THEN a ValueError should be raised
+    """
+    with pytest.raises(ValueError, match="Currencies must be a list"):
+        jobs.JobSpec.from_dict({"currencies": currencies})
+
+
+def test_job_spec_from_dict_with_cross_rates():
+    """
+    GIVEN a job specification with a derived table and cross rates
+    WHEN JobSpec.from_dict() is called with it
+    THEN the cross rates should be parsed, and rejected if they are malformed or need
+        currencies not fetched by the job
+    """
+    job_spec = jobs.JobSpec.from_dict(
+        {
+            "currencies": ["GBP", "USD"],
+            "derived_table": "raw.derived_exchange_rates",
+            "crosses": ["GBP/USD", "USD/EUR"],
+        }
+    )
+
+    assert job_spec.derived_table == "raw.derived_exchange_rates"
+    assert job_spec.cross_currency_pairs == (
+        model.CurrencyPair("GBP", "USD"),
+        model.CurrencyPair("USD", "EUR"),
+    )
+    with pytest.raises(ValueError):
+        jobs.JobSpec.from_dict({"currencies": ["GBP"], "crosses": ["GBP/JPY"]})
+    with pytest.raises(ValueError):
+        jobs.JobSpec.from_dict({"currencies": ["GBP"], "crosses": ["GBPEUR"]})
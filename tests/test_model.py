@@ -196,3 +196,47 @@ def test_currency_pair_string_representation():
     """
     pair = model.CurrencyPair("USD", "EUR")
     assert str(pair) == "USD/EUR"
+
+
+@pytest.mark.parametrize(
+    "frequency, start, end, label",
+    [
+        (model.DAILY, dt.date(2023, 11, 15), dt.date(2023, 11, 15), "2023-11-15"),
+        (model.MONTHLY, dt.date(2023, 11, 1), dt.date(2023, 11, 30), "2023-11"),
+        (model.QUARTERLY, dt.date(2023, 10, 1), dt.date(2023, 12, 31), "2023-Q4"),
+        (model.ANNUAL, dt.date(2023, 1, 1), dt.date(2023, 12, 31), "2023"),
+    ],
+)
+def test_periods(frequency: str, start: dt.date, end: dt.date, label: str):
+    """
+    GIVEN a date and a frequency
+    WHEN the period of the frequency containing the date is computed
+    THEN its first day, last day and ECB label should match, and the label should be
+        parsed back to its first day
+    """
+    date = dt.date(2023, 11, 15)
+
+    assert model.period_start(date, frequency) == start
+    assert model.period_end(date, frequency) == end
+    assert model.period_label(date, frequency) == label
+    assert model.parse_period(label, frequency) == start
+
+
+@pytest.mark.parametrize("currency_pair", ["GBPUSD", "GBP/", "/USD", "GBP/USD/JPY"])
+def test_currency_pair_from_string_rejects_malformed_pairs(currency_pair: str):
+    """
+    GIVEN a string that is not two currencies separated by a slash
+    WHEN CurrencyPair.from_string() is called with it
+    THEN a ValueError should be raised
+    """
+    with pytest.raises(ValueError, match="is not a currency pair"):
+        model.CurrencyPair.from_string(currency_pair)
+
+
+def test_currency_pair_from_string():
+    """
+    GIVEN a currency pair written as "gbp/USD"
+    WHEN CurrencyPair.from_string() is called with it
+    THEN the currency pair GBP/USD should be returned
+    """
+    assert model.CurrencyPair.from_string("gbp/USD") == model.CurrencyPair("GBP", "USD")
@@ -0,0 +1,147 @@
+import dataclasses
+import json
+
+import pytest
+import requests
+import requests_mock
+
+from tests.data.ecb_exchange_rates import EXCHANGE_RATES
+from src import notifications
+from src.utils.notification_state import NotificationStateStore
+
+
+WEBHOOK_URL = "https://consumer.example.com/exchange-rates"
+
+
+def test_notify_deduplicates_rates(tmp_path):
+    """
+    GIVEN a notifier publishing to a file
+    WHEN the same rates are notified twice, then again with a revised value
+    THEN only the rates not notified before with the same value should be published,
+        the revision marked as revised
+    """
+    publisher = notifications.FilePublisher(str(tmp_path / "notifications.jsonl"))
+    notifier = notifications.ChangeNotifier(publisher)
+    revised_rate = dataclasses.replace(
+        EXCHANGE_RATES[1], exchange_rate=0.8685, source="ECB API (revised)"
+    )
+
+    notifier.notify(EXCHANGE_RATES[:3] + EXCHANGE_RATES[:1])
+    assert notifier.notify(EXCHANGE_RATES[:3]) == []
+    notifier.notify([EXCHANGE_RATES[0], revised_rate, EXCHANGE_RATES[2]])
+    messages = publisher.read_notifications()
+
+    assert len(messages) == 2
+    assert messages[0]["rates"][0] == {
+        "pair": "EUR/GBP",
+        "date": "2023-10-05",
+        "value": 0.866,
+        "frequency": "D",
+        "revised": False,
+    }
+    assert [rate["date"] for rate in messages[0]["rates"]] == [
+        "2023-10-05",
+        "2023-10-06",
+        "2023-10-07",
+    ]
+    assert [(rate["value"], rate["revised"]) for rate in messages[1]["rates"]] == [
+        (0.8685, True)
+    ]
+    assert [message["id"] for message in messages] == [
+        notification.message_id for notification in notifier.notifications
+    ]
+
+
+def test_notify_batches_rates():
+    """
+    GIVEN a notifier allowing two rates per message
+    WHEN five rates are notified
+    THEN they should be published in three messages, whose ids only depend on their content
+    """
+    notifier = notifications.ChangeNotifier(
+        notifications.FilePublisher("/dev/null"), max_rates=2
+    )
+
+    published = notifier.notify(EXCHANGE_RATES[:5])
+
+    assert [len(notification.rates) for notification in published] == [2, 2, 1]
+    assert (
+        notifications.RateNotification.from_rates(list(reversed(published[0].rates)))
+        == published[0]
+    )
+
+
+def test_webhook_failure_is_published_with_next_run():
+    """
+    GIVEN a notifier posting to a webhook that fails once
+    WHEN rates are notified in two runs
+    THEN the first run should not raise, and the second one should post its rates along
+        with the ones of the first run, with the id of the message as idempotency key
+    """
+    notifier = notifications.ChangeNotifier(notifications.WebhookPublisher(WEBHOOK_URL))
+
+    with requests_mock.Mocker() as mock:
+        mock.post(WEBHOOK_URL, [{"status_code": 503}, {"status_code": 202}])
+        assert notifier.notify(EXCHANGE_RATES[:2]) == []
+        assert notifier.pending_rates() == 2
+        published = notifier.notify(EXCHANGE_RATES[2:3])
+        request = mock.last_request
+
+    assert [len(notification.rates) for notification in published] == [3]
+    assert notifier.pending_rates() == 0
+    assert request.headers["Idempotency-Key"] == published[0].message_id
+    assert request.headers["Content-Type"] == "application/json"
+    assert json.loads(request.body)["id"] == published[0].message_id
+
+
+def test_notifier_state_is_kept_across_processes(tmp_path):
+    """
+    GIVEN a notifier keeping its state in a SQLite file, posting to a webhook that fails
+        on the second message
+    WHEN a new notifier on the same file, as created by the next run of the CLI, notifies
+        the rates of the first one again along with a new rate
+    THEN the rates published by the first notifier should not be published again, and the
+        rates of the failed message should be published with the new rate
+    """
+    state_path = str(tmp_path / "state.sqlite")
+    first_notifier = notifications.ChangeNotifier(
+        notifications.WebhookPublisher(WEBHOOK_URL),
+        max_rates=2,
+        state_store=NotificationStateStore(state_path),
+    )
+
+    with requests_mock.Mocker() as mock:
+        mock.post(
+            WEBHOOK_URL,
+            [{"status_code": 202}, {"status_code": 503}, {"status_code": 202}],
+        )
+        first_published = first_notifier.notify(EXCHANGE_RATES[:4])
+        second_notifier = notifications.ChangeNotifier(
+            notifications.WebhookPublisher(WEBHOOK_URL),
+            state_store=NotificationStateStore(state_path),
+        )
+        second_published = second_notifier.notify(EXCHANGE_RATES[:5])
+
+    assert [len(notification.rates) for notification in first_published] == [2]
+    assert second_notifier.pending_rates() == 0
+    assert [rate.date for rate in second_published[0].rates] == [
+        exchange_rate.date.isoformat() for exchange_rate in EXCHANGE_RATES[2:5]
+    ]
+
+
+def test_webhook_publisher_raises_on_error():
+    """
+    GIVEN a webhook answering with an error
+    WHEN a notification is published to it directly
+    THEN the error should be raised
+    """
+    publisher = notifications.WebhookPublisher(WEBHOOK_URL)
+
+    with requests_mock.Mocker() as mock:
+        mock.post(WEBHOOK_URL, status_code=500)
+        with pytest.raises(requests.HTTPError):
+            publisher.publish(
+                notifications.RateNotification.from_rates(
+                    [notifications.NotifiedRate.from_exchange_rate(EXCHANGE_RATES[0])]
+                )
+            )
@@ -0,0 +1,137 @@
+import datetime as dt
+import pytest
+
+from src import model, planner, source_repository, target_calendar
+from src.destination_repository import ChunkReport, LoadBatchingPolicy
+from src.utils.high_water_marks import HighWaterMarkStore
+
+
+def test_plan_run_skips_pairs_without_new_publication(tmp_path):
+    """
+    GIVEN a EcbApiCaller with high-water marks, one currency pair up to date
+        and the other one behind
+    WHEN plan_run is called for both currency pairs
+    THEN a single call should be planned, with one row per publication date of the window
+    """
+    eur_gbp, eur_usd = model.CurrencyPair("EUR", "GBP"), model.CurrencyPair(
+        "EUR", "USD"
+    )
+    high_water_marks = HighWaterMarkStore(str(tmp_path / "state.json"))
+    high_water_marks.update(eur_gbp, dt.date.today())
+    high_water_marks.update(eur_usd, dt.date(2023, 11, 1))
+    ecb_api_caller = source_repository.EcbApiCaller(
+        days_to_register=30, high_water_marks=high_water_marks
+    )
+
+    plan = planner.plan_run(ecb_api_caller, [eur_gbp, eur_usd])
+
+    date_from, date_to = dt.date.today() - dt.timedelta(30), dt.date.today()
+    rows = len(target_calendar.publication_dates(date_from, date_to))
+    assert plan.requests == 1
+    assert plan.skipped_currency_pairs == [eur_gbp]
+    assert plan.fetches[0].fetch_key == source_repository.FetchKey(
+        eur_usd, date_from, date_to, source_repository.STRUCTURE_SPECIFIC_DATA
+    )
+    assert plan.rows == rows
+    assert plan.transferred_bytes < plan.response_bytes
+    assert plan.load_jobs == 0
+
+
+def test_plan_run_estimates_load_jobs():
+    """
+    GIVEN a batching policy of 100 rows per load job, derived rates and two cross rates,
+        one of them with a currency that is not fetched
+    WHEN plan_run is called for two currency pairs over a year
+    THEN load jobs should be planned for the fetched rows and the derived rows,
+        and a single DML statement for the derived rows
+    """
+    currency_pairs = [
+        model.CurrencyPair("EUR", "GBP"),
+        model.CurrencyPair("EUR", "USD"),
+    ]
+    ecb_api_caller = source_repository.EcbApiCaller(days_to_register=365)
+
+    plan = planner.plan_run(
+        ecb_api_caller,
+        currency_pairs,
+        batching_policy=LoadBatchingPolicy(max_rows=100),
+        derived=True,
+        cross_currency_pairs=[
+            model.CurrencyPair("GBP", "USD"),
+            model.CurrencyPair("GBP", "JPY"),
+        ],
+    )
+
+    dates = plan.fetches[0].rows
+    assert plan.derived_rows == dates * 3
+    assert plan.load_jobs == -(-dates * 2 // 100) + -(-dates * 3 // 100)
+    assert plan.dml_queries == 1
+
+
+def test_estimate_load_jobs_by_bytes():
+    """
+    GIVEN a batching policy whose byte limit is reached before its row limit
+    WHEN estimate_load_jobs is called
+    THEN chunks should be sized by the byte limit
+    """
+    batching_policy = LoadBatchingPolicy(
+        max_rows=1_000, max_bytes=planner.NDJSON_ROW_BYTES * 10
+    )
+
+    assert planner.estimate_load_jobs(0, batching_policy) == 0
+    assert planner.estimate_load_jobs(10, batching_policy) == 1
+    assert planner.estimate_load_jobs(101, batching_policy) == 11
+
+
+def test_compare_plan_with_run_report():
+    """
+    GIVEN a plan and the report of the run
+    WHEN compare_plan is called
+    THEN each metric should have its planned and actual values and their difference
+    """
+    currency_pair = model.CurrencyPair("EUR", "GBP")
+    fetch_key = source_repository.FetchKey(
+        currency_pair,
+        dt.date(2023, 11, 1),
+        dt.date(2023, 11, 10),
+        source_repository.STRUCTURE_SPECIFIC_DATA,
+    )
+    plan = planner.ExecutionPlan(
+        fetches=[planner.FetchPlan(fetch_key, 8, 1000, 200)], load_jobs=1
+    )
+    exchange_rate = model.ExchangeRate(
+        date=dt.date(2023, 11, 1),
+        exchange_rate=0.87,
+        currency_pair=currency_pair,
+        source="ECB API",
+        creation_date=dt.datetime(2023, 11, 10),
+    )
+    report = planner.RunReport.from_run(
+        [exchange_rate] * 6,
+        [source_repository.TransferStats(currency_pair, "gzip", 250, 900)],
+        [ChunkReport(rows=6, bytes=888, attempts=1, seconds=0.1, succeeded=True)],
+    )
+
+    assert planner.compare_plan(plan, report) == [
+        "requests: planned 1, actual 1, difference +0 (+0%)",
+        "rows: planned 8, actual 6, difference -2 (-25%)",
+        "response bytes: planned 1000, actual 900, difference -100 (-10%)",
+        "transferred bytes: planned 200, actual 250, difference +50 (+25%)",
+        "load jobs: planned 1, actual 1, difference +0 (+0%)",
+    ]
+
+
+@pytest.mark.parametrize(
+    "frequency, periods",
+    [(model.MONTHLY, 12), (model.QUARTERLY, 4), (model.ANNUAL, 1)],
+)
+def test_count_periods_of_averaged_series(frequency: str, periods: int):
+    """
+    GIVEN a window from the start of a year to a date within the next year
+    WHEN count_periods is called for a frequency other than daily
+    THEN only the periods over before the last date of the window should be counted
+    """
+    assert (
+        planner.count_periods(dt.date(2023, 1, 1), dt.date(2024, 1, 15), frequency)
+        == periods
+    )
@@ -0,0 +1,107 @@
+import contextlib
+import pstats
+import time
+from typing import Tuple, List
+
+from src import services, model, destination_repository, source_repository
+from src.utils.profiling import Profiler, StackSampler, profiler_from_environment
+
+
+def _busy_wait(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_stack_sampler_collapses_stacks():
+    """
+    GIVEN a StackSampler of the current thread
+    WHEN the thread spins in a function for a while
+    THEN the sampled stacks should be collapsed from the root, ending with that function
+    """
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    _busy_wait(0.05)
+    sampler.stop()
+
+    assert sampler.samples
+    busy_stacks = [
+        stack
+        for stack in sampler.samples
+        if stack.endswith("test_profiling.py:_busy_wait")
+    ]
+    assert busy_stacks
+    assert all(
+        "test_profiling.py:test_stack_sampler_collapses_stacks;" in stack
+        for stack in busy_stacks
+    )
+
+
+def test_profiler_writes_reports(
+    tmp_path,
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a fake ecb api and a SQLite destination repository
+    WHEN we profile a run of the service source_exchange_rates() with memory tracing
+    THEN the raw statistics, the flamegraph, the function, allocation and stage reports
+        should be written, with a fetch and a load stage
+    """
+    fake_ecb_api_caller, _, currency_pairs = fake_ecb_api
+    repository = destination_repository.SqliteDestinationRepository(":memory:")
+    output_directory = tmp_path / "profile"
+
+    profiler = Profiler(
+        str(output_directory), memory=True, top=5, stages=services.RUN_STAGES
+    )
+    profiler.start()
+    services.source_exchange_rates(repository, currency_pairs, fake_ecb_api_caller)
+    _busy_wait(0.02)
+    paths = profiler.stop()
+
+    assert sorted(paths) == [
+        "allocations",
+        "flamegraph",
+        "functions",
+        "pstats",
+        "stages",
+    ]
+    assert sorted(path.name for path in output_directory.iterdir()) == [
+        "allocations.txt",
+        "flamegraph.collapsed",
+        "functions.txt",
+        "profile.pstats",
+        "stages.txt",
+    ]
+    stats = pstats.Stats(str(output_directory / "profile.pstats"))
+    assert any(name == "source_exchange_rates" for _, _, name in stats.stats)
+    for line in (output_directory / "flamegraph.collapsed").read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack and int(count) > 0
+    assert len((output_directory / "allocations.txt").read_text().splitlines()) <= 5
+    stages = (output_directory / "stages.txt").read_text().splitlines()
+    assert [line.split(":")[0] for line in stages] == [
+        f"stage {stage}" for stage in services.RUN_STAGES
+    ] + ["run"]
+
+
+def test_profiler_from_environment():
+    """
+    GIVEN environment variables with and without PROFILE_DIR
+    WHEN profiler_from_environment() is called
+    THEN a Profiler tracing memory as set by PROFILE_MEMORY should be returned if
+        PROFILE_DIR is set, and a context doing nothing otherwise
+    """
+    assert isinstance(profiler_from_environment({}), contextlib.nullcontext)
+
+    profiler = profiler_from_environment(
+        {"PROFILE_DIR": "/tmp/profile", "PROFILE_MEMORY": "1"}
+    )
+    assert isinstance(profiler, Profiler)
+    assert profiler.output_directory == "/tmp/profile"
+    assert profiler.memory
+    assert not profiler_from_environment({"PROFILE_DIR": "/tmp/profile"}).memory
@@ -0,0 +1,138 @@
+import pytest
+
+from src.utils.resilience import (
+    CircuitBreaker,
+    Deadline,
+    DeadlineExceededError,
+    RetryBudget,
+    RetryPolicy,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_circuit_breaker_opens_on_failure_rate():
+    """
+    GIVEN a closed CircuitBreaker with a failure rate threshold of 0.5 over 4 calls
+    WHEN 2 calls out of 4 fail
+    THEN it should open and reject calls
+    """
+    circuit_breaker = CircuitBreaker(
+        failure_rate_threshold=0.5, window_size=4, minimum_calls=4, clock=FakeClock()
+    )
+
+    circuit_breaker.record_success()
+    circuit_breaker.record_failure()
+    circuit_breaker.record_success()
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+    circuit_breaker.record_failure()
+
+    assert circuit_breaker.state == CircuitBreaker.OPEN
+    assert not circuit_breaker.allow_request()
+
+
+def test_circuit_breaker_half_open_lets_single_trial_through():
+    """
+    GIVEN an open CircuitBreaker
+    WHEN its open period has elapsed
+    THEN it should let a single trial call through, and close if it succeeds
+    """
+    clock = FakeClock()
+    circuit_breaker = CircuitBreaker(minimum_calls=1, open_seconds=30, clock=clock)
+    circuit_breaker.record_failure()
+    clock.now = 30.0
+
+    assert circuit_breaker.state == CircuitBreaker.HALF_OPEN
+    assert circuit_breaker.allow_request()
+    assert not circuit_breaker.allow_request()
+    circuit_breaker.record_success()
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+    assert circuit_breaker.allow_request()
+
+
+def test_circuit_breaker_half_open_reopens_on_failure():
+    """
+    GIVEN a half open CircuitBreaker
+    WHEN its trial call fails
+    THEN it should open again for a whole open period
+    """
+    clock = FakeClock()
+    circuit_breaker = CircuitBreaker(minimum_calls=1, open_seconds=30, clock=clock)
+    circuit_breaker.record_failure()
+    clock.now = 30.0
+    circuit_breaker.allow_request()
+
+    circuit_breaker.record_failure()
+
+    assert circuit_breaker.state == CircuitBreaker.OPEN
+    clock.now = 59.0
+    assert not circuit_breaker.allow_request()
+
+
+def test_circuit_breaker_release_trial_lets_next_trial_through():
+    """
+    GIVEN a half open CircuitBreaker with a trial call in flight
+    WHEN the trial call ends without recording an outcome and releases the trial
+    THEN the next call should be let through as trial
+    """
+    clock = FakeClock()
+    circuit_breaker = CircuitBreaker(minimum_calls=1, open_seconds=30, clock=clock)
+    circuit_breaker.record_failure()
+    clock.now = 30.0
+    circuit_breaker.allow_request()
+
+    circuit_breaker.release_trial()
+
+    assert circuit_breaker.state == CircuitBreaker.HALF_OPEN
+    assert circuit_breaker.allow_request()
+    assert not circuit_breaker.allow_request()
+
+
+def test_retry_budget():
+    """
+    GIVEN a RetryBudget of 2 retries
+    WHEN 3 retries are requested
+    THEN only the first 2 should be granted
+    """
+    retry_budget = RetryBudget(2)
+
+    assert [retry_budget.try_consume() for _ in range(3)] == [True, True, False]
+
+
+def test_deadline():
+    """
+    GIVEN a Deadline of 10 seconds
+    WHEN time passes
+    THEN the remaining time should decrease and check() raise once it is over
+    """
+    clock = FakeClock()
+    deadline = Deadline(10, clock=clock)
+    clock.now = 4.0
+    assert deadline.remaining() == 6.0
+    deadline.check()
+
+    clock.now = 11.0
+
+    assert deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceededError):
+        deadline.check()
+    assert Deadline(None, clock=clock).remaining() is None
+
+
+def test_retry_policy_from_environment():
+    """
+    GIVEN environment variables setting some attributes of a RetryPolicy
+    WHEN RetryPolicy.from_environment() is called
+    THEN those attributes should be parsed and the others take default values
+    """
+    retry_policy = RetryPolicy.from_environment(
+        {"RETRY_MAX_ATTEMPTS": "5", "RETRY_DEADLINE_SECONDS": "2.5", "OTHER": "1"}
+    )
+
+    assert retry_policy == RetryPolicy(max_attempts=5, deadline_seconds=2.5)
@@ -0,0 +1,45 @@
+import datetime as dt
+
+from src import model, rollups
+
+
+def test_rollup_exchange_rates_averages_complete_periods():
+    """
+    GIVEN daily Exchange Rates of two currency pairs over two months, the last one not over
+    WHEN rollup_exchange_rates is called with a monthly frequency
+    THEN there should be one average per currency pair for the complete month only,
+        dated on its first day and marked as a rollup
+    """
+    eur_gbp, eur_usd = model.CurrencyPair("EUR", "GBP"), model.CurrencyPair(
+        "EUR", "USD"
+    )
+    daily_rates = [
+        model.ExchangeRate(
+            date=date, exchange_rate=rate, currency_pair=currency_pair, source="ECB API"
+        )
+        for currency_pair, offset in ((eur_gbp, 0.0), (eur_usd, 0.2))
+        for date, rate in (
+            (dt.date(2023, 10, 30), 0.86 + offset),
+            (dt.date(2023, 10, 2), 0.87 + offset),
+            (dt.date(2023, 10, 31), 0.88 + offset),
+            (dt.date(2023, 11, 1), 0.90 + offset),
+        )
+    ]
+
+    monthly_rates = rollups.rollup_exchange_rates(
+        daily_rates, model.MONTHLY, complete_before=dt.date(2023, 11, 2)
+    )
+
+    assert [
+        (
+            exchange_rate.currency_pair,
+            exchange_rate.date,
+            round(exchange_rate.exchange_rate, 6),
+            exchange_rate.source,
+            exchange_rate.frequency,
+        )
+        for exchange_rate in monthly_rates
+    ] == [
+        (eur_gbp, dt.date(2023, 10, 1), 0.87, rollups.ROLLUP_SOURCE, model.MONTHLY),
+        (eur_usd, dt.date(2023, 10, 1), 1.07, rollups.ROLLUP_SOURCE, model.MONTHLY),
+    ]
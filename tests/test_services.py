@@ -1,7 +1,24 @@
+import asyncio
+import dataclasses
 import os
+import datetime as dt
 from typing import Tuple, List
 
-from src import services, model, destination_repository, source_repository
+import pytest
+
+from src import (
+    services,
+    model,
+    destination_repository,
+    source_repository,
+    jobs,
+    validation,
+    change_detection,
+    notifications,
+)
+from src.utils.gcp_clients import BigQueryClientFake
+from src.utils.high_water_marks import HighWaterMarkStore
+from src.utils.observation_hashes import ObservationHashStore
 
 
 def test_source_exchange_rates(
@@ -45,3 +62,580 @@ def test_source_exchange_rates(
     assert len(expected_exchange_rates) == len(results_exchange_rates)
     for exchange_rate in expected_exchange_rates:
         assert exchange_rate in results_exchange_rates
+
+
+def test_source_exchange_rates_for_jobs(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a fake ecb api and jobs with overlapping currency pairs, different windows
+        and destinations
+    WHEN we call the service source_exchange_rates_for_jobs()
+    THEN each currency pair should be fetched once, and each destination should
+        receive the currency pairs and window of its job
+    """
+    fake_ecb_api_caller, expected_exchange_rates, currency_pairs = fake_ecb_api
+    eur_gbp, eur_usd = currency_pairs
+    job_specs = [
+        jobs.JobSpec(currency_pairs=(eur_gbp, eur_usd), days=10, destination_table="a"),
+        jobs.JobSpec(currency_pairs=(eur_gbp,), days=2, destination_table="b"),
+    ]
+    requested = []
+
+    def source_repository_factory(days: int, data_format: str):
+        requested.append((days, data_format))
+        return fake_ecb_api_caller
+
+    destinations = {}
+
+    def destination_repository_factory(destination_table: str):
+        return destinations.setdefault(
+            destination_table,
+            destination_repository.SqliteDestinationRepository(":memory:"),
+        )
+
+    services.source_exchange_rates_for_jobs(
+        job_specs,
+        source_repository_factory,
+        destination_repository_factory,
+        reference_date=dt.date(2023, 11, 10),
+    )
+
+    assert requested == [(10, source_repository.STRUCTURE_SPECIFIC_DATA)]
+    assert len(fake_ecb_api_caller.transfer_stats) == 2
+    assert (
+        destinations["a"].read_exchange_rates(eur_gbp)
+        + destinations["a"].read_exchange_rates(eur_usd)
+        == expected_exchange_rates
+    )
+    assert destinations["b"].read_exchange_rates(eur_gbp) == [
+        exchange_rate
+        for exchange_rate in expected_exchange_rates
+        if exchange_rate.currency_pair == eur_gbp
+        and exchange_rate.date >= dt.date(2023, 11, 8)
+    ]
+    assert destinations["b"].read_exchange_rates(eur_usd) == []
+
+
+def test_source_exchange_rates_for_jobs_merges_loads_of_a_table(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a fake ecb api and two jobs loading the same BigQuery table with a merge window
+    WHEN we call the service source_exchange_rates_for_jobs()
+    THEN the rows of both jobs should be loaded in a single load job
+    """
+    fake_ecb_api_caller, expected_exchange_rates, currency_pairs = fake_ecb_api
+    eur_gbp, eur_usd = currency_pairs
+    client = BigQueryClientFake()
+    created = []
+
+    def destination_repository_factory(destination_table: str):
+        repository = destination_repository.BiqQueryDestinationRepository(
+            client,
+            destination_repository.LoadBatchingPolicy(merge_window_seconds=60),
+        )
+        repository.exchange_rates_destination = destination_table
+        created.append(repository)
+        return repository
+
+    services.source_exchange_rates_for_jobs(
+        [
+            jobs.JobSpec(currency_pairs=(eur_gbp,), destination_table="raw.rates"),
+            jobs.JobSpec(currency_pairs=(eur_usd,), destination_table="raw.rates"),
+        ],
+        lambda days, data_format: fake_ecb_api_caller,
+        destination_repository_factory,
+        reference_date=dt.date(2023, 11, 10),
+    )
+
+    assert len(created) == 1
+    assert client.loads == [("raw.rates", len(expected_exchange_rates))]
+
+
+def test_source_exchange_rates_for_jobs_notifies_loaded_rates(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+    tmp_path,
+):
+    """
+    GIVEN a fake ecb api, a notifier publishing to a file, and two jobs loading EUR/GBP
+        into two tables
+    WHEN we call the service source_exchange_rates_for_jobs() twice
+    THEN the rates loaded should be published once, in a single message
+    """
+    fake_ecb_api_caller, expected_exchange_rates, currency_pairs = fake_ecb_api
+    eur_gbp, _ = currency_pairs
+    publisher = notifications.FilePublisher(str(tmp_path / "notifications.jsonl"))
+    notifier = notifications.ChangeNotifier(publisher)
+    job_specs = [
+        jobs.JobSpec(currency_pairs=(eur_gbp,), destination_table="raw.rates"),
+        jobs.JobSpec(currency_pairs=(eur_gbp,), destination_table="raw.rates_copy"),
+    ]
+
+    for _ in range(2):
+        services.source_exchange_rates_for_jobs(
+            job_specs,
+            lambda days, data_format: fake_ecb_api_caller,
+            lambda destination_table: destination_repository.BiqQueryDestinationRepository(
+                BigQueryClientFake()
+            ),
+            reference_date=dt.date(2023, 11, 10),
+            notifier=notifier,
+        )
+
+    (message,) = publisher.read_notifications()
+    assert [rate["date"] for rate in message["rates"]] == [
+        exchange_rate.date.isoformat()
+        for exchange_rate in expected_exchange_rates
+        if exchange_rate.currency_pair == eur_gbp
+    ]
+
+
+def test_source_exchange_rates_materializes_derived_rates(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a fake ecb api and a derived destination repository
+    WHEN we call the service source_exchange_rates() with GBP/USD as cross rate
+    THEN the inverses and the cross rate of the fetched dates should be loaded
+        into the derived destination repository
+    """
+    fake_ecb_api_caller, expected_exchange_rates, currency_pairs = fake_ecb_api
+    repository = destination_repository.SqliteDestinationRepository(":memory:")
+    derived_repository = destination_repository.SqliteDestinationRepository(
+        ":memory:", "derived_exchange_rates"
+    )
+    gbp_usd = model.CurrencyPair("GBP", "USD")
+
+    services.source_exchange_rates(
+        repository,
+        currency_pairs,
+        fake_ecb_api_caller,
+        derived_destination_repository=derived_repository,
+        cross_currency_pairs=[gbp_usd],
+    )
+
+    dates = sorted({exchange_rate.date for exchange_rate in expected_exchange_rates})
+    for currency_pair in (
+        gbp_usd,
+        model.CurrencyPair("GBP", "EUR"),
+        model.CurrencyPair("USD", "EUR"),
+    ):
+        assert [
+            exchange_rate.date
+            for exchange_rate in derived_repository.read_exchange_rates(currency_pair)
+        ] == dates
+    assert repository.read_exchange_rates(gbp_usd) == []
+
+
+def test_source_exchange_rates_derives_cross_rates_of_revised_legs(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a fake ecb api, a change detector and a derived destination repository loaded
+        by a first run
+    WHEN the EUR/GBP rate of a date is revised and we call the service
+        source_exchange_rates() again
+    THEN the GBP/USD cross rate of that date should be derived again from the revised
+        EUR/GBP rate and the unchanged EUR/USD one
+    """
+    fake_ecb_api_caller, expected_exchange_rates, currency_pairs = fake_ecb_api
+    eur_gbp, eur_usd = currency_pairs
+    gbp_usd = model.CurrencyPair("GBP", "USD")
+    repository = destination_repository.SqliteDestinationRepository(":memory:")
+    derived_repository = destination_repository.SqliteDestinationRepository(
+        ":memory:", "derived_exchange_rates"
+    )
+    change_detector = change_detection.ObservationChangeDetector(
+        ObservationHashStore(":memory:")
+    )
+
+    def run():
+        services.source_exchange_rates(
+            repository,
+            currency_pairs,
+            fake_ecb_api_caller,
+            derived_destination_repository=derived_repository,
+            cross_currency_pairs=[gbp_usd],
+            change_detector=change_detector,
+        )
+
+    run()
+    get_exchange_rates = fake_ecb_api_caller.get_exchange_rates
+    fake_ecb_api_caller.get_exchange_rates = lambda currency_pairs: [
+        (
+            dataclasses.replace(exchange_rate, exchange_rate=0.9)
+            if exchange_rate.currency_pair == eur_gbp
+            and exchange_rate.date == dt.date(2023, 11, 8)
+            else exchange_rate
+        )
+        for exchange_rate in get_exchange_rates(currency_pairs)
+    ]
+    run()
+
+    eur_usd_rate = next(
+        exchange_rate.exchange_rate
+        for exchange_rate in expected_exchange_rates
+        if exchange_rate.currency_pair == eur_usd
+        and exchange_rate.date == dt.date(2023, 11, 8)
+    )
+    cross_rates = {
+        exchange_rate.date: exchange_rate.exchange_rate
+        for exchange_rate in derived_repository.read_exchange_rates(gbp_usd)
+    }
+    assert len(cross_rates) == 5
+    assert cross_rates[dt.date(2023, 11, 8)] == pytest.approx(eur_usd_rate / 0.9)
+
+
+def test_source_exchange_rates_quarantines_invalid_exchange_rates(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a fake ecb api returning a negative rate
+    WHEN we call the service source_exchange_rates() with a validator
+    THEN the negative rate should be loaded into the quarantine table instead of
+        the destination repository
+    """
+    fake_ecb_api_caller, expected_exchange_rates, currency_pairs = fake_ecb_api
+    invalid_exchange_rate = model.ExchangeRate(
+        date=dt.date(2023, 11, 13),
+        exchange_rate=-0.87,
+        currency_pair=currency_pairs[0],
+        source="ECB API",
+    )
+    get_exchange_rates = fake_ecb_api_caller.get_exchange_rates
+    fake_ecb_api_caller.get_exchange_rates = lambda currency_pairs: (
+        get_exchange_rates(currency_pairs) + [invalid_exchange_rate]
+    )
+    repository = destination_repository.SqliteDestinationRepository(":memory:")
+    quarantine_repository = destination_repository.SqliteQuarantineRepository(
+        ":memory:"
+    )
+
+    services.source_exchange_rates(
+        repository,
+        currency_pairs,
+        fake_ecb_api_caller,
+        validator=validation.ExchangeRateValidator(),
+        quarantine_repository=quarantine_repository,
+    )
+
+    assert (
+        repository.read_exchange_rates(currency_pairs[0])
+        + repository.read_exchange_rates(currency_pairs[1])
+        == expected_exchange_rates
+    )
+    assert [
+        (row["date"], row["exchange_rate"], row["reason"])
+        for row in quarantine_repository.read_quarantined_rows()
+    ] == [("2023-11-13", "-0.87", "range")]
+
+
+def test_source_exchange_rates_advances_marks_up_to_loaded_dates(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+    tmp_path,
+):
+    """
+    GIVEN a fake ecb api returning a negative EUR/GBP rate on 2023-11-08, and high-water marks
+    WHEN we call the service source_exchange_rates() with a validator
+    THEN the mark of EUR/GBP should stop before the quarantined date, and the mark of
+        EUR/USD should move to its latest date
+    """
+    fake_ecb_api_caller, _, currency_pairs = fake_ecb_api
+    eur_gbp, eur_usd = currency_pairs
+    get_exchange_rates = fake_ecb_api_caller.get_exchange_rates
+    fake_ecb_api_caller.get_exchange_rates = lambda currency_pairs: [
+        (
+            dataclasses.replace(exchange_rate, exchange_rate=-0.87)
+            if exchange_rate.currency_pair == eur_gbp
+            and exchange_rate.date == dt.date(2023, 11, 8)
+            else exchange_rate
+        )
+        for exchange_rate in get_exchange_rates(currency_pairs)
+    ]
+    high_water_marks = HighWaterMarkStore(str(tmp_path / "state.json"))
+
+    services.source_exchange_rates(
+        destination_repository.SqliteDestinationRepository(":memory:"),
+        currency_pairs,
+        fake_ecb_api_caller,
+        validator=validation.ExchangeRateValidator(),
+        high_water_marks=high_water_marks,
+    )
+
+    assert high_water_marks.get(eur_gbp) == dt.date(2023, 11, 7)
+    assert high_water_marks.get(eur_usd) == dt.date(2023, 11, 10)
+
+
+def test_source_exchange_rates_keeps_marks_when_load_fails(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+    tmp_path,
+):
+    """
+    GIVEN a fake ecb api, high-water marks and a BigQuery client rejecting the load
+    WHEN we call the service source_exchange_rates()
+    THEN the load should fail and no mark should be moved
+    """
+    fake_ecb_api_caller, _, currency_pairs = fake_ecb_api
+    high_water_marks = HighWaterMarkStore(str(tmp_path / "state.json"))
+    fake_ecb_api_caller.high_water_marks = high_water_marks
+
+    with pytest.raises(RuntimeError):
+        services.source_exchange_rates(
+            destination_repository.BiqQueryDestinationRepository(
+                BigQueryClientFake(rejected_loads=[0])
+            ),
+            currency_pairs,
+            fake_ecb_api_caller,
+            high_water_marks=high_water_marks,
+        )
+
+    assert [
+        high_water_marks.get(currency_pair) for currency_pair in currency_pairs
+    ] == [
+        None,
+        None,
+    ]
+
+
+def test_source_exchange_rates_skips_unchanged_exchange_rates(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a fake ecb api and a change detector
+    WHEN we call the service source_exchange_rates() twice
+    THEN the second run should load nothing and report every exchange rate as unchanged
+    """
+    fake_ecb_api_caller, expected_exchange_rates, currency_pairs = fake_ecb_api
+    detector = change_detection.ObservationChangeDetector(
+        ObservationHashStore(":memory:")
+    )
+    repository = destination_repository.BiqQueryDestinationRepository(
+        BigQueryClientFake()
+    )
+
+    first_run = services.source_exchange_rates(
+        repository, currency_pairs, fake_ecb_api_caller, change_detector=detector
+    )
+    second_run = services.source_exchange_rates(
+        repository, currency_pairs, fake_ecb_api_caller, change_detector=detector
+    )
+
+    assert len(first_run) == len(expected_exchange_rates)
+    assert second_run == []
+    assert len(repository.client.tables[repository.exchange_rates_destination]) == len(
+        expected_exchange_rates
+    )
+    assert detector.reports[-1] == change_detection.ChangeCounts(
+        new=0, revised=0, unchanged=len(expected_exchange_rates)
+    )
+
+
+def test_source_exchange_rates_async(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN an AsyncEcbApiCallerFake and a BigQuery repository wrapped in
+        SyncToAsyncDestinationRepository, with a change detector
+    WHEN we await the service source_exchange_rates_async() twice
+    THEN the fake data should be loaded once, batch by batch, into the data repository
+    """
+    _, expected_exchange_rates, currency_pairs = fake_ecb_api
+    async_ecb_api_caller = source_repository.AsyncEcbApiCallerFake(
+        {
+            "GBP": "tests/data/xml_ecb_test.xml",
+            "USD": "tests/data/xml_ecb_test.xml",
+        }
+    )
+    repository = destination_repository.BiqQueryDestinationRepository(
+        BigQueryClientFake()
+    )
+    async_repository = destination_repository.SyncToAsyncDestinationRepository(
+        repository
+    )
+    detector = change_detection.ObservationChangeDetector(
+        ObservationHashStore(":memory:")
+    )
+
+    async def run():
+        first_run = await services.source_exchange_rates_async(
+            async_repository,
+            currency_pairs,
+            async_ecb_api_caller,
+            validator=validation.ExchangeRateValidator(),
+            change_detector=detector,
+        )
+        second_run = await services.source_exchange_rates_async(
+            async_repository,
+            currency_pairs,
+            async_ecb_api_caller,
+            change_detector=detector,
+        )
+        return first_run, second_run
+
+    first_run, second_run = asyncio.run(run())
+
+    assert len(first_run) == len(expected_exchange_rates)
+    assert second_run == []
+    loaded_exchange_rates = list(repository.read_all_exchange_rates())
+    assert len(loaded_exchange_rates) == len(expected_exchange_rates)
+    for expected_exchange_rate in expected_exchange_rates:
+        assert expected_exchange_rate in loaded_exchange_rates
+
+
+def test_source_exchange_rates_async_quarantines_into_sqlite(tmp_path):
+    """
+    GIVEN an AsyncEcbApiCallerFake returning a rate that fails validation, and a SQLite
+        quarantine repository created by the thread running the event loop
+    WHEN we await the service source_exchange_rates_async() with a validator
+    THEN the rate should be quarantined from the worker thread, and the others loaded
+    """
+    currency_pairs = [model.CurrencyPair("EUR", "GBP")]
+    async_ecb_api_caller = source_repository.AsyncEcbApiCallerFake(
+        {"GBP": "tests/data/xml_ecb_test.xml"}
+    )
+    validator = validation.ExchangeRateValidator(
+        validation.ValidationPolicy(max_rate=0.87)
+    )
+    database_path = str(tmp_path / "rates.sqlite")
+    quarantine_repository = destination_repository.SqliteQuarantineRepository(
+        database_path
+    )
+
+    loaded_exchange_rates = asyncio.run(
+        services.source_exchange_rates_async(
+            destination_repository.SyncToAsyncDestinationRepository(
+                destination_repository.SqliteDestinationRepository(database_path)
+            ),
+            currency_pairs,
+            async_ecb_api_caller,
+            validator=validator,
+            quarantine_repository=quarantine_repository,
+        )
+    )
+
+    quarantined_rows = quarantine_repository.read_quarantined_rows()
+    assert quarantined_rows
+    assert {row["reason"] for row in quarantined_rows} == {"range"}
+    assert len(loaded_exchange_rates) + len(quarantined_rows) == 5
+
+
+def test_source_exchange_rates_async_advances_marks_after_flush(tmp_path):
+    """
+    GIVEN an AsyncEcbApiCallerFake with high-water marks, and a first destination
+        rejecting the load
+    WHEN we await the service source_exchange_rates_async() with that destination,
+        then with a healthy one
+    THEN the marks should only move once the second run has been flushed
+    """
+    currency_pairs = [
+        model.CurrencyPair("EUR", "GBP"),
+        model.CurrencyPair("EUR", "USD"),
+    ]
+    high_water_marks = HighWaterMarkStore(str(tmp_path / "state.json"))
+    async_ecb_api_caller = source_repository.AsyncEcbApiCallerFake(
+        {
+            "GBP": "tests/data/xml_ecb_test.xml",
+            "USD": "tests/data/xml_ecb_test.xml",
+        }
+    )
+    async_ecb_api_caller.high_water_marks = high_water_marks
+
+    def run(client: BigQueryClientFake):
+        return asyncio.run(
+            services.source_exchange_rates_async(
+                destination_repository.SyncToAsyncDestinationRepository(
+                    destination_repository.BiqQueryDestinationRepository(client)
+                ),
+                currency_pairs,
+                async_ecb_api_caller,
+                high_water_marks=high_water_marks,
+            )
+        )
+
+    with pytest.raises(RuntimeError):
+        run(BigQueryClientFake(rejected_loads=[0]))
+    assert [
+        high_water_marks.get(currency_pair) for currency_pair in currency_pairs
+    ] == [
+        None,
+        None,
+    ]
+
+    run(BigQueryClientFake())
+    assert [
+        high_water_marks.get(currency_pair) for currency_pair in currency_pairs
+    ] == [
+        dt.date(2023, 11, 10),
+        dt.date(2023, 11, 10),
+    ]
+
+
+def test_source_exchange_rates_notifies_loaded_exchange_rates(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+    tmp_path,
+):
+    """
+    GIVEN a fake ecb api and a notifier publishing to a file
+    WHEN we call the service source_exchange_rates() twice
+    THEN the exchange rates loaded should be notified once, in a single message
+    """
+    fake_ecb_api_caller, expected_exchange_rates, currency_pairs = fake_ecb_api
+    publisher = notifications.FilePublisher(str(tmp_path / "notifications.jsonl"))
+    notifier = notifications.ChangeNotifier(publisher)
+    repository = destination_repository.BiqQueryDestinationRepository(
+        BigQueryClientFake()
+    )
+
+    for _ in range(2):
+        services.source_exchange_rates(
+            repository, currency_pairs, fake_ecb_api_caller, notifier=notifier
+        )
+    messages = publisher.read_notifications()
+
+    assert len(messages) == 1
+    assert len(messages[0]["rates"]) == len(expected_exchange_rates)
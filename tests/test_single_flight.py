@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import pytest
+
+from src.utils.single_flight import SingleFlight
+
+
+@dataclass(frozen=True)
+class RangeKey:
+    start: int
+    end: int
+
+    def covers(self, other: "RangeKey") -> bool:
+        return self.start <= other.start and other.end <= self.end
+
+
+class ObservedSingleFlight(SingleFlight):
+    """
+    SingleFlight that counts the callers joining a call in flight.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.joined = threading.Semaphore(0)
+
+    def _find_call(self, key):
+        in_flight = super()._find_call(key)
+        if in_flight is not None:
+            self.joined.release()
+        return in_flight
+
+
+def run_concurrently(keys: list, fn) -> list:
+    """
+    Calls SingleFlight.do() for each key from a different thread. The call for the
+    first key is held in flight until the calls for every other key have joined it.
+
+    Args:
+        keys (list): keys to call, the first one is called first.
+        fn: function executed by the calls, receives the key.
+    Returns:
+        list: results of SingleFlight.do(), or the exception raised, for each key.
+    """
+    single_flight = ObservedSingleFlight()
+    in_flight = threading.Event()
+
+    def leader():
+        in_flight.set()
+        for _ in keys[1:]:
+            assert single_flight.joined.acquire(timeout=5)
+        return fn(keys[0])
+
+    def call(key, leads):
+        try:
+            return single_flight.do(key, leader if leads else lambda: fn(key))
+        except Exception as exception:
+            return exception
+
+    with ThreadPoolExecutor(len(keys)) as executor:
+        futures = [executor.submit(call, keys[0], True)]
+        in_flight.wait(5)
+        futures += [executor.submit(call, key, False) for key in keys[1:]]
+        return [future.result() for future in futures]
+
+
+def test_single_flight_coalesces_identical_calls():
+    """
+    GIVEN several concurrent calls with the same key
+    WHEN they go through SingleFlight.do()
+    THEN the function should be executed once and its result shared by all callers
+    """
+    executions = []
+
+    def fn(key):
+        executions.append(key)
+        return [1, 2, 3]
+
+    results = run_concurrently(["a", "a", "a"], fn)
+
+    assert executions == ["a"]
+    assert results == [("a", [1, 2, 3])] * 3
+
+
+def test_single_flight_serves_covered_keys():
+    """
+    GIVEN a call in flight for a key that covers the key of a concurrent call
+    WHEN they go through SingleFlight.do()
+    THEN the covered call should get the result of the covering one along with its key
+    """
+    executions = []
+
+    def fn(key):
+        executions.append(key)
+        return list(range(key.start, key.end))
+
+    wide, narrow = RangeKey(0, 30), RangeKey(20, 30)
+    results = run_concurrently([wide, narrow], fn)
+
+    assert executions == [wide]
+    assert results == [(wide, list(range(0, 30)))] * 2
+
+
+def test_single_flight_shares_exceptions():
+    """
+    GIVEN several concurrent calls with the same key whose execution fails
+    WHEN they go through SingleFlight.do()
+    THEN every caller should get the exception
+    """
+
+    def fn(key):
+        raise ValueError(key)
+
+    results = run_concurrently(["a", "a"], fn)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_single_flight_runs_sequential_calls():
+    """
+    GIVEN sequential calls with the same key
+    WHEN they go through SingleFlight.do()
+    THEN the function should be executed for each of them
+    """
+    single_flight = SingleFlight()
+    executions = []
+
+    single_flight.do("a", lambda: executions.append("a"))
+    single_flight.do("a", lambda: executions.append("a"))
+
+    assert executions == ["a", "a"]
+    with pytest.raises(ValueError):
+        single_flight.do("a", lambda: int("not a number"))
+    assert single_flight._calls == {}
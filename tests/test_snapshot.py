@@ -0,0 +1,144 @@
+import datetime as dt
+import pytest
+
+from tests.data.ecb_exchange_rates import EXCHANGE_RATES
+from src import model, destination_repository, snapshot
+from src.utils.gcp_clients import BigQueryClientFake
+
+
+EUR_GBP = model.CurrencyPair("EUR", "GBP")
+
+
+def test_snapshot_lookups(tmp_path):
+    """
+    GIVEN a snapshot written from Exchange Rates in no particular order, one of them
+        written twice for the same date
+    WHEN it is opened with ExchangeRateSnapshot
+    THEN lookups by date, as of a date and by date range should return the rates sorted
+        by date, with the latest rate created for a date
+    """
+    file_path = str(tmp_path / "rates.snapshot")
+    eur_usd = model.CurrencyPair("EUR", "USD")
+    usd_rate = model.ExchangeRate(
+        date=dt.date(2023, 10, 6),
+        exchange_rate=1.05,
+        currency_pair=eur_usd,
+        source="ECB API",
+    )
+    corrected_rate = model.ExchangeRate(
+        date=dt.date(2023, 10, 9),
+        exchange_rate=0.874,
+        currency_pair=EUR_GBP,
+        source="ECB API",
+    )
+    snapshot.write_snapshot(
+        file_path, [usd_rate] + EXCHANGE_RATES[::-1] + [corrected_rate]
+    )
+
+    with snapshot.ExchangeRateSnapshot(file_path) as rates_snapshot:
+        assert rates_snapshot.currency_pairs == [EUR_GBP, eur_usd]
+        assert rates_snapshot.rate(EUR_GBP, dt.date(2023, 10, 7)) == 0.870
+        assert rates_snapshot.rate(EUR_GBP, dt.date(2023, 10, 9)) == 0.874
+        assert rates_snapshot.rate(EUR_GBP, dt.date(2023, 10, 10)) is None
+        assert (
+            rates_snapshot.rate(model.CurrencyPair("EUR", "JPY"), dt.date(2023, 10, 7))
+            is None
+        )
+        assert rates_snapshot.rate_as_of(eur_usd, dt.date(2023, 10, 20)) == (
+            dt.date(2023, 10, 6),
+            1.05,
+        )
+        assert rates_snapshot.rate_as_of(eur_usd, dt.date(2023, 10, 5)) is None
+        assert rates_snapshot.rates(
+            EUR_GBP, dt.date(2023, 10, 6), dt.date(2023, 10, 8)
+        ) == [
+            (dt.date(2023, 10, 6), 0.868),
+            (dt.date(2023, 10, 7), 0.870),
+            (dt.date(2023, 10, 8), 0.872),
+        ]
+        assert len(rates_snapshot.rates(EUR_GBP)) == len(EXCHANGE_RATES)
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    """
+    GIVEN a file that is not a snapshot
+    WHEN it is opened with ExchangeRateSnapshot
+    THEN a ValueError should be raised
+    """
+    file_path = tmp_path / "rates.csv"
+    file_path.write_text("date,exchange_rate\n2023-10-05,0.866\n")
+
+    with pytest.raises(ValueError):
+        snapshot.ExchangeRateSnapshot(str(file_path))
+
+
+def test_export_snapshot_from_sqlite(
+    tmp_path, sqlite_repository: destination_repository.SqliteDestinationRepository
+):
+    """
+    GIVEN a SQLite destination with Exchange Rates
+    WHEN export_snapshot is called with it
+    THEN the snapshot should hold every rate of the table
+    """
+    file_path = str(tmp_path / "rates.snapshot")
+    sqlite_repository.load_exchange_rates(EXCHANGE_RATES)
+
+    snapshot.export_snapshot(file_path, sqlite_repository)
+
+    with snapshot.ExchangeRateSnapshot(file_path) as rates_snapshot:
+        assert rates_snapshot.rates(EUR_GBP) == [
+            (exchange_rate.date, exchange_rate.exchange_rate)
+            for exchange_rate in EXCHANGE_RATES
+        ]
+
+
+def test_export_snapshot_from_bigquery(tmp_path):
+    """
+    GIVEN a BigQuery destination with Exchange Rates
+    WHEN export_snapshot is called with it
+    THEN the snapshot should hold every rate of the table
+    """
+    file_path = str(tmp_path / "rates.snapshot")
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        BigQueryClientFake()
+    )
+    bq_repository.load_exchange_rates(EXCHANGE_RATES)
+
+    snapshot.export_snapshot(file_path, bq_repository)
+
+    with snapshot.ExchangeRateSnapshot(file_path) as rates_snapshot:
+        assert rates_snapshot.rate_as_of(EUR_GBP, dt.date(2023, 12, 31)) == (
+            dt.date(2023, 10, 9),
+            0.873,
+        )
+
+
+def test_export_snapshot_keeps_latest_revision(tmp_path):
+    """
+    GIVEN a BigQuery destination whose rows list a revised rate before the rate it revises
+    WHEN export_snapshot is called with it
+    THEN the snapshot should hold the revised rate, created last
+    """
+    file_path = str(tmp_path / "rates.snapshot")
+    bq_repository = destination_repository.BiqQueryDestinationRepository(
+        BigQueryClientFake()
+    )
+    revised_rate, first_rate = (
+        model.ExchangeRate(
+            date=dt.date(2023, 10, 9),
+            exchange_rate=exchange_rate,
+            currency_pair=EUR_GBP,
+            source="ECB API",
+            creation_date=creation_date,
+        )
+        for exchange_rate, creation_date in [
+            (0.874, dt.datetime(2023, 10, 10, 16)),
+            (0.873, dt.datetime(2023, 10, 9, 16)),
+        ]
+    )
+    bq_repository.load_exchange_rates([revised_rate, first_rate])
+
+    snapshot.export_snapshot(file_path, bq_repository)
+
+    with snapshot.ExchangeRateSnapshot(file_path) as rates_snapshot:
+        assert rates_snapshot.rate(EUR_GBP, dt.date(2023, 10, 9)) == 0.874
@@ -1,10 +1,22 @@
+import asyncio
 from typing import Tuple, List
 import datetime as dt
+import gzip
+import os
+import time
+import httpx
 import requests as req
 import requests_mock
 import pytest
 
-from src import model, source_repository
+from src import model, rollups, source_repository
+from src.utils.high_water_marks import HighWaterMarkStore
+from src.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    RetryPolicy,
+)
 
 
 def test_reach_ecb_api():
@@ -77,6 +89,59 @@ def test_xml_to_ecb_rates():
         assert expected_ecb_rate in result_ecb_rates
 
 
+@pytest.mark.parametrize(
+    "file_path",
+    ["tests/data/xml_ecb_test.xml", "tests/data/xml_ecb_structure_specific_test.xml"],
+)
+def test_xml_to_ecb_rates_from_compressed_stream(
+    file_path: str,
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a gzip compressed and streamed response from ecb api in generic or
+        structure specific format
+    WHEN it is passed to EcbApiCaller.xml_to_ecb_rates()
+    THEN it should be decoded while streaming and return the expected list of ExchangeRate objects
+    """
+    _, expected_ecb_rates, _ = fake_ecb_api
+    with open(file_path, "rb") as f:
+        response_content = gzip.compress(f.read())
+
+    with requests_mock.Mocker() as mocker:
+        url = "https://data-api.ecb.europa.eu"
+        mocker.get(
+            url,
+            content=response_content,
+            headers={"Content-Encoding": "gzip"},
+            status_code=200,
+        )
+        response = req.get(url, stream=True)
+
+    result_ecb_rates = source_repository.EcbApiCaller._xml_to_ecb_rates(
+        response, model.CurrencyPair("EUR", "GBP")
+    )
+
+    assert result_ecb_rates == [
+        expected_ecb_rate
+        for expected_ecb_rate in expected_ecb_rates
+        if expected_ecb_rate.currency_pair.quote == "GBP"
+    ]
+
+
+def test_ecb_api_caller_with_invalid_data_format():
+    """
+    GIVEN a data format not supported by the ECB API
+    WHEN an EcbApiCaller is initialized with it
+    THEN a ValueError should be raised
+    """
+    with pytest.raises(ValueError):
+        source_repository.EcbApiCaller(data_format="application/json")
+
+
 def test_get_ecb_rates(
     fake_ecb_api: Tuple[
         source_repository.EcbApiCallerFake,
@@ -142,3 +207,672 @@ def test_get_ecb_rates_with_base_currency_not_eur(
     )
 
     assert expected_error_message in str(excinfo.value)
+
+
+def test_get_ecb_rates_records_transfer_stats(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a EcbApiCaller instance with predefined responses
+    WHEN get_ecb_rates is called
+    THEN the bytes transferred by each call should be recorded
+    """
+    fake_ecb_api_caller, _, currency_pairs = fake_ecb_api
+    fake_ecb_api_caller.get_exchange_rates(currency_pairs)
+
+    file_size = os.path.getsize("tests/data/xml_ecb_test.xml")
+    assert [stats.currency_pair for stats in fake_ecb_api_caller.transfer_stats] == (
+        currency_pairs
+    )
+    for stats in fake_ecb_api_caller.transfer_stats:
+        assert stats.content_encoding == "identity"
+        assert stats.compressed_bytes == file_size
+        assert stats.uncompressed_bytes == file_size
+
+
+def test_transfer_stats_are_bounded(monkeypatch):
+    """
+    GIVEN a long-lived EcbApiCaller keeping the stats of at most two calls
+    WHEN it runs three times
+    THEN only the stats of the two latest calls should be kept
+    """
+    monkeypatch.setattr(source_repository, "MAX_RECORDED_STATS", 2)
+    fake_ecb_api_caller = source_repository.EcbApiCallerFake(
+        {"GBP": "tests/data/xml_ecb_test.xml", "USD": "tests/data/xml_ecb_test.xml"}
+    )
+    eur_gbp, eur_usd = model.CurrencyPair("EUR", "GBP"), model.CurrencyPair(
+        "EUR", "USD"
+    )
+
+    for currency_pair in (eur_gbp, eur_gbp, eur_usd):
+        fake_ecb_api_caller.get_exchange_rates([currency_pair])
+
+    assert [stats.currency_pair for stats in fake_ecb_api_caller.transfer_stats] == [
+        eur_gbp,
+        eur_usd,
+    ]
+
+
+@pytest.mark.parametrize(
+    "other, expected",
+    [
+        (("GBP", 5, 10, source_repository.GENERIC_DATA), True),
+        (("GBP", 0, 29, source_repository.GENERIC_DATA), True),
+        (("GBP", -1, 10, source_repository.GENERIC_DATA), False),
+        (("GBP", 5, 30, source_repository.GENERIC_DATA), False),
+        (("USD", 5, 10, source_repository.GENERIC_DATA), False),
+        (("GBP", 5, 10, source_repository.STRUCTURE_SPECIFIC_DATA), False),
+    ],
+)
+def test_fetch_key_covers(other: tuple, expected: bool):
+    """
+    GIVEN a FetchKey for a 30 day window and another FetchKey
+    WHEN FetchKey.covers() is called with the other key
+    THEN it should be True only if the other key is for the same currency pair
+        and format and its window is contained in the 30 day window
+    """
+    quote, first_offset, last_offset, data_format = other
+    date_from = dt.date(2023, 11, 1)
+    fetch_key = source_repository.FetchKey(
+        model.CurrencyPair("EUR", "GBP"),
+        date_from,
+        date_from + dt.timedelta(29),
+        source_repository.GENERIC_DATA,
+    )
+    other_key = source_repository.FetchKey(
+        model.CurrencyPair("EUR", quote),
+        date_from + dt.timedelta(first_offset),
+        date_from + dt.timedelta(last_offset),
+        data_format,
+    )
+
+    assert fetch_key.covers(other_key) is expected
+
+
+def test_get_ecb_rates_skips_pairs_without_new_publication(tmp_path):
+    """
+    GIVEN a EcbApiCaller with high-water marks, one currency pair up to date
+        and the other one behind
+    WHEN get_ecb_rates is called for both currency pairs
+    THEN only the currency pair behind should be fetched, and the marks left as they are
+    """
+    eur_gbp, eur_usd = model.CurrencyPair("EUR", "GBP"), model.CurrencyPair(
+        "EUR", "USD"
+    )
+    high_water_marks = HighWaterMarkStore(str(tmp_path / "state.json"))
+    high_water_marks.update(eur_gbp, dt.date.today())
+    high_water_marks.update(eur_usd, dt.date(2023, 11, 1))
+    fake_ecb_api_caller = source_repository.EcbApiCallerFake(
+        {"GBP": "tests/data/xml_ecb_test.xml", "USD": "tests/data/xml_ecb_test.xml"},
+        days_to_register=10,
+    )
+    fake_ecb_api_caller.high_water_marks = high_water_marks
+
+    fake_ecb_api_caller.get_exchange_rates([eur_gbp, eur_usd])
+
+    assert [stats.currency_pair for stats in fake_ecb_api_caller.transfer_stats] == [
+        eur_usd
+    ]
+    assert high_water_marks.get(eur_usd) == dt.date(2023, 11, 1)
+
+
+PROBE_BODY = b"""<?xml version="1.0" encoding="UTF-8"?>
+<message:StructureSpecificData xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message">
+<message:DataSet>
+<Series FREQ="D" CURRENCY="GBP" CURRENCY_DENOM="EUR" EXR_TYPE="SP00" EXR_SUFFIX="A">
+<Obs TIME_PERIOD="2023-11-10" OBS_VALUE="0.87435"/>
+</Series>
+<Series FREQ="D" CURRENCY="USD" CURRENCY_DENOM="EUR" EXR_TYPE="SP00" EXR_SUFFIX="A">
+<Obs TIME_PERIOD="2023-11-10" OBS_VALUE="1.0683"/>
+</Series>
+</message:DataSet>
+</message:StructureSpecificData>"""
+
+
+@pytest.mark.parametrize(
+    "probe_status, fetched_quotes, avoided_fetches",
+    [(200, ["GBP"], 1), (404, [], 2), (400, ["GBP", "USD"], None)],
+)
+def test_get_ecb_rates_probes_pairs_before_fetching(
+    tmp_path, probe_status: int, fetched_quotes: list, avoided_fetches
+):
+    """
+    GIVEN a EcbApiCaller with high-water marks and the freshness probe enabled, the
+        latest observation of one currency pair newer than its mark and the other not
+    WHEN get_ecb_rates is called for both currency pairs
+    THEN both should be probed in a single call, and only the one with a new observation
+        fetched, none if the API has no observation since the marks, and both if the
+        probe fails
+    """
+    eur_gbp, eur_usd = model.CurrencyPair("EUR", "GBP"), model.CurrencyPair(
+        "EUR", "USD"
+    )
+    high_water_marks = HighWaterMarkStore(str(tmp_path / "state.json"))
+    high_water_marks.update(eur_gbp, dt.date(2023, 11, 9))
+    high_water_marks.update(eur_usd, dt.date(2023, 11, 10))
+    ecb_api_caller = source_repository.EcbApiCaller(
+        10,
+        high_water_marks=high_water_marks,
+        end_date=dt.date(2023, 11, 13),
+        probe=True,
+        retry_policy=RetryPolicy(max_attempts=1),
+    )
+    with open("tests/data/xml_ecb_structure_specific_test.xml", "rb") as f:
+        body = f.read()
+
+    with requests_mock.Mocker() as mocker:
+        probe = mocker.get(
+            source_repository.ECB_API_URL + "D.GBP+USD.EUR.SP00.A",
+            content=PROBE_BODY,
+            status_code=probe_status,
+        )
+        for quote in ("GBP", "USD"):
+            mocker.get(
+                source_repository.ECB_API_URL + f"D.{quote}.EUR.SP00.A", content=body
+            )
+        ecb_api_caller.get_exchange_rates([eur_gbp, eur_usd])
+
+    assert probe.call_count == 1
+    assert probe.last_request.qs["lastnobservations"] == ["1"]
+    assert probe.last_request.qs["startperiod"] == ["2023-11-10"]
+    assert [
+        stats.currency_pair.quote for stats in ecb_api_caller.transfer_stats
+    ] == fetched_quotes
+    assert [stats.avoided_fetches for stats in ecb_api_caller.probe_stats] == (
+        [avoided_fetches] if avoided_fetches is not None else []
+    )
+
+
+def test_get_ecb_rates_fetches_every_pair_if_probe_body_is_malformed(tmp_path):
+    """
+    GIVEN a EcbApiCaller with high-water marks and the freshness probe enabled, and a
+        probe answered with a truncated body
+    WHEN get_ecb_rates is called for two currency pairs
+    THEN both currency pairs should be fetched, and no probe outcome recorded
+    """
+    eur_gbp, eur_usd = model.CurrencyPair("EUR", "GBP"), model.CurrencyPair(
+        "EUR", "USD"
+    )
+    high_water_marks = HighWaterMarkStore(str(tmp_path / "state.json"))
+    high_water_marks.update(eur_gbp, dt.date(2023, 11, 9))
+    high_water_marks.update(eur_usd, dt.date(2023, 11, 10))
+    ecb_api_caller = source_repository.EcbApiCaller(
+        10,
+        high_water_marks=high_water_marks,
+        end_date=dt.date(2023, 11, 13),
+        probe=True,
+        retry_policy=RetryPolicy(max_attempts=1),
+    )
+    with open("tests/data/xml_ecb_structure_specific_test.xml", "rb") as f:
+        body = f.read()
+
+    with requests_mock.Mocker() as mocker:
+        probe = mocker.get(
+            source_repository.ECB_API_URL + "D.GBP+USD.EUR.SP00.A",
+            content=PROBE_BODY[: len(PROBE_BODY) // 2],
+        )
+        for quote in ("GBP", "USD"):
+            mocker.get(
+                source_repository.ECB_API_URL + f"D.{quote}.EUR.SP00.A", content=body
+            )
+        ecb_api_caller.get_exchange_rates([eur_gbp, eur_usd])
+
+    assert probe.call_count == 1
+    assert [stats.currency_pair.quote for stats in ecb_api_caller.transfer_stats] == [
+        "GBP",
+        "USD",
+    ]
+    assert not ecb_api_caller.probe_stats
+
+
+def test_latest_observation_dates_of_generic_data():
+    """
+    GIVEN an SDMX body in the generic format
+    WHEN the latest observation dates are parsed from it
+    THEN the date of the latest observation of its series should be returned
+    """
+    with open("tests/data/xml_ecb_test.xml", "rb") as f:
+        body = f.read()
+
+    assert source_repository._latest_observation_dates([body[:500], body[500:]]) == {
+        "GBP": dt.date(2023, 11, 10)
+    }
+
+
+def test_get_ecb_rates_retries_transient_errors(fault_injecting_ecb_api):
+    """
+    GIVEN an ECB API answering with transient errors before succeeding
+    WHEN get_ecb_rates is called
+    THEN the calls should be retried and the exchange rates returned
+    """
+    fault_injecting_ecb_api.faults = [503, 500]
+    ecb_api_caller = source_repository.EcbApiCaller(
+        10,
+        base_url=fault_injecting_ecb_api.base_url,
+        retry_policy=RetryPolicy(backoff_factor=0.0, minimum_calls=10),
+    )
+
+    exchange_rates = ecb_api_caller.get_exchange_rates(
+        [model.CurrencyPair("EUR", "GBP")]
+    )
+
+    assert fault_injecting_ecb_api.request_count == 3
+    assert len(exchange_rates) > 0
+
+
+def test_get_ecb_rates_stops_retrying_when_budget_is_spent(fault_injecting_ecb_api):
+    """
+    GIVEN an ECB API failing and a retry policy with a retry budget of 1
+    WHEN get_ecb_rates is called
+    THEN a single retry should be made and the call should fail
+    """
+    fault_injecting_ecb_api.faults = [500, 500, 500]
+    ecb_api_caller = source_repository.EcbApiCaller(
+        10,
+        base_url=fault_injecting_ecb_api.base_url,
+        retry_policy=RetryPolicy(backoff_factor=0.0, retry_budget=1, minimum_calls=10),
+    )
+
+    with pytest.raises(ValueError):
+        ecb_api_caller.get_exchange_rates([model.CurrencyPair("EUR", "GBP")])
+
+    assert fault_injecting_ecb_api.request_count == 2
+
+
+def test_get_ecb_rates_opens_shared_circuit_breaker(fault_injecting_ecb_api):
+    """
+    GIVEN an ECB API failing on every call and two EcbApiCaller sharing a circuit breaker
+    WHEN the first one fails to get exchange rates
+    THEN the circuit breaker should open and the second one should not reach the API
+    """
+    fault_injecting_ecb_api.faults = [500] * 10
+    retry_policy = RetryPolicy(backoff_factor=0.0, max_attempts=2, minimum_calls=2)
+    circuit_breaker = CircuitBreaker.from_policy(retry_policy)
+    ecb_api_callers = [
+        source_repository.EcbApiCaller(
+            10,
+            base_url=fault_injecting_ecb_api.base_url,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+        )
+        for _ in range(2)
+    ]
+
+    with pytest.raises(ValueError):
+        ecb_api_callers[0].get_exchange_rates([model.CurrencyPair("EUR", "GBP")])
+    with pytest.raises(CircuitOpenError):
+        ecb_api_callers[1].get_exchange_rates([model.CurrencyPair("EUR", "USD")])
+
+    assert fault_injecting_ecb_api.request_count == 2
+    assert circuit_breaker.state == CircuitBreaker.OPEN
+
+
+def test_get_ecb_rates_enforces_deadline(fault_injecting_ecb_api):
+    """
+    GIVEN an ECB API slower to answer than the deadline of the run
+    WHEN get_ecb_rates is called
+    THEN the call should time out instead of waiting for the answer
+    """
+    fault_injecting_ecb_api.faults = [1.0]
+    ecb_api_caller = source_repository.EcbApiCaller(
+        10,
+        base_url=fault_injecting_ecb_api.base_url,
+        retry_policy=RetryPolicy(
+            backoff_factor=0.0, deadline_seconds=0.2, minimum_calls=10
+        ),
+    )
+
+    with pytest.raises(DeadlineExceededError):
+        ecb_api_caller.get_exchange_rates([model.CurrencyPair("EUR", "GBP")])
+
+
+def test_get_ecb_rates_enforces_deadline_while_reading_body(fault_injecting_ecb_api):
+    """
+    GIVEN an ECB API answering at once, then sending the body in pieces that each arrive
+        within the deadline of the run but all of them after it
+    WHEN get_ecb_rates is called
+    THEN the run should stop at its deadline instead of reading the body to the end
+    """
+    fault_injecting_ecb_api.faults = [("slow_body", 0.1)]
+    ecb_api_caller = source_repository.EcbApiCaller(
+        10,
+        base_url=fault_injecting_ecb_api.base_url,
+        retry_policy=RetryPolicy(deadline_seconds=0.35),
+    )
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        ecb_api_caller.get_exchange_rates([model.CurrencyPair("EUR", "GBP")])
+
+    assert time.monotonic() - start < 1.0
+
+
+def test_async_ecb_api_caller_enforces_deadline_while_reading_body(
+    fault_injecting_ecb_api,
+):
+    """
+    GIVEN an ECB API sending the body in pieces that each arrive within the deadline of
+        the run but all of them after it
+    WHEN the exchange rates of an AsyncEcbApiCaller are iterated
+    THEN the iteration should stop at the deadline of the run
+    """
+    fault_injecting_ecb_api.faults = [("slow_body", 0.1)]
+    async_ecb_api_caller = source_repository.AsyncEcbApiCaller(
+        10,
+        base_url=fault_injecting_ecb_api.base_url,
+        retry_policy=RetryPolicy(deadline_seconds=0.35),
+    )
+
+    async def run():
+        try:
+            return await _collect_batches(
+                async_ecb_api_caller, [model.CurrencyPair("EUR", "GBP")]
+            )
+        finally:
+            await async_ecb_api_caller.aclose()
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(run())
+
+    assert time.monotonic() - start < 1.0
+
+
+def test_unexpected_error_releases_circuit_breaker_trial():
+    """
+    GIVEN a half open circuit breaker, and an ECB API call failing with an error that is
+        not an HTTP one
+    WHEN the exchange rates are fetched twice
+    THEN the first fetch should raise the error, and the second one be let through as
+        trial call and close the circuit breaker
+    """
+    circuit_breaker = CircuitBreaker(minimum_calls=1, open_seconds=0)
+    circuit_breaker.record_failure()
+    ecb_api_caller = source_repository.EcbApiCaller(10, circuit_breaker=circuit_breaker)
+    with open("tests/data/xml_ecb_structure_specific_test.xml", "rb") as f:
+        body = f.read()
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get(
+            requests_mock.ANY,
+            [{"exc": ValueError("unexpected")}, {"content": body, "status_code": 200}],
+        )
+        with pytest.raises(ValueError):
+            ecb_api_caller.get_exchange_rates([model.CurrencyPair("EUR", "GBP")])
+        exchange_rates = ecb_api_caller.get_exchange_rates(
+            [model.CurrencyPair("EUR", "GBP")]
+        )
+
+    assert len(exchange_rates) > 0
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_iter_body_views_reuses_a_single_buffer():
+    """
+    GIVEN a gzip compressed and streamed response
+    WHEN its body is read with iter_body_views()
+    THEN the decoded body should be yielded as views of one reusable buffer
+    """
+    body = b"".join(b"<Obs %d/>" % index for index in range(10_000))
+    with requests_mock.Mocker() as mocker:
+        url = "https://data-api.ecb.europa.eu"
+        mocker.get(
+            url, content=gzip.compress(body), headers={"Content-Encoding": "gzip"}
+        )
+        response = req.get(url, stream=True)
+
+    buffers, decoded = set(), b""
+    for view in source_repository.iter_body_views(response, chunk_size=1024):
+        buffers.add(id(view.obj))
+        decoded += view
+
+    assert decoded == body
+    assert len(buffers) == 1
+
+
+def test_xml_to_ecb_rates_uses_declared_encoding():
+    """
+    GIVEN a streamed response encoded as declared in its XML header, without charset header
+    WHEN it is passed to EcbApiCaller.xml_to_ecb_rates()
+    THEN it should be decoded with the declared encoding
+    """
+    body = (
+        '<?xml version="1.0" encoding="ISO-8859-1"?>'
+        "<message:StructureSpecificData "
+        'xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message">'
+        '<message:DataSet><Series TITLE="Livre sterling/Euro, Référence">'
+        '<Obs TIME_PERIOD="2023-11-06" OBS_VALUE="0.8664"/>'
+        "</Series></message:DataSet></message:StructureSpecificData>"
+    ).encode("iso-8859-1")
+    with requests_mock.Mocker() as mocker:
+        url = "https://data-api.ecb.europa.eu"
+        mocker.get(url, content=body, headers={"Content-Type": "application/xml"})
+        response = req.get(url, stream=True)
+
+    result_ecb_rates = source_repository.EcbApiCaller._xml_to_ecb_rates(
+        response, model.CurrencyPair("EUR", "GBP")
+    )
+
+    assert [(rate.date, rate.exchange_rate) for rate in result_ecb_rates] == [
+        (dt.date(2023, 11, 6), 0.8664)
+    ]
+
+
+def test_get_ecb_rates_of_monthly_series():
+    """
+    GIVEN a EcbApiCaller for monthly series and an API publishing the monthly series
+    WHEN get_ecb_rates is called
+    THEN the monthly averages should be returned, dated on the first day of their month
+    """
+    currency_pair = model.CurrencyPair("EUR", "GBP")
+    fake_ecb_api_caller = source_repository.EcbApiCallerFake(
+        {"M.GBP": "tests/data/xml_ecb_monthly_test.xml"}, frequency=model.MONTHLY
+    )
+
+    exchange_rates = fake_ecb_api_caller.get_exchange_rates([currency_pair])
+
+    assert [
+        (exchange_rate.date, exchange_rate.frequency)
+        for exchange_rate in exchange_rates
+    ] == [
+        (dt.date(2023, 9, 1), model.MONTHLY),
+        (dt.date(2023, 10, 1), model.MONTHLY),
+        (dt.date(2023, 11, 1), model.MONTHLY),
+    ]
+    assert exchange_rates[-1].exchange_rate == 0.8698545454545455
+
+
+def test_get_ecb_rates_rolls_up_unpublished_series():
+    """
+    GIVEN a EcbApiCaller for monthly series and an API publishing the daily series only
+    WHEN get_ecb_rates is called
+    THEN the daily series should be fetched and rolled up into monthly averages
+    """
+    currency_pair = model.CurrencyPair("EUR", "GBP")
+    fake_ecb_api_caller = source_repository.EcbApiCallerFake(
+        {"GBP": "tests/data/xml_ecb_structure_specific_test.xml"},
+        frequency=model.MONTHLY,
+    )
+
+    exchange_rates = fake_ecb_api_caller.get_exchange_rates([currency_pair])
+
+    assert len(exchange_rates) == 1
+    assert exchange_rates[0].date == dt.date(2023, 11, 1)
+    assert exchange_rates[0].frequency == model.MONTHLY
+    assert exchange_rates[0].source == rollups.ROLLUP_SOURCE
+    assert exchange_rates[0].exchange_rate == pytest.approx(
+        (0.8664 + 0.86855 + 0.87015 + 0.87205 + 0.87435) / 5
+    )
+
+
+async def _collect_batches(
+    async_source: source_repository.AbstractAsyncSourceRepository,
+    currency_pairs: List[model.CurrencyPair],
+) -> List[List[model.ExchangeRate]]:
+    return [batch async for batch in async_source.iter_exchange_rates(currency_pairs)]
+
+
+def test_iter_exchange_rates_yields_one_batch_per_currency_pair(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a AsyncEcbApiCallerFake with predefined responses
+    WHEN its exchange rates are iterated for two currency pairs, one of them twice
+    THEN one batch per currency pair should be yielded with the expected exchange rates,
+        and the bytes transferred by each call recorded
+    """
+    _, expected_ecb_rates, currency_pairs = fake_ecb_api
+    async_ecb_api_caller = source_repository.AsyncEcbApiCallerFake(
+        {
+            "GBP": "tests/data/xml_ecb_test.xml",
+            "USD": "tests/data/xml_ecb_test.xml",
+        }
+    )
+
+    batches = asyncio.run(
+        _collect_batches(async_ecb_api_caller, currency_pairs + currency_pairs[:1])
+    )
+
+    assert len(batches) == 2
+    assert sorted(batch[0].currency_pair.quote for batch in batches) == [
+        "GBP",
+        "USD",
+    ]
+    exchange_rates = [exchange_rate for batch in batches for exchange_rate in batch]
+    assert len(exchange_rates) == 10
+    for expected_ecb_rate in expected_ecb_rates:
+        assert expected_ecb_rate in exchange_rates
+    file_size = os.path.getsize("tests/data/xml_ecb_test.xml")
+    assert [
+        stats.uncompressed_bytes for stats in async_ecb_api_caller.transfer_stats
+    ] == [file_size, file_size]
+
+
+def test_iter_exchange_rates_rolls_up_unpublished_series():
+    """
+    GIVEN a AsyncEcbApiCallerFake for monthly series and an API publishing the daily
+        series only
+    WHEN its exchange rates are iterated
+    THEN the daily series should be fetched and rolled up into monthly averages
+    """
+    async_ecb_api_caller = source_repository.AsyncEcbApiCallerFake(
+        {"GBP": "tests/data/xml_ecb_structure_specific_test.xml"},
+        frequency=model.MONTHLY,
+    )
+
+    (batch,) = asyncio.run(
+        _collect_batches(async_ecb_api_caller, [model.CurrencyPair("EUR", "GBP")])
+    )
+
+    assert len(batch) == 1
+    assert batch[0].date == dt.date(2023, 11, 1)
+    assert batch[0].source == rollups.ROLLUP_SOURCE
+
+
+def test_async_ecb_api_caller_retries_transient_errors(fault_injecting_ecb_api):
+    """
+    GIVEN an ECB API answering with transient errors before succeeding
+    WHEN the exchange rates of an AsyncEcbApiCaller are iterated
+    THEN the calls should be retried over the asyncio HTTP client and the exchange
+        rates yielded
+    """
+    fault_injecting_ecb_api.faults = [503, 500]
+    async_ecb_api_caller = source_repository.AsyncEcbApiCaller(
+        10,
+        base_url=fault_injecting_ecb_api.base_url,
+        retry_policy=RetryPolicy(backoff_factor=0.0, minimum_calls=10),
+    )
+
+    async def run():
+        try:
+            return await _collect_batches(
+                async_ecb_api_caller, [model.CurrencyPair("EUR", "GBP")]
+            )
+        finally:
+            await async_ecb_api_caller.aclose()
+
+    (batch,) = asyncio.run(run())
+
+    assert fault_injecting_ecb_api.request_count == 3
+    assert len(batch) > 0
+    assert async_ecb_api_caller.transfer_stats[0].compressed_bytes == os.path.getsize(
+        "tests/data/xml_ecb_structure_specific_test.xml"
+    )
+
+
+def test_async_ecb_api_caller_decodes_compressed_responses():
+    """
+    GIVEN an ECB API answering with a gzip compressed body
+    WHEN the exchange rates of an AsyncEcbApiCaller are iterated
+    THEN the request should accept compressed responses, the exchange rates be parsed from
+        the decoded body, and the compressed and uncompressed bytes recorded
+    """
+    with open("tests/data/xml_ecb_structure_specific_test.xml", "rb") as f:
+        body = f.read()
+    compressed_body = gzip.compress(body)
+    requests = []
+
+    async def stream_body():
+        yield compressed_body
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200, content=stream_body(), headers={"Content-Encoding": "gzip"}
+        )
+
+    async_ecb_api_caller = source_repository.AsyncEcbApiCaller(
+        10, client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    async def run():
+        try:
+            return await _collect_batches(
+                async_ecb_api_caller, [model.CurrencyPair("EUR", "GBP")]
+            )
+        finally:
+            await async_ecb_api_caller.aclose()
+
+    (batch,) = asyncio.run(run())
+
+    assert len(batch) > 0
+    assert requests[0].headers["Accept-Encoding"] == "gzip, deflate"
+    assert requests[0].url.params["detail"] == "dataonly"
+    (stats,) = async_ecb_api_caller.transfer_stats
+    assert stats.content_encoding == "gzip"
+    assert stats.compressed_bytes == len(compressed_body)
+    assert stats.uncompressed_bytes == len(body)
+
+
+def test_sync_to_async_source_repository(
+    fake_ecb_api: Tuple[
+        source_repository.EcbApiCallerFake,
+        List[model.ExchangeRate],
+        List[model.CurrencyPair],
+    ],
+):
+    """
+    GIVEN a synchronous EcbApiCallerFake wrapped in SyncToAsyncSourceRepository
+    WHEN its exchange rates are iterated
+    THEN the exchange rates of get_exchange_rates() should be yielded in a single batch
+    """
+    fake_ecb_api_caller, expected_ecb_rates, currency_pairs = fake_ecb_api
+
+    (batch,) = asyncio.run(
+        _collect_batches(
+            source_repository.SyncToAsyncSourceRepository(fake_ecb_api_caller),
+            currency_pairs,
+        )
+    )
+
+    assert len(batch) == 10
+    for expected_ecb_rate in expected_ecb_rates:
+        assert expected_ecb_rate in batch
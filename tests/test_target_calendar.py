@@ -0,0 +1,95 @@
+import datetime as dt
+import pytest
+
+from src import model, target_calendar
+
+
+@pytest.mark.parametrize(
+    "year, good_friday, easter_monday",
+    [
+        (2002, dt.date(2002, 3, 29), dt.date(2002, 4, 1)),
+        (2019, dt.date(2019, 4, 19), dt.date(2019, 4, 22)),
+        (2023, dt.date(2023, 4, 7), dt.date(2023, 4, 10)),
+        (2024, dt.date(2024, 3, 29), dt.date(2024, 4, 1)),
+        (2025, dt.date(2025, 4, 18), dt.date(2025, 4, 21)),
+    ],
+)
+def test_target_holidays(year: int, good_friday: dt.date, easter_monday: dt.date):
+    """
+    GIVEN a year
+    WHEN target_holidays() is called with it
+    THEN it should return the TARGET2 closing days of the year
+    """
+    assert target_calendar.target_holidays(year) == {
+        dt.date(year, 1, 1),
+        good_friday,
+        easter_monday,
+        dt.date(year, 5, 1),
+        dt.date(year, 12, 25),
+        dt.date(year, 12, 26),
+    }
+
+
+@pytest.mark.parametrize(
+    "date, expected",
+    [
+        (dt.date(2023, 11, 10), True),
+        (dt.date(2023, 11, 11), False),
+        (dt.date(2023, 11, 12), False),
+        (dt.date(2024, 5, 1), False),
+        (dt.date(2024, 12, 24), True),
+        (dt.date(2024, 12, 25), False),
+    ],
+)
+def test_is_publication_day(date: dt.date, expected: bool):
+    """
+    GIVEN a date
+    WHEN is_publication_day() is called with it
+    THEN it should be True only for weekdays that are not TARGET2 closing days
+    """
+    assert target_calendar.is_publication_day(date) is expected
+
+
+def test_publication_dates_across_year_end():
+    """
+    GIVEN a window across the end of a year
+    WHEN publication_dates() is called with it
+    THEN it should return the weekdays of the window that are not TARGET2 closing days
+    """
+    assert target_calendar.publication_dates(
+        dt.date(2024, 12, 20), dt.date(2025, 1, 3)
+    ) == [
+        dt.date(2024, 12, 20),
+        dt.date(2024, 12, 23),
+        dt.date(2024, 12, 24),
+        dt.date(2024, 12, 27),
+        dt.date(2024, 12, 30),
+        dt.date(2024, 12, 31),
+        dt.date(2025, 1, 2),
+        dt.date(2025, 1, 3),
+    ]
+
+
+def test_find_gaps():
+    """
+    GIVEN exchange rates of two currency pairs, one of them missing a publication date
+    WHEN find_gaps() is called with them
+    THEN it should return the missing publication date of that currency pair only
+    """
+    eur_gbp, eur_usd = model.CurrencyPair("EUR", "GBP"), model.CurrencyPair(
+        "EUR", "USD"
+    )
+    exchange_rates = [
+        model.ExchangeRate(
+            date=date, exchange_rate=1.0, currency_pair=currency_pair, source="test"
+        )
+        for currency_pair in (eur_gbp, eur_usd)
+        for date in target_calendar.publication_dates(
+            dt.date(2024, 3, 25), dt.date(2024, 4, 5)
+        )
+        if not (currency_pair == eur_usd and date == dt.date(2024, 4, 3))
+    ]
+
+    assert target_calendar.find_gaps(
+        exchange_rates, [eur_gbp, eur_usd], dt.date(2024, 3, 25), dt.date(2024, 4, 5)
+    ) == {eur_usd: [dt.date(2024, 4, 3)]}
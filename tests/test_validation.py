@@ -0,0 +1,185 @@
+import datetime as dt
+from typing import List
+
+import pytest
+
+from src import model, validation
+
+
+EUR_GBP = model.CurrencyPair("EUR", "GBP")
+
+
+def build_series(values: List[float]) -> List[model.ExchangeRate]:
+    """
+    Builds EUR/GBP Exchange Rates on consecutive days from a list of rates.
+
+    Args:
+        values (List[float]): the rates.
+    Returns:
+        List[model.ExchangeRate]: the Exchange Rates.
+    """
+    return [
+        model.ExchangeRate(
+            date=dt.date(2023, 11, 1) + dt.timedelta(days),
+            exchange_rate=value,
+            currency_pair=EUR_GBP,
+            source="ECB API",
+        )
+        for days, value in enumerate(values)
+    ]
+
+
+SERIES = [0.861, 0.864, 0.862, 0.866, 0.868, 0.865, 0.867, 0.869, 0.866, 0.87]
+
+
+def quarantined_reasons(result: validation.ValidationResult) -> List[tuple]:
+    return [
+        (quarantined.exchange_rate.date.day, quarantined.reason)
+        for quarantined in result.quarantined
+    ]
+
+
+def test_validate_passes_valid_series():
+    """
+    GIVEN a series of Exchange Rates with regular day-over-day changes
+    WHEN it is validated
+    THEN all Exchange Rates should be valid
+    """
+    exchange_rates = build_series(SERIES)
+
+    result = validation.ExchangeRateValidator().validate(exchange_rates)
+
+    assert result.valid == exchange_rates
+    assert result.quarantined == [] and result.dropped == []
+
+
+@pytest.mark.parametrize(
+    "values, expected_reasons",
+    [
+        (SERIES[:3] + [float("nan")] + SERIES[4:], [(4, "schema")]),
+        (SERIES[:3] + [-0.86] + SERIES[4:], [(4, "range")]),
+        (SERIES[:3] + [8.62] + SERIES[4:], [(4, "jump")]),
+    ],
+)
+def test_validate_quarantines_invalid_exchange_rates(
+    values: List[float], expected_reasons: List[tuple]
+):
+    """
+    GIVEN a series with a non finite rate, a rate out of range or an outlier
+    WHEN it is validated
+    THEN the Exchange Rates failing a check should be quarantined with its reason,
+        and only them
+    """
+    exchange_rates = build_series(values)
+
+    result = validation.ExchangeRateValidator().validate(exchange_rates)
+
+    assert quarantined_reasons(result) == expected_reasons
+    assert len(result.valid) == len(values) - len(expected_reasons)
+
+
+def test_validate_passes_pegged_currencies():
+    """
+    GIVEN a series of a currency pegged to the EURO, with the same rate every day
+    WHEN it is validated with the default policy
+    THEN all Exchange Rates should be valid
+    """
+    exchange_rates = [
+        model.ExchangeRate(
+            date=dt.date(2024, 10, 1) + dt.timedelta(days),
+            exchange_rate=1.9558,
+            currency_pair=model.CurrencyPair("EUR", "BGN"),
+            source="ECB API",
+        )
+        for days in range(14)
+    ]
+
+    result = validation.ExchangeRateValidator().validate(exchange_rates)
+
+    assert result.valid == exchange_rates
+
+
+@pytest.mark.parametrize(
+    "min_jump, expected_reasons", [(0.01, []), (0.0, [(10, "jump")])]
+)
+def test_validate_jumps_beyond_minimum_move(
+    min_jump: float, expected_reasons: List[tuple]
+):
+    """
+    GIVEN a low-volatility series, like the ones of DKK, moving by 0.05% on its last day
+    WHEN it is validated with a minimum jump of 1%, the default, and without any
+    THEN the last Exchange Rate should only be a jump without minimum jump
+    """
+    exchange_rates = build_series(
+        [7.4580, 7.4579, 7.4580, 7.4578, 7.4579, 7.4580, 7.4579, 7.4578, 7.4579, 7.4620]
+    )
+    policy = validation.ValidationPolicy(min_jump=min_jump)
+
+    result = validation.ExchangeRateValidator(policy).validate(exchange_rates)
+
+    assert quarantined_reasons(result) == expected_reasons
+
+
+def test_validate_quarantines_unchanged_rates_when_enabled():
+    """
+    GIVEN a policy checking for more than 5 unchanged rates
+    WHEN a EUR/GBP series and a EUR/BGN series repeating their rate are validated
+    THEN the EUR/GBP rates beyond the 5th repetition should be quarantined as unchanged,
+        and the EUR/BGN ones, exempted as pegged, should be valid
+    """
+    policy = validation.ValidationPolicy(max_unchanged_observations=5)
+    pegged_rates = [
+        model.ExchangeRate(
+            date=dt.date(2023, 11, 1) + dt.timedelta(days),
+            exchange_rate=1.9558,
+            currency_pair=model.CurrencyPair("EUR", "BGN"),
+            source="ECB API",
+        )
+        for days in range(10)
+    ]
+    exchange_rates = build_series(SERIES[:3] + [0.862] * 7) + pegged_rates
+
+    result = validation.ExchangeRateValidator(policy).validate(exchange_rates)
+
+    assert quarantined_reasons(result) == [
+        (8, "unchanged"),
+        (9, "unchanged"),
+        (10, "unchanged"),
+    ]
+    assert result.valid[-10:] == pegged_rates
+
+
+def test_validate_catches_duplicate_keys():
+    """
+    GIVEN a batch with the same currency pair and date twice, out of date order
+    WHEN it is validated
+    THEN the second occurrence should be quarantined as duplicate
+    """
+    exchange_rates = build_series(SERIES)
+    exchange_rates = exchange_rates[5:] + exchange_rates[:5] + [exchange_rates[2]]
+
+    result = validation.ExchangeRateValidator().validate(exchange_rates)
+
+    assert quarantined_reasons(result) == [(3, "duplicate")]
+
+
+def test_validate_follows_routes():
+    """
+    GIVEN a validation policy loading jumps and dropping rates out of range
+    WHEN a series with an outlier and a negative rate is validated
+    THEN the outlier should be loaded and the negative rate dropped
+    """
+    policy = validation.ValidationPolicy(
+        routes={"jump": validation.LOAD, "range": validation.DROP}
+    )
+    exchange_rates = build_series(SERIES[:3] + [8.62, -1.0] + SERIES[5:])
+
+    result = validation.ExchangeRateValidator(policy).validate(exchange_rates)
+
+    assert [rate.exchange_rate for rate in result.valid] == SERIES[:3] + [
+        8.62
+    ] + SERIES[5:]
+    assert [(rate.exchange_rate.date.day, rate.reason) for rate in result.dropped] == [
+        (5, "range")
+    ]
+    assert result.quarantined == []
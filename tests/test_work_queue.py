@@ -0,0 +1,284 @@
+import datetime as dt
+import threading
+import time
+
+import pytest
+
+from src import destination_repository, model, services, source_repository, work_queue
+
+
+GBP = model.CurrencyPair("EUR", "GBP")
+USD = model.CurrencyPair("EUR", "USD")
+
+
+@pytest.fixture(params=["sqlite", "directory"])
+def queue(request, tmp_path) -> work_queue.AbstractWorkQueue:
+    """
+    Fixture that returns an empty work queue of each backend, allowing two attempts per unit.
+    """
+    if request.param == "sqlite":
+        return work_queue.SqliteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    return work_queue.DirectoryWorkQueue(str(tmp_path / "queue"), max_attempts=2)
+
+
+def _units(*currency_pairs: model.CurrencyPair) -> list[work_queue.WorkUnit]:
+    return work_queue.plan_work_units(
+        list(currency_pairs),
+        dt.date(2023, 11, 6),
+        dt.date(2023, 11, 10),
+        "raw.exchange_rates",
+        source_repository.GENERIC_DATA,
+    )
+
+
+def _report(lease: work_queue.Lease, rows: int = 5) -> work_queue.UnitReport:
+    return work_queue.UnitReport(
+        unit_id=lease.unit.unit_id,
+        worker_id=lease.worker_id,
+        rows=rows,
+        transferred_bytes=100,
+        seconds=0.5,
+    )
+
+
+def test_plan_work_units():
+    """
+    GIVEN a backfill of three currency pairs over 10 days
+    WHEN it is planned in units of two currency pairs and four days
+    THEN units should cover every pair and day once, by window then by set of pairs
+    """
+    units = work_queue.plan_work_units(
+        [GBP, USD, model.CurrencyPair("EUR", "JPY")],
+        dt.date(2023, 11, 1),
+        dt.date(2023, 11, 10),
+        "raw.exchange_rates",
+        source_repository.GENERIC_DATA,
+        pairs_per_unit=2,
+        days_per_unit=4,
+    )
+
+    assert [unit.unit_id for unit in units] == [
+        "raw.exchange_rates.GBP-USD.20231101-20231104",
+        "raw.exchange_rates.JPY.20231101-20231104",
+        "raw.exchange_rates.GBP-USD.20231105-20231108",
+        "raw.exchange_rates.JPY.20231105-20231108",
+        "raw.exchange_rates.GBP-USD.20231109-20231110",
+        "raw.exchange_rates.JPY.20231109-20231110",
+    ]
+    assert units[0].currency_pairs == (GBP, USD)
+    assert work_queue.WorkUnit.from_dict(units[-1].to_dict()) == units[-1]
+
+
+def test_put_is_idempotent(queue):
+    """
+    GIVEN a queue where units were put
+    WHEN the same units are put again
+    THEN they should be queued once
+    """
+    assert queue.put(_units(GBP, USD)) == 2
+    assert queue.put(_units(GBP, USD)) == 0
+    assert queue.summary().counts == {work_queue.PENDING: 2}
+
+
+def test_claim_heartbeat_and_complete(queue):
+    """
+    GIVEN a queue of two units
+    WHEN two workers claim a unit each, one renews its lease and both complete them
+    THEN each unit should be claimed once, and the summary aggregate both reports
+    """
+    queue.put(_units(GBP, USD))
+
+    first = queue.claim("worker-1", lease_seconds=60)
+    second = queue.claim("worker-2", lease_seconds=60)
+    assert queue.claim("worker-3", lease_seconds=60) is None
+    assert {first.unit.currency_pairs, second.unit.currency_pairs} == {(GBP,), (USD,)}
+    assert first.attempt == 1
+
+    renewed = queue.heartbeat(first, lease_seconds=120)
+    assert renewed.expires_at > first.expires_at
+    assert queue.summary().counts == {work_queue.LEASED: 2}
+
+    queue.complete(renewed, _report(renewed))
+    queue.complete(second, _report(second, rows=3))
+    summary = queue.summary()
+
+    assert summary.counts == {work_queue.DONE: 2}
+    assert summary.remaining == 0
+    assert summary.rows == 8
+    assert summary.transferred_bytes == 200
+    assert summary.busy_seconds == 1.0
+    assert summary.workers == 2
+    assert summary.format()[0] == "units: pending 0, leased 0, done 2, failed 0"
+
+
+def test_expired_lease_is_claimed_again(queue):
+    """
+    GIVEN a unit whose lease has expired
+    WHEN another worker claims it
+    THEN it should get the unit for a second attempt, and the first worker should lose its lease
+    """
+    queue.put(_units(GBP))
+    stale = queue.claim("worker-1", lease_seconds=0.01)
+    time.sleep(0.05)
+
+    lease = queue.claim("worker-2", lease_seconds=60)
+
+    assert lease.unit == stale.unit
+    assert lease.attempt == 2
+    with pytest.raises(work_queue.LeaseLostError):
+        queue.heartbeat(stale, lease_seconds=60)
+    with pytest.raises(work_queue.LeaseLostError):
+        queue.complete(stale, _report(stale))
+    queue.complete(lease, _report(lease))
+    assert queue.summary().counts == {work_queue.DONE: 1}
+
+
+def test_failed_unit_is_retried_up_to_max_attempts(queue):
+    """
+    GIVEN a queue allowing two attempts per unit
+    WHEN a unit fails twice, and the lease of another unit expires on its last attempt
+    THEN both units should be retried once then marked as failed
+    """
+    queue.put(_units(GBP))
+    queue.fail(queue.claim("worker-1", lease_seconds=60), "timeout")
+    assert queue.summary().counts == {work_queue.PENDING: 1}
+
+    lease = queue.claim("worker-1", lease_seconds=60)
+    assert lease.attempt == 2
+    queue.fail(lease, "timeout")
+    assert queue.summary().counts == {work_queue.FAILED: 1}
+
+    queue.put(_units(USD))
+    queue.fail(queue.claim("worker-1", lease_seconds=60), "timeout")
+    queue.claim("worker-1", lease_seconds=0.01)
+    time.sleep(0.05)
+
+    assert queue.claim("worker-1", lease_seconds=60) is None
+    assert queue.summary().counts == {work_queue.FAILED: 2}
+
+
+def test_lease_keeper_renews_lease(queue):
+    """
+    GIVEN a unit claimed with a short lease
+    WHEN it is worked on longer than the lease under a LeaseKeeper
+    THEN the lease should be renewed, so no other worker can claim the unit
+    """
+    queue.put(_units(GBP))
+    lease = queue.claim("worker-1", lease_seconds=0.3)
+
+    with work_queue.LeaseKeeper(queue, lease, lease_seconds=0.3) as lease_keeper:
+        time.sleep(0.5)
+        assert queue.claim("worker-2", lease_seconds=60) is None
+
+    assert not lease_keeper.lost
+    assert lease_keeper.lease.expires_at > lease.expires_at
+    queue.complete(lease_keeper.lease, _report(lease))
+
+
+def test_run_worker(queue, tmp_path):
+    """
+    GIVEN a queue of two units, one failing on its first attempt, and two workers
+    WHEN the workers run until the queue is empty
+    THEN every unit should be done and its rates loaded once into the destination
+    """
+    queue.put(_units(GBP, USD))
+    database_path = str(tmp_path / "rates.db")
+    failures = {"raw.exchange_rates.USD.20231106-20231110"}
+    lock = threading.Lock()
+
+    def source_repository_factory(unit: work_queue.WorkUnit):
+        with lock:
+            if unit.unit_id in failures:
+                failures.remove(unit.unit_id)
+                raise ConnectionError("ECB API unavailable")
+        return source_repository.EcbApiCallerFake(
+            {
+                "GBP": "tests/data/xml_ecb_test.xml",
+                "USD": "tests/data/xml_ecb_test.xml",
+            },
+            days_to_register=(unit.date_to - unit.date_from).days,
+            end_date=unit.date_to,
+        )
+
+    reports = []
+
+    def work(worker_id: str):
+        reports.extend(
+            services.run_worker(
+                queue,
+                worker_id,
+                source_repository_factory,
+                lambda destination_table: destination_repository.SqliteDestinationRepository(
+                    database_path
+                ),
+                lease_seconds=5,
+                poll_seconds=0.01,
+            )
+        )
+
+    workers = [threading.Thread(target=work, args=(f"worker-{i}",)) for i in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    summary = queue.summary()
+
+    assert sorted(report.unit_id for report in reports) == [
+        "raw.exchange_rates.GBP.20231106-20231110",
+        "raw.exchange_rates.USD.20231106-20231110",
+    ]
+    assert summary.counts == {work_queue.DONE: 2}
+    assert summary.rows == 10
+    destination = destination_repository.SqliteDestinationRepository(database_path)
+    assert len(list(destination.read_all_exchange_rates())) == 10
+
+
+def test_run_worker_skips_load_after_lost_lease(tmp_path):
+    """
+    GIVEN a queue of one unit whose first lease is lost, and expired, while its rates
+        are fetched
+    WHEN a worker runs until the queue is empty
+    THEN the first attempt should not load its rates, and the second attempt should
+        load and complete the unit
+    """
+
+    class LeaseLosingWorkQueue(work_queue.SqliteWorkQueue):
+        lost = False
+
+        def heartbeat(self, lease, lease_seconds):
+            if not self.lost:
+                self.lost = True
+                super().heartbeat(lease, 0)
+                raise work_queue.LeaseLostError("Lease lost.")
+            return super().heartbeat(lease, lease_seconds)
+
+    queue = LeaseLosingWorkQueue(str(tmp_path / "queue.db"))
+    queue.put(_units(GBP))
+    database_path = str(tmp_path / "rates.db")
+    fetches, loads = [], []
+
+    def source_repository_factory(unit: work_queue.WorkUnit):
+        fetches.append(unit.unit_id)
+        return source_repository.EcbApiCallerFake(
+            {"GBP": "tests/data/xml_ecb_test.xml"},
+            days_to_register=(unit.date_to - unit.date_from).days,
+            end_date=unit.date_to,
+        )
+
+    def destination_repository_factory(destination_table: str):
+        loads.append(destination_table)
+        return destination_repository.SqliteDestinationRepository(database_path)
+
+    reports = services.run_worker(
+        queue,
+        "worker-1",
+        source_repository_factory,
+        destination_repository_factory,
+        lease_seconds=60,
+        poll_seconds=0.01,
+    )
+
+    assert len(fetches) == 2
+    assert loads == ["raw.exchange_rates"]
+    assert len(reports) == 1
+    assert queue.summary().counts == {work_queue.DONE: 1}